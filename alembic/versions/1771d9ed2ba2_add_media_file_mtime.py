@@ -0,0 +1,27 @@
+"""Add file modification time to media
+
+Revision ID: 1771d9ed2ba2
+Revises: 6a77b0fb8d0a
+Create Date: 2026-10-17 09:12:41.204511
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1771d9ed2ba2'
+down_revision: Union[str, None] = '6a77b0fb8d0a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('media', sa.Column('file_mtime_ns', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('media') as batch_op:
+        batch_op.drop_column('file_mtime_ns')
@@ -0,0 +1,27 @@
+"""Add thumbnail path to media
+
+Revision ID: 2d9e6a4c8b71
+Revises: 8c5b3e7f2d16
+Create Date: 2026-10-17 14:22:07.481236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d9e6a4c8b71'
+down_revision: Union[str, None] = '8c5b3e7f2d16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('media', sa.Column('thumbnail_path', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('media') as batch_op:
+        batch_op.drop_column('thumbnail_path')
@@ -0,0 +1,34 @@
+"""Widen media.partial_hash for its chunk size prefix
+
+Revision ID: 3c8e2a7f5b19
+Revises: 5a1c7e9d3f42
+Create Date: 2026-10-17 18:42:10.215734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e2a7f5b19'
+down_revision: Union[str, None] = '5a1c7e9d3f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Partial hashes are now stored as "<chunk size>:<hex digest>". Existing ones carry no
+    # chunk size, so DuplicateFinder treats them as missing and recomputes them
+    with op.batch_alter_table('media') as batch_op:
+        batch_op.alter_column('partial_hash', existing_type=sa.String(length=64), type_=sa.String(length=80),
+                              existing_nullable=True)
+
+
+def downgrade() -> None:
+    media = sa.table('media', sa.column('partial_hash', sa.String))
+    op.execute(media.update().where(sa.func.length(media.c.partial_hash) > 64).values(partial_hash=None))
+    with op.batch_alter_table('media') as batch_op:
+        batch_op.alter_column('partial_hash', existing_type=sa.String(length=80), type_=sa.String(length=64),
+                              existing_nullable=True)
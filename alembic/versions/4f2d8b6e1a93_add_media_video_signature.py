@@ -0,0 +1,27 @@
+"""Add perceptual video signature to media
+
+Revision ID: 4f2d8b6e1a93
+Revises: e7a4c19d5b20
+Create Date: 2026-10-17 13:05:12.640288
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2d8b6e1a93'
+down_revision: Union[str, None] = 'e7a4c19d5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('media', sa.Column('video_signature', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('media') as batch_op:
+        batch_op.drop_column('video_signature')
@@ -0,0 +1,97 @@
+"""Add query indexes and integer width/height to media
+
+Revision ID: 5a1c7e9d3f42
+Revises: 2d9e6a4c8b71
+Create Date: 2026-10-17 15:06:42.930517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a1c7e9d3f42'
+down_revision: Union[str, None] = '2d9e6a4c8b71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows parsed and updated per backfill transaction
+BACKFILL_BATCH_SIZE = 10_000
+
+INDEXES = {
+    'ix_media_type_id': ['media_type_id', 'id'],
+    'ix_media_file_size': ['file_size'],
+    'ix_media_date_created': ['date_created'],
+    'ix_media_duration': ['duration'],
+    'ix_media_type_file_size': ['media_type_id', 'file_size'],
+    'ix_media_type_date_created': ['media_type_id', 'date_created'],
+    'ix_media_type_duration': ['media_type_id', 'duration'],
+    'ix_media_type_resolution': ['media_type_id', 'width', 'height'],
+}
+
+media = sa.table(
+    'media',
+    sa.column('id', sa.Integer),
+    sa.column('resolution', sa.String),
+    sa.column('width', sa.Integer),
+    sa.column('height', sa.Integer),
+)
+
+
+def _parse_resolution(resolution):
+    try:
+        width, height = (int(side) for side in resolution.lower().split('x'))
+    except (AttributeError, ValueError):
+        return None
+    return (width, height) if width > 0 and height > 0 else None
+
+
+def _backfill_dimensions(bind):
+    """
+    Fill width/height from the 'WxH' resolution strings, walking the table by id in
+    batches. Each batch is its own short transaction, so no long lock is held.
+    """
+    statement = (
+        media.update()
+        .where(media.c.id == sa.bindparam('row_id'))
+        .values(width=sa.bindparam('new_width'), height=sa.bindparam('new_height'))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(media.c.id, media.c.resolution)
+            .where(media.c.id > last_id)
+            .order_by(media.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        updates = []
+        for row_id, resolution in rows:
+            dimensions = _parse_resolution(resolution)
+            if dimensions is not None:
+                updates.append({'row_id': row_id, 'new_width': dimensions[0], 'new_height': dimensions[1]})
+        if updates:
+            bind.execute(statement, updates)
+
+
+def upgrade() -> None:
+    op.add_column('media', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('media', sa.Column('height', sa.Integer(), nullable=True))
+    # Outside the migration transaction: every backfill batch commits on its own, and
+    # PostgreSQL builds the indexes concurrently instead of blocking writes
+    with op.get_context().autocommit_block():
+        _backfill_dimensions(op.get_bind())
+        for name, columns in INDEXES.items():
+            op.create_index(name, 'media', columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name='media')
+    with op.batch_alter_table('media') as batch_op:
+        batch_op.drop_column('height')
+        batch_op.drop_column('width')
@@ -0,0 +1,29 @@
+"""Add inode and device to media for stat fingerprints
+
+Revision ID: 5db8f94c8f59
+Revises: 1771d9ed2ba2
+Create Date: 2026-10-17 10:03:17.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5db8f94c8f59'
+down_revision: Union[str, None] = '1771d9ed2ba2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('media', sa.Column('file_inode', sa.BigInteger(), nullable=True))
+    op.add_column('media', sa.Column('file_device', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('media') as batch_op:
+        batch_op.drop_column('file_device')
+        batch_op.drop_column('file_inode')
@@ -0,0 +1,27 @@
+"""Add perceptual image hash to media
+
+Revision ID: 8c5b3e7f2d16
+Revises: 4f2d8b6e1a93
+Create Date: 2026-10-17 13:48:30.115904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c5b3e7f2d16'
+down_revision: Union[str, None] = '4f2d8b6e1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('media', sa.Column('image_hash', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('media') as batch_op:
+        batch_op.drop_column('image_hash')
@@ -0,0 +1,35 @@
+"""Add metadata enrichment status, attempts and lease to media
+
+Revision ID: b3e1f0a9c2d4
+Revises: 5db8f94c8f59
+Create Date: 2026-10-17 11:42:05.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e1f0a9c2d4'
+down_revision: Union[str, None] = '5db8f94c8f59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows hold placeholder metadata, so they start out pending enrichment
+    op.add_column('media', sa.Column('metadata_status', sa.String(length=16), nullable=False,
+                                     server_default='pending'))
+    op.add_column('media', sa.Column('metadata_attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('media', sa.Column('metadata_leased_until', sa.DateTime(), nullable=True))
+    op.create_index('ix_media_metadata_status', 'media', ['metadata_status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_media_metadata_status', table_name='media')
+    with op.batch_alter_table('media') as batch_op:
+        batch_op.drop_column('metadata_leased_until')
+        batch_op.drop_column('metadata_attempts')
+        batch_op.drop_column('metadata_status')
@@ -0,0 +1,31 @@
+"""Add partial and full content hashes to media for duplicate detection
+
+Revision ID: e7a4c19d5b20
+Revises: b3e1f0a9c2d4
+Create Date: 2026-10-17 12:20:41.873512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a4c19d5b20'
+down_revision: Union[str, None] = 'b3e1f0a9c2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('media', sa.Column('partial_hash', sa.String(length=64), nullable=True))
+    op.add_column('media', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_media_content_hash', 'media', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_media_content_hash', table_name='media')
+    with op.batch_alter_table('media') as batch_op:
+        batch_op.drop_column('content_hash')
+        batch_op.drop_column('partial_hash')
@@ -15,6 +15,89 @@ class AppConfig:
         self.DATABASE_URL = self._get_env_variable("DATABASE_URL")
         self.LOG_LEVEL = self._get_env_variable("LOG_LEVEL", default="INFO")
 
+        # Bulk ingest tuning: rows per INSERT transaction and max seconds between flushes
+        self.SCAN_BATCH_SIZE = self._get_int_env_variable("SCAN_BATCH_SIZE", default=1000)
+        self.SCAN_FLUSH_INTERVAL = self._get_float_env_variable("SCAN_FLUSH_INTERVAL", default=5.0)
+
+        # Connection pools (per engine; the read and write engines each get one): persistent connections,
+        # extra connections under load, seconds to wait for a free one, seconds before a connection is
+        # replaced (-1 never), and whether a checkout tests the connection first
+        self.DB_POOL_SIZE = self._get_int_env_variable("DB_POOL_SIZE", default=5)
+        self.DB_MAX_OVERFLOW = self._get_int_env_variable("DB_MAX_OVERFLOW", default=10)
+        self.DB_POOL_TIMEOUT = self._get_float_env_variable("DB_POOL_TIMEOUT", default=30.0)
+        self.DB_POOL_RECYCLE = self._get_int_env_variable("DB_POOL_RECYCLE", default=1800)
+        self.DB_POOL_PRE_PING = self._get_bool_env_variable("DB_POOL_PRE_PING", default=True)
+
+        # Opt-in SQLite profile: WAL journal, commit durability, page cache (negative = KiB), memory-mapped
+        # bytes, temp tables in memory, lock wait, and read-only connections pooled beside the single writer
+        self.SQLITE_TUNED = self._get_bool_env_variable("SQLITE_TUNED", default=False)
+        self.SQLITE_JOURNAL_MODE = self._get_env_variable("SQLITE_JOURNAL_MODE", default="WAL")
+        self.SQLITE_SYNCHRONOUS = self._get_env_variable("SQLITE_SYNCHRONOUS", default="NORMAL")
+        self.SQLITE_CACHE_SIZE = self._get_int_env_variable("SQLITE_CACHE_SIZE", default=-64 * 1024)
+        self.SQLITE_MMAP_SIZE = self._get_int_env_variable("SQLITE_MMAP_SIZE", default=256 * 1024 * 1024)
+        self.SQLITE_TEMP_STORE = self._get_env_variable("SQLITE_TEMP_STORE", default="MEMORY")
+        self.SQLITE_BUSY_TIMEOUT_MS = self._get_int_env_variable("SQLITE_BUSY_TIMEOUT_MS", default=5000)
+        self.SQLITE_READ_POOL_SIZE = self._get_int_env_variable("SQLITE_READ_POOL_SIZE", default=4)
+
+        # Paginated and streaming catalog queries: rows per page or per fetch
+        self.QUERY_PAGE_SIZE = self._get_int_env_variable("QUERY_PAGE_SIZE", default=1000)
+
+        # Directory walker: threads listing directories and result order ("deterministic" or "as_completed")
+        self.SCAN_WORKERS = self._get_int_env_variable("SCAN_WORKERS", default=8)
+        self.SCAN_ORDERING = self._get_env_variable("SCAN_ORDERING", default="deterministic")
+
+        # ffprobe fallback for formats the native header parsers cannot read
+        self.FFPROBE_PATH = self._get_env_variable("FFPROBE_PATH", default="ffprobe")
+        self.FFPROBE_WORKERS = self._get_int_env_variable("FFPROBE_WORKERS", default=4)
+        self.FFPROBE_TIMEOUT = self._get_float_env_variable("FFPROBE_TIMEOUT", default=30.0)
+
+        # Background metadata enrichment: rows claimed per batch, lease length and attempts before failing
+        self.ENRICH_BATCH_SIZE = self._get_int_env_variable("ENRICH_BATCH_SIZE", default=500)
+        self.ENRICH_LEASE_SECONDS = self._get_float_env_variable("ENRICH_LEASE_SECONDS", default=300.0)
+        self.ENRICH_MAX_ATTEMPTS = self._get_int_env_variable("ENRICH_MAX_ATTEMPTS", default=3)
+
+        # Duplicate detection: bytes hashed at each of head/middle/tail, concurrent hashing threads
+        # and hashes stored per commit
+        self.HASH_CHUNK_SIZE = self._get_int_env_variable("HASH_CHUNK_SIZE", default=64 * 1024)
+        self.HASH_WORKERS = self._get_int_env_variable("HASH_WORKERS", default=4)
+        self.HASH_BATCH_SIZE = self._get_int_env_variable("HASH_BATCH_SIZE", default=100)
+
+        # Near-duplicate videos: frames hashed per video, decoding threads, signatures stored per commit
+        # and max Hamming distance
+        self.VIDEO_SIGNATURE_FRAMES = self._get_int_env_variable("VIDEO_SIGNATURE_FRAMES", default=4)
+        self.FINGERPRINT_WORKERS = self._get_int_env_variable("FINGERPRINT_WORKERS", default=4)
+        self.FINGERPRINT_BATCH_SIZE = self._get_int_env_variable("FINGERPRINT_BATCH_SIZE", default=100)
+        self.NEAR_DUPLICATE_DISTANCE = self._get_int_env_variable("NEAR_DUPLICATE_DISTANCE", default=16)
+
+        # Near-duplicate images: images decoded per hashing batch and hashes compared per vectorized step
+        self.IMAGE_HASH_BATCH_SIZE = self._get_int_env_variable("IMAGE_HASH_BATCH_SIZE", default=256)
+        self.IMAGE_SEARCH_CHUNK_SIZE = self._get_int_env_variable("IMAGE_SEARCH_CHUNK_SIZE", default=1 << 20)
+
+        # Sidecar cache of extracted metadata keyed by stat fingerprint, bounded by entry count
+        self.METADATA_CACHE_PATH = self._get_env_variable("METADATA_CACHE_PATH", default="cache/metadata_cache.db")
+        self.METADATA_CACHE_SIZE = self._get_int_env_variable("METADATA_CACHE_SIZE", default=1_000_000)
+
+        # Metadata similarity: persisted BallTree location and max feature distance for duplicate candidates
+        self.METADATA_INDEX_PATH = self._get_env_variable("METADATA_INDEX_PATH", default="cache/metadata_index.pkl")
+        self.METADATA_DUPLICATE_RADIUS = self._get_float_env_variable("METADATA_DUPLICATE_RADIUS", default=0.5)
+
+        # Thumbnails: content-addressed output directory, tiers (name:longest side, one decode renders all),
+        # the tier linked from Media.thumbnail_path, JPEG quality and worker processes
+        self.THUMBNAIL_DIR = self._get_env_variable("THUMBNAIL_DIR", default="cache/thumbnails")
+        self.THUMBNAIL_TIERS = self._get_env_variable("THUMBNAIL_TIERS", default="icon:96,medium:320,preview:800")
+        self.THUMBNAIL_PRIMARY_TIER = self._get_env_variable("THUMBNAIL_PRIMARY_TIER", default="medium")
+        self.THUMBNAIL_QUALITY = self._get_int_env_variable("THUMBNAIL_QUALITY", default=85)
+        self.THUMBNAIL_WORKERS = self._get_int_env_variable("THUMBNAIL_WORKERS", default=os.cpu_count() or 4)
+
+        # Packed thumbnail store for the GUI: directory of segment files plus index, and bytes per segment
+        self.THUMBNAIL_STORE_DIR = self._get_env_variable("THUMBNAIL_STORE_DIR", default="cache/thumbnail_store")
+        self.THUMBNAIL_SEGMENT_SIZE = self._get_int_env_variable("THUMBNAIL_SEGMENT_SIZE", default=256 * 1024 * 1024)
+
+        # Thumbnail cache for the GUI: bytes held in memory, threads loading neighbours ahead of scrolling
+        self.THUMBNAIL_MEMORY_CACHE_BYTES = self._get_int_env_variable("THUMBNAIL_MEMORY_CACHE_BYTES",
+                                                                       default=64 * 1024 * 1024)
+        self.THUMBNAIL_PREFETCH_WORKERS = self._get_int_env_variable("THUMBNAIL_PREFETCH_WORKERS", default=2)
+
     def _get_env_variable(self, var_name: str, default: str = None) -> str:
         """
         Retrieves environment variable value or raises exception if missing.
@@ -35,6 +118,46 @@ class AppConfig:
             raise ConfigError(f"Required environment variable '{var_name}' is missing.")
         return value
 
+    def _get_int_env_variable(self, var_name: str, default: int) -> int:
+        """
+        Retrieves an integer environment variable, falling back to a default.
+
+        Raises:
+            ConfigError: If the value cannot be parsed as an integer.
+        """
+        value = self._get_env_variable(var_name, default=str(default))
+        try:
+            return int(value)
+        except ValueError:
+            raise ConfigError(f"Environment variable '{var_name}' must be an integer, got '{value}'.")
+
+    def _get_bool_env_variable(self, var_name: str, default: bool) -> bool:
+        """
+        Retrieves a boolean environment variable (true/false, yes/no, on/off or 1/0), falling back to a default.
+
+        Raises:
+            ConfigError: If the value is not a recognized boolean.
+        """
+        value = self._get_env_variable(var_name, default=str(default)).strip().lower()
+        if value in ("1", "true", "yes", "on"):
+            return True
+        if value in ("0", "false", "no", "off"):
+            return False
+        raise ConfigError(f"Environment variable '{var_name}' must be a boolean, got '{value}'.")
+
+    def _get_float_env_variable(self, var_name: str, default: float) -> float:
+        """
+        Retrieves a float environment variable, falling back to a default.
+
+        Raises:
+            ConfigError: If the value cannot be parsed as a number.
+        """
+        value = self._get_env_variable(var_name, default=str(default))
+        try:
+            return float(value)
+        except ValueError:
+            raise ConfigError(f"Environment variable '{var_name}' must be a number, got '{value}'.")
+
 
 # Instantiate the configuration
 config = AppConfig()
@@ -1,18 +1,289 @@
 import os
+import threading
+import time
+import weakref
 
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
 
 from app.media_scan.config.settings import config
 
 # Define Base (single instance)
 Base = declarative_base()
 
-# Configure database i.e. SQLAlchemy setup with environment configuration
-engine = create_engine(config.DATABASE_URL, echo=config.LOG_LEVEL == "DEBUG")
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+class PoolMetrics:
+    """
+    Checkout counters of one engine's connection pool.
+
+    `in_use` follows the pool's checkout and checkin events. Checkout waits
+    (including opening a new connection) are timed by MeteredQueuePool, so
+    pools of other classes, such as in-memory SQLite's, report no waits.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Zero every counter (a forked child starts with none of its parent's connections).
+        """
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.max_in_use = 0
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def attach(self, engine):
+        """
+        Start counting the checkouts of an engine's pool.
+        """
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        if isinstance(engine.pool, MeteredQueuePool):
+            engine.pool.metrics = self
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> dict:
+        """
+        Return the connections in use (now and at most) and checkout wait statistics in seconds.
+        """
+        with self._lock:
+            return {
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "checkouts": self.checkouts,
+                "wait_total": self.wait_total,
+                "wait_mean": self.wait_total / self.checkouts if self.checkouts else 0.0,
+                "wait_max": self.wait_max,
+            }
+
+
+class MeteredQueuePool(QueuePool):
+    """
+    QueuePool that reports how long each checkout waited to its PoolMetrics.
+    """
+    metrics = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            # Checkouts that time out are counted too; their wait is the pool timeout
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        # Engine.dispose() swaps in a recreated pool, which keeps reporting to the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+# Metrics of every engine made by create_engines, also used to find them after a fork
+_engine_metrics = weakref.WeakKeyDictionary()
+
+
+def _create_engine(database_url: str, **kwargs):
+    engine = create_engine(database_url, echo=config.LOG_LEVEL == "DEBUG", **kwargs)
+    metrics = PoolMetrics()
+    metrics.attach(engine)
+    _engine_metrics[engine] = metrics
+    return engine
+
+
+def _pool_options(**overrides) -> dict:
+    """
+    Return the create_engine pool arguments from the DB_POOL_* configuration.
+    """
+    return {
+        "poolclass": MeteredQueuePool,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        **overrides,
+    }
+
+
+def sqlite_pragmas(read_only: bool = False) -> dict:
+    """
+    Return the PRAGMA settings of the SQLite tuning profile, in the order they are applied.
+
+    Args:
+        read_only (bool, optional): Settings for a reader: `query_only`, so the connection refuses
+            writes, instead of `journal_mode`. Defaults to False.
+
+    Returns:
+        dict[str, str | int]: PRAGMA name to value, taken from the SQLITE_* configuration.
+    """
+    pragmas = {
+        # Set first, so a lock held by another connection is waited for rather than failing
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT_MS,
+        # In WAL mode NORMAL only syncs at checkpoints; a power loss can drop the last
+        # commits but never corrupts the database
+        "synchronous": config.SQLITE_SYNCHRONOUS,
+        "cache_size": config.SQLITE_CACHE_SIZE,
+        "mmap_size": config.SQLITE_MMAP_SIZE,
+        "temp_store": config.SQLITE_TEMP_STORE,
+    }
+    if read_only:
+        pragmas["query_only"] = "ON"
+    else:
+        # WAL lets readers keep reading while the writer commits. The mode is stored in
+        # the database file, so readers pick it up without setting it themselves
+        pragmas["journal_mode"] = config.SQLITE_JOURNAL_MODE
+    return pragmas
+
+
+def apply_pragmas(engine, pragmas: dict):
+    """
+    Run the PRAGMA statements on every new DBAPI connection of an engine.
+    """
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+
+def create_engines(database_url: str = None, sqlite_tuned: bool = None):
+    """
+    Create the write and read engines for a database URL.
+
+    Both use a connection pool configured by the DB_POOL_* settings. On
+    PostgreSQL the read engine's connections default to read-only
+    transactions. With the SQLite tuning profile the writer is a single pooled
+    connection, so writes from different threads or sessions queue for it
+    instead of failing with "database is locked", and reads go to a separate
+    pool of `query_only` connections that WAL lets run alongside the writer.
+    Untuned and in-memory SQLite use one engine for both.
+
+    Args:
+        database_url (str, optional): Database URL. Defaults to config.DATABASE_URL.
+        sqlite_tuned (bool, optional): Apply the SQLite profile. Defaults to config.SQLITE_TUNED.
+
+    Returns:
+        tuple[Engine, Engine]: (write_engine, read_engine); the same engine twice when shared.
+    """
+    database_url = database_url or config.DATABASE_URL
+    sqlite_tuned = config.SQLITE_TUNED if sqlite_tuned is None else sqlite_tuned
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        # SQLAlchemy keeps one connection per thread for in-memory databases; pool settings do not apply
+        engine = _create_engine(database_url)
+        return engine, engine
+    if backend == "sqlite" and not sqlite_tuned:
+        engine = _create_engine(database_url, **_pool_options())
+        return engine, engine
+
+    if backend == "sqlite":
+        write_engine = _create_engine(database_url, **_pool_options(pool_size=1, max_overflow=0))
+        apply_pragmas(write_engine, sqlite_pragmas())
+        read_engine = _create_engine(
+            database_url, **_pool_options(pool_size=config.SQLITE_READ_POOL_SIZE, max_overflow=0)
+        )
+        apply_pragmas(read_engine, sqlite_pragmas(read_only=True))
+        return write_engine, read_engine
+
+    connect_args = {"options": "-c default_transaction_read_only=on"} if backend == "postgresql" else {}
+    write_engine = _create_engine(database_url, **_pool_options())
+    read_engine = _create_engine(database_url, connect_args=connect_args, **_pool_options())
+    return write_engine, read_engine
+
+
+# The process's (write_engine, read_engine), created on first use by get_engine
+_engines = None
+_engines_lock = threading.Lock()
+
+
+def get_engine(read_only: bool = False):
+    """
+    Return this process's write or read engine, creating both from the configuration on first use.
+
+    Args:
+        read_only (bool, optional): Return the read engine. Defaults to False.
+    """
+    global _engines
+    if _engines is None:
+        with _engines_lock:
+            if _engines is None:
+                _engines = create_engines()
+    return _engines[1 if read_only else 0]
+
+
+def pool_metrics(read_only: bool = False) -> dict:
+    """
+    Return the connections in use and checkout wait statistics of the write or read engine's pool.
+    """
+    return _engine_metrics[get_engine(read_only)].snapshot()
+
+
+def _dispose_after_fork():
+    """
+    Give a forked child fresh pools. The inherited connections still belong to the
+    parent, so they are dropped without being closed; new ones open on first use.
+    """
+    global _engines_lock
+    _engines_lock = threading.Lock()
+    for engine, metrics in list(_engine_metrics.items()):
+        engine.dispose(close=False)
+        metrics.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+class FactorySession(Session):
+    """
+    Session that uses the process's engines unless bound explicitly: the write
+    engine, or the read engine for sessions with info['read_only'] set.
+    """
+
+    def get_bind(self, mapper=None, **kwargs):
+        if self.bind is None and kwargs.get("bind") is None:
+            return get_engine(read_only=self.info.get("read_only", False))
+        return super().get_bind(mapper, **kwargs)
+
+
+# Create session factories; ReadSessionLocal is for sessions that never write.
+# Neither creates an engine until a session first needs a connection.
+SessionLocal = sessionmaker(class_=FactorySession, autocommit=False, autoflush=False)
+ReadSessionLocal = sessionmaker(class_=FactorySession, autocommit=False, autoflush=False, info={"read_only": True})
+
+
+def __getattr__(name):
+    # `engine` and `read_engine` are still importable, but only built when first accessed
+    if name == "engine":
+        return get_engine()
+    if name == "read_engine":
+        return get_engine(read_only=True)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def initialize_database(base):
     """
@@ -20,5 +291,5 @@ def initialize_database(base):
     Args:
         base: Declarative base containing table definitions
     """
-    base.metadata.create_all(bind=engine)
+    base.metadata.create_all(bind=get_engine())
     # print("Database initialized.")
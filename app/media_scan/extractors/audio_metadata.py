@@ -0,0 +1,248 @@
+import os
+import struct
+
+from app.media_scan.extractors.media_metadata import MediaMetadataExtractor, PositionalReader
+
+# MPEG audio bitrates in kbit/s, indexed by [table][bitrate index]
+_MP3_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = (44100, 48000, 32000)
+# Version bits -> MPEG version (1, 2 or 2.5, stored as 25); 1 is reserved
+_MP3_VERSIONS = {0: 25, 2: 2, 3: 1}
+_ADTS_SAMPLE_RATES = (96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050,
+                      16000, 12000, 11025, 8000, 7350)
+_WAV_CODECS = {0x0001: "PCM", 0x0003: "PCM float", 0x0006: "A-law", 0x0007: "mu-law",
+               0x0055: "MP3", 0xFFFE: "PCM"}
+
+
+class AudioMetadataExtractor(MediaMetadataExtractor):
+    """
+    Reads audio duration, codec and bit rate from headers, without decoding.
+
+    - WAV: the RIFF `fmt ` and `data` chunk sizes.
+    - FLAC: the STREAMINFO block (total samples / sample rate).
+    - MP3: the Xing/Info or VBRI header of the first frame for VBR files, otherwise
+      the first frame header and the file size (CBR). A leading ID3v2 tag is skipped.
+    - Ogg (Vorbis, Opus): the sample rate from the identification header and the
+      granule position of the last page, found by reading only the file's tail.
+    - AAC (ADTS): frame lengths of the first `HEADER_SIZE` bytes, extrapolated
+      to the file size.
+
+    Example:
+        AudioMetadataExtractor().extract("/music/track.flac")
+        # {'duration': 241.3, 'codec': 'FLAC', 'bit_rate': 912000}
+    """
+
+    HEADER_SIZE = 64 * 1024
+    OGG_TAIL_SIZE = 64 * 1024
+
+    def extract(self, file_path: str, stat=None) -> dict:
+        try:
+            with PositionalReader(file_path) as reader:
+                file_size = stat.st_size if stat is not None else os.fstat(reader.fd).st_size
+                return self._parse(reader, file_size)
+        except (OSError, struct.error, IndexError, ValueError, ZeroDivisionError):
+            return {}
+
+    def _parse(self, reader, file_size):
+        header = reader.read(0, self.HEADER_SIZE)
+        audio_start = _id3v2_size(header)
+        if audio_start:
+            header = reader.read(audio_start, self.HEADER_SIZE)
+
+        if header.startswith(b"RIFF") and header[8:12] == b"WAVE":
+            return self._parse_wav(reader, file_size)
+        if header.startswith(b"fLaC"):
+            return _parse_flac(header, file_size)
+        if header.startswith(b"OggS"):
+            return self._parse_ogg(reader, header, file_size)
+        if len(header) > 1 and header[0] == 0xFF and header[1] & 0xF6 == 0xF0:
+            return _parse_adts(header, file_size - audio_start)
+        return _parse_mp3(header, file_size - audio_start - _id3v1_size(reader, file_size))
+
+    def _parse_wav(self, reader, file_size):
+        """
+        Walk the RIFF chunks for `fmt ` and `data`.
+        """
+        offset = 12
+        fmt = None
+        while offset + 8 <= file_size:
+            chunk_id, chunk_size = struct.unpack("<4sI", reader.read(offset, 8))
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", reader.read(offset + 8, 16))
+            elif chunk_id == b"data" and fmt is not None:
+                # Streaming writers leave the size at 0 or 0xFFFFFFFF
+                data_size = min(chunk_size, file_size - offset - 8) or file_size - offset - 8
+                codec_tag, _, _, byte_rate, _, _ = fmt
+                return {
+                    "duration": data_size / byte_rate,
+                    "codec": _WAV_CODECS.get(codec_tag, f"WAV 0x{codec_tag:04x}"),
+                    "bit_rate": byte_rate * 8,
+                }
+            offset += 8 + chunk_size + (chunk_size & 1)
+        return {}
+
+    def _parse_ogg(self, reader, header, file_size):
+        """
+        Identify the codec from the first packet and the duration from the last granule position.
+        """
+        serial = struct.unpack_from("<I", header, 14)[0]
+        packet = header[27 + header[26]:]
+        if packet.startswith(b"\x01vorbis"):
+            codec, sample_rate, pre_skip = "Vorbis", struct.unpack_from("<I", packet, 12)[0], 0
+        elif packet.startswith(b"OpusHead"):
+            # Opus granule positions always count 48 kHz samples
+            codec, sample_rate, pre_skip = "Opus", 48000, struct.unpack_from("<H", packet, 10)[0]
+        else:
+            return {}
+
+        tail_start = max(file_size - self.OGG_TAIL_SIZE, 0)
+        tail = reader.read(tail_start, self.OGG_TAIL_SIZE)
+        position = tail.rfind(b"OggS")
+        while position >= 0:
+            if len(tail) >= position + 27 and tail[position + 4] == 0:
+                granule, page_serial = struct.unpack_from("<qI", tail, position + 6)
+                if page_serial == serial and granule >= 0:
+                    duration = (granule - pre_skip) / sample_rate
+                    return _audio_metadata(duration, codec, file_size)
+            position = tail.rfind(b"OggS", 0, position)
+        return {"codec": codec}
+
+
+def _id3v2_size(header):
+    """
+    Return the size of a leading ID3v2 tag (synchsafe length, optional footer), or 0.
+    """
+    if not header.startswith(b"ID3") or len(header) < 10:
+        return 0
+    size = 0
+    for byte in header[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    return 10 + size + (10 if header[5] & 0x10 else 0)
+
+
+def _id3v1_size(reader, file_size):
+    if file_size >= 128 and reader.read(file_size - 128, 3) == b"TAG":
+        return 128
+    return 0
+
+
+def _parse_flac(header, file_size):
+    """
+    STREAMINFO is always the first metadata block: 20-bit sample rate, 36-bit sample count.
+    """
+    if len(header) < 26 or header[4] & 0x7F != 0:
+        return {}
+    info = int.from_bytes(header[18:26], "big")
+    sample_rate = info >> 44
+    total_samples = info & 0xFFFFFFFFF
+    if not sample_rate or not total_samples:
+        return {"codec": "FLAC"}
+    return _audio_metadata(total_samples / sample_rate, "FLAC", file_size)
+
+
+def _parse_mp3_frame_header(data, offset):
+    """
+    Decode the 4-byte MPEG audio frame header at offset, or return None if invalid.
+    """
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or b1 & 0xE0 != 0xE0:
+        return None
+    version = _MP3_VERSIONS.get((b1 >> 3) & 3)
+    layer = 4 - ((b1 >> 1) & 3)
+    bitrate_index, rate_index = b2 >> 4, (b2 >> 2) & 3
+    if version is None or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    table = (1, layer) if version == 1 else (2, 1 if layer == 1 else 2)
+    bitrate = _MP3_BITRATES[table][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[rate_index] // {1: 1, 2: 2, 25: 4}[version]
+    padding = (b2 >> 1) & 1
+    if layer == 1:
+        samples, frame_length = 384, (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 576 if layer == 3 and version != 1 else 1152
+        frame_length = samples // 8 * bitrate // sample_rate + padding
+    return {
+        "version": version, "layer": layer, "bitrate": bitrate, "sample_rate": sample_rate,
+        "samples": samples, "frame_length": frame_length, "mono": b3 >> 6 == 3,
+    }
+
+
+def _find_mp3_frame(data):
+    """
+    Find the first frame header, confirmed by the following frame where it is in the buffer.
+    """
+    offset = data.find(b"\xff")
+    while 0 <= offset <= len(data) - 4:
+        frame = _parse_mp3_frame_header(data, offset)
+        if frame is not None:
+            following = offset + frame["frame_length"]
+            if following > len(data) - 4 or _parse_mp3_frame_header(data, following) is not None:
+                return offset, frame
+        offset = data.find(b"\xff", offset + 1)
+    return None, None
+
+
+def _parse_mp3(header, audio_size):
+    offset, frame = _find_mp3_frame(header)
+    if frame is None:
+        return {}
+    codec = {1: "MP1", 2: "MP2", 3: "MP3"}[frame["layer"]]
+    side_info = (32 if not frame["mono"] else 17) if frame["version"] == 1 else (17 if not frame["mono"] else 9)
+
+    frames = stream_bytes = None
+    xing = offset + 4 + side_info
+    vbri = offset + 36
+    if header[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack_from(">I", header, xing + 4)[0]
+        position = xing + 8
+        if flags & 1:
+            frames = struct.unpack_from(">I", header, position)[0]
+            position += 4
+        if flags & 2:
+            stream_bytes = struct.unpack_from(">I", header, position)[0]
+    elif header[vbri:vbri + 4] == b"VBRI":
+        stream_bytes, frames = struct.unpack_from(">II", header, vbri + 10)
+
+    if frames:
+        duration = frames * frame["samples"] / frame["sample_rate"]
+        return {
+            "duration": duration,
+            "codec": codec,
+            "bit_rate": int((stream_bytes or audio_size - offset) * 8 / duration),
+        }
+    # Constant bit rate: every frame has the first frame's bit rate
+    return {
+        "duration": (audio_size - offset) * 8 / frame["bitrate"],
+        "codec": codec,
+        "bit_rate": frame["bitrate"],
+    }
+
+
+def _parse_adts(header, audio_size):
+    """
+    Average the ADTS frame lengths in the header buffer and extrapolate to the file size.
+    """
+    sample_rate = _ADTS_SAMPLE_RATES[(header[2] >> 2) & 0xF]
+    offset = frames = 0
+    while offset + 7 <= len(header) and header[offset] == 0xFF and header[offset + 1] & 0xF6 == 0xF0:
+        frame_length = ((header[offset + 3] & 3) << 11) | (header[offset + 4] << 3) | (header[offset + 5] >> 5)
+        if frame_length < 7:
+            break
+        offset += frame_length
+        frames += 1
+    if not frames:
+        return {"codec": "AAC"}
+    estimated_frames = audio_size / (offset / frames)
+    return _audio_metadata(estimated_frames * 1024 / sample_rate, "AAC", audio_size)
+
+
+def _audio_metadata(duration, codec, file_size):
+    if duration <= 0:
+        return {"codec": codec}
+    return {"duration": duration, "codec": codec, "bit_rate": int(file_size * 8 / duration)}
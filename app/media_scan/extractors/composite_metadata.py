@@ -0,0 +1,55 @@
+import os
+
+from app.media_scan.extractors.audio_metadata import AudioMetadataExtractor
+from app.media_scan.extractors.image_metadata import ImageMetadataExtractor
+from app.media_scan.extractors.media_metadata import with_dimensions
+from app.media_scan.extractors.video_metadata import VideoMetadataExtractor
+
+
+class CompositeMetadataExtractor:
+    """
+    Composite extractor that dispatches to the extractor registered for a media type.
+
+    Media types without an extractor (or files an extractor cannot parse)
+    yield an empty dict, leaving the scanner's placeholder values in place.
+
+    With a MetadataCache, results are looked up by the file's stat fingerprint
+    before any extractor opens the file, and stored after extraction.
+    """
+
+    def __init__(self, cache=None):
+        """
+        Args:
+            cache (MetadataCache, optional): Persistent cache of extraction results.
+        """
+        self.cache = cache
+        self.extractors = {
+            "video": VideoMetadataExtractor(),
+            "image": ImageMetadataExtractor(),
+            "audio": AudioMetadataExtractor(),
+        }
+
+    def extract(self, file_path: str, media_type: str, stat=None) -> dict:
+        """
+        Extract metadata for a file of the given media type.
+
+        Args:
+            file_path (str): Full path of the media file.
+            media_type (str): Media type name (e.g. 'video', 'audio', 'image').
+            stat (os.stat_result, optional): Stat result if the caller already has one.
+
+        Returns:
+            dict: Extracted Media columns, possibly empty.
+        """
+        extractor = self.extractors.get(media_type)
+        if extractor is None:
+            return {}
+        if self.cache is None:
+            return extractor.extract(file_path, stat)
+
+        stat = stat or os.stat(file_path)
+        metadata = self.cache.get(stat)
+        if metadata is None:
+            metadata = extractor.extract(file_path, stat)
+            self.cache.put(stat, metadata)
+        return with_dimensions(metadata)
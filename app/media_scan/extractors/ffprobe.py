@@ -0,0 +1,234 @@
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.media_scan.config.settings import config
+from app.media_scan.extractors.media_metadata import MediaMetadataExtractor, resolution_columns, with_dimensions
+
+# ffprobe codec_name -> codec name stored in Media.codec (others are stored upper-cased)
+FFPROBE_CODECS = {
+    "h264": "H.264", "hevc": "H.265", "mpeg4": "MPEG-4", "mpeg2video": "MPEG-2",
+    "mpeg1video": "MPEG-1", "av1": "AV1", "vp8": "VP8", "vp9": "VP9", "theora": "Theora",
+    "mjpeg": "MJPEG", "prores": "ProRes", "h263": "H.263", "wmv1": "WMV7", "wmv2": "WMV8",
+    "wmv3": "WMV9", "vc1": "VC-1", "msmpeg4v3": "MS-MPEG4", "aac": "AAC", "mp3": "MP3",
+    "opus": "Opus", "vorbis": "Vorbis", "flac": "FLAC", "ac3": "AC-3", "eac3": "E-AC-3",
+    "wmav2": "WMA", "pcm_s16le": "PCM",
+}
+
+
+class FFprobeError(Exception):
+    """Raised when ffprobe fails, times out or produces unreadable output for a file."""
+    pass
+
+
+def parse_ffprobe_output(probe: dict) -> dict:
+    """
+    Map `ffprobe -show_format -show_streams` JSON to Media columns.
+
+    Resolution and codec come from the first video stream, or the codec from
+    the first audio stream for audio-only files. Fields ffprobe reports as
+    missing or 'N/A' are left out.
+    """
+    metadata = {}
+    container = probe.get("format", {})
+    try:
+        duration = float(container.get("duration", 0))
+        if duration > 0:
+            metadata["duration"] = duration
+    except ValueError:
+        pass
+    try:
+        bit_rate = int(container.get("bit_rate", 0))
+        if bit_rate > 0:
+            metadata["bit_rate"] = bit_rate
+    except ValueError:
+        pass
+
+    streams = probe.get("streams", [])
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), None)
+    audio = next((stream for stream in streams if stream.get("codec_type") == "audio"), None)
+    stream = video or audio
+    if stream is not None and stream.get("codec_name"):
+        metadata["codec"] = FFPROBE_CODECS.get(stream["codec_name"], stream["codec_name"].upper())
+    if video is not None and video.get("width") and video.get("height"):
+        metadata.update(resolution_columns(int(video["width"]), int(video["height"])))
+    return metadata
+
+
+class FFprobeExtractor(MediaMetadataExtractor):
+    """
+    Runs ffprobe on a single file and maps its JSON output to Media columns.
+
+    Used for containers the native parsers do not handle (e.g. AVI, WMV, FLV)
+    and for files whose headers they could not parse. Each call is a separate
+    process with a hard timeout; on timeout the process is killed.
+
+    Example:
+        FFprobeExtractor(timeout=10).probe("/videos/old.avi")
+        # {'duration': 95.2, 'bit_rate': 1200000, 'codec': 'MPEG-4', 'resolution': '640x480',
+        #  'width': 640, 'height': 480}
+    """
+
+    def __init__(self, executable: str = None, timeout: float = None):
+        """
+        Args:
+            executable (str, optional): ffprobe binary. Defaults to config.FFPROBE_PATH.
+            timeout (float, optional): Seconds before the process is killed. Defaults to config.FFPROBE_TIMEOUT.
+        """
+        self.executable = executable or config.FFPROBE_PATH
+        self.timeout = config.FFPROBE_TIMEOUT if timeout is None else timeout
+
+    def probe(self, file_path: str) -> dict:
+        """
+        Probe a file.
+
+        Raises:
+            FFprobeError: If ffprobe is missing, exits non-zero, times out or prints invalid JSON.
+        """
+        command = [self.executable, "-v", "error", "-print_format", "json",
+                   "-show_format", "-show_streams", file_path]
+        try:
+            # subprocess.run kills and reaps the child when the timeout expires
+            completed = subprocess.run(command, capture_output=True, timeout=self.timeout, check=False)
+        except subprocess.TimeoutExpired:
+            raise FFprobeError(f"timed out after {self.timeout}s")
+        except OSError as e:
+            raise FFprobeError(f"could not run {self.executable}: {e}")
+        if completed.returncode != 0:
+            message = completed.stderr.decode(errors="replace").strip().splitlines()
+            raise FFprobeError(f"exit code {completed.returncode}: {message[-1] if message else 'no output'}")
+        try:
+            return parse_ffprobe_output(json.loads(completed.stdout))
+        except (ValueError, AttributeError) as e:
+            raise FFprobeError(f"invalid JSON output: {e}")
+
+    def extract(self, file_path: str, stat=None) -> dict:
+        try:
+            return self.probe(file_path)
+        except FFprobeError:
+            return {}
+
+
+class FFprobePool:
+    """
+    Bounded pool of concurrent ffprobe processes for metadata enrichment.
+
+    Files are submitted while the scan continues; results are collected with
+    `completed()` (non-blocking) or `drain()` (waits for the rest). Each file
+    runs with the extractor's timeout, so a hung demuxer costs at most one
+    worker for that long. Failures are recorded per path instead of raised, and
+    per-file wall-clock latencies are kept for sizing the pool. With a
+    MetadataCache, files probed before (same stat fingerprint) are answered
+    from the cache without starting ffprobe.
+
+    Example:
+        pool = FFprobePool(max_workers=4)
+        pool.submit("/videos/old.avi")
+        for file_path, metadata in pool.drain():
+            ...
+        pool.stats()  # {'probed': 1, 'failed': 0, 'p50': 0.08, 'p95': 0.08, 'max': 0.08}
+    """
+
+    def __init__(self, extractor: FFprobeExtractor = None, max_workers: int = None, cache=None):
+        """
+        Args:
+            extractor (FFprobeExtractor, optional): Configured extractor. Defaults to FFprobeExtractor().
+            max_workers (int, optional): Concurrent ffprobe processes. Defaults to config.FFPROBE_WORKERS.
+            cache (MetadataCache, optional): Persistent cache of probe results (namespace 'ffprobe').
+        """
+        self.extractor = extractor or FFprobeExtractor()
+        self.cache = cache
+        self.max_workers = max_workers or config.FFPROBE_WORKERS
+        self.failures = {}
+        self.latencies = []
+        self._executor = None
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def submit(self, file_path: str):
+        """
+        Queue a file for probing; returns immediately.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ffprobe")
+        self._futures.append(self._executor.submit(self._probe, file_path))
+
+    def _probe(self, file_path):
+        stat = None
+        if self.cache is not None:
+            try:
+                stat = os.stat(file_path)
+            except OSError as e:
+                with self._lock:
+                    self.failures[file_path] = str(e)
+                return file_path, None
+            metadata = self.cache.get(stat, namespace="ffprobe")
+            if metadata is not None:
+                return file_path, with_dimensions(metadata)
+
+        start = time.perf_counter()
+        try:
+            metadata = self.extractor.probe(file_path)
+        except FFprobeError as e:
+            metadata = None
+            with self._lock:
+                self.failures[file_path] = str(e)
+        with self._lock:
+            self.latencies.append(time.perf_counter() - start)
+        if metadata is not None and stat is not None:
+            self.cache.put(stat, metadata, namespace="ffprobe")
+        return file_path, metadata
+
+    def completed(self):
+        """
+        Yield (file_path, metadata) for finished probes that produced metadata, without waiting.
+        """
+        # Check each future once, so a probe finishing mid-scan lands in exactly one list
+        finished, pending = [], []
+        for future in self._futures:
+            (finished if future.done() else pending).append(future)
+        self._futures = pending
+        yield from self._successful(finished)
+
+    def drain(self):
+        """
+        Wait for all queued probes and yield (file_path, metadata) for those that produced metadata.
+        """
+        futures, self._futures = self._futures, []
+        yield from self._successful(future for future in futures)
+
+    @staticmethod
+    def _successful(futures):
+        for future in futures:
+            file_path, metadata = future.result()
+            if metadata:
+                yield file_path, metadata
+
+    def stats(self) -> dict:
+        """
+        Summarize probe counts and latency percentiles (seconds).
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+            failed = len(self.failures)
+        if not latencies:
+            return {"probed": 0, "failed": failed, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        return {
+            "probed": len(latencies),
+            "failed": failed,
+            "p50": latencies[len(latencies) // 2],
+            "p95": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+            "max": latencies[-1],
+        }
+
+    def shutdown(self):
+        """
+        Cancel probes that have not started and release the worker threads.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._futures = []
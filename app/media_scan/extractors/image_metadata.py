@@ -0,0 +1,143 @@
+import struct
+
+from app.media_scan.extractors.media_metadata import MediaMetadataExtractor, PositionalReader, resolution_columns
+
+# JPEG start-of-frame markers (all except DHT C4, JPG C8 and DAC CC)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers without a length field
+_JPEG_STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+_TIFF_IMAGE_WIDTH = 256
+_TIFF_IMAGE_LENGTH = 257
+_TIFF_SHORT = 3
+_TIFF_LONG = 4
+
+
+class ImageMetadataExtractor(MediaMetadataExtractor):
+    """
+    Reads image dimensions and format from the header, without decoding pixels.
+
+    Each format is handled with a few small positional reads:
+    - PNG: the IHDR chunk.
+    - JPEG: walks the marker segments by their length fields up to the SOF marker,
+      skipping EXIF/ICC payloads by offset instead of reading them.
+    - GIF: the logical screen descriptor.
+    - BMP: the DIB header (core and info variants, top-down bitmaps).
+    - TIFF: the ImageWidth/ImageLength tags of the first IFD, in either byte order.
+    - WebP: the VP8, VP8L or VP8X chunk header.
+
+    At most `MAX_READS` reads of `CHUNK_SIZE` bytes are issued per file, so
+    memory and I/O stay bounded even for corrupt files.
+
+    Example:
+        ImageMetadataExtractor().extract("/photos/cat.jpg")
+        # {'resolution': '4032x3024', 'width': 4032, 'height': 3024, 'codec': 'JPEG'}
+    """
+
+    CHUNK_SIZE = 512
+    MAX_READS = 64
+
+    def extract(self, file_path: str, stat=None) -> dict:
+        try:
+            with PositionalReader(file_path) as reader:
+                header = reader.read(0, self.CHUNK_SIZE)
+                return self._parse(reader, header)
+        except (OSError, struct.error, IndexError, ValueError):
+            return {}
+
+    def _parse(self, reader, header):
+        if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR":
+            width, height = struct.unpack_from(">II", header, 16)
+            return _image_metadata(width, height, "PNG")
+        if header.startswith(b"\xff\xd8"):
+            return self._parse_jpeg(reader, header)
+        if header.startswith((b"GIF87a", b"GIF89a")):
+            width, height = struct.unpack_from("<HH", header, 6)
+            return _image_metadata(width, height, "GIF")
+        if header.startswith(b"BM"):
+            dib_size = struct.unpack_from("<I", header, 14)[0]
+            if dib_size == 12:
+                width, height = struct.unpack_from("<HH", header, 18)
+            else:
+                width, height = struct.unpack_from("<ii", header, 18)
+            return _image_metadata(width, abs(height), "BMP")
+        if header[:4] in (b"II*\x00", b"MM\x00*"):
+            return self._parse_tiff(reader, header)
+        if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+            return _parse_webp(header)
+        return {}
+
+    def _parse_jpeg(self, reader, header):
+        """
+        Follow JPEG marker segments from SOI to the first SOF.
+        """
+        offset = 2
+        for _ in range(self.MAX_READS):
+            chunk = reader.read(offset, 10)
+            if len(chunk) < 4 or chunk[0] != 0xFF:
+                return {}
+            marker = chunk[1]
+            if marker == 0xFF:  # fill byte
+                offset += 1
+                continue
+            if marker in _JPEG_STANDALONE_MARKERS:
+                offset += 2
+                continue
+            length = struct.unpack_from(">H", chunk, 2)[0]
+            if marker in _JPEG_SOF_MARKERS:
+                height, width = struct.unpack_from(">HH", chunk, 5)
+                return _image_metadata(width, height, "JPEG")
+            if marker in (0xD9, 0xDA):  # EOI or start of scan before any frame header
+                return {}
+            offset += 2 + length
+        return {}
+
+    def _parse_tiff(self, reader, header):
+        """
+        Read the dimension tags from the first IFD.
+        """
+        order = "<" if header[:2] == b"II" else ">"
+        ifd_offset = struct.unpack_from(order + "I", header, 4)[0]
+        count_data = reader.read(ifd_offset, 2)
+        entry_count = struct.unpack_from(order + "H", count_data)[0]
+        entries = reader.read(ifd_offset + 2, min(entry_count, 256) * 12)
+
+        dimensions = {}
+        for index in range(len(entries) // 12):
+            tag, value_type, _ = struct.unpack_from(order + "HHI", entries, index * 12)
+            if tag not in (_TIFF_IMAGE_WIDTH, _TIFF_IMAGE_LENGTH):
+                continue
+            if value_type == _TIFF_SHORT:
+                value = struct.unpack_from(order + "H", entries, index * 12 + 8)[0]
+            elif value_type == _TIFF_LONG:
+                value = struct.unpack_from(order + "I", entries, index * 12 + 8)[0]
+            else:
+                continue
+            dimensions[tag] = value
+            if len(dimensions) == 2:
+                break
+        if len(dimensions) < 2:
+            return {}
+        return _image_metadata(dimensions[_TIFF_IMAGE_WIDTH], dimensions[_TIFF_IMAGE_LENGTH], "TIFF")
+
+
+def _parse_webp(header):
+    chunk = header[12:16]
+    if chunk == b"VP8X":
+        width = int.from_bytes(header[24:27], "little") + 1
+        height = int.from_bytes(header[27:30], "little") + 1
+    elif chunk == b"VP8L":
+        bits = struct.unpack_from("<I", header, 21)[0]
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+    elif chunk == b"VP8 ":
+        width, height = struct.unpack_from("<HH", header, 26)
+        width, height = width & 0x3FFF, height & 0x3FFF
+    else:
+        return {}
+    return _image_metadata(width, height, "WebP")
+
+
+def _image_metadata(width, height, codec):
+    if width <= 0 or height <= 0:
+        return {"codec": codec}
+    return {**resolution_columns(width, height), "codec": codec}
@@ -0,0 +1,103 @@
+import mmap
+import os
+from abc import ABC, abstractmethod
+
+
+class MediaMetadataExtractor(ABC):
+    """
+    Abstract base class for any in-process media metadata extractor.
+
+    Extractors read container headers directly instead of spawning a decoder,
+    and return only the `Media` columns they could determine.
+    """
+
+    @abstractmethod
+    def extract(self, file_path: str, stat=None) -> dict:
+        """
+        Extract metadata for a single file.
+
+        Args:
+            file_path (str): Full path of the media file.
+            stat (os.stat_result, optional): Stat result if the caller already has one.
+
+        Returns:
+            dict: Any of 'duration', 'resolution' (with 'width' and 'height'), 'codec', 'bit_rate'. Empty if
+            the format is not recognised or the header is malformed.
+        """
+        raise NotImplementedError("You must implement the extract method.")
+
+
+def map_file(file_path: str):
+    """
+    Memory-map a file read-only.
+
+    Only the pages a parser actually touches are read from disk, so seeking
+    over a multi-GB `mdat` box or Matroska cluster costs nothing.
+
+    Returns:
+        mmap.mmap | None: The mapping (caller closes it), or None for empty files.
+    """
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def resolution_columns(width: int, height: int) -> dict:
+    """
+    Media columns for known dimensions: the 'WxH' resolution string plus integer width and height.
+    """
+    return {"resolution": f"{width}x{height}", "width": width, "height": height}
+
+
+def with_dimensions(metadata: dict) -> dict:
+    """
+    Add integer width and height to a result that only has a 'WxH' resolution
+    (e.g. one cached before those columns existed).
+    """
+    if "resolution" in metadata and "width" not in metadata:
+        try:
+            width, height = (int(side) for side in metadata["resolution"].split("x"))
+        except ValueError:
+            return metadata
+        metadata = {**metadata, "width": width, "height": height}
+    return metadata
+
+
+class PositionalReader:
+    """
+    Bounded positional reads from a file through one descriptor.
+
+    Uses `os.pread`, so each read is a single syscall with no seek and no
+    Python file-object buffering; falls back to seek + read where `pread` is
+    unavailable (Windows). Use as a context manager.
+
+    Example:
+        with PositionalReader("/photos/a.png") as reader:
+            header = reader.read(0, 32)
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.fd = None
+        self.bytes_read = 0
+
+    def __enter__(self):
+        self.fd = os.open(self.file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        os.close(self.fd)
+        self.fd = None
+
+    def read(self, offset: int, size: int) -> bytes:
+        """
+        Read up to size bytes at offset (fewer at end of file).
+        """
+        if hasattr(os, "pread"):
+            data = os.pread(self.fd, size, offset)
+        else:
+            os.lseek(self.fd, offset, os.SEEK_SET)
+            data = os.read(self.fd, size)
+        self.bytes_read += len(data)
+        return data
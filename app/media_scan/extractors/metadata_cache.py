@@ -0,0 +1,175 @@
+import json
+import os
+import sqlite3
+import threading
+
+from app.media_scan.config.settings import config
+from app.media_scan.utils.stat_snapshot import StatFingerprint
+
+
+class MetadataCache:
+    """
+    Persistent, size-bounded cache of extraction results in a sidecar SQLite file.
+
+    Results are keyed by the file's stat fingerprint (device, inode, size,
+    mtime) plus a namespace per kind of result ('metadata', 'ffprobe',
+    'hash:<chunk size>'), so any change to the file misses the cache and a
+    rebuilt or re-pointed catalog database can be repopulated without reading
+    file contents again.
+    Results that came back empty are cached too, so unparseable files are not
+    retried.
+
+    The cache is independent of the catalog database. Once it holds more than
+    `max_entries` results, the least recently accessed ones are evicted.
+    Access times are a monotonically increasing counter updated on every hit;
+    writes are committed every `COMMIT_EVERY` operations and on `close()`.
+
+    Example:
+        with MetadataCache("cache/metadata.db") as cache:
+            metadata = cache.get(stat)
+            if metadata is None:
+                metadata = extractor.extract(file_path, stat)
+                cache.put(stat, metadata)
+    """
+
+    COMMIT_EVERY = 1000
+
+    def __init__(self, path: str = None, max_entries: int = None):
+        """
+        Args:
+            path (str, optional): SQLite file, created if missing. Defaults to config.METADATA_CACHE_PATH.
+                ':memory:' keeps the cache for the process lifetime only.
+            max_entries (int, optional): Entries kept before LRU eviction. Defaults to config.METADATA_CACHE_SIZE.
+        """
+        self.path = path or config.METADATA_CACHE_PATH
+        self.max_entries = max_entries or config.METADATA_CACHE_SIZE
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.path != ":memory:" and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Extraction runs on worker threads (e.g. the ffprobe pool); access is serialized by the lock
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS metadata_cache (
+                device INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                namespace TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                last_access INTEGER NOT NULL,
+                PRIMARY KEY (device, inode, size, mtime_ns, namespace)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS ix_metadata_cache_last_access ON metadata_cache (last_access);
+        """)
+        self._access_counter, self._entries = self._connection.execute(
+            "SELECT COALESCE(MAX(last_access), 0), COUNT(*) FROM metadata_cache"
+        ).fetchone()
+
+    @staticmethod
+    def _key(stat):
+        fingerprint = stat if isinstance(stat, StatFingerprint) else StatFingerprint.from_stat(stat)
+        return fingerprint.device, fingerprint.inode, fingerprint.size, fingerprint.mtime_ns
+
+    def get(self, stat, namespace: str = "metadata"):
+        """
+        Look up a cached result.
+
+        Args:
+            stat (os.stat_result | StatFingerprint): Current stat of the file.
+            namespace (str, optional): Kind of result. Defaults to 'metadata'.
+
+        Returns:
+            dict | None: The cached result, or None on a miss.
+        """
+        key = self._key(stat) + (namespace,)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload FROM metadata_cache "
+                "WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ? AND namespace = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._access_counter += 1
+            self._connection.execute(
+                "UPDATE metadata_cache SET last_access = ? "
+                "WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ? AND namespace = ?",
+                (self._access_counter,) + key,
+            )
+            self._wrote()
+        return json.loads(row[0])
+
+    def put(self, stat, result: dict, namespace: str = "metadata"):
+        """
+        Store a result, evicting the least recently accessed entries if the cache is full.
+        """
+        key = self._key(stat) + (namespace,)
+        payload = json.dumps(result, separators=(",", ":"))
+        with self._lock:
+            self._access_counter += 1
+            inserted = self._connection.execute(
+                "INSERT OR IGNORE INTO metadata_cache "
+                "(device, inode, size, mtime_ns, namespace, payload, last_access) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                key + (payload, self._access_counter),
+            ).rowcount
+            if not inserted:
+                self._connection.execute(
+                    "UPDATE metadata_cache SET payload = ?, last_access = ? "
+                    "WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ? AND namespace = ?",
+                    (payload, self._access_counter) + key,
+                )
+            self._entries += inserted
+            if self._entries > self.max_entries:
+                self._evict(self._entries - self.max_entries)
+            self._wrote()
+
+    def _evict(self, count):
+        evicted = self._connection.execute(
+            "DELETE FROM metadata_cache WHERE last_access IN "
+            "(SELECT last_access FROM metadata_cache ORDER BY last_access LIMIT ?)",
+            (count,),
+        ).rowcount
+        self._entries -= evicted
+        self.evictions += evicted
+
+    def _wrote(self):
+        self._pending_writes += 1
+        if self._pending_writes >= self.COMMIT_EVERY:
+            self._connection.commit()
+            self._pending_writes = 0
+
+    def __len__(self):
+        return self._entries
+
+    def stats(self) -> dict:
+        """
+        Return hit/miss/eviction counters and the current entry count.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": self._entries,
+        }
+
+    def close(self):
+        """
+        Commit outstanding writes and close the file.
+        """
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
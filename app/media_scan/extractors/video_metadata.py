@@ -0,0 +1,358 @@
+import struct
+
+from app.media_scan.extractors.media_metadata import MediaMetadataExtractor, map_file, resolution_columns
+
+# Sample entry / CodecID -> codec name stored in Media.codec
+MP4_CODECS = {
+    b"avc1": "H.264", b"avc3": "H.264", b"hvc1": "H.265", b"hev1": "H.265",
+    b"mp4v": "MPEG-4", b"av01": "AV1", b"vp08": "VP8", b"vp09": "VP9",
+    b"apch": "ProRes", b"apcn": "ProRes", b"apcs": "ProRes", b"apco": "ProRes", b"ap4h": "ProRes",
+    b"jpeg": "MJPEG", b"mjpa": "MJPEG", b"s263": "H.263", b"mp4a": "AAC", b"ac-3": "AC-3",
+    b"ec-3": "E-AC-3", b"Opus": "Opus", b"fLaC": "FLAC", b".mp3": "MP3", b"alac": "ALAC",
+}
+MATROSKA_CODECS = {
+    "V_MPEG4/ISO/AVC": "H.264", "V_MPEGH/ISO/HEVC": "H.265", "V_MPEG4/ISO/SP": "MPEG-4",
+    "V_MPEG4/ISO/ASP": "MPEG-4", "V_MPEG2": "MPEG-2", "V_AV1": "AV1", "V_VP8": "VP8",
+    "V_VP9": "VP9", "V_THEORA": "Theora", "V_MJPEG": "MJPEG", "V_PRORES": "ProRes",
+    "A_AAC": "AAC", "A_OPUS": "Opus", "A_VORBIS": "Vorbis", "A_FLAC": "FLAC",
+    "A_MPEG/L3": "MP3", "A_AC3": "AC-3", "A_EAC3": "E-AC-3", "A_DTS": "DTS",
+}
+
+# Top-level box types an MP4/MOV file can start with
+_QUICKTIME_TOP_LEVEL = {b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"}
+
+# Matroska element IDs
+_SEGMENT = 0x18538067
+_SEEK_HEAD = 0x114D9B74
+_SEEK = 0x4DBB
+_SEEK_ID = 0x53AB
+_SEEK_POSITION = 0x53AC
+_INFO = 0x1549A966
+_TIMECODE_SCALE = 0x2AD7B1
+_DURATION = 0x4489
+_TRACKS = 0x1654AE6B
+_TRACK_ENTRY = 0xAE
+_TRACK_TYPE = 0x83
+_CODEC_ID = 0x86
+_VIDEO = 0xE0
+_PIXEL_WIDTH = 0xB0
+_PIXEL_HEIGHT = 0xBA
+_CLUSTER = 0x1F43B675
+_UNKNOWN_SIZE = -1
+
+
+class VideoMetadataExtractor(MediaMetadataExtractor):
+    """
+    Reads duration, resolution, codec and bit rate from MP4/MOV and Matroska/WebM headers.
+
+    The file is memory-mapped and only the header structures are visited:
+    - MP4/MOV: the `moov` box, then `mvhd` (duration), and per `trak` the `tkhd`
+      (display size), `hdlr` (track kind) and the first `stsd` sample entry (codec).
+    - Matroska/WebM: the Segment `Info` (TimecodeScale, Duration) and `Tracks`
+      (CodecID, PixelWidth/PixelHeight), using the SeekHead when they sit after
+      the clusters.
+
+    Sample tables and media data are skipped by offset, so typically only a few
+    KB are touched per file regardless of its size. Bit rate is the overall
+    rate, file size * 8 / duration.
+
+    Example:
+        VideoMetadataExtractor().extract("/videos/clip.mp4")
+        # {'duration': 12.5, 'resolution': '1920x1080', 'width': 1920, 'height': 1080,
+        #  'codec': 'H.264', 'bit_rate': 8000000}
+    """
+
+    def extract(self, file_path: str, stat=None) -> dict:
+        try:
+            buffer = map_file(file_path)
+        except (OSError, ValueError):
+            return {}
+        if buffer is None:
+            return {}
+        try:
+            return parse_video_header(buffer)
+        except (struct.error, IndexError, ValueError, UnicodeDecodeError):
+            # Truncated or corrupt headers: leave the placeholders in place
+            return {}
+        finally:
+            buffer.close()
+
+
+def parse_video_header(buffer) -> dict:
+    """
+    Dispatch to the MP4 or Matroska parser based on the first bytes.
+
+    Args:
+        buffer: Any bytes-like object supporting slicing (bytes, mmap).
+
+    Returns:
+        dict: Extracted Media columns, empty for unrecognised containers.
+    """
+    if buffer[:4] == b"\x1a\x45\xdf\xa3":
+        metadata = parse_matroska(buffer)
+    elif buffer[4:8] in _QUICKTIME_TOP_LEVEL:
+        metadata = parse_mp4(buffer)
+    else:
+        return {}
+    duration = metadata.get("duration")
+    if duration:
+        metadata["bit_rate"] = int(len(buffer) * 8 / duration)
+    return metadata
+
+
+def _mp4_boxes(buffer, start, end):
+    """
+    Yield (box_type, payload_start, box_end) for the boxes between start and end.
+    """
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", buffer, offset)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", buffer, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset  # box extends to the end of its parent
+        if size < header or offset + size > end:
+            return
+        yield box_type, offset + header, offset + size
+        offset += size
+
+
+def _find_mp4_box(buffer, start, end, box_type):
+    """
+    Return (payload_start, box_end) of the first box_type between start and end, or None.
+    """
+    for found_type, payload_start, box_end in _mp4_boxes(buffer, start, end):
+        if found_type == box_type:
+            return payload_start, box_end
+    return None
+
+
+def parse_mp4(buffer) -> dict:
+    """
+    Parse the `moov` box of an MP4/MOV file.
+
+    Returns:
+        dict: duration, resolution and codec where present.
+    """
+    moov = _find_mp4_box(buffer, 0, len(buffer), b"moov")
+    if moov is None:
+        return {}
+
+    metadata = {}
+    video_codec = audio_codec = None
+    for box_type, payload_start, box_end in _mp4_boxes(buffer, *moov):
+        if box_type == b"mvhd":
+            version = buffer[payload_start]
+            if version == 1:
+                timescale, duration = struct.unpack_from(">IQ", buffer, payload_start + 20)
+            else:
+                timescale, duration = struct.unpack_from(">II", buffer, payload_start + 12)
+            if timescale:
+                metadata["duration"] = duration / timescale
+        elif box_type == b"trak":
+            kind, codec, width, height = _parse_mp4_track(buffer, payload_start, box_end)
+            if kind == b"vide" and video_codec is None:
+                video_codec = codec
+                if width and height:
+                    metadata.update(resolution_columns(width, height))
+            elif kind == b"soun" and audio_codec is None:
+                audio_codec = codec
+
+    codec = video_codec or audio_codec
+    if codec:
+        metadata["codec"] = codec
+    return metadata
+
+
+def _parse_mp4_track(buffer, start, end):
+    """
+    Read a `trak` box.
+
+    Returns:
+        tuple: (handler type, codec name, width, height); missing parts are None.
+    """
+    width = height = handler = codec = None
+    tkhd = _find_mp4_box(buffer, start, end, b"tkhd")
+    if tkhd is not None:
+        # Width and height are the last two 16.16 fixed-point fields of tkhd
+        width, height = struct.unpack_from(">II", buffer, tkhd[1] - 8)
+        width, height = width >> 16, height >> 16
+
+    mdia = _find_mp4_box(buffer, start, end, b"mdia")
+    if mdia is None:
+        return handler, codec, width, height
+    hdlr = _find_mp4_box(buffer, *mdia, b"hdlr")
+    if hdlr is not None:
+        handler = bytes(buffer[hdlr[0] + 8:hdlr[0] + 12])
+
+    minf = _find_mp4_box(buffer, *mdia, b"minf")
+    stbl = minf and _find_mp4_box(buffer, *minf, b"stbl")
+    stsd = stbl and _find_mp4_box(buffer, *stbl, b"stsd")
+    if stsd:
+        # Full box header (4) + entry count (4), then the first sample entry
+        entry = stsd[0] + 8
+        entry_format = bytes(buffer[entry + 4:entry + 8])
+        codec = MP4_CODECS.get(entry_format, entry_format.decode("latin-1").strip())
+        if handler == b"vide" and not (width and height):
+            # Visual sample entry: coded width/height at offset 32
+            width, height = struct.unpack_from(">HH", buffer, entry + 32)
+    return handler, codec, width, height
+
+
+def _read_vint(buffer, offset, keep_marker=False):
+    """
+    Read an EBML variable-length integer.
+
+    Args:
+        keep_marker (bool): Keep the length marker bit (element IDs) instead of
+            masking it off (element sizes).
+
+    Returns:
+        tuple: (value, length). Sizes with all value bits set return _UNKNOWN_SIZE.
+    """
+    first = buffer[offset]
+    if first == 0:
+        raise ValueError("Invalid EBML variable-length integer.")
+    length = 1
+    mask = 0x80
+    while not first & mask:
+        mask >>= 1
+        length += 1
+    value = first if keep_marker else first & (mask - 1)
+    for index in range(1, length):
+        value = (value << 8) | buffer[offset + index]
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return _UNKNOWN_SIZE, length
+    return value, length
+
+
+def _ebml_elements(buffer, start, end):
+    """
+    Yield (element_id, data_start, data_end) for the elements between start and end.
+    """
+    offset = start
+    while offset < end:
+        element_id, id_length = _read_vint(buffer, offset, keep_marker=True)
+        size, size_length = _read_vint(buffer, offset + id_length)
+        data_start = offset + id_length + size_length
+        data_end = end if size == _UNKNOWN_SIZE else data_start + size
+        if data_end > end:
+            data_end = end
+        yield element_id, data_start, data_end
+        offset = data_end
+
+
+def _ebml_uint(buffer, start, end):
+    return int.from_bytes(buffer[start:end], "big")
+
+
+def _ebml_float(buffer, start, end):
+    return struct.unpack_from(">f" if end - start == 4 else ">d", buffer, start)[0]
+
+
+def parse_matroska(buffer) -> dict:
+    """
+    Parse the Segment Info and Tracks elements of a Matroska/WebM file.
+
+    Returns:
+        dict: duration, resolution and codec where present.
+    """
+    segment = None
+    for element_id, data_start, data_end in _ebml_elements(buffer, 0, len(buffer)):
+        if element_id == _SEGMENT:
+            segment = (data_start, data_end)
+            break
+    if segment is None:
+        return {}
+
+    segment_start, segment_end = segment
+    offsets = {}
+    seek_positions = {}
+    for element_id, data_start, data_end in _ebml_elements(buffer, segment_start, segment_end):
+        if element_id in (_INFO, _TRACKS):
+            offsets[element_id] = (data_start, data_end)
+        elif element_id == _SEEK_HEAD:
+            for target, position in _parse_seek_head(buffer, data_start, data_end):
+                seek_positions.setdefault(target, segment_start + position)
+        elif element_id == _CLUSTER:
+            # Media data starts here; anything still missing must be found via the SeekHead
+            break
+        if _INFO in offsets and _TRACKS in offsets:
+            break
+
+    for target in (_INFO, _TRACKS):
+        position = seek_positions.get(target)
+        if target not in offsets and position is not None and position < segment_end:
+            element_id, data_start, data_end = next(_ebml_elements(buffer, position, segment_end))
+            if element_id == target:
+                offsets[target] = (data_start, data_end)
+
+    metadata = {}
+    if _INFO in offsets:
+        metadata.update(_parse_matroska_info(buffer, *offsets[_INFO]))
+    if _TRACKS in offsets:
+        metadata.update(_parse_matroska_tracks(buffer, *offsets[_TRACKS]))
+    return metadata
+
+
+def _parse_seek_head(buffer, start, end):
+    """
+    Yield (element_id, position relative to the Segment data) for each SeekHead entry.
+    """
+    for element_id, data_start, data_end in _ebml_elements(buffer, start, end):
+        if element_id != _SEEK:
+            continue
+        target = position = None
+        for child_id, child_start, child_end in _ebml_elements(buffer, data_start, data_end):
+            if child_id == _SEEK_ID:
+                target = _ebml_uint(buffer, child_start, child_end)
+            elif child_id == _SEEK_POSITION:
+                position = _ebml_uint(buffer, child_start, child_end)
+        if target is not None and position is not None:
+            yield target, position
+
+
+def _parse_matroska_info(buffer, start, end):
+    timecode_scale = 1_000_000  # nanoseconds per tick, the Matroska default
+    duration = None
+    for element_id, data_start, data_end in _ebml_elements(buffer, start, end):
+        if element_id == _TIMECODE_SCALE:
+            timecode_scale = _ebml_uint(buffer, data_start, data_end)
+        elif element_id == _DURATION:
+            duration = _ebml_float(buffer, data_start, data_end)
+    if duration is None:
+        return {}
+    return {"duration": duration * timecode_scale / 1e9}
+
+
+def _parse_matroska_tracks(buffer, start, end):
+    metadata = {}
+    audio_codec = None
+    for element_id, data_start, data_end in _ebml_elements(buffer, start, end):
+        if element_id != _TRACK_ENTRY:
+            continue
+        track_type = codec_id = width = height = None
+        for child_id, child_start, child_end in _ebml_elements(buffer, data_start, data_end):
+            if child_id == _TRACK_TYPE:
+                track_type = _ebml_uint(buffer, child_start, child_end)
+            elif child_id == _CODEC_ID:
+                codec_id = bytes(buffer[child_start:child_end]).rstrip(b"\x00").decode("ascii")
+            elif child_id == _VIDEO:
+                for video_id, video_start, video_end in _ebml_elements(buffer, child_start, child_end):
+                    if video_id == _PIXEL_WIDTH:
+                        width = _ebml_uint(buffer, video_start, video_end)
+                    elif video_id == _PIXEL_HEIGHT:
+                        height = _ebml_uint(buffer, video_start, video_end)
+        codec = MATROSKA_CODECS.get(codec_id, codec_id)
+        if track_type == 1 and "codec" not in metadata:
+            if codec:
+                metadata["codec"] = codec
+            if width and height:
+                metadata.update(resolution_columns(width, height))
+        elif track_type == 2 and audio_codec is None:
+            audio_codec = codec
+    if "codec" not in metadata and audio_codec:
+        metadata["codec"] = audio_codec
+    return metadata
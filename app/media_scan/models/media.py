@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, BigInteger, DateTime, Float, ForeignKey
+from enum import Enum
+
+from sqlalchemy import Column, Integer, String, BigInteger, DateTime, Float, ForeignKey, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from app.media_scan.dal.database import Base  # Import Base from the single definition
 '''
@@ -12,6 +14,20 @@ from app.media_scan.dal.database import Base  # Import Base from the single defi
     thumbnail_path = Column(Text)
 
 '''
+
+class MetadataStatus(str, Enum):
+    """
+    Enrichment state of a media row.
+
+    PENDING: registered by the scan, metadata not extracted yet (or a retry is due).
+    DONE: metadata extracted.
+    FAILED: extraction failed on every allowed attempt.
+    """
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+
 class Media(Base):
     """
     Generalized Media model linked to the media_type table.
@@ -24,8 +40,38 @@ class Media(Base):
     media_type_id = Column(Integer, ForeignKey("media_type.id"), nullable=False)  # Reference to media_type - establish ForeignKey relationship
     duration = Column(Float)  # Media duration in seconds
     resolution = Column(String)  # Resolution as "widthxheight" (example: 1920x1080)
+    width = Column(Integer)  # Frame/image width in pixels, parsed from resolution; NULL if unknown
+    height = Column(Integer)  # Frame/image height in pixels; NULL if unknown
     codec = Column(String)  # Codec type (e.g., H.264, MP3)
     bit_rate = Column(BigInteger)  # Bit rate in bits per second
     date_created = Column(DateTime)  # When the file/media was created
+    file_mtime_ns = Column(BigInteger)  # File modification time (st_mtime_ns) when last scanned
+    file_inode = Column(BigInteger)  # Inode number (st_ino) when last scanned
+    file_device = Column(BigInteger)  # Device number (st_dev) when last scanned
+    metadata_status = Column(String(16), nullable=False, default=MetadataStatus.PENDING.value,
+                             server_default=MetadataStatus.PENDING.value)  # See MetadataStatus
+    metadata_attempts = Column(Integer, nullable=False, default=0, server_default="0")  # Enrichment attempts so far
+    metadata_leased_until = Column(DateTime)  # Enrichment worker lease expiry; NULL when unclaimed
+    partial_hash = Column(String(80))  # "<chunk size>:<BLAKE2b of the head, middle and tail chunks>"; NULL until hashed
+    content_hash = Column(String(64))  # BLAKE2b of the full contents; computed when partial hashes collide or for thumbnails
+    video_signature = Column(LargeBinary)  # Perceptual hashes of sampled frames (little-endian uint64 words); empty if undecodable
+    image_hash = Column(LargeBinary)  # 64-bit perceptual hash (little-endian uint64); empty if undecodable
+    thumbnail_path = Column(String)  # Content-addressed thumbnail file; empty if undecodable, NULL until generated
     media_type = relationship("MediaType", back_populates="media")
 
+    __table_args__ = (
+        Index("ix_media_metadata_status", "metadata_status", "id"),
+        Index("ix_media_content_hash", "content_hash"),
+        # Filter by type (foreign key lookups, keyset pages per type ordered by id)
+        Index("ix_media_type_id", "media_type_id", "id"),
+        # Range filters and sorts over the whole catalog
+        Index("ix_media_file_size", "file_size"),
+        Index("ix_media_date_created", "date_created"),
+        Index("ix_media_duration", "duration"),
+        # Filter by type, then range-filter or sort within it
+        Index("ix_media_type_file_size", "media_type_id", "file_size"),
+        Index("ix_media_type_date_created", "media_type_id", "date_created"),
+        Index("ix_media_type_duration", "media_type_id", "duration"),
+        Index("ix_media_type_resolution", "media_type_id", "width", "height"),
+    )
+
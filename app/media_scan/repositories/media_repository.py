@@ -1,8 +1,229 @@
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from itertools import chain, islice
+
+from sqlalchemy import (BigInteger, Column, MetaData, String, Table, bindparam, case, delete, func, insert,
+                        literal_column, or_, select, update)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
+from app.media_scan.config.settings import config
 from app.media_scan.dal.database import SessionLocal
-from app.media_scan.models.media import Media
+from app.media_scan.models.media import Media, MetadataStatus
 from app.media_scan.models.media_type import MediaType
 from app.media_scan.exceptions.media_exceptions import MediaAlreadyExistsError, MediaTypeNotFoundError
+from app.media_scan.utils.stat_snapshot import StatFingerprint
+
+
+@dataclass
+class BulkInsertResult:
+    """
+    Outcome of a bulk insert.
+
+    Attributes:
+        inserted (list): File paths that were written to the database.
+        duplicates (list): File paths skipped because they already exist
+            (in the database or earlier in the same input).
+    """
+    inserted: list = field(default_factory=list)
+    duplicates: list = field(default_factory=list)
+
+    def merge(self, other):
+        """Accumulate another result into this one and return self."""
+        self.inserted.extend(other.inserted)
+        self.duplicates.extend(other.duplicates)
+        return self
+
+
+class UpsertPolicy(str, Enum):
+    """
+    How an upsert treats a row whose file_path is already cataloged.
+
+    SKIP: leave the existing row untouched (``ON CONFLICT DO NOTHING``).
+    REFRESH: overwrite the file columns (size, mtime, inode, device, type) with the new values.
+        The extracted metadata is kept when the new row is still pending enrichment and
+        the file is unchanged, and the columns derived from the contents (hashes,
+        signatures, thumbnail) are reset only when file_size or file_mtime_ns differ.
+    REFRESH_IF_CHANGED: refresh only when file_size or file_mtime_ns differ.
+    """
+    SKIP = "skip"
+    REFRESH = "refresh"
+    REFRESH_IF_CHANGED = "refresh_if_changed"
+
+
+@dataclass
+class UpsertResult:
+    """
+    Row counts produced by an upsert.
+    """
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def merge(self, other):
+        """Accumulate another result into this one and return self."""
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        return self
+
+
+@dataclass
+class MediaPage:
+    """
+    One page of a keyset-paginated query.
+
+    Attributes:
+        items (list): Media objects, or column tuples (starting with id) when columns were projected.
+        next_after_id (int | None): Cursor for the next page; None when this is the last page.
+    """
+    items: list = field(default_factory=list)
+    next_after_id: int = None
+
+
+# Dialects with native INSERT ... ON CONFLICT support
+_UPSERT_DIALECTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def _batched(records, batch_size):
+    """
+    Yield lists of at most batch_size records from any iterable.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, got {batch_size}.")
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _split_repeats(batch):
+    """
+    Drop repeated file paths within a batch, keeping the first occurrence.
+
+    Returns:
+        tuple: (dict of file_path -> record, list of repeated file paths)
+    """
+    unique_records = {}
+    repeats = []
+    for record in batch:
+        file_path = record["file_path"]
+        if file_path in unique_records:
+            repeats.append(file_path)
+        else:
+            unique_records[file_path] = record
+    return unique_records, repeats
+
+
+# Columns computed from a file's contents; a refresh resets them only when the file changed
+_CONTENT_COLUMNS = frozenset({"partial_hash", "content_hash", "video_signature", "image_hash", "thumbnail_path"})
+
+# Columns describing the file itself; a refresh always takes the new values
+_FILE_COLUMNS = frozenset({"file_size", "file_mtime_ns", "file_inode", "file_device", "media_type_id"})
+
+
+def _refresh_set(table, excluded, names):
+    """
+    Build the SET clause of a REFRESH upsert (see UpsertPolicy) over the given record columns.
+    """
+    changed = table.c.file_size != excluded.file_size
+    if "file_mtime_ns" in names:
+        changed = or_(changed, table.c.file_mtime_ns.is_distinct_from(excluded.file_mtime_ns))
+    # A pending row has placeholder metadata, which must not replace extracted values
+    fresh = None
+    if "metadata_status" in names:
+        fresh = or_(changed, excluded.metadata_status == MetadataStatus.DONE.value)
+    values = {}
+    for name in names:
+        if name in ("id", "file_path"):
+            continue
+        condition = changed if name in _CONTENT_COLUMNS else None if name in _FILE_COLUMNS else fresh
+        if condition is None:
+            values[name] = excluded[name]
+        else:
+            values[name] = case((condition, excluded[name]), else_=table.c[name])
+    return values
+
+
+def _refresh_values(record, current):
+    """
+    Python counterpart of `_refresh_set`: the columns of `record` a REFRESH writes over a row
+    whose current (file_size, file_mtime_ns) is `current`.
+    """
+    changed = current[0] != record["file_size"]
+    if "file_mtime_ns" in record:
+        changed = changed or current[1] != record["file_mtime_ns"]
+    fresh = changed or record.get("metadata_status", MetadataStatus.DONE.value) == MetadataStatus.DONE.value
+    return {
+        name: value for name, value in record.items()
+        if name not in ("id", "file_path")
+        and (name in _FILE_COLUMNS or (changed if name in _CONTENT_COLUMNS else fresh))
+    }
+
+
+def _copy_value(value) -> str:
+    """
+    Encode one value for PostgreSQL's COPY text format.
+    """
+    if value is None:
+        return r"\N"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # bytea hex input, with the backslash escaped for COPY
+        return "\\\\x" + bytes(value).hex()
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, Enum):
+        value = value.value
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+class _CopyStream:
+    """
+    File-like object that encodes records to COPY text lines as the driver reads them,
+    so a load streams without materializing the rows.
+    """
+
+    def __init__(self, records, columns):
+        self._records = records
+        self._columns = columns
+        self._buffer = bytearray()
+        self.rows = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            record = next(self._records, None)
+            if record is None:
+                break
+            self._buffer += ("\t".join(_copy_value(record.get(name)) for name in self._columns) + "\n").encode()
+            self.rows += 1
+        size = len(self._buffer) if size < 0 else size
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def _staging_table(columns):
+    """
+    Describe an UNLOGGED staging table for a bulk load: `seq` keeps the input order,
+    `media_type` holds the type name and the other columns mirror media.
+    """
+    metadata = MetaData()
+    return Table(
+        f"media_staging_{uuid.uuid4().hex[:12]}",
+        metadata,
+        Column("seq", BigInteger, primary_key=True, autoincrement=True),
+        Column("media_type", String, nullable=False),
+        *(Column(name, Media.__table__.c[name].type) for name in columns),
+        prefixes=["UNLOGGED"],
+    )
 
 
 class MediaRepository:
@@ -31,6 +252,332 @@ class MediaRepository:
                 f"Media with path {media_data.get('file_path')} already exists in the database."
             )
 
+    def add_media_bulk(self, media_records, batch_size=None):
+        """
+        Insert many media entries using one transaction per batch.
+
+        Each batch is written with a single core-level ``INSERT`` executed as an
+        executemany, so the cost of a commit is paid once per batch instead of
+        once per file. Paths that already exist are reported back rather than
+        raising ``MediaAlreadyExistsError``.
+
+        Args:
+            media_records (Iterable[dict]): Column values for each media row.
+            batch_size (int, optional): Rows per transaction. Defaults to
+                ``config.SCAN_BATCH_SIZE``.
+
+        Returns:
+            BulkInsertResult: Inserted and duplicate file paths.
+        """
+        batch_size = batch_size or config.SCAN_BATCH_SIZE
+        result = BulkInsertResult()
+        for batch in _batched(media_records, batch_size):
+            result.merge(self._insert_batch(batch))
+        return result
+
+    def _dialect_insert(self):
+        """
+        Return the dialect-specific insert() supporting ON CONFLICT, or None.
+        """
+        return _UPSERT_DIALECTS.get(self.session.get_bind().dialect.name)
+
+    def _insert_batch(self, batch):
+        """
+        Insert a single batch inside one transaction, reporting duplicates.
+        """
+        result = BulkInsertResult()
+        unique_records, result.duplicates = _split_repeats(batch)
+        dialect_insert = self._dialect_insert()
+
+        if dialect_insert is not None:
+            # Let the database skip conflicts; RETURNING tells us which rows were new
+            table = Media.__table__
+            statement = (
+                dialect_insert(table)
+                .on_conflict_do_nothing(index_elements=[table.c.file_path])
+                .returning(table.c.file_path)
+            )
+            inserted = set(self.session.scalars(statement, list(unique_records.values())))
+            self.session.commit()
+            for file_path in unique_records:
+                (result.inserted if file_path in inserted else result.duplicates).append(file_path)
+            return result
+
+        existing = self._existing_paths(unique_records)
+        rows = [record for path, record in unique_records.items() if path not in existing]
+        result.duplicates.extend(path for path in unique_records if path in existing)
+
+        if not rows:
+            return result
+
+        try:
+            self.session.execute(insert(Media.__table__), rows)
+            self.session.commit()
+            result.inserted.extend(row["file_path"] for row in rows)
+        except IntegrityError:
+            # Another writer got in between the lookup and the insert; retry row by row
+            self.session.rollback()
+            result.merge(self._insert_rows_individually(rows))
+        return result
+
+    def _existing_paths(self, file_paths):
+        """
+        Return the subset of file_paths that already exist in the media table.
+        """
+        return set(
+            self.session.scalars(select(Media.file_path).where(Media.file_path.in_(list(file_paths))))
+        )
+
+    def _insert_rows_individually(self, rows):
+        """
+        Fallback for a failed batch: insert each row in its own savepoint so a
+        conflicting row does not abort the whole transaction.
+        """
+        result = BulkInsertResult()
+        for row in rows:
+            try:
+                with self.session.begin_nested():
+                    self.session.execute(insert(Media.__table__), [row])
+                result.inserted.append(row["file_path"])
+            except IntegrityError:
+                result.duplicates.append(row["file_path"])
+        self.session.commit()
+        return result
+
+    def upsert_media_bulk(self, media_records, policy=UpsertPolicy.SKIP, batch_size=None):
+        """
+        Insert or update many media entries, one transaction per batch.
+
+        On SQLite and PostgreSQL this issues a native
+        ``INSERT ... ON CONFLICT (file_path) DO NOTHING / DO UPDATE`` so already
+        cataloged paths never cost a failed statement and a rollback. Other
+        dialects fall back to a lookup followed by separate INSERT and UPDATE
+        executemany statements.
+
+        Args:
+            media_records (Iterable[dict]): Column values for each media row.
+            policy (UpsertPolicy | str, optional): Conflict handling. Defaults to SKIP.
+            batch_size (int, optional): Rows per transaction. Defaults to
+                ``config.SCAN_BATCH_SIZE``.
+
+        Returns:
+            UpsertResult: Counts of inserted, updated and unchanged rows.
+        """
+        policy = UpsertPolicy(policy)
+        batch_size = batch_size or config.SCAN_BATCH_SIZE
+        result = UpsertResult()
+        for batch in _batched(media_records, batch_size):
+            result.merge(self._upsert_batch(batch, policy))
+        return result
+
+    def _upsert_batch(self, batch, policy):
+        """
+        Upsert a single batch inside one transaction.
+        """
+        unique_records, repeats = _split_repeats(batch)
+        result = UpsertResult(unchanged=len(repeats))
+        records = list(unique_records.values())
+        dialect_insert = self._dialect_insert()
+
+        if policy is UpsertPolicy.SKIP:
+            if dialect_insert is None:
+                inserted = len(self._insert_batch(records).inserted)
+            else:
+                table = Media.__table__
+                statement = (
+                    dialect_insert(table)
+                    .on_conflict_do_nothing(index_elements=[table.c.file_path])
+                    .returning(table.c.file_path)
+                )
+                inserted = len(self.session.scalars(statement, records).all())
+                self.session.commit()
+            result.inserted += inserted
+            result.unchanged += len(records) - inserted
+            return result
+
+        # Knowing which paths existed beforehand separates inserts from updates
+        existing = self._existing_paths(unique_records)
+        if dialect_insert is None:
+            written = self._upsert_batch_generic(records, existing, policy)
+        else:
+            written = self._upsert_batch_native(dialect_insert, records, policy)
+        self.session.commit()
+
+        result.inserted += sum(1 for path in written if path not in existing)
+        result.updated += sum(1 for path in written if path in existing)
+        result.unchanged += len(existing) - result.updated
+        return result
+
+    def _upsert_batch_native(self, dialect_insert, records, policy):
+        """
+        Run INSERT ... ON CONFLICT DO UPDATE and return the file paths written.
+        """
+        table = Media.__table__
+        statement = dialect_insert(table)
+        where = None
+        if policy is UpsertPolicy.REFRESH_IF_CHANGED:
+            where = or_(
+                table.c.file_size != statement.excluded.file_size,
+                table.c.file_mtime_ns.is_distinct_from(statement.excluded.file_mtime_ns),
+            )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.file_path],
+            set_=_refresh_set(table, statement.excluded, list(records[0])),
+            where=where,
+        ).returning(table.c.file_path)
+        return set(self.session.scalars(statement, records))
+
+    def _upsert_batch_generic(self, records, existing, policy):
+        """
+        Portable upsert for dialects without ON CONFLICT; returns the file paths written.
+        """
+        table = Media.__table__
+        new_rows = [record for record in records if record["file_path"] not in existing]
+        changed_rows = [record for record in records if record["file_path"] in existing]
+
+        current = {}
+        if changed_rows:
+            current = {
+                row.file_path: (row.file_size, row.file_mtime_ns)
+                for row in self.session.execute(
+                    select(table.c.file_path, table.c.file_size, table.c.file_mtime_ns)
+                    .where(table.c.file_path.in_([record["file_path"] for record in changed_rows]))
+                )
+            }
+        if policy is UpsertPolicy.REFRESH_IF_CHANGED:
+            changed_rows = [
+                record for record in changed_rows
+                if current[record["file_path"]] != (record["file_size"], record.get("file_mtime_ns"))
+            ]
+
+        if new_rows:
+            self.session.execute(insert(table), new_rows)
+        # Rows may refresh different columns; the executemany is grouped by column set
+        by_columns = {}
+        for record in changed_rows:
+            values = _refresh_values(record, current[record["file_path"]])
+            by_columns.setdefault(tuple(sorted(values)), []).append(
+                values | {"match_file_path": record["file_path"]}
+            )
+        for parameters in by_columns.values():
+            # Column values bind by key; the matched path gets its own parameter name
+            statement = update(table).where(table.c.file_path == bindparam("match_file_path"))
+            self.session.connection().execute(statement, parameters)
+        return {record["file_path"] for record in new_rows + changed_rows}
+
+    def load_media_bulk(self, media_records, policy=UpsertPolicy.SKIP):
+        """
+        Load a stream of media rows in one transaction, for the first import of a volume.
+
+        On PostgreSQL the rows are streamed with ``COPY ... FROM STDIN`` into an
+        UNLOGGED staging table and merged into media by a single
+        ``INSERT ... SELECT ... ON CONFLICT (file_path)`` that resolves
+        media_type_id by joining media_type on the type name. Other dialects
+        fall back to ``upsert_media_bulk`` with the type names looked up once
+        each. Repeated file paths keep their first occurrence.
+
+        Args:
+            media_records (Iterable[dict]): Column values for each media row, with the
+                media type name under 'media_type' instead of media_type_id. Every
+                record has the columns of the first one.
+            policy (UpsertPolicy | str, optional): Conflict handling. Defaults to SKIP.
+
+        Returns:
+            UpsertResult: Counts of inserted, updated and unchanged rows.
+
+        Raises:
+            MediaTypeNotFoundError: If a record names an unknown media type (nothing is loaded on PostgreSQL).
+        """
+        policy = UpsertPolicy(policy)
+        records = iter(media_records)
+        first = next(records, None)
+        if first is None:
+            return UpsertResult()
+        records = chain([first], records)
+        if self.session.get_bind().dialect.name != "postgresql":
+            return self.upsert_media_bulk(self._with_media_type_ids(records), policy)
+        try:
+            return self._copy_load(records, [name for name in first if name not in ("id", "media_type")], policy)
+        except BaseException:
+            self.session.rollback()
+            raise
+
+    def _with_media_type_ids(self, records):
+        """
+        Replace each record's media type name with its ID, looking every name up once.
+        """
+        media_type_ids = {}
+        for record in records:
+            record = dict(record)
+            name = record.pop("media_type")
+            if name not in media_type_ids:
+                media_type_ids[name] = self.session.execute(
+                    select(MediaType.id).where(MediaType.name == name)
+                ).scalar_one_or_none()
+                if media_type_ids[name] is None:
+                    raise MediaTypeNotFoundError(f"Media type '{name}' not found.")
+            record["media_type_id"] = media_type_ids[name]
+            yield record
+
+    def _copy_load(self, records, columns, policy):
+        """
+        PostgreSQL path of `load_media_bulk`: COPY into a staging table, then merge with one statement.
+        """
+        connection = self.session.connection()
+        staging = _staging_table(columns)
+        staging.create(connection)
+        stream = _CopyStream(records, ["media_type", *columns])
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {staging.name} (media_type, {', '.join(columns)}) FROM STDIN", stream
+            )
+        finally:
+            cursor.close()
+
+        unknown = self.session.scalars(
+            select(staging.c.media_type).distinct()
+            .where(staging.c.media_type.not_in(select(MediaType.name)))
+        ).all()
+        if unknown:
+            raise MediaTypeNotFoundError(f"Media type '{', '.join(sorted(unknown))}' not found.")
+
+        table = Media.__table__
+        # ON CONFLICT cannot touch a row twice; keep the first occurrence of a path
+        ranked = select(
+            staging,
+            func.row_number().over(partition_by=staging.c.file_path, order_by=staging.c.seq).label("occurrence"),
+        ).subquery()
+        source = (
+            select(*(ranked.c[name] for name in columns), MediaType.id)
+            .join_from(ranked, MediaType.__table__, MediaType.name == ranked.c.media_type)
+            .where(ranked.c.occurrence == 1)
+        )
+        statement = postgresql.insert(table).from_select([*columns, "media_type_id"], source)
+        if policy is UpsertPolicy.SKIP:
+            statement = statement.on_conflict_do_nothing(index_elements=[table.c.file_path])
+        else:
+            where = None
+            if policy is UpsertPolicy.REFRESH_IF_CHANGED:
+                where = or_(
+                    table.c.file_size != statement.excluded.file_size,
+                    table.c.file_mtime_ns.is_distinct_from(statement.excluded.file_mtime_ns),
+                )
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.file_path],
+                set_=_refresh_set(table, statement.excluded, [*columns, "media_type_id"]),
+                where=where,
+            )
+        # xmax is 0 for freshly inserted row versions and set for updated ones; counting in
+        # the database avoids sending a row per file back to the client
+        written = statement.returning(literal_column("xmax = 0").label("inserted")).cte("written")
+        inserted, total = self.session.execute(
+            select(func.count().filter(written.c.inserted), func.count()).select_from(written)
+        ).one()
+        staging.drop(connection)
+        self.session.commit()
+        return UpsertResult(inserted=inserted, updated=total - inserted, unchanged=stream.rows - total)
+
     def get_media_by_id(self, media_id):
         """
         Retrieve a media entry by its ID.
@@ -40,12 +587,372 @@ class MediaRepository:
     def get_media_by_type(self, media_type_name):
         """
         Retrieve all media entries of a specific type (e.g., video, image).
+
+        Every row is loaded as an ORM object; for large catalogs use
+        `get_media_page` or `iter_media` instead.
         """
         media_type = self.session.query(MediaType).filter_by(name=media_type_name).first()
         if not media_type:
             raise MediaTypeNotFoundError(f"Media type '{media_type_name}' not found.")
         return self.session.query(Media).filter(Media.media_type_id == media_type.id).all()
 
+    def _media_statement(self, media_type_name=None, columns=None, after_id=None):
+        """
+        Build a SELECT over media ordered by id, optionally filtered by type and keyset cursor.
+
+        Projected statements select plain columns (id first) instead of ORM entities.
+        """
+        if columns is None:
+            statement = select(Media)
+        else:
+            names = ["id"] + [name for name in columns if name != "id"]
+            unknown = [name for name in names if name not in Media.__table__.c]
+            if unknown:
+                raise ValueError(f"Unknown media columns: {', '.join(unknown)}.")
+            statement = select(*(Media.__table__.c[name] for name in names))
+        if media_type_name is not None:
+            media_type_id = self.session.execute(
+                select(MediaType.id).where(MediaType.name == media_type_name)
+            ).scalar_one_or_none()
+            if media_type_id is None:
+                raise MediaTypeNotFoundError(f"Media type '{media_type_name}' not found.")
+            statement = statement.where(Media.media_type_id == media_type_id)
+        if after_id is not None:
+            statement = statement.where(Media.id > after_id)
+        return statement.order_by(Media.id)
+
+    def get_media_page(self, media_type_name=None, after_id=None, limit=None, columns=None):
+        """
+        Fetch one page of media ordered by id, starting after a keyset cursor.
+
+        Unlike OFFSET pagination, each page is an index range scan from the
+        cursor, so late pages cost the same as the first.
+
+        Args:
+            media_type_name (str, optional): Only rows of this type (e.g. 'video').
+            after_id (int, optional): Return rows with an id greater than this; None starts at the beginning.
+            limit (int, optional): Rows per page. Defaults to config.QUERY_PAGE_SIZE.
+            columns (Sequence[str], optional): Column names to project into lightweight tuples
+                (id is always included first) instead of loading ORM objects.
+
+        Returns:
+            MediaPage: The rows and the cursor for the next page.
+
+        Raises:
+            MediaTypeNotFoundError: If the media type does not exist.
+            ValueError: If a projected column does not exist.
+        """
+        limit = limit or config.QUERY_PAGE_SIZE
+        result = self.session.execute(self._media_statement(media_type_name, columns, after_id).limit(limit))
+        items = result.scalars().all() if columns is None else result.all()
+        next_after_id = None
+        if len(items) == limit:
+            next_after_id = items[-1].id if columns is None else items[-1][0]
+        return MediaPage(items, next_after_id)
+
+    def iter_media(self, media_type_name=None, after_id=None, columns=None, batch_size=None):
+        """
+        Stream media ordered by id without materializing the whole result.
+
+        Rows are fetched `batch_size` at a time with `yield_per`, which uses a
+        server-side cursor on PostgreSQL, so memory stays flat however many rows
+        match. Project `columns` for the smallest footprint; ORM objects are only
+        held weakly by the session and are freed once the caller drops them.
+        Do not commit on this session while the generator is being consumed.
+
+        Args:
+            media_type_name (str, optional): Only rows of this type (e.g. 'video').
+            after_id (int, optional): Resume after this id.
+            columns (Sequence[str], optional): Column names to project (id is always included first).
+            batch_size (int, optional): Rows per fetch. Defaults to config.QUERY_PAGE_SIZE.
+
+        Yields:
+            Media | Row: ORM objects, or column tuples when columns were projected.
+        """
+        statement = self._media_statement(media_type_name, columns, after_id)
+        result = self.session.execute(statement.execution_options(yield_per=batch_size or config.QUERY_PAGE_SIZE))
+        yield from (result.scalars() if columns is None else result)
+
+    def get_fingerprints(self, directory_path=None):
+        """
+        Load the stat fingerprint of every cataloged file, optionally limited to a directory.
+
+        Only the fingerprint columns are selected, so this stays cheap for very
+        large catalogs. Rows scanned before fingerprints were recorded have NULL
+        columns and will never compare equal, which makes them rescan once.
+
+        Args:
+            directory_path (str, optional): Only include files under this directory.
+
+        Returns:
+            dict: Mapping of file_path -> StatFingerprint.
+        """
+        statement = select(
+            Media.file_path, Media.file_size, Media.file_mtime_ns, Media.file_inode, Media.file_device
+        )
+        if directory_path is not None:
+            prefix = os.path.join(directory_path, "")
+            statement = statement.where(Media.file_path.startswith(prefix, autoescape=True))
+        return {
+            file_path: StatFingerprint(size, mtime_ns, inode, device)
+            for file_path, size, mtime_ns, inode, device in self.session.execute(statement)
+        }
+
+    def delete_media_by_paths(self, file_paths, batch_size=None):
+        """
+        Delete media entries by file path, one transaction per batch.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+        batch_size = batch_size or config.SCAN_BATCH_SIZE
+        deleted = 0
+        for batch in _batched(file_paths, batch_size):
+            deleted += self.session.execute(delete(Media).where(Media.file_path.in_(batch))).rowcount
+            self.session.commit()
+        return deleted
+
+    def get_media_ids(self, file_paths, batch_size=None):
+        """
+        Return the IDs of the rows with the given file paths (paths without a row are ignored).
+        """
+        batch_size = batch_size or config.SCAN_BATCH_SIZE
+        media_ids = []
+        for batch in _batched(file_paths, batch_size):
+            media_ids.extend(self.session.execute(select(Media.id).where(Media.file_path.in_(batch))).scalars())
+        return media_ids
+
+    def update_media_metadata_bulk(self, updates, batch_size=None, lease=None):
+        """
+        Update metadata columns of existing rows, matched by file path, one transaction per batch.
+
+        Args:
+            updates (list[dict]): Each dict holds a `file_path` plus the columns to set.
+                Dicts may set different columns; rows are grouped by column set.
+            batch_size (int, optional): Rows per transaction. Defaults to config.SCAN_BATCH_SIZE.
+            lease (datetime, optional): Only update rows still holding this enrichment lease
+                (the `metadata_leased_until` returned by claim_pending_metadata).
+
+        Returns:
+            int: Number of rows updated (paths without a row, or whose lease changed, are ignored).
+        """
+        batch_size = batch_size or config.SCAN_BATCH_SIZE
+        table = Media.__table__
+        statement = update(table).where(table.c.file_path == bindparam("match_file_path"))
+        if lease is not None:
+            statement = statement.where(table.c.metadata_leased_until == lease)
+        updated = 0
+        for batch in _batched(updates, batch_size):
+            by_columns = {}
+            for record in batch:
+                values = {name: value for name, value in record.items() if name not in ("id", "file_path")}
+                if values:
+                    by_columns.setdefault(tuple(sorted(values)), []).append(
+                        values | {"match_file_path": record["file_path"]}
+                    )
+            for params in by_columns.values():
+                updated += self.session.connection().execute(statement, params).rowcount
+            self.session.commit()
+        return updated
+
+    def claim_pending_metadata(self, limit, lease_seconds):
+        """
+        Lease up to `limit` rows awaiting metadata enrichment and commit the lease.
+
+        Rows are pending and either unleased or with an expired lease (e.g. the
+        worker holding it crashed), taken in ID order. Each claim increments the
+        row's attempt count. On PostgreSQL the candidate rows are locked with
+        FOR UPDATE SKIP LOCKED so concurrent workers claim disjoint batches; on
+        SQLite the single UPDATE ... RETURNING is atomic under its database-level
+        write lock.
+
+        Args:
+            limit (int): Maximum rows to claim.
+            lease_seconds (float): How long the rows stay reserved for this worker.
+
+        Returns:
+            list[Row]: Claimed rows with id, file_path, media_type_id, metadata_attempts and
+                metadata_leased_until (the lease, passed back when saving the rows).
+        """
+        table = Media.__table__
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        candidates = (
+            select(table.c.id)
+            .where(table.c.metadata_status == MetadataStatus.PENDING.value)
+            .where(or_(table.c.metadata_leased_until.is_(None), table.c.metadata_leased_until < now))
+            .order_by(table.c.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        lease = {
+            "metadata_leased_until": now + timedelta(seconds=lease_seconds),
+            "metadata_attempts": table.c.metadata_attempts + 1,
+        }
+        returned = (table.c.id, table.c.file_path, table.c.media_type_id, table.c.metadata_attempts,
+                    table.c.metadata_leased_until)
+
+        if self.session.get_bind().dialect.update_returning:
+            claimed = self.session.execute(
+                update(table).where(table.c.id.in_(candidates.scalar_subquery())).values(**lease).returning(*returned)
+            ).all()
+        else:
+            ids = self.session.execute(candidates).scalars().all()
+            self.session.execute(update(table).where(table.c.id.in_(ids)).values(**lease))
+            claimed = self.session.execute(select(*returned).where(table.c.id.in_(ids))).all() if ids else []
+        self.session.commit()
+        return sorted(claimed, key=lambda row: row.id)
+
+    def release_failed_metadata(self, media_ids, max_attempts, lease=None, count_attempt=False):
+        """
+        Return pending rows whose enrichment failed to the queue, or mark them
+        failed once they have used `max_attempts` attempts. The lease is kept,
+        so a retry waits for it to expire.
+
+        Args:
+            media_ids (list[int]): Rows to release.
+            max_attempts (int): Attempts after which a row is marked failed.
+            lease (datetime, optional): Only release rows still holding this enrichment lease.
+            count_attempt (bool, optional): Count the failure as an attempt, for attempts made
+                without a claim (e.g. the scanner's ffprobe fallback). Defaults to False.
+
+        Returns:
+            int: Number of rows updated.
+        """
+        if not media_ids:
+            return 0
+        table = Media.__table__
+        statement = update(table).where(
+            table.c.id.in_(media_ids), table.c.metadata_status == MetadataStatus.PENDING.value
+        )
+        if lease is not None:
+            statement = statement.where(table.c.metadata_leased_until == lease)
+        attempts = table.c.metadata_attempts + 1 if count_attempt else table.c.metadata_attempts
+        released = self.session.execute(
+            statement.values(metadata_attempts=attempts, metadata_status=case(
+                (attempts >= max_attempts, MetadataStatus.FAILED.value),
+                else_=MetadataStatus.PENDING.value,
+            ))
+        ).rowcount
+        self.session.commit()
+        return released
+
+    def get_size_collisions(self):
+        """
+        Retrieve hashing state for every non-empty file whose size is shared by another file.
+
+        Returns:
+            list[Row]: Rows with file_path, file_size, file_mtime_ns, partial_hash and
+                content_hash, ordered by file_size.
+        """
+        table = Media.__table__
+        shared_sizes = (
+            select(table.c.file_size)
+            .where(table.c.file_size > 0)
+            .group_by(table.c.file_size)
+            .having(func.count() > 1)
+        )
+        return self.session.execute(
+            select(table.c.file_path, table.c.file_size, table.c.file_mtime_ns,
+                   table.c.partial_hash, table.c.content_hash)
+            .where(table.c.file_size.in_(shared_sizes))
+            .order_by(table.c.file_size, table.c.id)
+        ).all()
+
+    def get_videos_without_signature(self):
+        """
+        Return the paths of video rows that have no perceptual signature yet.
+        """
+        return self.session.execute(
+            select(Media.file_path)
+            .join(MediaType, Media.media_type_id == MediaType.id)
+            .where(MediaType.name == "video", Media.video_signature.is_(None))
+            .order_by(Media.id)
+        ).scalars().all()
+
+    def get_video_signatures(self):
+        """
+        Return (file_path, video_signature) for every video with a non-empty signature.
+        """
+        return self.session.execute(
+            select(Media.file_path, Media.video_signature)
+            .where(Media.video_signature.is_not(None), func.length(Media.video_signature) > 0)
+            .order_by(Media.id)
+        ).all()
+
+    def get_images_without_hash(self):
+        """
+        Return (id, file_path, resolution) of image rows that have no perceptual hash yet.
+        """
+        return self.session.execute(
+            select(Media.id, Media.file_path, Media.resolution)
+            .join(MediaType, Media.media_type_id == MediaType.id)
+            .where(MediaType.name == "image", Media.image_hash.is_(None))
+            .order_by(Media.id)
+        ).all()
+
+    def get_media_without_thumbnail(self):
+        """
+        Return (id, file_path, media type name, content_hash, resolution) of video and image
+        rows that have no thumbnail yet.
+        """
+        return self.session.execute(
+            select(Media.id, Media.file_path, MediaType.name.label("media_type"),
+                   Media.content_hash, Media.resolution)
+            .join(MediaType, Media.media_type_id == MediaType.id)
+            .where(MediaType.name.in_(("video", "image")), Media.thumbnail_path.is_(None))
+            .order_by(Media.id)
+        ).all()
+
+    def get_thumbnail_sources(self, media_ids):
+        """
+        Return (id, file_path, media type name, content_hash, resolution) for the given IDs.
+        """
+        return self.session.execute(
+            select(Media.id, Media.file_path, MediaType.name.label("media_type"),
+                   Media.content_hash, Media.resolution)
+            .join(MediaType, Media.media_type_id == MediaType.id)
+            .where(Media.id.in_(list(media_ids)))
+        ).all()
+
+    def get_thumbnails(self):
+        """
+        Return (id, content_hash, thumbnail_path) for every row with a generated thumbnail.
+        """
+        return self.session.execute(
+            select(Media.id, Media.content_hash, Media.thumbnail_path)
+            .where(Media.thumbnail_path.is_not(None), Media.thumbnail_path != "")
+            .order_by(Media.id)
+        ).all()
+
+    def get_image_hashes(self):
+        """
+        Return (id, image_hash) for every image with a non-empty perceptual hash.
+        """
+        return self.session.execute(
+            select(Media.id, Media.image_hash)
+            .where(Media.image_hash.is_not(None), func.length(Media.image_hash) > 0)
+            .order_by(Media.id)
+        ).all()
+
+    def get_similarity_features(self, media_type_name="video"):
+        """
+        Return (id, file_size, file_mtime_ns, duration, resolution, codec, bit_rate) for every
+        row of a media type with a known duration, for the metadata similarity index.
+        """
+        return self.session.execute(
+            select(Media.id, Media.file_size, Media.file_mtime_ns, Media.duration,
+                   Media.resolution, Media.codec, Media.bit_rate)
+            .join(MediaType, Media.media_type_id == MediaType.id)
+            .where(MediaType.name == media_type_name, Media.duration > 0)
+            .order_by(Media.id)
+        ).all()
+
+    def get_total_file_size(self):
+        """
+        Return the sum of file sizes across the catalog, in bytes.
+        """
+        return self.session.execute(select(func.coalesce(func.sum(Media.file_size), 0))).scalar_one()
+
     def update_media(self, media_id, updates):
         """
         Update an existing media entry by ID.
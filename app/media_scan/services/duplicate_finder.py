@@ -0,0 +1,199 @@
+# app/media_scan/services/duplicate_finder.py
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from itertools import groupby
+
+from app.media_scan.config.settings import config
+from app.media_scan.dal.database import SessionLocal
+from app.media_scan.repositories.media_repository import MediaRepository
+from app.media_scan.utils.file_hashing import full_hash, partial_hash
+
+
+@dataclass
+class DuplicateReport:
+    """
+    Outcome of a duplicate search.
+
+    Attributes:
+        groups (list[list[str]]): Paths of files with identical contents, one list per group.
+        bytes_read (int): Bytes read from disk by this run.
+        catalog_bytes (int): Total size of all cataloged files.
+        partial_hashed (int): Files that got a partial hash in this run.
+        full_hashed (int): Files that got a full hash in this run.
+        skipped (list[str]): Files that changed on disk since they were scanned, or could not be read.
+    """
+    groups: list = field(default_factory=list)
+    bytes_read: int = 0
+    catalog_bytes: int = 0
+    partial_hashed: int = 0
+    full_hashed: int = 0
+    skipped: list = field(default_factory=list)
+
+    @property
+    def read_fraction(self) -> float:
+        """
+        Bytes read as a fraction of the catalog's total size.
+        """
+        return self.bytes_read / self.catalog_bytes if self.catalog_bytes else 0.0
+
+
+class DuplicateFinder:
+    """
+    Finds files with identical contents in the catalog while reading as little as possible.
+
+    Stages, each only applied to files still colliding after the previous one:
+    1. Group rows by file_size (a database query, no I/O).
+    2. Partial hash of the head, middle and tail `chunk_size` bytes.
+    3. Full streaming hash.
+
+    Hashes are stored in the `partial_hash` and `content_hash` columns every
+    `batch_size` files as they finish, so later runs, including one after an
+    interrupted stage, only hash new or changed files (the scanner clears both
+    when a file's contents change). A file whose size or mtime no longer
+    matches its row is skipped until it is rescanned. With a MetadataCache,
+    hashes also survive a catalog rebuild (namespace 'hash:<chunk_size>').
+
+    A partial hash is stored as "<chunk_size>:<hex digest>". Partial hashes of
+    another chunk size (e.g. after HASH_CHUNK_SIZE changed) cannot collide
+    with the current ones, so they are treated as missing and recomputed.
+
+    Example:
+        report = DuplicateFinder().find_duplicates()
+        for group in report.groups:
+            print(group)
+        print(f"read {report.read_fraction:.4%} of the catalog")
+    """
+
+    def __init__(self, session=None, chunk_size=None, max_workers=None, cache=None, batch_size=None):
+        """
+        Args:
+            session (Session, optional): Database session. Defaults to a new SessionLocal().
+            chunk_size (int, optional): Bytes hashed at each position. Defaults to config.HASH_CHUNK_SIZE.
+            max_workers (int, optional): Files hashed concurrently. Defaults to config.HASH_WORKERS.
+            cache (MetadataCache, optional): Persistent cache of hashes keyed by stat fingerprint.
+            batch_size (int, optional): Hashes stored per commit. Defaults to config.HASH_BATCH_SIZE.
+        """
+        self.session = session or SessionLocal()
+        self.media_repository = MediaRepository(self.session)
+        self.chunk_size = chunk_size or config.HASH_CHUNK_SIZE
+        self.max_workers = max_workers or config.HASH_WORKERS
+        self.cache = cache
+        self.batch_size = batch_size or config.HASH_BATCH_SIZE
+        self._partial_prefix = f"{self.chunk_size}:"
+        self._cache_namespace = f"hash:{self.chunk_size}"
+
+    def find_duplicates(self) -> DuplicateReport:
+        """
+        Run all stages and return the duplicate groups with I/O statistics.
+        """
+        report = DuplicateReport(catalog_bytes=self.media_repository.get_total_file_size())
+        rows = [row._asdict() for row in self.media_repository.get_size_collisions()]
+
+        for row in rows:
+            if row["partial_hash"] is not None and not row["partial_hash"].startswith(self._partial_prefix):
+                row["partial_hash"] = None
+        unhashed = [row for row in rows if row["partial_hash"] is None]
+        self._hash_stage(unhashed, self._partial_hash, report)
+        report.partial_hashed = sum(1 for row in unhashed if row["partial_hash"] is not None)
+
+        collisions = [
+            row for group in _colliding_groups(rows, "partial_hash") for row in group
+            if row["content_hash"] is None
+        ]
+        self._hash_stage(collisions, self._full_hash, report)
+        report.full_hashed = sum(1 for row in collisions if row["content_hash"] is not None)
+
+        report.groups = [
+            [row["file_path"] for row in group] for group in _colliding_groups(rows, "content_hash")
+        ]
+        return report
+
+    def _hash_stage(self, rows, hash_function, report):
+        """
+        Hash rows concurrently, update them in place and store the new hashes as they finish.
+        """
+        updates = []
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hash")
+        try:
+            futures = {executor.submit(hash_function, row): row for row in rows}
+            for future in as_completed(futures):
+                row = futures.pop(future)
+                hashes, bytes_read = future.result()
+                report.bytes_read += bytes_read
+                if hashes is None:
+                    report.skipped.append(row["file_path"])
+                    continue
+                row.update(hashes)
+                updates.append({"file_path": row["file_path"], **hashes})
+                if len(updates) >= self.batch_size:
+                    self.media_repository.update_media_metadata_bulk(updates)
+                    updates = []
+        finally:
+            # On an error or interrupt, drop the queued files instead of hashing them all first
+            executor.shutdown(wait=True, cancel_futures=True)
+        if updates:
+            self.media_repository.update_media_metadata_bulk(updates)
+
+    def _current_stat(self, row):
+        """
+        Stat the file, or return None if it is gone or differs from its row.
+        """
+        try:
+            stat = os.stat(row["file_path"])
+        except OSError:
+            return None
+        if stat.st_size != row["file_size"] or (
+                row["file_mtime_ns"] is not None and stat.st_mtime_ns != row["file_mtime_ns"]):
+            return None
+        return stat
+
+    def _partial_hash(self, row):
+        stat = self._current_stat(row)
+        if stat is None:
+            return None, 0
+        cached = self.cache.get(stat, namespace=self._cache_namespace) if self.cache is not None else None
+        if cached is not None:
+            return cached, 0
+        try:
+            digest, bytes_read, whole_file = partial_hash(row["file_path"], row["file_size"], self.chunk_size)
+        except OSError:
+            return None, 0
+        # A file hashed whole needs no separate full hash; keep one computed earlier (e.g. for thumbnails)
+        hashes = {"partial_hash": self._partial_prefix + digest,
+                  "content_hash": digest if whole_file else row["content_hash"]}
+        self._cache_put(stat, hashes)
+        return hashes, bytes_read
+
+    def _full_hash(self, row):
+        stat = self._current_stat(row)
+        if stat is None:
+            return None, 0
+        cached = self.cache.get(stat, namespace=self._cache_namespace) if self.cache is not None else None
+        if cached is not None and cached.get("content_hash"):
+            return cached, 0
+        try:
+            digest, bytes_read = full_hash(row["file_path"])
+        except OSError:
+            return None, 0
+        hashes = {"partial_hash": row["partial_hash"], "content_hash": digest}
+        self._cache_put(stat, hashes)
+        return hashes, bytes_read
+
+    def _cache_put(self, stat, hashes):
+        if self.cache is not None:
+            self.cache.put(stat, hashes, namespace=self._cache_namespace)
+
+
+def _colliding_groups(rows, hash_column):
+    """
+    Yield groups of two or more rows sharing file_size and a non-NULL hash.
+    """
+    hashed = sorted(
+        (row for row in rows if row[hash_column] is not None),
+        key=lambda row: (row["file_size"], row[hash_column]),
+    )
+    for _, group in groupby(hashed, key=lambda row: (row["file_size"], row[hash_column])):
+        group = list(group)
+        if len(group) > 1:
+            yield group
@@ -0,0 +1,103 @@
+# app/media_scan/services/image_similarity.py
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.media_scan.config.settings import config
+from app.media_scan.dal.database import SessionLocal
+from app.media_scan.repositories.media_repository import MediaRepository
+from app.media_scan.similarity.image_hash import BATCH_HASH_FUNCTIONS, load_grayscale
+from app.media_scan.similarity.image_index import ImageHashIndex
+
+
+class ImageSimilarityService:
+    """
+    Perceptual hashing and near-duplicate search for cataloged images.
+
+    `hash_images` decodes images without a hash in batches (at reduced scale
+    where the known resolution allows it, on a thread pool since OpenCV
+    releases the GIL), hashes each batch with one vectorized NumPy pass and
+    stores the 64-bit hashes in `Media.image_hash`. Undecodable images get an
+    empty hash so they are not retried until they change.
+
+    `similar_images` and `clusters` run on an ImageHashIndex built from the
+    stored hashes; call `refresh_index` after hashing new images.
+
+    Example:
+        service = ImageSimilarityService()
+        service.hash_images()
+        service.similar_images(media_id=42, k=10)   # [(media_id, distance), ...]
+        service.clusters(max_distance=6)            # [array([3, 42, 97]), ...]
+    """
+
+    def __init__(self, session=None, method="phash", batch_size=None, max_workers=None, chunk_size=None):
+        """
+        Args:
+            session (Session, optional): Database session. Defaults to a new SessionLocal().
+            method (str, optional): 'phash' or 'dhash'. Defaults to 'phash'.
+            batch_size (int, optional): Images per hashing batch. Defaults to config.IMAGE_HASH_BATCH_SIZE.
+            max_workers (int, optional): Images decoded concurrently. Defaults to config.FINGERPRINT_WORKERS.
+            chunk_size (int, optional): Hashes per vectorized comparison. Defaults to config.IMAGE_SEARCH_CHUNK_SIZE.
+        """
+        self.session = session or SessionLocal()
+        self.media_repository = MediaRepository(self.session)
+        self.hash_function = BATCH_HASH_FUNCTIONS[method]
+        self.batch_size = batch_size or config.IMAGE_HASH_BATCH_SIZE
+        self.max_workers = max_workers or config.FINGERPRINT_WORKERS
+        self.chunk_size = chunk_size or config.IMAGE_SEARCH_CHUNK_SIZE
+        self._index = None
+
+    def hash_images(self) -> int:
+        """
+        Compute and store hashes for images that do not have one.
+
+        Returns:
+            int: Number of images processed (including undecodable ones).
+        """
+        rows = self.media_repository.get_images_without_hash()
+        processed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="image-hash") as executor:
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                images = list(executor.map(
+                    lambda row: load_grayscale(row.file_path, resolution=row.resolution), batch
+                ))
+                decoded = [image for image in images if image is not None and image.size]
+                hashes = iter(self.hash_function(decoded).astype("<u8"))
+                updates = [
+                    {"file_path": row.file_path,
+                     "image_hash": next(hashes).tobytes() if image is not None and image.size else b""}
+                    for row, image in zip(batch, images)
+                ]
+                processed += self.media_repository.update_media_metadata_bulk(updates)
+        self._index = None
+        return processed
+
+    def refresh_index(self) -> ImageHashIndex:
+        """
+        (Re)build the in-memory index from the stored hashes.
+        """
+        rows = self.media_repository.get_image_hashes()
+        ids = np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows))
+        hashes = np.frombuffer(b"".join(row.image_hash for row in rows), dtype="<u8").astype(np.uint64)
+        self._index = ImageHashIndex(ids, hashes, chunk_size=self.chunk_size)
+        return self._index
+
+    @property
+    def index(self) -> ImageHashIndex:
+        return self._index if self._index is not None else self.refresh_index()
+
+    def similar_images(self, media_id: int, k: int = 10, max_distance: int = 64):
+        """
+        Return the k images most similar to a cataloged image as (media_id, distance), closest first.
+
+        Raises:
+            KeyError: If the image has no hash.
+        """
+        return self.index.top_k(media_id, k, max_distance)
+
+    def clusters(self, max_distance: int = 6, min_size: int = 2):
+        """
+        Return clusters of near-duplicate images as arrays of Media IDs, largest first.
+        """
+        return self.index.clusters(max_distance, min_size)
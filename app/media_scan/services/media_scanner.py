@@ -1,14 +1,18 @@
 # app/media_scan/services/media_scanner.py
 import os
+import time
+from app.media_scan.config.settings import config
+from app.media_scan.models.media import MetadataStatus
 from app.media_scan.models.media_type import MediaType
 from utils.directory_scanner import DirectoryScanner
-from app.media_scan.dal.database import SessionLocal
+from app.media_scan.dal.database import ReadSessionLocal, SessionLocal
 
 from app.media_scan.services.media_type import MediaTypeService
-from app.media_scan.repositories.media_repository import MediaRepository
+from app.media_scan.repositories.media_repository import MediaRepository, UpsertPolicy
 from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
 
 from app.media_scan.exceptions.media_exceptions import MediaAlreadyExistsError
+from app.media_scan.utils.stat_snapshot import StatSnapshot
 
 
 class MediaScanner:
@@ -16,61 +20,223 @@ class MediaScanner:
     Media scanner logic for scanning and processing media files.
     """
 
-    def __init__(self, validation_strategy):
+    def __init__(self, validation_strategy, session=None, batch_size=None, flush_interval=None,
+                 upsert_policy=None, content_strategy=None, metadata_extractor=None, ffprobe_pool=None,
+                 defer_metadata=False, read_session=None):
         """
         Accept the CompositeValidationStrategy to use during scanning.
         Args:
             validation_strategy: CompositeValidationStrategy instance.
+            session (Session, optional): Database session. Defaults to a new SessionLocal().
+            batch_size (int, optional): Rows per bulk insert. Defaults to config.SCAN_BATCH_SIZE.
+            flush_interval (float, optional): Maximum seconds a pending row waits before
+                being flushed, even if the batch is not full. Defaults to config.SCAN_FLUSH_INTERVAL.
+            upsert_policy (UpsertPolicy | str, optional): When set, batches are upserted with this
+                conflict policy (skip, refresh, refresh_if_changed) instead of reporting duplicates.
+            content_strategy (ContentSniffingValidationStrategy, optional): Magic-byte fallback for
+                files the name-based validation cannot classify.
+            metadata_extractor (CompositeMetadataExtractor, optional): Reads duration, resolution,
+                codec and bit rate from file headers. Without it the placeholder values are stored.
+            ffprobe_pool (FFprobePool, optional): Probes audio and video files whose duration the
+                metadata extractor could not read, concurrently with the scan; results update the
+                rows after they are inserted. Probed rows stay pending until their result is saved,
+                and a failed probe counts as an enrichment attempt, so the MetadataEnricher retries it.
+            defer_metadata (bool, optional): Two-phase ingest. Rows are inserted with placeholder
+                values and metadata_status 'pending' without opening the files, for a
+                MetadataEnricher to fill in. Defaults to False (extract during the scan).
+            read_session (Session, optional): Session for the large reads of a scan (the stat
+                fingerprints of an incremental scan), so they do not hold a write connection.
+                Defaults to the scanning session when one is given, else a new ReadSessionLocal().
         """
-        self.session = SessionLocal()
+        self.session = session or SessionLocal()
         self.media_repository = MediaRepository(self.session)
+        if read_session is None and session is not None:
+            read_session = self.session
+        self.read_repository = MediaRepository(read_session or ReadSessionLocal())
         self.validation_strategy = validation_strategy
+        self.content_strategy = content_strategy
+        self.metadata_extractor = metadata_extractor
+        self.ffprobe_pool = ffprobe_pool
+        self.defer_metadata = defer_metadata
+        self.batch_size = batch_size or config.SCAN_BATCH_SIZE
+        self.flush_interval = config.SCAN_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.upsert_policy = None if upsert_policy is None else UpsertPolicy(upsert_policy)
+        self.removed_paths = []
+        self._media_type_ids = {}
 
-    def execute_and_save_to_db(self, directory_path: str):
+    def _get_media_type_id(self, media_type: str) -> int:
+        """
+        Resolve a media type name to its ID, caching the lookup for the scanner's lifetime.
+        """
+        if media_type not in self._media_type_ids:
+            self._media_type_ids[media_type] = MediaType.get_id_by_name(self.session, media_type)
+        return self._media_type_ids[media_type]
+
+    def _build_media_data(self, file_path: str, media_type: str, stat=None, type_by_name: bool = False) -> dict:
+        """
+        Build the column values for a media row, using extracted metadata where
+        available and placeholders otherwise. Rows whose metadata was not
+        extracted are left pending for the MetadataEnricher.
+
+        Args:
+            file_path (str): Full path to the media file.
+            media_type (str): Media type name.
+            stat (os.stat_result, optional): Stat result if the caller already has one.
+            type_by_name (bool, optional): Store the type name under 'media_type' instead of
+                looking up media_type_id, for MediaRepository.load_media_bulk. Defaults to False.
+        """
+        # media_data = {
+        #     #TODO Add a file name attribute to the Media object
+        #     # "file_name": os.path.basename(file_path),
+        #     "created_at": None,
+        #     "modified_at": None,
+        #     "frame_rate": 0.0,
+        #     "thumbnail_path": "Unknown"
+        # }
+        stat = stat or os.stat(file_path)
+        media_data = {
+            "file_path": file_path,
+            "file_size": stat.st_size,
+            "duration": 0.0,
+            "resolution": "Unknown",
+            "width": None,
+            "height": None,
+            "codec": "Unknown",
+            "bit_rate": 0,
+            "date_created": None,
+            "file_mtime_ns": stat.st_mtime_ns,
+            "file_inode": stat.st_ino,
+            "file_device": stat.st_dev,
+            "metadata_status": MetadataStatus.PENDING.value,
+            "metadata_attempts": 0,
+            "metadata_leased_until": None,
+            # New or changed contents invalidate any stored hashes and signatures
+            "partial_hash": None,
+            "content_hash": None,
+            "video_signature": None,
+            "image_hash": None,
+            "thumbnail_path": None,
+        }
+        if type_by_name:
+            media_data["media_type"] = media_type
+        else:
+            media_data["media_type_id"] = self._get_media_type_id(media_type)
+        if self.defer_metadata:
+            return media_data
+
+        if self.metadata_extractor is not None:
+            media_data.update(self.metadata_extractor.extract(file_path, media_type, stat))
+            media_data["metadata_status"] = MetadataStatus.DONE.value
+        if self.ffprobe_pool is not None and media_type in ("video", "audio") and not media_data["duration"]:
+            # Done once the probe's result is saved; if the probe fails, the enricher retries the row
+            media_data["metadata_status"] = MetadataStatus.PENDING.value
+            self.ffprobe_pool.submit(file_path)
+        return media_data
+
+    def _apply_probe_results(self, results):
+        """
+        Write ffprobe results onto rows that are already in the database and mark them done.
+        """
+        updates = [
+            {"file_path": file_path, **metadata, "metadata_status": MetadataStatus.DONE.value}
+            for file_path, metadata in results
+        ]
+        if updates:
+            updated = self.media_repository.update_media_metadata_bulk(updates, self.batch_size)
+            print(f"ffprobe metadata saved for {updated} files.")
+
+    def _finish_probes(self):
+        """
+        Wait for outstanding ffprobe runs, save their results, record failures on their
+        rows and report failures and latency.
+        """
+        if self.ffprobe_pool is None:
+            return
+        try:
+            self._apply_probe_results(self.ffprobe_pool.drain())
+        finally:
+            self.ffprobe_pool.shutdown()
+        if self.ffprobe_pool.failures:
+            # Each failed probe counts as an enrichment attempt of the (still pending) row
+            self.media_repository.release_failed_metadata(
+                self.media_repository.get_media_ids(list(self.ffprobe_pool.failures), self.batch_size),
+                config.ENRICH_MAX_ATTEMPTS, count_attempt=True,
+            )
+        stats = self.ffprobe_pool.stats()
+        print(f"ffprobe: {stats['probed']} probed, {stats['failed']} failed, "
+              f"latency p50 {stats['p50']:.3f}s p95 {stats['p95']:.3f}s max {stats['max']:.3f}s.")
+        for file_path, reason in self.ffprobe_pool.failures.items():
+            print(f"ffprobe failed for {file_path}: {reason}")
+
+    def _flush(self, pending: list, upsert_policy=None):
+        """
+        Write pending rows in one bulk insert (or upsert) and report the outcome.
+        """
+        if not pending:
+            return
+        upsert_policy = upsert_policy or self.upsert_policy
+        if upsert_policy is not None:
+            result = self.media_repository.upsert_media_bulk(
+                pending, policy=upsert_policy, batch_size=self.batch_size
+            )
+            print(f"Batch saved: {result.inserted} added, {result.updated} updated, "
+                  f"{result.unchanged} unchanged.")
+        else:
+            result = self.media_repository.add_media_bulk(pending, batch_size=self.batch_size)
+            print(f"Batch saved: {len(result.inserted)} added, {len(result.duplicates)} duplicates skipped.")
+        pending.clear()
+        if self.ffprobe_pool is not None:
+            # Probes submitted so far belong to rows that are now written
+            self._apply_probe_results(self.ffprobe_pool.completed())
+
+    def execute_and_save_to_db(self, directory_path: str, bulk: bool = True,
+                               incremental: bool = False, prune_missing: bool = False,
+                               bulk_load: bool = False):
         """
         Scan the directory for valid media files and attempt to save their metadata into the database.
         Args:
             directory_path (str): Directory to scan.
+            bulk (bool, optional): Buffer rows and insert them in batches (one transaction per
+                batch). When False, each file is committed individually. Defaults to True.
+            incremental (bool, optional): Only process files that are new or whose stat
+                fingerprint changed since the last scan. Defaults to False.
+            prune_missing (bool, optional): In incremental mode, delete rows for files that
+                no longer exist on disk. Defaults to False (they are only reported).
+            bulk_load (bool, optional): For the first import of a volume: stream every row into
+                one MediaRepository.load_media_bulk transaction (COPY on PostgreSQL) instead of
+                batched inserts. Nothing is saved if the scan fails part-way. Defaults to False.
         """
+        if incremental:
+            self._execute_incremental(directory_path, prune_missing)
+            return
+        if bulk_load:
+            self._execute_bulk_load(directory_path)
+            return
+
         # Initialize directory scanner with media validation logic
-        scanner = DirectoryScanner(validation_strategy=self.validation_strategy)
-        
+        scanner = DirectoryScanner(validation_strategy=self.validation_strategy,
+                                   content_strategy=self.content_strategy)
+        pending = []
+        last_flush = time.monotonic()
+
         try:
-            for file_path, media_type in scanner.scan(directory_path):
+            for file_path, media_type, stat in scanner.scan_entries(directory_path):
                 
                 print(f"Processing {file_path} as type {media_type}")
                 
                 # Insert logic to handle database save based on media_type
                 try:
-                    # TODO This may be redundant check
-                    # media_type = MediaTypeService.identify(file_path)
                     if media_type == "unknown":
                         continue  # Skip unsupported media types
-                    # media_data = {
-                    #     #TODO Add a file name attribute to the Media object
-                    #     # "file_name": os.path.basename(file_path),
-                    #     "file_path": file_path,
-                    #     "file_size": os.path.getsize(file_path),
-                    #     "media_type": media_type,
-                    #     "created_at": None,
-                    #     "modified_at": None,
-                    #     "duration": 0.0,
-                    #     "resolution": "Unknown",
-                    #     "frame_rate": 0.0,
-                    #     "codec": "Unknown",
-                    #     "bitrate": 0,
-                    #     "thumbnail_path": "Unknown"
-                    # }
-                    media_data = {
-                        "file_path": file_path,
-                        "file_size": os.path.getsize(file_path),
-                        "media_type_id": MediaType.get_id_by_name(self.session, media_type),  # Use the static method here
-                        "duration": 0.0,
-                        "resolution": "Unknown",
-                        "codec": "Unknown",
-                        "bit_rate": 0,
-                        "date_created": None,
-                    }                    
+                    media_data = self._build_media_data(file_path, media_type, stat)
+
+                    if bulk:
+                        pending.append(media_data)
+                        if (len(pending) >= self.batch_size
+                                or time.monotonic() - last_flush >= self.flush_interval):
+                            self._flush(pending)
+                            last_flush = time.monotonic()
+                        continue
 
                     # Save the data to the database
                     self.media_repository.add_media(media_data)
@@ -80,5 +246,80 @@ class MediaScanner:
                 except Exception as e:
                     print(f"Unexpected error processing {file_path}: {e}")
 
+            self._flush(pending)
+            self._finish_probes()
+
         except Exception as e:
             print(f"Error during scanning process: {e}")
+
+    def _execute_bulk_load(self, directory_path: str):
+        """
+        Bulk-load scan: rows are handed to the repository as the walk produces them.
+        """
+        scanner = DirectoryScanner(validation_strategy=self.validation_strategy,
+                                   content_strategy=self.content_strategy)
+
+        def records():
+            for file_path, media_type, stat in scanner.scan_entries(directory_path):
+                if media_type == "unknown":
+                    continue
+                try:
+                    # The repository resolves types by name in the database; a lookup here
+                    # would also run on the connection the COPY is streaming through
+                    media_data = self._build_media_data(file_path, media_type, stat, type_by_name=True)
+                except Exception as e:
+                    print(f"Unexpected error processing {file_path}: {e}")
+                    continue
+                yield media_data
+
+        try:
+            result = self.media_repository.load_media_bulk(records(), policy=self.upsert_policy or UpsertPolicy.SKIP)
+            print(f"Bulk load saved: {result.inserted} added, {result.updated} updated, "
+                  f"{result.unchanged} unchanged.")
+            self._finish_probes()
+        except Exception as e:
+            print(f"Error during scanning process: {e}")
+
+    def _execute_incremental(self, directory_path: str, prune_missing: bool):
+        """
+        Incremental scan: upsert new and changed files, then report (or prune) removed files.
+        """
+        scanner = DirectoryScanner(validation_strategy=self.validation_strategy,
+                                   content_strategy=self.content_strategy)
+        snapshot = StatSnapshot(self.read_repository.get_fingerprints(directory_path))
+        if self.read_repository.session is not self.session:
+            # End the read transaction, so a SQLite reader does not hold back WAL checkpoints during the scan
+            self.read_repository.session.rollback()
+        # Changed files must overwrite their stale row, so never fall back to skip
+        upsert_policy = self.upsert_policy or UpsertPolicy.REFRESH
+        self.removed_paths = []
+        pending = []
+        last_flush = time.monotonic()
+
+        try:
+            for file_path, media_type, stat in scanner.scan_incremental(directory_path, snapshot):
+                if media_type == "unknown":
+                    continue
+                try:
+                    pending.append(self._build_media_data(file_path, media_type, stat))
+                except Exception as e:
+                    print(f"Unexpected error processing {file_path}: {e}")
+                    continue
+                if (len(pending) >= self.batch_size
+                        or time.monotonic() - last_flush >= self.flush_interval):
+                    self._flush(pending, upsert_policy)
+                    last_flush = time.monotonic()
+            self._flush(pending, upsert_policy)
+            self._finish_probes()
+        except Exception as e:
+            print(f"Error during scanning process: {e}")
+            return
+
+        self.removed_paths = list(snapshot.removed_paths())
+        print(f"{len(self.removed_paths)} cataloged files no longer exist on disk.")
+        stat_failed = snapshot.stat_failed_paths()
+        if stat_failed:
+            print(f"{len(stat_failed)} entries could not be stat'ed; their catalog rows are kept.")
+        if prune_missing and self.removed_paths:
+            deleted = self.media_repository.delete_media_by_paths(self.removed_paths, self.batch_size)
+            print(f"Removed {deleted} missing files from the catalog.")
@@ -0,0 +1,154 @@
+# app/media_scan/services/metadata_enricher.py
+import os
+from dataclasses import dataclass
+
+from app.media_scan.config.settings import config
+from app.media_scan.dal.database import SessionLocal
+from app.media_scan.models.media import MetadataStatus
+from app.media_scan.models.media_type import MediaType
+from app.media_scan.repositories.media_repository import MediaRepository
+
+
+@dataclass
+class EnrichmentResult:
+    """
+    Outcome of one or more enrichment batches.
+
+    Attributes:
+        done (int): Rows whose metadata was extracted.
+        retried (int): Rows that failed this attempt and went back to the queue.
+        failed (int): Rows that failed their last allowed attempt.
+        lost (int): Rows not saved because their lease expired and another worker claimed them.
+    """
+    done: int = 0
+    retried: int = 0
+    failed: int = 0
+    lost: int = 0
+
+    def merge(self, other):
+        """
+        Accumulate another batch's counts into this result.
+        """
+        self.done += other.done
+        self.retried += other.retried
+        self.failed += other.failed
+        self.lost += other.lost
+
+
+class MetadataEnricher:
+    """
+    Second phase of ingest: fills in metadata for rows the scan registered as pending.
+
+    The scan (MediaScanner with defer_metadata=True) inserts rows at walk speed;
+    this worker claims pending rows in batches under a time-limited lease, runs
+    the metadata extractor on each file and writes the results in one bulk
+    update per batch. Several workers can run against the same database. If a
+    worker dies, its lease expires and the rows are claimed again, so enrichment
+    resumes where it stopped. Results are only saved to rows that still hold
+    the batch's lease, so a slow worker whose lease ran out cannot overwrite
+    the worker that claimed the rows next; those rows are counted as lost.
+    Rows whose extraction raises (e.g. the file is gone or unreadable) are
+    retried up to `max_attempts` times, then marked failed.
+
+    Example:
+        enricher = MetadataEnricher(CompositeMetadataExtractor())
+        result = enricher.run()
+        print(result.done, result.failed)
+    """
+
+    def __init__(self, metadata_extractor, session=None, batch_size=None, lease_seconds=None,
+                 max_attempts=None, ffprobe_pool=None):
+        """
+        Args:
+            metadata_extractor (CompositeMetadataExtractor): Extracts metadata for a file and media type.
+            session (Session, optional): Database session. Defaults to a new SessionLocal().
+            batch_size (int, optional): Rows claimed per batch. Defaults to config.ENRICH_BATCH_SIZE.
+            lease_seconds (float, optional): Lease length per claim. Defaults to config.ENRICH_LEASE_SECONDS.
+            max_attempts (int, optional): Attempts before a row is marked failed.
+                Defaults to config.ENRICH_MAX_ATTEMPTS.
+            ffprobe_pool (FFprobePool, optional): Probes audio and video files the extractor
+                returned no duration for; each batch waits for its probes before saving.
+        """
+        self.session = session or SessionLocal()
+        self.media_repository = MediaRepository(self.session)
+        self.metadata_extractor = metadata_extractor
+        self.batch_size = batch_size or config.ENRICH_BATCH_SIZE
+        self.lease_seconds = config.ENRICH_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self.max_attempts = max_attempts or config.ENRICH_MAX_ATTEMPTS
+        self.ffprobe_pool = ffprobe_pool
+        self._media_type_names = None
+
+    def _media_type_name(self, media_type_id):
+        if self._media_type_names is None:
+            self._media_type_names = {
+                media_type.id: media_type.name for media_type in self.session.query(MediaType).all()
+            }
+        return self._media_type_names.get(media_type_id, "unknown")
+
+    def enrich_batch(self):
+        """
+        Claim, enrich and save one batch.
+
+        Returns:
+            EnrichmentResult | None: Counts for the batch, or None if no rows were claimable.
+        """
+        claimed = self.media_repository.claim_pending_metadata(self.batch_size, self.lease_seconds)
+        if not claimed:
+            return None
+
+        updates = {}
+        failed_ids = []
+        for row in claimed:
+            media_type = self._media_type_name(row.media_type_id)
+            try:
+                metadata = self.metadata_extractor.extract(row.file_path, media_type, os.stat(row.file_path))
+            except Exception as e:
+                print(f"Metadata extraction failed for {row.file_path} (attempt {row.metadata_attempts}): {e}")
+                failed_ids.append(row.id)
+                continue
+            updates[row.file_path] = {"file_path": row.file_path, **metadata}
+            if self.ffprobe_pool is not None and media_type in ("video", "audio") and not metadata.get("duration"):
+                self.ffprobe_pool.submit(row.file_path)
+
+        if self.ffprobe_pool is not None:
+            for file_path, metadata in self.ffprobe_pool.drain():
+                updates[file_path].update(metadata)
+
+        done = [
+            update | {"metadata_status": MetadataStatus.DONE.value, "metadata_leased_until": None}
+            for update in updates.values()
+        ]
+        # Every row of a claim carries the same lease
+        lease = claimed[0].metadata_leased_until
+        saved = self.media_repository.update_media_metadata_bulk(done, batch_size=self.batch_size, lease=lease)
+
+        # Released separately, so each count only includes rows whose lease was still held
+        attempts = {row.id: row.metadata_attempts for row in claimed}
+        exhausted_ids = [media_id for media_id in failed_ids if attempts[media_id] >= self.max_attempts]
+        retry_ids = [media_id for media_id in failed_ids if attempts[media_id] < self.max_attempts]
+        retried = self.media_repository.release_failed_metadata(retry_ids, self.max_attempts, lease=lease)
+        exhausted = self.media_repository.release_failed_metadata(exhausted_ids, self.max_attempts, lease=lease)
+
+        lost = len(done) + len(failed_ids) - saved - retried - exhausted
+        return EnrichmentResult(done=saved, retried=retried, failed=exhausted, lost=lost)
+
+    def run(self, max_batches=None):
+        """
+        Enrich batches until no claimable rows remain (or `max_batches` have run).
+
+        Returns:
+            EnrichmentResult: Totals across all batches.
+        """
+        total = EnrichmentResult()
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            result = self.enrich_batch()
+            if result is None:
+                break
+            total.merge(result)
+            batches += 1
+            print(f"Enrichment batch {batches}: {result.done} done, {result.retried} to retry, "
+                  f"{result.failed} failed, {result.lost} lost.")
+        if self.ffprobe_pool is not None:
+            self.ffprobe_pool.shutdown()
+        return total
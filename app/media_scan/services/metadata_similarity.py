@@ -0,0 +1,108 @@
+# app/media_scan/services/metadata_similarity.py
+import threading
+
+from app.media_scan.config.settings import config
+from app.media_scan.dal.database import ReadSessionLocal
+from app.media_scan.repositories.media_repository import MediaRepository
+from app.media_scan.similarity.metadata_index import MetadataIndex
+
+
+class MetadataSimilarityService:
+    """
+    Near-duplicate candidates and "similar videos" from metadata alone, without decoding.
+
+    Rows of one media type (videos by default) are indexed by a MetadataIndex,
+    a BallTree over weighted duration, resolution, bit rate, file size and
+    codec features. The index is loaded from `index_path` at startup, so no
+    rebuild is needed until the catalog changes.
+
+    `refresh` reads the current columns and re-vectorizes only new or changed
+    rows. With `background=True` the tree is rebuilt on a worker thread while
+    queries keep using the previous index; the new index is saved to disk and
+    then swapped in with a single reference assignment.
+
+    Example:
+        service = MetadataSimilarityService()
+        service.refresh(background=True)
+        service.similar_videos(media_id=42, k=10)   # [(media_id, distance), ...]
+        service.duplicate_groups()                  # [[3, 42, 97], ...]
+    """
+
+    def __init__(self, session=None, media_type_name="video", index_path=None, leaf_size=40):
+        """
+        Args:
+            session (Session, optional): Database session. Defaults to a new read-only ReadSessionLocal().
+            media_type_name (str, optional): Media type to index. Defaults to 'video'.
+            index_path (str, optional): File the index is persisted to. Defaults to
+                config.METADATA_INDEX_PATH; pass False to keep the index in memory only.
+            leaf_size (int, optional): BallTree leaf size. Defaults to 40.
+        """
+        self.session = session or ReadSessionLocal()
+        self.media_repository = MediaRepository(self.session)
+        self.media_type_name = media_type_name
+        self.index_path = config.METADATA_INDEX_PATH if index_path is None else index_path
+        self.leaf_size = leaf_size
+        self._rebuild_lock = threading.Lock()
+        self._rebuild_thread = None
+        self._index = MetadataIndex.load(self.index_path) if self.index_path else None
+
+    def refresh(self, background: bool = False):
+        """
+        Bring the index up to date with the catalog.
+
+        The rows are read on the calling thread (the session is not shared);
+        vectorizing, building the tree and saving it happen on a worker thread
+        when `background` is True.
+
+        Returns:
+            MetadataIndex | threading.Thread: The new index, or the rebuild thread when running in the background.
+        """
+        rows = self.media_repository.get_similarity_features(self.media_type_name)
+        if not background:
+            return self._rebuild(rows)
+        thread = threading.Thread(target=self._rebuild, args=(rows,), name="metadata-index", daemon=True)
+        self._rebuild_thread = thread
+        thread.start()
+        return thread
+
+    def wait(self, timeout: float = None):
+        """
+        Block until a background rebuild started by `refresh` has finished.
+        """
+        if self._rebuild_thread is not None:
+            self._rebuild_thread.join(timeout)
+
+    def _rebuild(self, rows) -> MetadataIndex:
+        # Rebuilds run one at a time, each starting from the index the previous one produced
+        with self._rebuild_lock:
+            current = self._index or MetadataIndex(leaf_size=self.leaf_size)
+            index = current.updated(rows)
+            if index is not self._index and self.index_path:
+                index.save(self.index_path)
+            self._index = index
+            return index
+
+    @property
+    def index(self) -> MetadataIndex:
+        index = self._index
+        return index if index is not None else self.refresh()
+
+    def similar_videos(self, media_id: int, k: int = 10):
+        """
+        Return the k rows with the closest metadata as (media_id, distance), closest first.
+
+        Raises:
+            KeyError: If the row is not indexed (unknown ID or no duration yet).
+        """
+        return self.index.similar(media_id, k)
+
+    def duplicate_groups(self, radius: float = None, min_size: int = 2):
+        """
+        Return candidate duplicate groups as sorted Media ID lists, largest first.
+
+        Args:
+            radius (float, optional): Max feature distance linking two rows. Defaults to config.METADATA_DUPLICATE_RADIUS.
+            min_size (int, optional): Smallest group reported. Defaults to 2.
+        """
+        radius = config.METADATA_DUPLICATE_RADIUS if radius is None else radius
+        return self.index.duplicate_groups(radius, min_size)
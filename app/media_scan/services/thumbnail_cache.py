@@ -0,0 +1,262 @@
+# app/media_scan/services/thumbnail_cache.py
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from app.media_scan.config.settings import config
+from app.media_scan.dal.database import ReadSessionLocal
+from app.media_scan.repositories.media_repository import MediaRepository
+from app.media_scan.thumbnails.lru_cache import ByteLRUCache
+from app.media_scan.thumbnails.render import content_addressed_path, parse_tiers, render_thumbnail
+
+
+class ThumbnailCache:
+    """
+    Two-level thumbnail cache for the GUI: an in-process LRU over the on-disk tier files.
+
+    Lookups go through three levels:
+    1. Memory: a ByteLRUCache bounded by `memory_limit` bytes, keyed by (media_id, tier).
+    2. Disk: the content-addressed tier files written by ThumbnailGenerator.
+    3. Source: the original video or image, decoded once to write every tier
+       to disk (so the other tiers become disk hits).
+
+    Only the first two run on the calling (GUI) thread. Rendering from the
+    source, which first hashes the whole file when its content hash is
+    unknown, is scheduled on the background threads: `get` returns None for
+    it, and `on_loaded` is called once the thumbnail is ready. The computed
+    hash is not stored; ThumbnailGenerator records hashes and tier files for
+    the whole catalog, after which every lookup is a disk hit.
+
+    `window` serves the visible slice of the GUI's current ordering and
+    prefetches the pages before and after it on background threads, so
+    scrolling usually hits memory. Background threads only read and write
+    files; the database is queried on the calling thread.
+
+    Example:
+        cache = ThumbnailCache()
+        icons = cache.window(ordered_ids, start=200, count=50, tier="icon")
+        preview = cache.get(42, tier="preview")
+        cache.stats()   # {'memory': {'hits': ..., 'evictions': ...}, 'disk_hits': ..., ...}
+    """
+
+    def __init__(self, session=None, directory=None, tiers=None, quality=None, memory_limit=None,
+                 prefetch_workers=None, on_loaded=None):
+        """
+        Args:
+            session (Session, optional): Database session. Defaults to a new read-only ReadSessionLocal().
+            directory (str, optional): Thumbnail root directory. Defaults to config.THUMBNAIL_DIR.
+            tiers (dict[str, int] | str, optional): Tier sizes, as for ThumbnailGenerator. Defaults to config.THUMBNAIL_TIERS.
+            quality (int, optional): JPEG quality for thumbnails rendered on a miss. Defaults to config.THUMBNAIL_QUALITY.
+            memory_limit (int, optional): Bytes of thumbnails kept in memory. Defaults to config.THUMBNAIL_MEMORY_CACHE_BYTES.
+            prefetch_workers (int, optional): Background loading threads. Defaults to config.THUMBNAIL_PREFETCH_WORKERS.
+            on_loaded (callable, optional): Called as on_loaded(media_id, tier, data) on a background
+                thread when a scheduled load finishes (data is None if the file cannot be decoded).
+        """
+        self.session = session or ReadSessionLocal()
+        self.media_repository = MediaRepository(self.session)
+        self.directory = directory or config.THUMBNAIL_DIR
+        tiers = tiers or config.THUMBNAIL_TIERS
+        self.tiers = parse_tiers(tiers) if isinstance(tiers, str) else dict(tiers)
+        self.quality = quality or config.THUMBNAIL_QUALITY
+        self.memory = ByteLRUCache(memory_limit or config.THUMBNAIL_MEMORY_CACHE_BYTES)
+        self.disk_hits = 0
+        self.renders = 0
+        self.render_failures = 0
+        self.prefetched = 0
+        self._sources = {}
+        self._failed = set()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.on_loaded = on_loaded
+        self._executor = ThreadPoolExecutor(max_workers=prefetch_workers or config.THUMBNAIL_PREFETCH_WORKERS,
+                                            thread_name_prefix="thumbnail-prefetch")
+
+    def _check_tier(self, tier):
+        if tier not in self.tiers:
+            raise KeyError(f"Unknown thumbnail tier '{tier}'.")
+
+    def _resolve(self, media_ids):
+        """
+        Look up the source files of IDs not seen before (calling thread only).
+        """
+        missing = [media_id for media_id in media_ids if media_id not in self._sources]
+        if missing:
+            for row in self.media_repository.get_thumbnail_sources(missing):
+                self._sources[row.id] = row._asdict()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _renderable(self, media_id):
+        source = self._sources.get(media_id)
+        return source is not None and source["media_type"] in ("video", "image") and media_id not in self._failed
+
+    def _read_disk(self, media_id, tier):
+        """
+        Read a thumbnail's tier file into memory, or return None if its content hash or file is missing.
+        """
+        content_hash = self._sources[media_id]["content_hash"]
+        if not content_hash:
+            return None
+        try:
+            with open(content_addressed_path(self.directory, content_hash, tier), "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+        self._count("disk_hits")
+        self.memory.put((media_id, tier), data)
+        return data
+
+    def _load(self, media_id, tier):
+        """
+        Load a thumbnail from disk, rendering every tier from the source on a miss, and cache it in
+        memory. Runs on the background threads.
+        """
+        data = self._read_disk(media_id, tier)
+        if data is not None:
+            return data
+        source = self._sources[media_id]
+        _, content_hash, paths, outcome = render_thumbnail(
+            source["file_path"], source["media_type"], source["content_hash"], source["resolution"],
+            self.directory, self.tiers, self.quality,
+        )
+        source["content_hash"] = content_hash
+        if outcome == "failed":
+            self._failed.add(media_id)
+            self._count("render_failures")
+            return None
+        self._count("renders")
+        with open(paths[tier], "rb") as file:
+            data = file.read()
+        self.memory.put((media_id, tier), data)
+        return data
+
+    def get(self, media_id: int, tier: str, neighbours=(), wait: bool = False):
+        """
+        Return a thumbnail's JPEG bytes from memory or disk, scheduling a render from the source otherwise.
+
+        Args:
+            media_id (int): Media ID.
+            tier (str): Tier name.
+            neighbours (iterable, optional): IDs to prefetch in the background after serving this one.
+            wait (bool, optional): Wait for a scheduled render instead of returning None, for
+                callers off the GUI thread. Defaults to False.
+
+        Returns:
+            bytes | None: None while the thumbnail is being rendered (unless `wait`), or if the
+            file cannot be decoded.
+
+        Raises:
+            KeyError: If the tier is not defined.
+        """
+        self._check_tier(tier)
+        data = self.memory.get((media_id, tier))
+        if data is None:
+            self._resolve([media_id])
+            if self._renderable(media_id):
+                data = self._read_disk(media_id, tier)
+                if data is None:
+                    future = self._schedule(media_id, tier)
+                    data = future.result() if wait else None
+        if neighbours:
+            self.prefetch(neighbours, tier)
+        return data
+
+    def get_many(self, media_ids, tier: str, wait: bool = False) -> dict:
+        """
+        Return the thumbnails of several IDs found in memory or on disk (or, with `wait`, rendered).
+
+        IDs still being rendered, or that cannot be decoded, are left out.
+        """
+        media_ids = list(media_ids)
+        self._check_tier(tier)
+        self._resolve(media_ids)
+        thumbnails = {}
+        for media_id in media_ids:
+            data = self.get(media_id, tier, wait=wait)
+            if data is not None:
+                thumbnails[media_id] = data
+        return thumbnails
+
+    def _schedule(self, media_id, tier):
+        """
+        Return the background load of a thumbnail, submitting it unless one is already running.
+        """
+        key = (media_id, tier)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = self._executor.submit(self._prefetch_one, key)
+            return future
+
+    def prefetch(self, media_ids, tier: str) -> int:
+        """
+        Load thumbnails into memory on background threads, nearest first.
+
+        Returns:
+            int: Loads scheduled (IDs already cached or loading are skipped).
+        """
+        self._check_tier(tier)
+        media_ids = [media_id for media_id in media_ids if (media_id, tier) not in self.memory]
+        self._resolve(media_ids)
+        scheduled = 0
+        with self._lock:
+            for media_id in media_ids:
+                key = (media_id, tier)
+                if key not in self._inflight and self._renderable(media_id):
+                    self._inflight[key] = self._executor.submit(self._prefetch_one, key)
+                    scheduled += 1
+        return scheduled
+
+    def _prefetch_one(self, key):
+        data = None
+        try:
+            data = self._load(*key)
+            return data
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self.prefetched += 1
+            if self.on_loaded is not None:
+                self.on_loaded(*key, data)
+
+    def window(self, ordered_ids, start: int, count: int, tier: str, prefetch_pages: int = 1) -> dict:
+        """
+        Return the thumbnails of a visible slice of the GUI's ordering and prefetch its neighbours.
+
+        Args:
+            ordered_ids (Sequence[int]): Media IDs in display order.
+            start (int): Index of the first visible item.
+            count (int): Number of visible items (one page).
+            tier (str): Tier name.
+            prefetch_pages (int, optional): Pages prefetched after and before the window. Defaults to 1.
+        """
+        thumbnails = self.get_many(ordered_ids[start:start + count], tier)
+        after = ordered_ids[start + count:start + count * (1 + prefetch_pages)]
+        before = ordered_ids[max(0, start - count * prefetch_pages):start]
+        # Scrolling usually continues forward, so the next page is loaded first
+        self.prefetch(list(after) + list(reversed(before)), tier)
+        return thumbnails
+
+    def wait_for_prefetch(self, timeout: float = None):
+        """
+        Block until scheduled prefetches have finished.
+        """
+        with self._lock:
+            futures = list(self._inflight.values())
+        wait(futures, timeout=timeout)
+
+    def stats(self) -> dict:
+        """
+        Return memory-tier counters (hits, misses, evictions, bytes) and disk, render and prefetch counts.
+        """
+        with self._lock:
+            counters = {"disk_hits": self.disk_hits, "renders": self.renders,
+                        "render_failures": self.render_failures, "prefetched": self.prefetched}
+        return {"memory": self.memory.stats(), **counters}
+
+    def close(self):
+        """
+        Stop the prefetch threads.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
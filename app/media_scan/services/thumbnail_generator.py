@@ -0,0 +1,153 @@
+# app/media_scan/services/thumbnail_generator.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+from app.media_scan.config.settings import config
+from app.media_scan.dal.database import SessionLocal
+from app.media_scan.repositories.media_repository import MediaRepository
+from app.media_scan.thumbnails.render import content_addressed_path, init_worker, parse_tiers, render_thumbnail
+
+
+@dataclass
+class ThumbnailReport:
+    """
+    Outcome of a thumbnail run.
+
+    Attributes:
+        generated (int): Thumbnails decoded and written by this run.
+        reused (int): Rows linked to a thumbnail that already existed for the same contents.
+        failed (int): Files that could not be read or decoded (given an empty thumbnail path).
+    """
+    generated: int = 0
+    reused: int = 0
+    failed: int = 0
+
+
+class ThumbnailGenerator:
+    """
+    Generates thumbnails for cataloged videos and images on a process pool.
+
+    Videos get their most detailed sampled frame, images a downscaled copy
+    (decoded at reduced scale where possible). Each file is decoded once and
+    encoded at every tier (e.g. grid icon, detail pane, hover preview), each
+    tier scaled down from the next larger one. Decoding and resizing are
+    CPU-bound, so they run in worker processes and throughput scales with the
+    number of cores.
+
+    Thumbnails are stored content-addressed by the file's BLAKE2b hash
+    (`<dir>/<tier>/ab/abcd....jpg`), so duplicate files share one set. Rows
+    whose content hash is already known and whose tiers all exist are linked
+    without touching the pool; otherwise the worker hashes the file and still
+    skips the decode when the tiers exist. The primary tier's path (and the
+    computed content hash) is written back to the Media row.
+
+    Example:
+        ThumbnailGenerator().generate()
+        # ThumbnailReport(generated=950, reused=48, failed=2)
+    """
+
+    def __init__(self, session=None, directory=None, tiers=None, primary_tier=None, quality=None,
+                 max_workers=None, batch_size=None):
+        """
+        Args:
+            session (Session, optional): Database session. Defaults to a new SessionLocal().
+            directory (str, optional): Thumbnail root directory. Defaults to config.THUMBNAIL_DIR.
+            tiers (dict[str, int] | str, optional): Longest side in pixels by tier name, or a
+                'name:pixels,...' spec. Defaults to config.THUMBNAIL_TIERS.
+            primary_tier (str, optional): Tier stored in Media.thumbnail_path. Defaults to
+                config.THUMBNAIL_PRIMARY_TIER, or the first tier if that is not defined.
+            quality (int, optional): JPEG quality. Defaults to config.THUMBNAIL_QUALITY.
+            max_workers (int, optional): Worker processes. Defaults to config.THUMBNAIL_WORKERS.
+            batch_size (int, optional): Rows updated per transaction. Defaults to config.SCAN_BATCH_SIZE.
+        """
+        self.session = session or SessionLocal()
+        self.media_repository = MediaRepository(self.session)
+        self.directory = directory or config.THUMBNAIL_DIR
+        tiers = tiers or config.THUMBNAIL_TIERS
+        self.tiers = parse_tiers(tiers) if isinstance(tiers, str) else dict(tiers)
+        self.primary_tier = primary_tier or config.THUMBNAIL_PRIMARY_TIER
+        if self.primary_tier not in self.tiers:
+            self.primary_tier = next(iter(self.tiers))
+        self.quality = quality or config.THUMBNAIL_QUALITY
+        self.max_workers = max_workers or config.THUMBNAIL_WORKERS
+        self.batch_size = batch_size or config.SCAN_BATCH_SIZE
+
+    def generate(self) -> ThumbnailReport:
+        """
+        Create or link thumbnails for every video and image row without one.
+
+        Returns:
+            ThumbnailReport: Counts of generated, reused and failed thumbnails.
+        """
+        report = ThumbnailReport()
+        updates = []
+        tasks = []
+        for row in self.media_repository.get_media_without_thumbnail():
+            if row.content_hash and all(
+                    os.path.exists(content_addressed_path(self.directory, row.content_hash, tier))
+                    for tier in self.tiers):
+                path = content_addressed_path(self.directory, row.content_hash, self.primary_tier)
+                updates.append({"file_path": row.file_path, "thumbnail_path": path})
+                report.reused += 1
+                continue
+            tasks.append((row.file_path, row.media_type, row.content_hash, row.resolution))
+
+        if tasks:
+            # Several small tasks per round trip, while still spreading them over every worker
+            chunksize = min(32, max(1, len(tasks) // (self.max_workers * 4)))
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_worker) as executor:
+                render = partial(render_thumbnail, directory=self.directory, tiers=self.tiers,
+                                 quality=self.quality)
+                results = executor.map(render, *zip(*tasks), chunksize=chunksize)
+                for file_path, content_hash, paths, outcome in results:
+                    setattr(report, outcome, getattr(report, outcome) + 1)
+                    updates.append({"file_path": file_path, "content_hash": content_hash,
+                                    "thumbnail_path": paths.get(self.primary_tier, "")})
+                    if len(updates) >= self.batch_size:
+                        self.media_repository.update_media_metadata_bulk(updates, self.batch_size)
+                        updates.clear()
+        self.media_repository.update_media_metadata_bulk(updates, self.batch_size)
+        return report
+
+    def pack(self, store, tier: str = None) -> int:
+        """
+        Synchronize a PackedThumbnailStore with the catalog's thumbnails of one tier.
+
+        Rows whose thumbnail is missing from the store (or stored under an old
+        content hash) are added, reading each thumbnail file only when the store
+        does not already hold that content; entries of rows that are gone or have
+        no thumbnail any more are deleted. The loose thumbnail files are left in
+        place: `Media.thumbnail_path`, ThumbnailCache and the reuse check of
+        `generate` all read them.
+
+        Args:
+            store (PackedThumbnailStore): Destination store.
+            tier (str, optional): Tier to pack. Defaults to the primary tier.
+
+        Returns:
+            int: Entries added or updated.
+        """
+        tier = tier or self.primary_tier
+        stored = store.entries()
+        rows = self.media_repository.get_thumbnails()
+        store.delete(set(stored) - {row.id for row in rows})
+        pending = [row for row in rows if stored.get(row.id) != row.content_hash]
+        packed = 0
+        for start in range(0, len(pending), self.batch_size):
+            items = []
+            for row in pending[start:start + self.batch_size]:
+                data = None
+                if not store.contains(row.content_hash):
+                    path = content_addressed_path(self.directory, row.content_hash, tier)
+                    try:
+                        with open(path, "rb") as file:
+                            data = file.read()
+                    except OSError as e:
+                        print(f"Cannot pack thumbnail {path}: {e}")
+                        continue
+                items.append((row.id, row.content_hash, data))
+            store.put_many(items)
+            packed += len(items)
+        return packed
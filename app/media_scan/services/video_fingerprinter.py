@@ -0,0 +1,102 @@
+# app/media_scan/services/video_fingerprinter.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.media_scan.config.settings import config
+from app.media_scan.dal.database import SessionLocal
+from app.media_scan.repositories.media_repository import MediaRepository
+from app.media_scan.similarity.hamming_index import MultiIndexHashIndex
+from app.media_scan.similarity.video_fingerprint import (
+    signature_from_bytes, signature_to_bytes, video_signature
+)
+
+
+class VideoFingerprinter:
+    """
+    Computes perceptual video signatures and finds near-duplicate videos.
+
+    `fingerprint_videos` decodes a few frames of every video that has no
+    signature yet (OpenCV releases the GIL while decoding, so a thread pool
+    scales) and stores the signature in `Media.video_signature`, committing
+    every `batch_size` videos as they finish, so an interrupted run keeps its
+    progress. Videos that cannot be decoded get an empty signature so they are
+    not retried until the scanner sees them change.
+
+    `find_near_duplicates` loads the signatures into a MultiIndexHashIndex
+    and reports every pair within the Hamming distance, which catches
+    re-encoded and resized copies that exact content hashes miss.
+
+    Example:
+        fingerprinter = VideoFingerprinter()
+        fingerprinter.fingerprint_videos()
+        for path_a, path_b, distance in fingerprinter.find_near_duplicates():
+            print(path_a, path_b, distance)
+    """
+
+    def __init__(self, session=None, frames=None, method="dhash", max_workers=None, batch_size=None):
+        """
+        Args:
+            session (Session, optional): Database session. Defaults to a new SessionLocal().
+            frames (int, optional): Frames hashed per video. Defaults to config.VIDEO_SIGNATURE_FRAMES.
+            method (str, optional): Frame hash, 'dhash' or 'phash'. Defaults to 'dhash'.
+            max_workers (int, optional): Videos decoded concurrently. Defaults to config.FINGERPRINT_WORKERS.
+            batch_size (int, optional): Signatures stored per commit. Defaults to config.FINGERPRINT_BATCH_SIZE.
+        """
+        self.session = session or SessionLocal()
+        self.media_repository = MediaRepository(self.session)
+        self.frames = frames or config.VIDEO_SIGNATURE_FRAMES
+        self.method = method
+        self.max_workers = max_workers or config.FINGERPRINT_WORKERS
+        self.batch_size = batch_size or config.FINGERPRINT_BATCH_SIZE
+
+    def _signature(self, file_path):
+        signature = video_signature(file_path, self.frames, self.method)
+        return b"" if signature is None else signature_to_bytes(signature)
+
+    def fingerprint_videos(self) -> int:
+        """
+        Compute and store signatures for videos that do not have one.
+
+        Returns:
+            int: Number of videos processed (including undecodable ones).
+        """
+        file_paths = self.media_repository.get_videos_without_signature()
+        processed = undecodable = 0
+        updates = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fingerprint") as executor:
+            futures = {executor.submit(self._signature, file_path): file_path for file_path in file_paths}
+            for future in as_completed(futures):
+                signature = future.result()
+                undecodable += not signature
+                updates.append({"file_path": futures.pop(future), "video_signature": signature})
+                if len(updates) >= self.batch_size:
+                    processed += self.media_repository.update_media_metadata_bulk(updates)
+                    updates = []
+        if updates:
+            processed += self.media_repository.update_media_metadata_bulk(updates)
+        if undecodable:
+            print(f"{undecodable} videos could not be decoded for fingerprinting.")
+        return processed
+
+    def find_near_duplicates(self, max_distance=None):
+        """
+        Find pairs of videos whose signatures are within `max_distance` bits.
+
+        Args:
+            max_distance (int, optional): Maximum Hamming distance over the whole signature.
+                Defaults to config.NEAR_DUPLICATE_DISTANCE.
+
+        Returns:
+            list[tuple[str, str, int]]: (file_path_a, file_path_b, distance), closest first.
+        """
+        max_distance = config.NEAR_DUPLICATE_DISTANCE if max_distance is None else max_distance
+        rows = [
+            (file_path, signature_from_bytes(signature))
+            for file_path, signature in self.media_repository.get_video_signatures()
+        ]
+        # Signatures computed with another frame count cannot be compared
+        rows = [(file_path, signature) for file_path, signature in rows if len(signature) == self.frames]
+        index = MultiIndexHashIndex(words=self.frames)
+        for _, signature in rows:
+            index.add(signature)
+        pairs = [(rows[a][0], rows[b][0], distance) for a, b, distance in index.pairs_within(max_distance)]
+        return sorted(pairs, key=lambda pair: (pair[2], pair[0], pair[1]))
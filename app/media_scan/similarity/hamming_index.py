@@ -0,0 +1,124 @@
+from itertools import combinations
+
+import numpy as np
+
+
+class MultiIndexHashIndex:
+    """
+    Hamming-distance index over fixed-width binary codes (multi-index hashing).
+
+    Each code is split into `m` substrings of `substring_bits` bits, and every
+    substring gets its own hash table. Writing k = r * m + a (0 <= a < m), two
+    codes within distance k must either agree to within r bits on one of the
+    first a + 1 substrings, or to within r - 1 bits on one of the others
+    (otherwise their distance would be at least m * r + a + 1). A query
+    therefore probes each table with the substring values within that radius,
+    and checks the exact distance only for the candidates found. With k < m
+    most tables need a single exact lookup.
+
+    This makes near-duplicate search, and the all-pairs search, roughly linear in the
+    number of codes, instead of comparing every pair.
+
+    Example:
+        index = MultiIndexHashIndex(words=4)
+        index.add_many(signatures)            # (n, 4) uint64 array
+        index.pairs_within(16)                # [(i, j, distance), ...]
+    """
+
+    def __init__(self, words: int, substring_bits: int = 16):
+        """
+        Args:
+            words (int): Code width in 64-bit words.
+            substring_bits (int, optional): Bits per substring; must divide the code width. Defaults to 16.
+        """
+        if (words * 64) % substring_bits:
+            raise ValueError("substring_bits must divide the code width.")
+        self.words = words
+        self.substring_bits = substring_bits
+        self.substrings = words * 64 // substring_bits
+        self.codes = []
+        self._tables = [{} for _ in range(self.substrings)]
+        self._masks = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _to_int(self, signature) -> int:
+        signature = np.asarray(signature, dtype="<u8")
+        if signature.shape != (self.words,):
+            raise ValueError(f"Expected a signature of {self.words} words, got shape {signature.shape}.")
+        return int.from_bytes(signature.tobytes(), "little")
+
+    def _split(self, code: int):
+        mask = (1 << self.substring_bits) - 1
+        return [(code >> (self.substring_bits * index)) & mask for index in range(self.substrings)]
+
+    def _flip_masks(self, radius):
+        """
+        All substring XOR masks with at most `radius` bits set.
+        """
+        if radius not in self._masks:
+            masks = [0]
+            for flipped in range(1, radius + 1):
+                for bits in combinations(range(self.substring_bits), flipped):
+                    masks.append(sum(1 << bit for bit in bits))
+            self._masks[radius] = masks
+        return self._masks[radius]
+
+    def add(self, signature) -> int:
+        """
+        Add one signature and return its position in the index.
+        """
+        position = len(self.codes)
+        code = self._to_int(signature)
+        self.codes.append(code)
+        for table, value in zip(self._tables, self._split(code)):
+            table.setdefault(value, []).append(position)
+        return position
+
+    def add_many(self, signatures):
+        """
+        Add a (n, words) array of signatures, in order.
+        """
+        for signature in signatures:
+            self.add(signature)
+
+    def _search(self, code, max_distance, min_position=0):
+        radius, remainder = divmod(max_distance, self.substrings)
+        seen = set()
+        matches = []
+        for substring, (table, value) in enumerate(zip(self._tables, self._split(code))):
+            substring_radius = radius if substring <= remainder else radius - 1
+            if substring_radius < 0:
+                continue
+            for mask in self._flip_masks(substring_radius):
+                for position in table.get(value ^ mask, ()):
+                    if position < min_position or position in seen:
+                        continue
+                    seen.add(position)
+                    distance = (code ^ self.codes[position]).bit_count()
+                    if distance <= max_distance:
+                        matches.append((position, distance))
+        return matches
+
+    def query(self, signature, max_distance: int):
+        """
+        Find indexed signatures within `max_distance` bits of `signature`.
+
+        Returns:
+            list[tuple[int, int]]: (position, distance) pairs sorted by distance.
+        """
+        return sorted(self._search(self._to_int(signature), max_distance), key=lambda match: (match[1], match[0]))
+
+    def pairs_within(self, max_distance: int):
+        """
+        Find every pair of indexed signatures within `max_distance` bits of each other.
+
+        Returns:
+            list[tuple[int, int, int]]: (position_a, position_b, distance) with position_a < position_b.
+        """
+        pairs = []
+        for position, code in enumerate(self.codes):
+            for other, distance in self._search(code, max_distance, min_position=position + 1):
+                pairs.append((position, other, distance))
+        return sorted(pairs)
@@ -0,0 +1,110 @@
+import cv2
+import numpy as np
+
+HASH_SIZE = 8
+PHASH_SIZE = 32
+
+# Decoders downscale JPEGs while decoding (DCT scaling), which is much cheaper than a full decode
+_REDUCED_READ_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+    (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+    (2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+)
+
+
+def _dct_matrix(size):
+    """
+    Orthonormal DCT-II matrix, so that D @ X @ D.T is the 2-D DCT of X (as cv2.dct computes it).
+    """
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.sqrt(2.0 / size) * np.cos(np.pi * (2 * n + 1) * k / (2 * size))
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+
+_DCT = _dct_matrix(PHASH_SIZE)
+
+
+def popcount(values):
+    """
+    Number of set bits per element of a uint64 array.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    # NumPy < 2.0: count bits per byte with a lookup table
+    table = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+    return table[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def _pack_rows(bits):
+    """
+    Pack an (n, 64) boolean array into n uint64 values, first bit most significant.
+    """
+    return np.packbits(bits, axis=1).view(">u8").astype(np.uint64).reshape(-1)
+
+
+def load_grayscale(file_path: str, min_side: int = 64, resolution: str = None):
+    """
+    Read an image as grayscale, decoding at reduced scale when it is large enough.
+
+    Args:
+        file_path (str): Image file.
+        min_side (int, optional): Smallest side the reduced image may have. Defaults to 64.
+        resolution (str, optional): Known 'WxH' (e.g. Media.resolution), used to pick the reduction.
+
+    Returns:
+        np.ndarray | None: 2-D uint8 image, or None if it cannot be decoded.
+    """
+    flag = cv2.IMREAD_GRAYSCALE
+    try:
+        width, height = (int(side) for side in resolution.split("x"))
+        for factor, reduced_flag in _REDUCED_READ_FLAGS:
+            if min(width, height) // factor >= min_side:
+                flag = reduced_flag
+                break
+    except (AttributeError, ValueError):
+        pass
+    return cv2.imread(file_path, flag)
+
+
+def batch_phash(images):
+    """
+    DCT perceptual hashes for a batch of grayscale images.
+
+    Each image is downscaled to 32x32; the batch is transformed with one
+    batched matrix product and the 8x8 low-frequency coefficients are compared
+    with their per-image median (DC term excluded).
+
+    Args:
+        images (list[np.ndarray]): 2-D grayscale images of any size.
+
+    Returns:
+        np.ndarray: uint64 hashes, one per image.
+    """
+    if not images:
+        return np.empty(0, dtype=np.uint64)
+    stack = np.stack([
+        cv2.resize(image, (PHASH_SIZE, PHASH_SIZE), interpolation=cv2.INTER_AREA) for image in images
+    ]).astype(np.float32)
+    low = (_DCT @ stack @ _DCT.T)[:, :HASH_SIZE, :HASH_SIZE].reshape(len(images), -1)
+    medians = np.median(low[:, 1:], axis=1, keepdims=True)
+    return _pack_rows(low > medians)
+
+
+def batch_dhash(images):
+    """
+    Difference hashes for a batch of grayscale images (9x8 downscale, horizontal gradient sign).
+
+    Returns:
+        np.ndarray: uint64 hashes, one per image.
+    """
+    if not images:
+        return np.empty(0, dtype=np.uint64)
+    stack = np.stack([
+        cv2.resize(image, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA) for image in images
+    ]).astype(np.int16)
+    return _pack_rows((stack[:, :, 1:] > stack[:, :, :-1]).reshape(len(images), -1))
+
+
+BATCH_HASH_FUNCTIONS = {"phash": batch_phash, "dhash": batch_dhash}
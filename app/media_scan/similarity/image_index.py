@@ -0,0 +1,199 @@
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+
+from app.media_scan.similarity.image_hash import popcount
+
+
+class ImageHashIndex:
+    """
+    In-memory similarity index over 64-bit image hashes, held in packed NumPy arrays.
+
+    `ids` and `hashes` are parallel arrays (int64 Media IDs and uint64 hashes),
+    about 16 bytes per image. Lookups are vectorized XOR + popcount, processed
+    in chunks of `chunk_size` hashes so memory stays bounded however large the
+    catalog is.
+
+    - `top_k` compares one hash against all others, a few milliseconds per
+      million images.
+    - `clusters` groups every image within a Hamming distance into connected
+      components. Candidate pairs come from multi-index hashing, with
+      substrings sized to the index and joined with bucketed arrays instead
+      of a Python loop.
+
+    Example:
+        index = ImageHashIndex(ids, hashes)
+        index.top_k(media_id=42, k=10)       # [(media_id, distance), ...]
+        index.clusters(max_distance=6)       # [array([3, 42, 97]), ...]
+    """
+
+    def __init__(self, ids, hashes, chunk_size: int = 1 << 20):
+        """
+        Args:
+            ids (array-like): Media IDs.
+            hashes (array-like): 64-bit hashes, parallel to ids.
+            chunk_size (int, optional): Hashes compared per vectorized step. Defaults to 1,048,576.
+        """
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.hashes = np.asarray(hashes, dtype=np.uint64)
+        if self.ids.shape != self.hashes.shape:
+            raise ValueError("ids and hashes must have the same length.")
+        self.chunk_size = chunk_size
+        order = np.argsort(self.ids)
+        self._sorted_ids = self.ids[order]
+        self._sorted_positions = order
+
+    def __len__(self):
+        return len(self.ids)
+
+    def position(self, media_id: int) -> int:
+        """
+        Return the array position of a Media ID.
+
+        Raises:
+            KeyError: If the ID is not in the index.
+        """
+        slot = np.searchsorted(self._sorted_ids, media_id)
+        if slot == len(self._sorted_ids) or self._sorted_ids[slot] != media_id:
+            raise KeyError(f"Media ID {media_id} is not in the index.")
+        return int(self._sorted_positions[slot])
+
+    def top_k(self, media_id: int, k: int = 10, max_distance: int = 64):
+        """
+        Find the k images closest to a cataloged image (itself excluded).
+
+        Returns:
+            list[tuple[int, int]]: (media_id, distance), closest first, ties by ID.
+        """
+        return self.query(self.hashes[self.position(media_id)], k, max_distance, exclude_id=media_id)
+
+    def query(self, image_hash, k: int = 10, max_distance: int = 64, exclude_id: int = None):
+        """
+        Find the k images closest to an arbitrary hash.
+
+        Returns:
+            list[tuple[int, int]]: (media_id, distance), closest first, ties by ID.
+        """
+        target = np.uint64(image_hash)
+        wanted = k + (exclude_id is not None)
+        best_ids = []
+        best_distances = []
+        for start in range(0, len(self.hashes), self.chunk_size):
+            distances = popcount(self.hashes[start:start + self.chunk_size] ^ target)
+            # A 65-bin histogram gives the smallest cutoff keeping `wanted` hashes, without sorting
+            within = np.cumsum(np.bincount(distances, minlength=65))
+            cutoff = min(int(np.searchsorted(within, wanted)), max_distance)
+            positions = np.flatnonzero(distances <= cutoff)
+            best_ids.append(self.ids[start + positions])
+            best_distances.append(distances[positions].astype(np.int64))
+        if not best_ids:
+            return []
+        ids, distances = np.concatenate(best_ids), np.concatenate(best_distances)
+        if exclude_id is not None:
+            keep = ids != exclude_id
+            ids, distances = ids[keep], distances[keep]
+        order = np.lexsort((ids, distances))[:k]
+        return [(int(ids[i]), int(distances[i])) for i in order]
+
+    def substring_widths(self):
+        """
+        Substring widths for multi-index hashing: about log2(n) bits each, so a
+        substring table bucket holds about one hash; at least 3 substrings, so
+        none is wider than 22 bits.
+        """
+        bits = max(int(np.round(np.log2(max(len(self.hashes), 2)))), 8)
+        count = max(64 // bits, 3)
+        base, extra = divmod(64, count)
+        return [base + 1] * extra + [base] * (count - extra)
+
+    def pairs_within(self, max_distance: int):
+        """
+        Find all pairs of positions whose hashes are within `max_distance` bits.
+
+        The hashes are split into m substrings (see `substring_widths`). Writing
+        max_distance = r * m + a, a pair within the distance agrees to within r
+        bits on one of the first a + 1 substrings or within r - 1 bits on one of
+        the others. Each substring is bucketed by value; each mask of the allowed
+        weight is then an O(n) gather of the bucket holding `value ^ mask`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Position arrays (left < right), deduplicated.
+        """
+        widths = self.substring_widths()
+        radius, remainder = divmod(max_distance, len(widths))
+        lefts, rights = [], []
+        shift = 0
+        for substring, width in enumerate(widths):
+            substring_radius = radius if substring <= remainder else radius - 1
+            keys = ((self.hashes >> np.uint64(shift)) & np.uint64((1 << width) - 1)).astype(np.int64)
+            shift += width
+            if substring_radius < 0:
+                continue
+            order = np.argsort(keys, kind="stable")
+            counts = np.bincount(keys, minlength=1 << width)
+            starts = np.cumsum(counts) - counts
+            for mask in _flip_masks(width, substring_radius):
+                for start in range(0, len(keys), self.chunk_size):
+                    left, right = self._join(keys, order, counts, starts, mask, start)
+                    close = popcount(self.hashes[left] ^ self.hashes[right]) <= max_distance
+                    lefts.append(left[close])
+                    rights.append(right[close])
+        if not lefts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        pairs = np.unique(np.stack([np.concatenate(lefts), np.concatenate(rights)], axis=1), axis=0)
+        return pairs[:, 0], pairs[:, 1]
+
+    def _join(self, keys, order, counts, starts, mask, start):
+        """
+        Pairs (x, y), x < y, x in the chunk at `start`, with keys[y] == keys[x] ^ mask.
+        """
+        positions = np.arange(start, min(start + self.chunk_size, len(keys)))
+        targets = keys[positions] ^ mask
+        matches = counts[targets]
+        left = np.repeat(positions, matches)
+        # Offsets 0..count-1 within each matching bucket
+        offsets = np.arange(matches.sum()) - np.repeat(np.cumsum(matches) - matches, matches)
+        right = order[np.repeat(starts[targets], matches) + offsets]
+        keep = left < right
+        return left[keep], right[keep]
+
+    def clusters(self, max_distance: int, min_size: int = 2):
+        """
+        Group images into clusters of hashes linked by distances up to `max_distance`.
+
+        Returns:
+            list[np.ndarray]: Media ID arrays (sorted), largest cluster first.
+        """
+        left, right = self.pairs_within(max_distance)
+        labels = _connected_components(len(self.hashes), left, right)
+        order = np.argsort(labels, kind="stable")
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        groups = [np.sort(self.ids[group]) for group in np.split(order, boundaries) if len(group) >= min_size]
+        return sorted(groups, key=lambda group: (-len(group), group[0]))
+
+
+@lru_cache(maxsize=None)
+def _flip_masks(width, radius):
+    """
+    All `width`-bit masks with at most `radius` bits set.
+    """
+    masks = [0]
+    for flipped in range(1, radius + 1):
+        masks.extend(sum(1 << bit for bit in bits) for bits in combinations(range(width), flipped))
+    return masks
+
+
+def _connected_components(count, left, right):
+    """
+    Label positions by connected component (smallest member position), by label propagation.
+    """
+    labels = np.arange(count)
+    while True:
+        merged = np.minimum(labels[left], labels[right])
+        previous = labels.copy()
+        np.minimum.at(labels, left, merged)
+        np.minimum.at(labels, right, merged)
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
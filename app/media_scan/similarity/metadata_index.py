@@ -0,0 +1,236 @@
+import os
+import pickle
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+from app.media_scan.extractors.ffprobe import FFPROBE_CODECS
+from app.media_scan.extractors.video_metadata import MATROSKA_CODECS, MP4_CODECS
+
+# One-hot slots for every codec name the extractors report; anything else shares the last slot
+CODEC_VOCABULARY = tuple(sorted(set(MP4_CODECS.values()) | set(MATROSKA_CODECS.values())
+                                | set(FFPROBE_CODECS.values()))) + ("Other",)
+# Per-feature scale applied after log1p. Duration dominates (a 1% difference is ~0.08),
+# resolution tells resized copies apart, and bit rate, file size and codec vary between
+# re-encodes of the same video so they weigh little.
+FEATURE_WEIGHTS = {"duration": 8.0, "width": 1.0, "height": 1.0, "bit_rate": 0.25,
+                   "file_size": 0.25, "codec": 0.25}
+# Largest candidate duplicate group, and most rows after a seed scanned directly (beyond
+# that, the tree finds the rows within the radius)
+MAX_GROUP_SIZE = 16
+_WINDOW_LIMIT = 256
+_FORMAT_VERSION = 1
+_CODEC_SLOTS = {codec: slot for slot, codec in enumerate(CODEC_VOCABULARY)}
+
+
+def parse_resolution(resolution) -> tuple:
+    """
+    Split a 'WxH' resolution string into (width, height); (0, 0) when unknown.
+    """
+    try:
+        width, height = str(resolution).lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        return 0, 0
+
+
+def feature_vector(duration, resolution, bit_rate, file_size, codec) -> np.ndarray:
+    """
+    Build the weighted feature vector for one media row.
+    """
+    width, height = parse_resolution(resolution)
+    numeric = np.log1p(np.maximum([duration or 0.0, width, height, bit_rate or 0, file_size or 0], 0.0))
+    numeric *= [FEATURE_WEIGHTS[name] for name in ("duration", "width", "height", "bit_rate", "file_size")]
+    codecs = np.zeros(len(CODEC_VOCABULARY))
+    codecs[_CODEC_SLOTS.get(codec, len(CODEC_VOCABULARY) - 1)] = FEATURE_WEIGHTS["codec"]
+    return np.concatenate([numeric, codecs])
+
+
+class MetadataIndex:
+    """
+    Immutable nearest-neighbour index over metadata feature vectors.
+
+    Each row (duration, width/height from the resolution, bit rate, file size
+    and a codec one-hot) becomes a weighted, log-scaled vector indexed by a
+    scikit-learn BallTree. Instances are never modified: `updated` returns a
+    new index that re-vectorizes only new or changed rows, so a rebuild can
+    run in the background while readers keep using the current instance, and
+    the swap is a single reference assignment.
+
+    Example:
+        index = MetadataIndex().updated(rows)
+        index.similar(media_id=42, k=10)        # [(media_id, distance), ...]
+        index.duplicate_groups(radius=0.5)      # [[3, 42, 97], ...]
+        index.save("cache/metadata_index.pkl")
+    """
+
+    def __init__(self, ids=(), keys=(), vectors=None, tree=None, leaf_size: int = 40):
+        """
+        Args:
+            ids (array-like, optional): Media IDs.
+            keys (list, optional): Per-row column values the vectors were built from, parallel to ids.
+            vectors (np.ndarray, optional): Feature vectors, parallel to ids.
+            tree (BallTree, optional): Prebuilt tree over the vectors; built when omitted.
+            leaf_size (int, optional): BallTree leaf size. Defaults to 40.
+        """
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.keys = list(keys)
+        width = len(FEATURE_WEIGHTS) - 1 + len(CODEC_VOCABULARY)
+        self.vectors = np.empty((0, width)) if vectors is None else np.asarray(vectors, dtype=np.float64)
+        self.leaf_size = leaf_size
+        if tree is None and len(self.ids):
+            tree = BallTree(self.vectors, leaf_size=leaf_size)
+        self.tree = tree
+        self._positions = {int(media_id): position for position, media_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def updated(self, rows):
+        """
+        Return an index over `rows`, reusing vectors of rows whose columns did not change.
+
+        Args:
+            rows (iterable): (id, file_size, file_mtime_ns, duration, resolution, codec, bit_rate) rows.
+
+        Returns:
+            MetadataIndex: `self` when nothing was added, changed or removed, else a new index.
+        """
+        ids, keys, vectors = [], [], []
+        reused = 0
+        for row in rows:
+            media_id, key = int(row[0]), tuple(row[1:])
+            position = self._positions.get(media_id)
+            if position is not None and self.keys[position] == key:
+                vector = self.vectors[position]
+                reused += 1
+            else:
+                file_size, _, duration, resolution, codec, bit_rate = key
+                vector = feature_vector(duration, resolution, bit_rate, file_size, codec)
+            ids.append(media_id)
+            keys.append(key)
+            vectors.append(vector)
+        if reused == len(ids) == len(self.ids):
+            return self
+        return MetadataIndex(ids, keys, np.array(vectors).reshape(len(ids), self.vectors.shape[1]),
+                             leaf_size=self.leaf_size)
+
+    def similar(self, media_id: int, k: int = 10):
+        """
+        Find the k rows with the closest metadata to a cataloged row (itself excluded).
+
+        Returns:
+            list[tuple[int, float]]: (media_id, distance), closest first.
+
+        Raises:
+            KeyError: If the ID is not in the index.
+        """
+        if media_id not in self._positions:
+            raise KeyError(f"Media ID {media_id} is not in the index.")
+        position = self._positions[media_id]
+        distances, positions = self.tree.query(self.vectors[position:position + 1], k=min(k + 1, len(self)))
+        return [(int(self.ids[found]), float(distance))
+                for distance, found in zip(distances[0], positions[0]) if found != position][:k]
+
+    def duplicate_groups(self, radius: float, min_size: int = 2, max_group_size: int = MAX_GROUP_SIZE):
+        """
+        Group rows whose vectors are all within `radius` of each other into candidate duplicates.
+
+        Groups are built greedily with complete linkage: rows are visited in
+        duration order, and each row not yet grouped seeds a group with the
+        closest ungrouped rows that are within `radius` of every member so far.
+        Unlike linking any two close rows, this never chains a dense spread of
+        different videos into one group. Duration is one of the features, so
+        a seed's candidates lie in a short window of the sorted rows (ordered
+        by duration, then by the other features, which keeps identical rows
+        adjacent); no neighbour lists are built and memory stays linear in
+        the rows. Windows are scanned directly up to `_WINDOW_LIMIT` (256)
+        rows; a seed whose duration range holds more queries the BallTree for
+        the rows within the radius instead, so no candidate is cut off.
+        Each group considers at most the `4 * max_group_size` rows closest to
+        its seed.
+
+        Args:
+            radius (float): Max feature distance between any two members of a group.
+            min_size (int, optional): Smallest group reported. Defaults to 2.
+            max_group_size (int, optional): Largest group formed. Defaults to MAX_GROUP_SIZE.
+
+        Returns:
+            list[list[int]]: Sorted Media ID lists, largest group first.
+        """
+        if len(self) < 2:
+            return []
+        # lexsort's primary key is the last one: duration first, then the remaining features
+        order = np.lexsort(self.vectors.T[::-1])
+        rank = np.empty(len(self), dtype=np.int64)
+        rank[order] = np.arange(len(self))
+        vectors = self.vectors[order]
+        durations = vectors[:, 0]
+        # Rows whose duration feature is farther than the radius from both sorted neighbours stay alone
+        close = np.diff(durations) <= radius
+        candidates = np.zeros(len(self), dtype=bool)
+        candidates[:-1] |= close
+        candidates[1:] |= close
+        grouped = np.zeros(len(self), dtype=bool)
+        groups = []
+        for seed in np.flatnonzero(candidates):
+            if grouped[seed]:
+                continue
+            end = np.searchsorted(durations, durations[seed] + radius, side="right")
+            if end - seed - 1 > _WINDOW_LIMIT:
+                # Too many rows share this duration range to scan; the tree finds those within the radius
+                window = np.sort(rank[self.tree.query_radius(vectors[seed:seed + 1], r=radius)[0]])
+                window = window[window != seed]
+            else:
+                window = np.arange(seed + 1, end)
+            window = window[~grouped[window]]
+            distances = np.linalg.norm(vectors[window] - vectors[seed], axis=1)
+            nearest = np.argsort(distances, kind="stable")
+            nearby = window[nearest[distances[nearest] <= radius]][:4 * max_group_size]
+            # Add the closest candidate still within the radius of every member, until none is left
+            points = vectors[nearby]
+            squares = np.einsum("ij,ij->i", points, points)
+            linked = squares[:, None] + squares[None, :] - 2 * points @ points.T <= radius * radius
+            allowed = np.ones(len(nearby), dtype=bool)
+            members = [seed]
+            while allowed.any() and len(members) < max_group_size:
+                chosen = np.argmax(allowed)
+                members.append(nearby[chosen])
+                allowed &= linked[chosen]
+                allowed[chosen] = False
+            grouped[members] = True
+            if len(members) >= min_size:
+                groups.append(sorted(self.ids[order[members]].tolist()))
+        return sorted(groups, key=lambda group: (-len(group), group[0]))
+
+    def save(self, path: str):
+        """
+        Write the index (tree included) to `path`, replacing any previous file atomically.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        state = {"version": _FORMAT_VERSION, "codecs": CODEC_VOCABULARY, "weights": FEATURE_WEIGHTS,
+                 "ids": self.ids, "keys": self.keys, "vectors": self.vectors, "tree": self.tree,
+                 "leaf_size": self.leaf_size}
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as handle:
+            pickle.dump(state, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Read an index written by `save`.
+
+        Returns:
+            MetadataIndex | None: None if the file is missing, unreadable or was built
+            with a different codec vocabulary or feature weights.
+        """
+        try:
+            with open(path, "rb") as handle:
+                state = pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        if (not isinstance(state, dict) or state.get("version") != _FORMAT_VERSION
+                or state.get("codecs") != CODEC_VOCABULARY or state.get("weights") != FEATURE_WEIGHTS):
+            return None
+        return cls(state["ids"], state["keys"], state["vectors"], state["tree"], state["leaf_size"])
@@ -0,0 +1,44 @@
+import cv2
+import numpy as np
+
+HASH_BITS = 64
+
+
+def _pack_bits(bits) -> int:
+    """
+    Pack 64 booleans (row-major) into an unsigned 64-bit integer, first bit most significant.
+    """
+    return int.from_bytes(np.packbits(bits.reshape(-1)).tobytes(), "big")
+
+
+def dhash(gray) -> int:
+    """
+    Difference hash: 1 where a pixel is brighter than its right neighbour on a 9x8 downscale.
+
+    Args:
+        gray (np.ndarray): 2-D grayscale image of any size.
+
+    Returns:
+        int: 64-bit hash.
+    """
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    return _pack_bits(small[:, 1:] > small[:, :-1])
+
+
+def phash(gray) -> int:
+    """
+    DCT hash: 1 where a low-frequency DCT coefficient of a 32x32 downscale exceeds their median.
+
+    Args:
+        gray (np.ndarray): 2-D grayscale image of any size.
+
+    Returns:
+        int: 64-bit hash.
+    """
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8]
+    # The DC term only reflects overall brightness, so it is left out of the median
+    return _pack_bits(low > np.median(low.reshape(-1)[1:]))
+
+
+HASH_FUNCTIONS = {"dhash": dhash, "phash": phash}
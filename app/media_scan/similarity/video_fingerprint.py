@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+
+from app.media_scan.similarity.perceptual_hash import HASH_FUNCTIONS
+
+
+def video_signature(file_path: str, frames: int = 4, method: str = "dhash"):
+    """
+    Compute a perceptual signature from evenly spaced frames of a video.
+
+    Frames are taken at the middle of `frames` equal slices of the video (so
+    the black first and last frames are avoided), converted to grayscale and
+    hashed with a 64-bit dHash or pHash. Re-encoded and resized copies produce
+    signatures a few bits apart; unrelated videos differ in about half the bits.
+
+    Args:
+        file_path (str): Video file.
+        frames (int, optional): Frames sampled (64 signature bits each). Defaults to 4.
+        method (str, optional): 'dhash' or 'phash'. Defaults to 'dhash'.
+
+    Returns:
+        np.ndarray | None: `frames` uint64 hashes, or None if the video cannot be decoded.
+    """
+    hash_function = HASH_FUNCTIONS[method]
+    capture = cv2.VideoCapture(file_path)
+    try:
+        if not capture.isOpened():
+            return None
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        if frame_count <= 0:
+            return None
+        hashes = []
+        for index in range(frames):
+            capture.set(cv2.CAP_PROP_POS_FRAMES, int((index + 0.5) * frame_count / frames))
+            ok, frame = capture.read()
+            if not ok:
+                return None
+            hashes.append(hash_function(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)))
+        return np.array(hashes, dtype=np.uint64)
+    finally:
+        capture.release()
+
+
+def signature_to_bytes(signature) -> bytes:
+    """
+    Serialize a signature as fixed-width little-endian uint64 words.
+    """
+    return np.asarray(signature, dtype="<u8").tobytes()
+
+
+def signature_from_bytes(data: bytes):
+    """
+    Inverse of `signature_to_bytes`.
+    """
+    return np.frombuffer(data, dtype="<u8").astype(np.uint64)
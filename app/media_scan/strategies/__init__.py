@@ -9,5 +9,6 @@ from app.media_scan.strategies.video_validation import VideoValidationStrategy
 from app.media_scan.strategies.audio_validation import AudioValidationStrategy
 from app.media_scan.strategies.image_validation import ImageValidationStrategy
 from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
+from app.media_scan.strategies.content_validation import ContentSniffingValidationStrategy
 
 
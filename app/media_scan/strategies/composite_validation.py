@@ -1,13 +1,24 @@
+from types import MappingProxyType
+
 from app.media_scan.strategies.audio_validation import AudioValidationStrategy
 from app.media_scan.strategies.video_validation import VideoValidationStrategy
 from app.media_scan.strategies.image_validation import ImageValidationStrategy
 from app.media_scan.strategies.default_validation import DefaultValidationStrategy
+from app.media_scan.strategies.extension_classifier import ExtensionClassifier
 
 
 class CompositeValidationStrategy:
     """
     Composite strategy to dynamically validate multiple types of media
     with a fallback for unsupported media types.
+
+    When every strategy is extension based, the strategies are compiled into an
+    `ExtensionClassifier` so each name costs one dict lookup instead of a pass
+    per strategy. `strategies` is a read-only view, so the classifier cannot
+    go stale: change it with `add_strategy`/`remove_strategy` or by assigning
+    a new dict, all of which recompile. If any strategy cannot be compiled
+    (e.g. a custom or mocked one), the strategies are called one after
+    another as before.
     """
 
     def __init__(self):
@@ -18,6 +29,42 @@ class CompositeValidationStrategy:
             "default": DefaultValidationStrategy(),
         }
 
+    @property
+    def strategies(self):
+        return MappingProxyType(self._strategies)
+
+    @strategies.setter
+    def strategies(self, strategies):
+        self._strategies = dict(strategies)
+        self._classifier = ExtensionClassifier.from_strategies(self._strategies)
+
+    def add_strategy(self, media_type: str, strategy):
+        """
+        Add a strategy for a media type, replacing any existing one, and recompile.
+
+        Args:
+            media_type (str): Media type the strategy validates, e.g. 'video'.
+            strategy (MediaValidationStrategy): Strategy to use for it.
+        """
+        self.strategies = {**self._strategies, media_type: strategy}
+
+    def remove_strategy(self, media_type: str):
+        """
+        Remove the strategy for a media type and recompile.
+
+        Args:
+            media_type (str): Media type to stop recognizing.
+
+        Raises:
+            KeyError: If no strategy is registered for the media type.
+            ValueError: If media_type is 'default'; the fallback is always required.
+        """
+        if media_type == "default":
+            raise ValueError("The default strategy cannot be removed.")
+        strategies = dict(self._strategies)
+        del strategies[media_type]
+        self.strategies = strategies
+
     def validate(self, file_name: str) -> str:
         """
         Validate a file and return its media type or fallback to default.
@@ -28,6 +75,9 @@ class CompositeValidationStrategy:
         Returns:
             str: Media type if found, otherwise 'unknown'.
         """
+        if self._classifier is not None:
+            return self._classifier.classify(file_name)
+
         for media_type, strategy in self.strategies.items():
             if media_type != "default" and strategy.validate(file_name):
                 return media_type
@@ -35,3 +85,18 @@ class CompositeValidationStrategy:
         # If no type matches, call the default fallback strategy.
         self.strategies["default"].validate(file_name)
         return "unknown"
+
+    def validate_many(self, file_names) -> list:
+        """
+        Validate a batch of file names and return their media types.
+
+        Args:
+            file_names (Iterable[str]): The file names to validate, e.g. one directory listing.
+
+        Returns:
+            list[str]: Media type for each name ('unknown' if unsupported), in input order.
+        """
+        if self._classifier is not None:
+            return self._classifier.classify_many(file_names)
+        validate = self.validate
+        return [validate(file_name) for file_name in file_names]
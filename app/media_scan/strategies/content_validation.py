@@ -0,0 +1,172 @@
+import os
+import threading
+from collections import OrderedDict
+
+from app.media_scan.strategies.media_validation import MediaValidationStrategy
+
+
+class ContentSniffingValidationStrategy(MediaValidationStrategy):
+    """
+    A validation strategy that identifies media by its container signature ("magic bytes").
+
+    Unlike the extension-based strategies, this one opens the file: it reads only
+    the first `HEADER_SIZE` bytes with a single `os.pread` and matches them
+    against known container signatures:
+    - Video: ftyp (MP4/MOV/3GP), bare QuickTime atoms, EBML (MKV/WebM), RIFF AVI, ASF (WMV), Ogg Theora.
+    - Audio: RIFF WAVE, ID3 and MPEG/ADTS frame sync (MP3/AAC), fLaC, OggS, ftyp M4A.
+    - Image: PNG, JPEG, GIF, TIFF, BMP, RIFF WEBP, ftyp HEIC/AVIF.
+
+    It is meant as a fallback behind the extension check, for extensionless
+    camera dumps and misnamed files, so only names the extension check could not
+    classify pay for the read (see `should_sniff`). Results are cached by the
+    file's (device, inode, mtime), so re-checking an unchanged file costs no I/O.
+
+    Attributes:
+        HEADER_SIZE (int): Number of bytes read from the start of each file.
+        SKIP_EXTENSIONS (set): Extensions that are clearly not media and are never sniffed.
+
+    Example:
+        strategy = ContentSniffingValidationStrategy()
+        strategy.sniff("/dump/DCIM0001")  # Returns "video" for an MP4 without extension
+        strategy.validate("/docs/readme")  # Returns False
+    """
+
+    HEADER_SIZE = 64
+
+    SKIP_EXTENSIONS = {
+        ".txt", ".nfo", ".srt", ".sub", ".vtt", ".md", ".log", ".ini", ".cfg", ".json", ".xml",
+        ".html", ".htm", ".csv", ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+        ".py", ".js", ".css", ".sh", ".bat", ".exe", ".dll", ".so", ".db", ".sqlite",
+        ".zip", ".tar", ".gz", ".bz2", ".xz", ".7z", ".rar", ".iso", ".lnk", ".url", ".torrent",
+    }
+
+    # ftyp major brands that are not video
+    _AUDIO_BRANDS = {b"M4A ", b"M4B ", b"M4P ", b"F4A ", b"F4B "}
+    _IMAGE_BRANDS = {b"heic", b"heix", b"hevc", b"heim", b"heis", b"mif1", b"msf1", b"avif", b"avis"}
+    # Top-level QuickTime atoms that may start a .mov without an ftyp box
+    _QUICKTIME_ATOMS = {b"moov", b"mdat", b"wide", b"pnot"}
+    _BMP_DIB_HEADER_SIZES = {12, 40, 52, 56, 64, 108, 124}
+
+    def __init__(self, cache_size: int = 100_000):
+        """
+        Args:
+            cache_size (int, optional): Maximum number of (device, inode, mtime) results kept.
+        """
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def should_sniff(self, file_name: str) -> bool:
+        """
+        Decide whether a file the extension check left as 'unknown' is worth reading.
+
+        Returns:
+            bool: False for names whose extension marks them as clearly non-media.
+        """
+        _, dot, extension = file_name.rpartition(".")
+        return not dot or f".{extension.lower()}" not in self.SKIP_EXTENSIONS
+
+    def validate(self, file_path: str) -> bool:
+        """
+        Validate a file by its content.
+
+        Args:
+            file_path (str): Full path of the file (the content is read, so a bare name is not enough).
+
+        Returns:
+            bool: True if the file starts with a known media container signature.
+        """
+        return self.sniff(file_path) != "unknown"
+
+    def sniff(self, file_path: str, stat=None) -> str:
+        """
+        Identify the media type of a file from its first bytes.
+
+        Args:
+            file_path (str): Full path of the file.
+            stat (os.stat_result, optional): Stat result if the caller already has one.
+
+        Returns:
+            str: 'video', 'audio', 'image', or 'unknown' (also for unreadable files).
+        """
+        try:
+            stat = stat or os.stat(file_path)
+        except OSError:
+            return "unknown"
+        if stat.st_size == 0:
+            return "unknown"
+
+        key = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        with self._lock:
+            media_type = self._cache.get(key)
+            if media_type is not None:
+                self._cache.move_to_end(key)
+                return media_type
+
+        try:
+            header = self._read_header(file_path)
+        except OSError:
+            return "unknown"
+        media_type = self.identify_signature(header)
+
+        with self._lock:
+            self._cache[key] = media_type
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return media_type
+
+    def _read_header(self, file_path: str) -> bytes:
+        """
+        Read the first HEADER_SIZE bytes with one positional read.
+        """
+        if not hasattr(os, "pread"):  # Windows
+            with open(file_path, "rb") as file:
+                return file.read(self.HEADER_SIZE)
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            return os.pread(fd, self.HEADER_SIZE, 0)
+        finally:
+            os.close(fd)
+
+    @classmethod
+    def identify_signature(cls, header: bytes) -> str:
+        """
+        Map the first bytes of a file to a media type.
+
+        Args:
+            header (bytes): Leading bytes of the file (at least 12 for most signatures).
+
+        Returns:
+            str: 'video', 'audio', 'image', or 'unknown'.
+        """
+        if header[4:8] == b"ftyp":
+            brand = header[8:12]
+            if brand in cls._AUDIO_BRANDS:
+                return "audio"
+            if brand in cls._IMAGE_BRANDS:
+                return "image"
+            return "video"
+        if header[4:8] in cls._QUICKTIME_ATOMS:
+            return "video"
+        if header.startswith(b"\x1a\x45\xdf\xa3"):  # EBML: Matroska / WebM
+            return "video"
+        if header.startswith(b"RIFF"):
+            return {b"AVI ": "video", b"WAVE": "audio", b"WEBP": "image"}.get(header[8:12], "unknown")
+        if header.startswith(b"\x30\x26\xb2\x75\x8e\x66\xcf\x11"):  # ASF: WMV / WMA
+            return "video"
+        if header.startswith(b"OggS"):
+            # The first page carries the codec identification packet
+            return "video" if b"\x80theora" in header else "audio"
+        if header.startswith((b"ID3", b"fLaC")):
+            return "audio"
+        if header.startswith(b"\x89PNG\r\n\x1a\n") or header.startswith(b"\xff\xd8\xff"):
+            return "image"
+        if header.startswith((b"GIF87a", b"GIF89a", b"II*\x00", b"MM\x00*")):
+            return "image"
+        if header.startswith(b"BM") and int.from_bytes(header[14:18], "little") in cls._BMP_DIB_HEADER_SIZES:
+            return "image"
+        if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+            # MPEG audio frame sync (MP3) or ADTS (AAC); the version bits must not be "reserved"
+            if (header[1] >> 3) & 0x03 != 0x01:
+                return "audio"
+        return "unknown"
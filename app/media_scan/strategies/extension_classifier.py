@@ -0,0 +1,119 @@
+class ExtensionClassifier:
+    """
+    Resolves a file name to its media type with a single split and one dict lookup.
+
+    The lookup table is compiled from the `*_EXTENSIONS` sets of extension-based
+    strategies (`AudioValidationStrategy`, `VideoValidationStrategy`,
+    `ImageValidationStrategy`), and the filename rules are the same ones those
+    strategies apply, so the result always matches running them in sequence:
+    - Empty names, path-like names ('/' or '\\'), and names without exactly one dot are rejected.
+    - Names with nothing but whitespace before the dot are rejected.
+    - The extension is matched case-insensitively.
+
+    Unlike the sequential strategies, the extension is split off once and the
+    cheap rejection checks only run for names whose extension is a media one.
+
+    Example:
+        classifier = ExtensionClassifier({"audio": {".mp3"}, "video": {".mp4"}})
+        classifier.classify("song.MP3")  # Returns "audio"
+        classifier.classify("notes.txt")  # Returns "unknown"
+    """
+
+    UNKNOWN = "unknown"
+
+    def __init__(self, extensions_by_type: dict):
+        """
+        Args:
+            extensions_by_type (dict): Ordered mapping of media type -> set of extensions
+                (with leading dot, e.g. ".mp3"). When an extension appears under several
+                types, the first type wins, as it would in the sequential strategy loop.
+        """
+        self._table = {}
+        for media_type, extensions in extensions_by_type.items():
+            for extension in extensions:
+                # Only ".ext" entries can ever match f".{ext.lower()}"
+                if extension.startswith("."):
+                    self._table.setdefault(extension[1:], media_type)
+
+    @classmethod
+    def from_strategies(cls, strategies: dict):
+        """
+        Compile a classifier from a composite's strategies, if they are all extension based.
+
+        Args:
+            strategies (dict): Media type -> strategy, as held by CompositeValidationStrategy.
+                The "default" fallback entry is ignored.
+
+        Returns:
+            ExtensionClassifier | None: None if any strategy does not expose an
+            `*_EXTENSIONS` set (e.g. a custom or mocked strategy), in which case the
+            caller must keep calling the strategies one by one.
+        """
+        extensions_by_type = {}
+        for media_type, strategy in strategies.items():
+            if media_type == "default":
+                continue
+            extensions = cls._extensions_of(strategy)
+            if extensions is None:
+                return None
+            extensions_by_type[media_type] = extensions
+        return cls(extensions_by_type)
+
+    @staticmethod
+    def _extensions_of(strategy):
+        """
+        Return the strategy class's `*_EXTENSIONS` set, or None if it has none.
+        """
+        for attribute in dir(type(strategy)):
+            if attribute.endswith("_EXTENSIONS"):
+                extensions = getattr(strategy, attribute)
+                if isinstance(extensions, (set, frozenset)):
+                    return extensions
+        return None
+
+    def classify(self, file_name: str) -> str:
+        """
+        Return the media type for file_name, or "unknown".
+
+        Args:
+            file_name (str): The file name (not a path) to classify.
+
+        Returns:
+            str: Media type such as "audio", "video" or "image", otherwise "unknown".
+        """
+        name, _, extension = file_name.rpartition(".")
+        media_type = self._table.get(extension.lower())
+        if media_type is None:
+            return self.UNKNOWN
+        # A name without a dot leaves `name` empty, so it is rejected by the strip check
+        if "." in name or "/" in file_name or "\\" in file_name or not name.strip():
+            return self.UNKNOWN
+        return media_type
+
+    def classify_many(self, file_names) -> list:
+        """
+        Classify a whole batch of names (e.g. one directory listing) in a single call.
+
+        Equivalent to ``[self.classify(name) for name in file_names]`` but with the
+        table lookup and string checks bound once for the batch, which removes the
+        per-name method call overhead.
+
+        Args:
+            file_names (Iterable[str]): File names (not paths) to classify.
+
+        Returns:
+            list[str]: Media type for each name, in input order.
+        """
+        lookup = self._table.get
+        unknown = self.UNKNOWN
+        media_types = []
+        append = media_types.append
+        for file_name in file_names:
+            name, _, extension = file_name.rpartition(".")
+            media_type = lookup(extension.lower())
+            if (media_type is None or "." in name or "/" in file_name
+                    or "\\" in file_name or not name.strip()):
+                append(unknown)
+            else:
+                append(media_type)
+        return media_types
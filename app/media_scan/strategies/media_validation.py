@@ -9,3 +9,19 @@ class MediaValidationStrategy(ABC):
     @abstractmethod
     def validate(self, file_name: str) -> bool:
         raise NotImplementedError("You must implement the validate method.")
+
+    def validate_many(self, file_names) -> list:
+        """
+        Validate a batch of file names, e.g. a whole directory listing, in one call.
+
+        The default implementation calls `validate` for each name; strategies with
+        a cheaper batch path can override it.
+
+        Args:
+            file_names (Iterable[str]): The file names to validate.
+
+        Returns:
+            list[bool]: Validation result for each name, in input order.
+        """
+        validate = self.validate
+        return [validate(file_name) for file_name in file_names]
@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+
+
+class ByteLRUCache:
+    """
+    Thread-safe in-memory LRU cache bounded by the total size of its values in bytes.
+
+    Values are `bytes`; inserting one evicts least recently used entries until
+    the total fits in `max_bytes`. Values larger than the whole budget are not
+    cached. Hit, miss and eviction counters are kept for `stats()`.
+
+    Example:
+        cache = ByteLRUCache(64 * 1024 * 1024)
+        cache.put((42, "icon"), jpeg_bytes)
+        cache.get((42, "icon"))   # b'...'
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes (int): Total size of cached values allowed.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        """
+        Return the cached value (marking it most recently used), or None on a miss.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value: bytes) -> bool:
+        """
+        Cache a value, evicting least recently used entries to make room.
+
+        Returns:
+            bool: False if the value is larger than the whole cache and was not stored.
+        """
+        size = len(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            if size > self.max_bytes:
+                return False
+            while self._bytes + size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+                self.evicted_bytes += len(evicted)
+            self._entries[key] = value
+            self._bytes += size
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Return hit/miss/eviction counters and current usage.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,295 @@
+import mmap
+import os
+import sqlite3
+import threading
+
+from app.media_scan.config.settings import config
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_QUERY_CHUNK = 500
+
+
+class PackedThumbnailStore:
+    """
+    Thumbnails packed into large append-only segment files, read through mmap.
+
+    Layout of `directory`:
+    - `segment_00001.dat`, ...: concatenated thumbnail bytes. New data is only
+      appended to the newest (active) segment, which rolls over at `segment_size`.
+    - `index.db`: SQLite index with two tables:
+      - `blobs`: content key (e.g. the file's content hash) to (segment, offset, length).
+      - `entries`: Media ID to content key, so duplicate files share one blob.
+
+    Reads slice a memory map of the segment (mapped once per segment and
+    remapped when the active segment has grown), so loading a grid of
+    thumbnails costs no per-thumbnail open or seek; `get_many` sorts the reads
+    by segment and offset so they sweep each segment front to back.
+
+    Deleting entries only updates the index. Blobs no longer referenced are
+    dead space until `compact` rewrites segments that are mostly dead and
+    removes their files.
+
+    Example:
+        with PackedThumbnailStore("cache/thumbnail_store") as store:
+            store.put(42, content_hash, jpeg_bytes)
+            store.get_many([42, 43, 44])   # {42: b'...', 43: b'...'}
+            store.delete([43])
+            store.compact()
+    """
+
+    def __init__(self, directory: str = None, segment_size: int = None):
+        """
+        Args:
+            directory (str, optional): Store directory, created if missing. Defaults to config.THUMBNAIL_STORE_DIR.
+            segment_size (int, optional): Bytes per segment before rolling over. Defaults to config.THUMBNAIL_SEGMENT_SIZE.
+        """
+        self.directory = directory or config.THUMBNAIL_STORE_DIR
+        self.segment_size = segment_size or config.THUMBNAIL_SEGMENT_SIZE
+        os.makedirs(self.directory, exist_ok=True)
+        # The GUI reads from its own threads; access is serialized by the lock
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(os.path.join(self.directory, "index.db"), check_same_thread=False)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                key TEXT PRIMARY KEY,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS ix_blobs_segment ON blobs (segment, offset);
+            CREATE TABLE IF NOT EXISTS entries (
+                media_id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_entries_key ON entries (key);
+        """)
+        self._maps = {}
+        segments = self._segments()
+        self._active_segment = segments[-1] if segments else 1
+        self._active_file = open(self._segment_path(self._active_segment), "ab")
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment_{segment:05d}.dat")
+
+    def _segments(self):
+        return sorted(
+            int(name[len("segment_"):-len(".dat")]) for name in os.listdir(self.directory)
+            if name.startswith("segment_") and name.endswith(".dat")
+        )
+
+    def _append(self, data: bytes):
+        """
+        Append bytes to the active segment, rolling over to a new one when it is full.
+        """
+        position = self._active_file.tell()
+        if position and position + len(data) > self.segment_size:
+            self._roll()
+            position = 0
+        self._active_file.write(data)
+        return self._active_segment, position
+
+    def _roll(self):
+        self._active_file.close()
+        self._active_segment += 1
+        self._active_file = open(self._segment_path(self._active_segment), "ab")
+
+    def _view(self, segment: int, end: int):
+        """
+        Return a memory map of a segment covering at least `end` bytes.
+        """
+        view = self._maps.get(segment)
+        if view is None or len(view) < end:
+            if view is not None:
+                view.close()
+            if segment == self._active_segment:
+                self._active_file.flush()
+            with open(self._segment_path(segment), "rb") as file:
+                view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = view
+        return view
+
+    def contains(self, key: str) -> bool:
+        """
+        Return whether a blob with this content key is stored.
+        """
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM blobs WHERE key = ?", (key,)).fetchone() is not None
+
+    def put(self, media_id: int, key: str, data: bytes = None):
+        """
+        Store one thumbnail; see `put_many`.
+        """
+        self.put_many([(media_id, key, data)])
+
+    def put_many(self, items):
+        """
+        Store thumbnails in one index transaction.
+
+        Args:
+            items (iterable): (media_id, key, data) tuples. The data is only appended
+                when no blob with that key exists yet, so it may be None for content
+                that is already stored (the Media ID is just linked to it).
+
+        Raises:
+            KeyError: If data is None for a key that is not stored.
+        """
+        with self._lock:
+            try:
+                for media_id, key, data in items:
+                    if not self._connection.execute("SELECT 1 FROM blobs WHERE key = ?", (key,)).fetchone():
+                        if data is None:
+                            raise KeyError(f"No thumbnail stored for key {key}.")
+                        segment, offset = self._append(data)
+                        self._connection.execute(
+                            "INSERT INTO blobs (key, segment, offset, length) VALUES (?, ?, ?, ?)",
+                            (key, segment, offset, len(data)),
+                        )
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO entries (media_id, key) VALUES (?, ?)", (media_id, key)
+                    )
+                # The index must never point at bytes that are not in the segment yet
+                self._active_file.flush()
+                self._connection.commit()
+            except BaseException:
+                self._connection.rollback()
+                raise
+
+    def delete(self, media_ids) -> int:
+        """
+        Remove entries; their blobs become dead space once no entry references them.
+
+        Returns:
+            int: Entries removed.
+        """
+        media_ids = list(media_ids)
+        deleted = 0
+        with self._lock:
+            for start in range(0, len(media_ids), _QUERY_CHUNK):
+                chunk = media_ids[start:start + _QUERY_CHUNK]
+                deleted += self._connection.execute(
+                    f"DELETE FROM entries WHERE media_id IN ({','.join('?' * len(chunk))})", chunk
+                ).rowcount
+            self._connection.commit()
+        return deleted
+
+    def entries(self) -> dict:
+        """
+        Return the content key of every stored Media ID.
+        """
+        with self._lock:
+            return dict(self._connection.execute("SELECT media_id, key FROM entries"))
+
+    def get(self, media_id: int):
+        """
+        Return one thumbnail's bytes, or None if it is not stored.
+        """
+        return self.get_many([media_id]).get(media_id)
+
+    def get_many(self, media_ids) -> dict:
+        """
+        Fetch thumbnails for several Media IDs, reading in segment/offset order.
+
+        Returns:
+            dict[int, bytes]: Thumbnail bytes by Media ID; IDs without a thumbnail are left out.
+        """
+        media_ids = list(media_ids)
+        with self._lock:
+            locations = []
+            for start in range(0, len(media_ids), _QUERY_CHUNK):
+                chunk = media_ids[start:start + _QUERY_CHUNK]
+                locations.extend(self._connection.execute(
+                    "SELECT entries.media_id, blobs.segment, blobs.offset, blobs.length "
+                    "FROM entries JOIN blobs ON blobs.key = entries.key "
+                    f"WHERE entries.media_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ))
+            locations.sort(key=lambda location: (location[1], location[2]))
+            thumbnails = {}
+            for media_id, segment, offset, length in locations:
+                thumbnails[media_id] = self._view(segment, offset + length)[offset:offset + length]
+            return thumbnails
+
+    def stats(self) -> dict:
+        """
+        Return entry, blob and segment counts, and live versus dead bytes.
+        """
+        with self._lock:
+            self._active_file.flush()
+            entries, = self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+            blobs, live_bytes = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM blobs WHERE key IN (SELECT key FROM entries)"
+            ).fetchone()
+            segments = self._segments()
+            segment_bytes = sum(os.path.getsize(self._segment_path(segment)) for segment in segments)
+        return {
+            "entries": entries,
+            "blobs": blobs,
+            "segments": len(segments),
+            "live_bytes": live_bytes,
+            "segment_bytes": segment_bytes,
+            "dead_bytes": segment_bytes - live_bytes,
+        }
+
+    def compact(self, max_dead_fraction: float = 0.3) -> int:
+        """
+        Drop unreferenced blobs and rewrite segments whose dead fraction exceeds `max_dead_fraction`.
+
+        Live blobs of those segments are copied to the active segment (in offset
+        order), the index is updated in one transaction and the old segment
+        files are deleted.
+
+        Returns:
+            int: Bytes of disk space reclaimed.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM blobs WHERE key NOT IN (SELECT key FROM entries)")
+            self._active_file.flush()
+            live = dict(self._connection.execute("SELECT segment, SUM(length) FROM blobs GROUP BY segment"))
+            sizes = {segment: os.path.getsize(self._segment_path(segment)) for segment in self._segments()}
+            victims = [segment for segment, size in sizes.items()
+                       if size and (size - live.get(segment, 0)) / size > max_dead_fraction]
+            if self._active_segment in victims:
+                self._roll()
+            try:
+                for segment in victims:
+                    blobs = self._connection.execute(
+                        "SELECT key, offset, length FROM blobs WHERE segment = ? ORDER BY offset", (segment,)
+                    ).fetchall()
+                    for key, offset, length in blobs:
+                        data = self._view(segment, offset + length)[offset:offset + length]
+                        new_segment, new_offset = self._append(data)
+                        self._connection.execute(
+                            "UPDATE blobs SET segment = ?, offset = ? WHERE key = ?", (new_segment, new_offset, key)
+                        )
+                self._active_file.flush()
+                os.fsync(self._active_file.fileno())
+                self._connection.commit()
+            except BaseException:
+                self._connection.rollback()
+                raise
+            reclaimed = 0
+            for segment in victims:
+                view = self._maps.pop(segment, None)
+                if view is not None:
+                    view.close()
+                os.remove(self._segment_path(segment))
+                reclaimed += sizes[segment]
+            copied = sum(live.get(segment, 0) for segment in victims)
+            return reclaimed - copied
+
+    def close(self):
+        """
+        Flush the active segment, release the memory maps and close the index.
+        """
+        with self._lock:
+            for view in self._maps.values():
+                view.close()
+            self._maps.clear()
+            self._active_file.close()
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
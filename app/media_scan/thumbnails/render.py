@@ -0,0 +1,199 @@
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+from app.media_scan.utils.file_hashing import full_hash
+
+# Decoders downscale JPEGs while decoding (DCT scaling), which is much cheaper than a full decode
+_REDUCED_COLOR_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def init_worker():
+    """
+    Process-pool initializer: one OpenCV thread per worker process, so N workers
+    use N cores instead of oversubscribing them with OpenCV's own thread pool.
+    """
+    cv2.setNumThreads(1)
+
+
+def load_image(file_path: str, max_side: int, resolution: str = None):
+    """
+    Read an image in color, decoding at reduced scale when it is still at least `max_side` wide.
+
+    Args:
+        file_path (str): Image file.
+        max_side (int): Longest side the thumbnail will have.
+        resolution (str, optional): Known 'WxH' (e.g. Media.resolution), used to pick the reduction.
+
+    Returns:
+        np.ndarray | None: BGR image, or None if it cannot be decoded.
+    """
+    flag = cv2.IMREAD_COLOR
+    try:
+        width, height = (int(side) for side in resolution.split("x"))
+        for factor, reduced_flag in _REDUCED_COLOR_FLAGS:
+            if max(width, height) // factor >= max_side:
+                flag = reduced_flag
+                break
+    except (AttributeError, ValueError):
+        pass
+    return cv2.imread(file_path, flag)
+
+
+def representative_frame(file_path: str, samples: int = 5):
+    """
+    Pick a representative frame of a video.
+
+    Frames are read at the middle of `samples` equal slices and the one with
+    the most detail (highest grayscale standard deviation) wins, so black
+    fades, title cards and flat frames are passed over.
+
+    Returns:
+        np.ndarray | None: BGR frame, or None if the video cannot be decoded.
+    """
+    capture = cv2.VideoCapture(file_path)
+    try:
+        if not capture.isOpened():
+            return None
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        positions = [int((index + 0.5) * frame_count / samples) for index in range(samples)] if frame_count > 0 else [0]
+        best, best_detail = None, -1.0
+        for position in positions:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, position)
+            ok, frame = capture.read()
+            if not ok:
+                continue
+            detail = float(np.std(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)))
+            if detail > best_detail:
+                best, best_detail = frame, detail
+        return best
+    finally:
+        capture.release()
+
+
+def fit_within(image, max_side: int):
+    """
+    Downscale an image so its longest side is at most `max_side`, keeping the aspect ratio.
+    """
+    height, width = image.shape[:2]
+    scale = max_side / max(width, height)
+    if scale >= 1:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def encode_jpeg(image, quality: int = 85) -> bytes:
+    """
+    Encode a BGR image as JPEG bytes.
+    """
+    ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("JPEG encoding failed.")
+    return data.tobytes()
+
+
+def parse_tiers(spec: str) -> dict:
+    """
+    Parse a tier specification such as 'icon:96,medium:320,preview:800'.
+
+    Returns:
+        dict[str, int]: Longest side in pixels by tier name, in the given order.
+    """
+    tiers = {}
+    for item in spec.split(","):
+        name, _, side = item.strip().partition(":")
+        if not name or not side.isdigit() or int(side) <= 0:
+            raise ValueError(f"Invalid thumbnail tier '{item}', expected name:pixels.")
+        tiers[name] = int(side)
+    return tiers
+
+
+def content_addressed_path(directory: str, content_hash: str, tier: str, extension: str = ".jpg") -> str:
+    """
+    Path of a tier's thumbnail for a content hash, fanned out by the first two hex digits.
+    """
+    return os.path.join(directory, tier, content_hash[:2], content_hash + extension)
+
+
+def write_atomically(path: str, data: bytes) -> bool:
+    """
+    Write a file through a unique temporary file and hard-link it into place, so
+    concurrent writers of the same content (in any process or thread) never expose a
+    partial file and only the first one wins.
+
+    Returns:
+        bool: False if the file already existed (it is left untouched).
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(data)
+    try:
+        os.link(temporary_path, path)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(temporary_path)
+
+
+def render_tiers(image, tiers: dict, quality: int = 85) -> dict:
+    """
+    Encode one decoded image at every tier, largest first, each scaled down from the
+    previous tier rather than from the full image.
+
+    Returns:
+        dict[str, bytes]: JPEG bytes by tier name.
+    """
+    encoded = {}
+    for name, side in sorted(tiers.items(), key=lambda tier: -tier[1]):
+        image = fit_within(image, side)
+        encoded[name] = encode_jpeg(image, quality)
+    return encoded
+
+
+def render_thumbnail(file_path: str, media_type: str, content_hash: str, resolution: str, directory: str,
+                     tiers: dict, quality: int = 85):
+    """
+    Hash a file if needed, then render its content-addressed thumbnail tiers unless they exist.
+    All tiers come from a single decode. Module-level so it can run in worker processes.
+
+    Args:
+        file_path (str): Video or image file.
+        media_type (str): 'video' or 'image'.
+        content_hash (str | None): Known BLAKE2b hex digest; computed when None.
+        resolution (str | None): Known 'WxH', used to decode images at reduced scale.
+        directory (str): Thumbnail root directory.
+        tiers (dict[str, int]): Longest side in pixels by tier name.
+        quality (int, optional): JPEG quality. Defaults to 85.
+
+    Returns:
+        tuple: (file_path, content_hash, paths, outcome) where paths maps tier names to
+        files and outcome is 'generated', 'reused' or 'failed' (with no paths).
+    """
+    try:
+        if content_hash is None:
+            content_hash, _ = full_hash(file_path)
+        paths = {name: content_addressed_path(directory, content_hash, name) for name in tiers}
+        if all(os.path.exists(path) for path in paths.values()):
+            return file_path, content_hash, paths, "reused"
+        if media_type == "video":
+            image = representative_frame(file_path)
+        else:
+            image = load_image(file_path, max(tiers.values()), resolution)
+        if image is None or not image.size:
+            return file_path, content_hash, {}, "failed"
+        # Another worker may be rendering a duplicate of this file; every worker writes the
+        # tiers largest first, so whoever wrote the first tier is the one that generated it
+        created = [write_atomically(paths[name], data) for name, data in render_tiers(image, tiers, quality).items()]
+        return file_path, content_hash, paths, "generated" if created[0] else "reused"
+    except (OSError, ValueError):
+        return file_path, content_hash, {}, "failed"
@@ -2,6 +2,7 @@ import os
 import logging
 
 from app.media_scan.exceptions.media_exceptions import MediaTypeNotFoundError
+from app.media_scan.utils.parallel_walker import ParallelDirectoryWalker
 
 # TODO: Implement logging across the application rather than just in this module
 logging.basicConfig(
@@ -16,14 +17,20 @@ class DirectoryScanner:
     Handles scanning directories for valid media files and yields results.
     """
 
-    def __init__(self, validation_strategy):
+    def __init__(self, validation_strategy, walker=None, content_strategy=None):
         """
         Initialize the scanner with a specific validation strategy.
         
         Args:
             validation_strategy: Strategy or a dictionary of strategies for validation logic.
+            walker (ParallelDirectoryWalker, optional): Directory walker engine. Defaults to
+                a ParallelDirectoryWalker configured from AppConfig.
+            content_strategy (ContentSniffingValidationStrategy, optional): Fallback that reads
+                the file header of files the name-based check reports as 'unknown'.
         """
         self.validation_strategy = validation_strategy
+        self.walker = walker or ParallelDirectoryWalker()
+        self.content_strategy = content_strategy
 
     def identify_media_type(self, file_name: str):
         """
@@ -39,6 +46,40 @@ class DirectoryScanner:
         media_type = self.validation_strategy.validate(file_name)
         return media_type  # Either "video", "audio", "image", or "unknown"
 
+    def identify_media_types(self, file_names: list):
+        """
+        Identifies the media types of a batch of files, e.g. one directory listing.
+
+        Args:
+            file_names (list[str]): Names of the files.
+
+        Returns:
+            list[str]: Media type for each name, in input order.
+        """
+        validate_many = getattr(self.validation_strategy, "validate_many", None)
+        if validate_many is None:
+            return [self.identify_media_type(file_name) for file_name in file_names]
+        return validate_many(file_names)
+
+
+    def _identify_directory(self, root: str, files: list):
+        """
+        Classify one directory listing, sniffing file contents only for ambiguous files.
+
+        Args:
+            root (str): Directory path.
+            files (list[tuple[str, os.stat_result]]): File names and stat results.
+
+        Returns:
+            list[str]: Media type for each file, in input order.
+        """
+        # Classify the whole directory listing in one call
+        media_types = self.identify_media_types([file for file, _ in files])
+        if self.content_strategy is not None:
+            for index, (file, stat) in enumerate(files):
+                if media_types[index] == "unknown" and self.content_strategy.should_sniff(file):
+                    media_types[index] = self.content_strategy.sniff(os.path.join(root, file), stat)
+        return media_types
 
     def scan(self, directory_path: str):
         """
@@ -50,20 +91,77 @@ class DirectoryScanner:
         Yields:
             tuple: (str, str): Full path to valid media file, Media type.
         """
+        for full_path, media_type, _ in self.scan_entries(directory_path):
+            yield full_path, media_type
+
+    def scan_entries(self, directory_path: str):
+        """
+        Scans directory and yields valid media file paths, their media types and stat results.
+
+        The stat result comes from the walker's ``DirEntry``, so callers never
+        need to stat the file again.
+
+        Args:
+            directory_path (str): Directory to scan.
+
+        Yields:
+            tuple: (str, str, os.stat_result): Full path, Media type, stat result.
+        """
         try:
             if not os.path.exists(directory_path):
                 raise FileNotFoundError(f"Directory path does not exist: {directory_path}")
 
-            for root, _, files in os.walk(directory_path):
-                for file in files:
+            for root, files in self.walker.walk(directory_path):
+                media_types = self._identify_directory(root, files)
+                for (file, stat), media_type in zip(files, media_types):
                     full_path = os.path.join(root, file)
-                    media_type = self.identify_media_type(file)
                     if media_type:
                         print(f"Valid {media_type} file: {full_path}")
-                        yield full_path, media_type
+                        yield full_path, media_type, stat
                     else:
                         raise MediaTypeNotFoundError(f"Unsupported file type: {full_path}")
         except FileNotFoundError as e:
             print(e)
         except Exception as e:
             print(f"An error occurred: {e}")
+
+    def scan_incremental(self, directory_path: str, snapshot):
+        """
+        Scans directory and yields only files that are new or changed since the snapshot.
+
+        Each file's stat result (gathered once by the walker) is compared against
+        its cataloged fingerprint before any validation happens, so unchanged
+        files cost nothing beyond the directory listing. Files that disappeared
+        are available afterwards from ``snapshot.removed_paths()``; entries that
+        could not be stat'ed are recorded in the snapshot instead.
+
+        Args:
+            directory_path (str): Directory to scan.
+            snapshot (StatSnapshot): Fingerprints of the files already cataloged.
+
+        Yields:
+            tuple: (str, str, os.stat_result): Full path, media type, stat result.
+
+        Raises:
+            FileNotFoundError: If directory_path does not exist. Unlike ``scan`` this is
+                not swallowed, since an empty walk would report every file as removed.
+        """
+        if not os.path.exists(directory_path):
+            raise FileNotFoundError(f"Directory path does not exist: {directory_path}")
+
+        def on_walk_error(error):
+            # Unreadable directories must not look like deleted files
+            snapshot.mark_seen_under(error.filename)
+
+        def on_stat_error(path, error):
+            # Neither must files that exist but could not be stat'ed
+            snapshot.mark_stat_failed(path)
+
+        for root, files in self.walker.walk(directory_path, on_error=on_walk_error, on_stat_error=on_stat_error):
+            changed = [
+                (file, stat) for file, stat in files
+                if not snapshot.is_unchanged(os.path.join(root, file), stat)
+            ]
+            media_types = self._identify_directory(root, changed)
+            for (file, stat), media_type in zip(changed, media_types):
+                yield os.path.join(root, file), media_type, stat
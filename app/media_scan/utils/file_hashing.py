@@ -0,0 +1,56 @@
+import hashlib
+
+from app.media_scan.extractors.media_metadata import PositionalReader
+
+# Buffer for streaming full-file hashes
+_READ_SIZE = 1024 * 1024
+
+
+def _new_hash():
+    return hashlib.blake2b(digest_size=32)
+
+
+def partial_hash(file_path: str, file_size: int, chunk_size: int):
+    """
+    Hash the head, middle and tail `chunk_size` bytes of a file.
+
+    Files no larger than three chunks are hashed whole, so for them the
+    partial hash equals `full_hash`.
+
+    Args:
+        file_path (str): File to hash.
+        file_size (int): Expected size; also decides the chunk offsets.
+        chunk_size (int): Bytes read at each of the three positions.
+
+    Returns:
+        tuple[str, int, bool]: Hex digest, bytes read, and whether the whole file was hashed.
+    """
+    digest = _new_hash()
+    with PositionalReader(file_path) as reader:
+        if file_size <= 3 * chunk_size:
+            digest.update(reader.read(0, file_size))
+            return digest.hexdigest(), reader.bytes_read, True
+        for offset in (0, file_size // 2 - chunk_size // 2, file_size - chunk_size):
+            digest.update(reader.read(offset, chunk_size))
+        return digest.hexdigest(), reader.bytes_read, False
+
+
+def full_hash(file_path: str):
+    """
+    Hash the entire file, streaming it through a fixed-size buffer.
+
+    Returns:
+        tuple[str, int]: Hex digest and bytes read.
+    """
+    digest = _new_hash()
+    buffer = bytearray(_READ_SIZE)
+    view = memoryview(buffer)
+    bytes_read = 0
+    with open(file_path, "rb", buffering=0) as file:
+        while True:
+            count = file.readinto(buffer)
+            if not count:
+                break
+            digest.update(view[:count])
+            bytes_read += count
+    return digest.hexdigest(), bytes_read
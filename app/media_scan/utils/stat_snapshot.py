@@ -0,0 +1,107 @@
+import os
+from typing import NamedTuple
+
+
+class StatFingerprint(NamedTuple):
+    """
+    The parts of a file's stat result used to decide whether it changed since the last scan.
+    """
+    size: int
+    mtime_ns: int
+    inode: int
+    device: int
+
+    @classmethod
+    def from_stat(cls, stat_result):
+        """
+        Build a fingerprint from an ``os.stat_result`` (or ``DirEntry.stat()``).
+        """
+        return cls(stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino, stat_result.st_dev)
+
+
+class StatSnapshot:
+    """
+    Fingerprints of cataloged files under a directory, consumed by an incremental scan.
+
+    The scanner checks every walked file against the snapshot; files whose
+    fingerprint matches are skipped without being validated or sent to the
+    database. Every checked path is marked as seen, so once the walk finishes
+    the paths never seen are the files that disappeared from disk. Entries the
+    walk could not stat are recorded separately and never reported as removed.
+
+    Example:
+        snapshot = StatSnapshot(repository.get_fingerprints(directory_path))
+        for file_path, media_type, stat in scanner.scan_incremental(directory_path, snapshot):
+            ...
+        for file_path in snapshot.removed_paths():
+            ...
+    """
+
+    def __init__(self, fingerprints: dict):
+        """
+        Args:
+            fingerprints (dict): Mapping of file path -> StatFingerprint (or an equivalent
+                (size, mtime_ns, inode, device) tuple).
+        """
+        self._fingerprints = fingerprints
+        self._seen = set()
+        self._stat_failed = set()
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def is_unchanged(self, file_path: str, stat_result) -> bool:
+        """
+        Mark file_path as seen and report whether it matches its cataloged fingerprint.
+
+        Args:
+            file_path (str): Full path of the walked file.
+            stat_result: ``os.stat_result`` for the file.
+
+        Returns:
+            bool: True if the file is cataloged and its size, mtime, inode and device are unchanged.
+        """
+        cataloged = self._fingerprints.get(file_path)
+        if cataloged is None:
+            return False
+        self._seen.add(file_path)
+        return tuple(cataloged) == StatFingerprint.from_stat(stat_result)
+
+    def mark_seen_under(self, directory_path: str):
+        """
+        Mark every cataloged path under directory_path as seen.
+
+        Used when a directory cannot be listed, so its files are not mistaken
+        for deleted ones.
+        """
+        prefix = os.path.join(directory_path, "")
+        self._seen.update(path for path in self._fingerprints if path.startswith(prefix))
+
+    def mark_stat_failed(self, path: str):
+        """
+        Record a walked entry that could not be stat'ed.
+
+        The entry still exists, so neither it nor (should it be a directory
+        whose type could not be read) anything under it is reported as removed.
+        """
+        self._stat_failed.add(path)
+
+    def stat_failed_paths(self) -> list:
+        """
+        Return the entries recorded by mark_stat_failed, sorted.
+        """
+        return sorted(self._stat_failed)
+
+    def removed_paths(self):
+        """
+        Yield cataloged paths that were not seen during the walk.
+
+        Only meaningful once the incremental scan has been fully consumed.
+        """
+        failed_prefixes = tuple(os.path.join(path, "") for path in self._stat_failed)
+        for file_path in self._fingerprints:
+            if file_path in self._seen or file_path in self._stat_failed:
+                continue
+            if failed_prefixes and file_path.startswith(failed_prefixes):
+                continue
+            yield file_path
@@ -0,0 +1,111 @@
+"""
+Microbenchmark: per-name cost of media type classification.
+
+Compares the original sequential path (audio, video, image strategies, then
+the default strategy) against the compiled ExtensionClassifier used by
+CompositeValidationStrategy, both one name at a time and through the batch
+validate_many API (as DirectoryScanner calls it, once per directory).
+
+Usage:
+    python -m benchmarks.bench_extension_classifier --count 10000000
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+from itertools import cycle, islice
+
+from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
+
+
+def synthetic_names(pool_size: int, seed: int = 42) -> list:
+    """
+    Build a pool of realistic file names: mostly media, some documents and sidecar files,
+    a few with multiple dots or no extension.
+    """
+    rng = random.Random(seed)
+    extensions = [
+        "mp4", "MKV", "mov", "avi", "jpg", "JPG", "png", "jpeg", "mp3", "flac", "wav",
+        "txt", "nfo", "srt", "pdf", "xml", "db", "json",
+    ]
+    names = []
+    for index in range(pool_size):
+        roll = rng.random()
+        if roll < 0.05:
+            names.append(f"IMG_{index:06d}")  # camera dump without extension
+        elif roll < 0.10:
+            names.append(f"backup.{index}.tar.gz")
+        else:
+            names.append(f"file_{index:07d}.{rng.choice(extensions)}")
+    return names
+
+
+def sequential_validate(composite: CompositeValidationStrategy):
+    """
+    Return the original per-strategy loop, bound to the composite's strategies.
+    """
+    strategies = composite.strategies
+
+    def validate(file_name):
+        for media_type, strategy in strategies.items():
+            if media_type != "default" and strategy.validate(file_name):
+                return media_type
+        strategies["default"].validate(file_name)
+        return "unknown"
+
+    return validate
+
+
+def time_per_name(validate, names: list, count: int) -> float:
+    """
+    Return nanoseconds per name for classifying `count` names drawn from `names`.
+    """
+    start = time.perf_counter()
+    for file_name in islice(cycle(names), count):
+        validate(file_name)
+    return (time.perf_counter() - start) * 1e9 / count
+
+
+def time_per_name_batched(validate_many, names: list, count: int, batch_size: int) -> float:
+    """
+    Return nanoseconds per name when classifying `count` names in batches of `batch_size`.
+    """
+    batches = [names[start:start + batch_size] for start in range(0, len(names), batch_size)]
+    classified = 0
+    start = time.perf_counter()
+    for batch in cycle(batches):
+        if classified >= count:
+            break
+        validate_many(batch)
+        classified += len(batch)
+    return (time.perf_counter() - start) * 1e9 / classified
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10_000_000, help="Names to classify per run.")
+    parser.add_argument("--pool-size", type=int, default=100_000, help="Distinct synthetic names.")
+    parser.add_argument("--batch-size", type=int, default=1_000, help="Names per validate_many call.")
+    args = parser.parse_args()
+
+    names = synthetic_names(args.pool_size)
+    composite = CompositeValidationStrategy()
+
+    baseline = time_per_name(lambda file_name: None, names, args.count)
+    compiled = time_per_name(composite.validate, names, args.count)
+    batched = time_per_name_batched(composite.validate_many, names, args.count, args.batch_size)
+    # The default strategy prints a warning per unknown name; keep it off the terminal
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        sequential = time_per_name(sequential_validate(composite), names, args.count)
+
+    print(f"names classified:        {args.count:,}")
+    print(f"loop overhead:           {baseline:8.1f} ns/name")
+    print(f"sequential strategies:   {sequential:8.1f} ns/name")
+    print(f"compiled classifier:     {compiled:8.1f} ns/name")
+    print(f"validate_many batches:   {batched:8.1f} ns/name")
+    print(f"speed-up (net of loop):  {(sequential - baseline) / max(compiled - baseline, 1e-9):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Scaling benchmark: all-pairs near-duplicate search over video signatures.
+
+Builds `--count` random signatures of `--words` 64-bit words, plants
+`--planted` near-duplicates (each within `--max-distance` bits of an
+original), then times MultiIndexHashIndex construction and the all-pairs
+search. The brute-force cost (NumPy XOR + popcount against every signature)
+is measured on a sample of queries and extrapolated to all of them.
+
+Usage:
+    python -m benchmarks.bench_hamming_index --count 100000 --max-distance 16
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.media_scan.similarity.hamming_index import MultiIndexHashIndex
+
+
+def planted_signatures(count: int, words: int, planted: int, max_distance: int, seed: int = 42):
+    """
+    Return (signatures, planted_pairs): random signatures with `planted` of them
+    replaced by copies of others with up to `max_distance` bits flipped.
+    """
+    rng = np.random.default_rng(seed)
+    signatures = rng.integers(0, 2 ** 64, size=(count, words), dtype=np.uint64, endpoint=False)
+    pairs = set()
+    for copy in range(count - planted, count):
+        original = int(rng.integers(0, count - planted))
+        signature = signatures[original].copy()
+        for bit in rng.choice(words * 64, size=int(rng.integers(0, max_distance + 1)), replace=False):
+            signature[bit // 64] ^= np.uint64(1) << np.uint64(bit % 64)
+        signatures[copy] = signature
+        pairs.add((original, copy))
+    return signatures, pairs
+
+
+def brute_force_seconds(signatures, max_distance: int, sample: int) -> float:
+    """
+    Time brute-force search for `sample` queries and extrapolate to every signature.
+    """
+    start = time.perf_counter()
+    for query in signatures[:sample]:
+        distances = np.bitwise_count(signatures ^ query).sum(axis=1)
+        np.flatnonzero(distances <= max_distance)
+    return (time.perf_counter() - start) * len(signatures) / sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000, help="Signatures in the index.")
+    parser.add_argument("--words", type=int, default=4, help="64-bit words per signature (frames).")
+    parser.add_argument("--planted", type=int, default=1_000, help="Near-duplicate copies to plant.")
+    parser.add_argument("--max-distance", type=int, default=16, help="Hamming distance threshold.")
+    parser.add_argument("--brute-force-sample", type=int, default=200, help="Queries timed for brute force.")
+    args = parser.parse_args()
+
+    signatures, planted = planted_signatures(args.count, args.words, args.planted, args.max_distance)
+
+    start = time.perf_counter()
+    index = MultiIndexHashIndex(words=args.words)
+    index.add_many(signatures)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pairs = index.pairs_within(args.max_distance)
+    search = time.perf_counter() - start
+
+    found = {(a, b) for a, b, _ in pairs}
+    brute_force = brute_force_seconds(signatures, args.max_distance, args.brute_force_sample)
+
+    print(f"signatures:             {args.count:,} x {args.words * 64} bits, k = {args.max_distance}")
+    print(f"index build:            {build:8.2f} s")
+    print(f"all-pairs search:       {search:8.2f} s ({len(pairs):,} pairs)")
+    print(f"planted pairs found:    {len(planted & found):,} / {len(planted):,}")
+    print(f"brute force (estimate): {brute_force:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
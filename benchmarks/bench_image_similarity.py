@@ -0,0 +1,68 @@
+"""
+Latency benchmark: top-k similar images and all-clusters mode over packed 64-bit hashes.
+
+Builds an ImageHashIndex of `--count` random hashes with `--planted`
+near-duplicates (each within `--max-distance` bits of an original), then
+reports the mean and p95 latency of `top_k` lookups and the time to compute
+all clusters.
+
+Usage:
+    python -m benchmarks.bench_image_similarity --count 1000000 --queries 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.media_scan.similarity.image_index import ImageHashIndex
+
+
+def planted_hashes(count: int, planted: int, max_distance: int, seed: int = 42):
+    """
+    Random hashes whose last `planted` entries are near copies of earlier ones.
+    """
+    rng = np.random.default_rng(seed)
+    hashes = rng.integers(0, 2 ** 64, size=count, dtype=np.uint64, endpoint=False)
+    originals = rng.integers(0, count - planted, size=planted)
+    flips = np.zeros(planted, dtype=np.uint64)
+    for row, bits in enumerate(rng.integers(0, max_distance + 1, size=planted)):
+        for bit in rng.choice(64, size=bits, replace=False):
+            flips[row] |= np.uint64(1) << np.uint64(bit)
+    hashes[count - planted:] = hashes[originals] ^ flips
+    return hashes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000, help="Images in the index.")
+    parser.add_argument("--planted", type=int, default=10_000, help="Near-duplicate copies to plant.")
+    parser.add_argument("--max-distance", type=int, default=6, help="Hamming distance for clusters.")
+    parser.add_argument("--queries", type=int, default=200, help="top_k lookups to time.")
+    parser.add_argument("--k", type=int, default=10, help="Results per lookup.")
+    parser.add_argument("--chunk-size", type=int, default=1 << 20, help="Hashes per vectorized step.")
+    args = parser.parse_args()
+
+    hashes = planted_hashes(args.count, args.planted, args.max_distance)
+    ids = np.arange(1, args.count + 1, dtype=np.int64)
+    index = ImageHashIndex(ids, hashes, chunk_size=args.chunk_size)
+
+    rng = np.random.default_rng(0)
+    latencies = []
+    for media_id in rng.choice(ids, size=args.queries, replace=False):
+        start = time.perf_counter()
+        index.top_k(int(media_id), k=args.k)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+
+    start = time.perf_counter()
+    clusters = index.clusters(args.max_distance)
+    cluster_seconds = time.perf_counter() - start
+
+    print(f"images:           {args.count:,} ({hashes.nbytes / 2 ** 20:.1f} MiB of hashes)")
+    print(f"top_{args.k} latency:    mean {latencies.mean():.2f} ms, p95 {np.percentile(latencies, 95):.2f} ms")
+    print(f"all clusters:     {cluster_seconds:.2f} s, {len(clusters):,} clusters "
+          f"(k = {args.max_distance}, {args.planted:,} planted copies)")
+
+
+if __name__ == "__main__":
+    main()
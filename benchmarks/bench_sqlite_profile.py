@@ -0,0 +1,122 @@
+"""
+Throughput benchmark: stock SQLite engine versus the tuned profile.
+
+For each configuration a fresh database file is created and `--rows` media
+rows are inserted through MediaRepository.add_media_bulk in batches of
+`--batch-size` (one commit per batch), while `--readers` threads keep paging
+through the catalog with get_media_page, as the GUI does. Reports inserted
+rows per second, pages read per second and the slowest page. With the stock
+engine, readers and the writer share one rollback-journal database, so pages
+stall while a batch commits and every commit is fsynced; the tuned profile
+(WAL, synchronous=NORMAL, a single writer connection and a read-only pool)
+should raise both rates and flatten the worst-case page latency.
+
+Usage:
+    python -m benchmarks.bench_sqlite_profile --rows 200000 --batch-size 1000 --readers 2
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.media_scan.dal.database import Base, create_engines
+from app.media_scan.models.media import Media  # noqa: F401 (registers the tables)
+from app.media_scan.models.media_type import MediaType
+from app.media_scan.repositories.media_repository import MediaRepository
+
+
+def media_rows(count: int, media_type_id: int):
+    """
+    Yield synthetic media rows.
+    """
+    for number in range(count):
+        yield {
+            "file_path": f"/volume/videos/{number // 1000:04d}/clip_{number}.mp4",
+            "file_size": 1_000_000 + number,
+            "media_type_id": media_type_id,
+            "duration": 60.0 + number % 600,
+            "resolution": "1920x1080",
+            "width": 1920,
+            "height": 1080,
+            "codec": "H.264",
+            "bit_rate": 4_000_000,
+        }
+
+
+def read_pages(session_factory, stop: threading.Event, latencies: list, page_size: int):
+    """
+    Page through the catalog from the start, over and over, until `stop` is set.
+    """
+    session = session_factory()
+    repository = MediaRepository(session)
+    after_id = None
+    try:
+        while not stop.is_set():
+            start = time.perf_counter()
+            page = repository.get_media_page("video", after_id=after_id, limit=page_size)
+            # End the read transaction, so each page sees the latest commits
+            session.rollback()
+            latencies.append(time.perf_counter() - start)
+            after_id = page.next_after_id
+    finally:
+        session.close()
+
+
+def run(database_path: str, tuned: bool, rows: int, batch_size: int, readers: int, page_size: int) -> dict:
+    """
+    Insert `rows` rows while `readers` threads page through them, and return the measurements.
+    """
+    write_engine, read_engine = create_engines(f"sqlite:///{database_path}", sqlite_tuned=tuned)
+    Base.metadata.create_all(write_engine)
+    WriteSession = sessionmaker(autoflush=False, bind=write_engine)
+    ReadSession = sessionmaker(autoflush=False, bind=read_engine)
+    with WriteSession() as session:
+        session.add(MediaType(name="video"))
+        session.commit()
+        media_type_id = MediaType.get_id_by_name(session, "video")
+
+    stop = threading.Event()
+    latencies = [[] for _ in range(readers)]
+    threads = [threading.Thread(target=read_pages, args=(ReadSession, stop, latencies[number], page_size))
+               for number in range(readers)]
+    for thread in threads:
+        thread.start()
+    start = time.perf_counter()
+    with WriteSession() as session:
+        MediaRepository(session).add_media_bulk(media_rows(rows, media_type_id), batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+    write_engine.dispose()
+    read_engine.dispose()
+
+    pages = [latency for thread_latencies in latencies for latency in thread_latencies]
+    return {"rows_per_second": rows / elapsed, "pages_per_second": len(pages) / elapsed,
+            "slowest_page": max(pages, default=0.0)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="Media rows inserted.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per insert transaction.")
+    parser.add_argument("--readers", type=int, default=2, help="Threads paging through the catalog.")
+    parser.add_argument("--page-size", type=int, default=200, help="Rows per page read.")
+    args = parser.parse_args()
+
+    print(f"rows: {args.rows}, batch size: {args.batch_size}, readers: {args.readers}, "
+          f"page size: {args.page_size}")
+    with tempfile.TemporaryDirectory() as directory:
+        for tuned in (False, True):
+            result = run(os.path.join(directory, f"catalog_{'tuned' if tuned else 'stock'}.db"), tuned,
+                         args.rows, args.batch_size, args.readers, args.page_size)
+            print(f"{'tuned' if tuned else 'stock':>5}: {result['rows_per_second']:9.0f} rows/s written, "
+                  f"{result['pages_per_second']:7.1f} pages/s read, "
+                  f"slowest page {result['slowest_page'] * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
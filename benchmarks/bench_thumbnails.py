@@ -0,0 +1,79 @@
+"""
+Scaling benchmark: thumbnail throughput versus worker processes.
+
+Writes `--images` synthetic JPEG photos and `--videos` short synthetic videos
+to a temporary directory, then renders every thumbnail (all tiers, one decode) with `render_thumbnail`
+on a ProcessPoolExecutor of 1, 2, 4, ... up to `--max-workers` processes (a
+fresh output directory each time, so nothing is reused). Reports files per
+second, the speedup over one worker and the parallel efficiency; the work is
+CPU-bound, so efficiency should stay close to 100% up to the physical cores.
+
+Usage:
+    python -m benchmarks.bench_thumbnails --images 400 --videos 40 --max-workers 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import cv2
+
+from app.media_scan.thumbnails.render import init_worker, parse_tiers, render_thumbnail
+from tests.fixtures.video_fixtures import synthetic_frames, write_video
+
+
+def create_corpus(directory: str, images: int, videos: int, size=(1920, 1080)):
+    """
+    Write the benchmark files and return (file_path, media_type, content_hash, resolution) tasks.
+    """
+    tasks = []
+    for seed in range(images):
+        path = os.path.join(directory, f"photo_{seed}.jpg")
+        cv2.imwrite(path, synthetic_frames(seed=seed, count=1, size=size)[0])
+        tasks.append((path, "image", None, f"{size[0]}x{size[1]}"))
+    for seed in range(videos):
+        path = write_video(os.path.join(directory, f"clip_{seed}.avi"),
+                           synthetic_frames(seed=images + seed, count=60, size=(640, 360)))
+        tasks.append((path, "video", None, "640x360"))
+    return tasks
+
+
+def run(tasks, output: str, workers: int, tiers: dict) -> float:
+    """
+    Render every task with `workers` processes and return the elapsed seconds.
+    """
+    render = partial(render_thumbnail, directory=output, tiers=tiers)
+    chunksize = min(32, max(1, len(tasks) // (workers * 4)))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        outcomes = [result[3] for result in executor.map(render, *zip(*tasks), chunksize=chunksize)]
+    elapsed = time.perf_counter() - start
+    assert outcomes.count("failed") == 0
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=400, help="Synthetic 1920x1080 JPEG photos.")
+    parser.add_argument("--videos", type=int, default=40, help="Synthetic 640x360 videos.")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 4, help="Largest pool size tried.")
+    parser.add_argument("--tiers", default="icon:96,medium:320,preview:800", help="Thumbnail tiers, name:pixels.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        tasks = create_corpus(directory, args.images, args.videos)
+        print(f"files: {len(tasks)} ({args.images} images, {args.videos} videos), cpus: {os.cpu_count()}")
+        workers, baseline = 1, None
+        while workers <= args.max_workers:
+            elapsed = run(tasks, os.path.join(directory, f"thumbs_{workers}"), workers, parse_tiers(args.tiers))
+            baseline = baseline or elapsed
+            speedup = baseline / elapsed
+            print(f"workers {workers:>3}: {len(tasks) / elapsed:8.1f} files/s, "
+                  f"speedup {speedup:5.2f}x, efficiency {speedup / workers:6.1%}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
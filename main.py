@@ -1,12 +1,22 @@
 import sys
 import os
+import shutil
 
 # Add the root directory to Python's search path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.media_scan.dal.database import initialize_database, Base
+from app.media_scan.dal.database import initialize_database, pool_metrics, Base
 from app.media_scan.services.media_scanner import MediaScanner
+from app.media_scan.services.metadata_enricher import MetadataEnricher
+from app.media_scan.services.metadata_similarity import MetadataSimilarityService
+from app.media_scan.services.thumbnail_generator import ThumbnailGenerator
+from app.media_scan.thumbnails.packed_store import PackedThumbnailStore
 from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
+from app.media_scan.strategies.content_validation import ContentSniffingValidationStrategy
+from app.media_scan.extractors.composite_metadata import CompositeMetadataExtractor
+from app.media_scan.extractors.ffprobe import FFprobePool
+from app.media_scan.extractors.metadata_cache import MetadataCache
+from app.media_scan.config.settings import config
 
 
 if __name__ == "__main__":
@@ -17,8 +27,21 @@ if __name__ == "__main__":
         # Dynamically create composite strategy
         composite_strategy = CompositeValidationStrategy()
 
-        # Initialize MediaScanner with the strategy
-        app = MediaScanner(composite_strategy)
+        # Extraction results survive database rebuilds in a sidecar cache keyed by stat fingerprint
+        metadata_cache = MetadataCache()
+
+        # Initialize MediaScanner with the strategy, sniffing file headers when the name is ambiguous.
+        # Rows are registered at walk speed; metadata is filled in afterwards by the enricher.
+        app = MediaScanner(
+            composite_strategy,
+            content_strategy=ContentSniffingValidationStrategy(),
+            defer_metadata=True,
+        )
+        enricher = MetadataEnricher(
+            CompositeMetadataExtractor(cache=metadata_cache),
+            # Formats the header parsers cannot read fall back to ffprobe when it is installed
+            ffprobe_pool=FFprobePool(cache=metadata_cache) if shutil.which(config.FFPROBE_PATH) else None,
+        )
 
         user_input_path = input(
             "Please input the directory path to scan for media files: "
@@ -32,6 +55,27 @@ if __name__ == "__main__":
         app.execute_and_save_to_db(user_input_path)
         print("Directory scan completed successfully.")
 
+        print("Extracting metadata for new files...")
+        result = enricher.run()
+        print(f"Metadata: {result.done} extracted, {result.retried} to retry, {result.failed} failed.")
+        print(f"Metadata cache: {metadata_cache.stats()}")
+        metadata_cache.close()
+
+        print("Generating thumbnails...")
+        thumbnail_generator = ThumbnailGenerator()
+        thumbnails = thumbnail_generator.generate()
+        print(f"Thumbnails: {thumbnails.generated} generated, {thumbnails.reused} shared with duplicates, "
+              f"{thumbnails.failed} failed.")
+        # The GUI grid reads thumbnails from packed segment files instead of one file each
+        with PackedThumbnailStore() as thumbnail_store:
+            print(f"Thumbnails packed: {thumbnail_generator.pack(thumbnail_store, tier='icon')}")
+
+        # Only new or changed rows are re-vectorized; the index is saved for the next start
+        similarity = MetadataSimilarityService()
+        similarity.refresh()
+        print(f"Metadata near-duplicate candidates: {len(similarity.duplicate_groups())} groups.")
+        print(f"Database pools: write {pool_metrics()}, read {pool_metrics(read_only=True)}")
+
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
         sys.exit(1)  # Exit with an error status code
@@ -0,0 +1,119 @@
+"""
+Unit tests for the AudioMetadataExtractor WAV, FLAC, MP3, Ogg and ADTS parsers.
+
+The corpus is built from synthetic headers (see tests/fixtures/header_fixtures.py).
+"""
+
+import pytest
+
+from app.media_scan.extractors.audio_metadata import AudioMetadataExtractor
+from app.media_scan.extractors.composite_metadata import CompositeMetadataExtractor
+from tests.fixtures.header_fixtures import (
+    build_adts, build_flac, build_mp3, build_ogg, build_wav
+)
+
+MP3_FRAME_SECONDS = 1152 / 44100
+
+
+def extract(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return AudioMetadataExtractor().extract(str(path))
+
+
+@pytest.mark.parametrize("kwargs, expected", [
+    ({}, {"duration": 2.0, "codec": "PCM", "bit_rate": 1_411_200}),
+    ({"sample_rate": 8000, "channels": 1, "bits": 8, "seconds": 3.0},
+     {"duration": 3.0, "codec": "PCM", "bit_rate": 64_000}),
+    ({"data_size": 0xFFFFFFFF}, {"duration": 2.0, "codec": "PCM", "bit_rate": 1_411_200}),
+    ({"codec_tag": 3, "bits": 32}, {"duration": 2.0, "codec": "PCM float", "bit_rate": 2_822_400}),
+])
+def test_extract_wav(tmp_path, kwargs, expected):
+    """
+    Test WAV duration from the data chunk size and byte rate, including streamed (unsized) files.
+    """
+    assert extract(tmp_path, "a.wav", build_wav(**kwargs)) == expected
+
+
+def test_extract_flac(tmp_path):
+    """
+    Test FLAC duration from STREAMINFO and average bit rate from the file size.
+    """
+    data = build_flac(sample_rate=48000, total_samples=480000)
+    assert extract(tmp_path, "a.flac", data) == {
+        "duration": 10.0, "codec": "FLAC", "bit_rate": int(len(data) * 8 / 10.0)
+    }
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"vbr_header": "Xing"},
+    {"vbr_header": "Xing", "mono": True},
+    {"vbr_header": "VBRI"},
+    {"vbr_header": "Xing", "id3_size": 100_000},
+])
+def test_extract_mp3_vbr_header(tmp_path, kwargs):
+    """
+    Test MP3 duration from the Xing/VBRI frame count, also behind a large ID3v2 tag.
+    """
+    metadata = extract(tmp_path, "a.mp3", build_mp3(frames=200, **kwargs))
+    duration = 200 * MP3_FRAME_SECONDS
+    assert metadata == {"duration": pytest.approx(duration), "codec": "MP3", "bit_rate": int(200 * 417 * 8 / duration)}
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"id3_size": 2048, "id3v1": True}])
+def test_extract_mp3_cbr(tmp_path, kwargs):
+    """
+    Test CBR MP3 duration from the first frame's bit rate and the audio size, excluding ID3 tags.
+    """
+    metadata = extract(tmp_path, "a.mp3", build_mp3(frames=500, **kwargs))
+    assert metadata["codec"] == "MP3"
+    assert metadata["bit_rate"] == 128_000
+    assert metadata["duration"] == pytest.approx(500 * MP3_FRAME_SECONDS, rel=0.01)
+
+
+@pytest.mark.parametrize("kwargs, expected", [
+    ({"codec": "vorbis", "sample_rate": 44100, "final_granule": 441000}, {"duration": 10.0, "codec": "Vorbis"}),
+    ({"codec": "opus", "final_granule": 480312, "pre_skip": 312}, {"duration": 10.0, "codec": "Opus"}),
+    ({"codec": "vorbis", "padding_pages": 40, "trailing_stream": True}, {"duration": 10.0, "codec": "Vorbis"}),
+])
+def test_extract_ogg(tmp_path, kwargs, expected):
+    """
+    Test Ogg duration from the last page's granule position of the first logical stream.
+    """
+    data = build_ogg(**kwargs)
+    metadata = extract(tmp_path, "a.ogg", data)
+    assert metadata.pop("bit_rate") == int(len(data) * 8 / 10.0)
+    assert metadata == expected
+
+
+def test_extract_adts(tmp_path):
+    """
+    Test AAC (ADTS) duration extrapolated from the frames at the start of the file.
+    """
+    metadata = extract(tmp_path, "a.aac", build_adts(frames=430))
+    assert metadata["codec"] == "AAC"
+    assert metadata["duration"] == pytest.approx(430 * 1024 / 44100)
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"plain text, not audio",
+    build_wav()[:30],
+    b"fLaC\x80\x00\x00\x22",
+    build_ogg()[:20],
+    b"\xff\xfb\x90",
+])
+def test_extract_unparseable_returns_empty(tmp_path, data):
+    """
+    Test truncated, corrupt or non-audio files yield no metadata instead of raising.
+    """
+    assert extract(tmp_path, "broken.mp3", data) == {}
+
+
+def test_composite_dispatches_audio(tmp_path):
+    """
+    Test the composite extractor routes audio files to the audio extractor.
+    """
+    path = tmp_path / "a.wav"
+    path.write_bytes(build_wav(seconds=1.0))
+    assert CompositeMetadataExtractor().extract(str(path), "audio")["duration"] == 1.0
@@ -0,0 +1,174 @@
+"""
+Unit tests for the ffprobe extractor and worker pool, run against a stub ffprobe executable.
+"""
+
+import json
+import os
+import sys
+import time
+
+import pytest
+
+from app.media_scan.extractors.ffprobe import (
+    FFprobeError, FFprobeExtractor, FFprobePool, parse_ffprobe_output
+)
+
+PROBE_OUTPUT = {
+    "streams": [
+        {"codec_type": "audio", "codec_name": "mp3"},
+        {"codec_type": "video", "codec_name": "mpeg4", "width": 640, "height": 480},
+    ],
+    "format": {"duration": "95.200000", "bit_rate": "1200000"},
+}
+
+# The stub behaves according to the probed file's name
+STUB_SOURCE = f'''#!{sys.executable}
+import json, sys, time
+path = sys.argv[-1]
+if "slow" in path:
+    time.sleep(30)
+if "broken" in path:
+    sys.stderr.write("Invalid data found when processing input\\n")
+    sys.exit(1)
+if "garbage" in path:
+    print("not json")
+    sys.exit(0)
+print(json.dumps({PROBE_OUTPUT!r}))
+'''
+
+
+@pytest.fixture
+def stub_ffprobe(tmp_path):
+    """
+    Write an executable stub ffprobe script and return its path.
+    """
+    path = tmp_path / "ffprobe"
+    path.write_text(STUB_SOURCE)
+    path.chmod(0o755)
+    return str(path)
+
+
+def media_file(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(b"\x00" * 16)
+    return str(path)
+
+
+def test_parse_ffprobe_output():
+    """
+    Test video stream fields take precedence and numeric strings are converted.
+    """
+    assert parse_ffprobe_output(PROBE_OUTPUT) == {
+        "duration": 95.2, "bit_rate": 1_200_000, "codec": "MPEG-4", "resolution": "640x480", "width": 640, "height": 480
+    }
+
+
+def test_parse_ffprobe_output_audio_only_and_missing_fields():
+    """
+    Test audio-only output and 'N/A' fields.
+    """
+    probe = {"streams": [{"codec_type": "audio", "codec_name": "wmav2"}],
+             "format": {"duration": "N/A", "bit_rate": "N/A"}}
+    assert parse_ffprobe_output(probe) == {"codec": "WMA"}
+    assert parse_ffprobe_output({}) == {}
+
+
+@pytest.mark.skipif(os.name == "nt", reason="stub ffprobe is a shebang script")
+def test_probe_success(tmp_path, stub_ffprobe):
+    """
+    Test a successful probe returns the parsed Media columns.
+    """
+    extractor = FFprobeExtractor(executable=stub_ffprobe, timeout=10)
+    assert extractor.probe(media_file(tmp_path, "clip.avi"))["resolution"] == "640x480"
+
+
+@pytest.mark.skipif(os.name == "nt", reason="stub ffprobe is a shebang script")
+@pytest.mark.parametrize("name, message", [
+    ("broken.avi", "exit code 1: Invalid data found"),
+    ("garbage.avi", "invalid JSON"),
+    ("slow.avi", "timed out"),
+])
+def test_probe_failures(tmp_path, stub_ffprobe, name, message):
+    """
+    Test non-zero exits, unparseable output and timeouts raise FFprobeError; a timeout kills the process.
+    """
+    extractor = FFprobeExtractor(executable=stub_ffprobe, timeout=1)
+    start = time.monotonic()
+    with pytest.raises(FFprobeError, match=message):
+        extractor.probe(media_file(tmp_path, name))
+    assert time.monotonic() - start < 10
+    assert extractor.extract(media_file(tmp_path, name)) == {}
+
+
+def test_probe_missing_executable(tmp_path):
+    """
+    Test a missing ffprobe binary raises FFprobeError instead of OSError.
+    """
+    extractor = FFprobeExtractor(executable=str(tmp_path / "no-ffprobe"))
+    with pytest.raises(FFprobeError, match="could not run"):
+        extractor.probe(media_file(tmp_path, "clip.avi"))
+
+
+@pytest.mark.skipif(os.name == "nt", reason="stub ffprobe is a shebang script")
+def test_pool_records_results_failures_and_latency(tmp_path, stub_ffprobe):
+    """
+    Test the pool yields successful results, records failures and keeps one latency per file;
+    a hung file does not hold up the others beyond its timeout.
+    """
+    pool = FFprobePool(FFprobeExtractor(executable=stub_ffprobe, timeout=1), max_workers=4)
+    good = [media_file(tmp_path, f"clip{index}.avi") for index in range(6)]
+    bad = [media_file(tmp_path, "broken.wmv"), media_file(tmp_path, "slow.wmv")]
+    for path in good + bad:
+        pool.submit(path)
+
+    results = dict(pool.drain())
+    pool.shutdown()
+
+    assert sorted(results) == sorted(good)
+    assert set(pool.failures) == set(bad)
+    assert "timed out" in pool.failures[bad[1]]
+    stats = pool.stats()
+    assert stats["probed"] == 8
+    assert stats["failed"] == 2
+    assert stats["p50"] <= stats["p95"] <= stats["max"] < 10
+
+
+def test_pool_completed_does_not_wait(mocker):
+    """
+    Test completed() only returns finished probes and leaves the rest for drain().
+    """
+    def probe(path):
+        if path == "slow":
+            time.sleep(0.5)
+            return {"duration": 1.0}
+        return {"duration": 2.0}
+
+    extractor = mocker.Mock()
+    extractor.probe.side_effect = probe
+    pool = FFprobePool(extractor, max_workers=2)
+    pool.submit("fast")
+    pool.submit("slow")
+    time.sleep(0.2)
+
+    assert list(pool.completed()) == [("fast", {"duration": 2.0})]
+    assert list(pool.drain()) == [("slow", {"duration": 1.0})]
+    pool.shutdown()
+
+
+def test_pool_completed_keeps_probes_finishing_during_the_check(mocker):
+    """
+    Test that a probe completing between done() checks is returned by completed() or drain(), never lost.
+    """
+    pool = FFprobePool(mocker.Mock())
+    finished = mocker.Mock()
+    finished.done.return_value = True
+    finished.result.return_value = ("finished", {"duration": 2.0})
+    racing = mocker.Mock()
+    # Pending on the first done() call, finished on any later one
+    racing.done.side_effect = [False, True, True, True]
+    racing.result.return_value = ("racing", {"duration": 3.0})
+    pool._futures = [finished, racing]
+
+    returned = list(pool.completed()) + list(pool.drain())
+
+    assert returned == [("finished", {"duration": 2.0}), ("racing", {"duration": 3.0})]
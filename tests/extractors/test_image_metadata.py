@@ -0,0 +1,92 @@
+"""
+Unit tests for the ImageMetadataExtractor header parsers.
+
+The corpus is built from synthetic headers (see tests/fixtures/header_fixtures.py).
+"""
+
+import pytest
+
+from app.media_scan.extractors.composite_metadata import CompositeMetadataExtractor
+from app.media_scan.extractors.image_metadata import ImageMetadataExtractor
+from app.media_scan.extractors.media_metadata import PositionalReader
+from tests.fixtures.header_fixtures import (
+    build_bmp, build_gif, build_jpeg, build_png, build_tiff, build_webp
+)
+
+
+@pytest.mark.parametrize("name, data, expected", [
+    ("a.png", build_png(640, 480), {"resolution": "640x480", "width": 640, "height": 480, "codec": "PNG"}),
+    ("a.jpg", build_jpeg(800, 600), {"resolution": "800x600", "width": 800, "height": 600, "codec": "JPEG"}),
+    ("b.jpg", build_jpeg(4032, 3024, sof_marker=0xC2),
+     {"resolution": "4032x3024", "width": 4032, "height": 3024, "codec": "JPEG"}),
+    ("c.jpg", build_jpeg(1920, 1080, exif_size=60_000),
+     {"resolution": "1920x1080", "width": 1920, "height": 1080, "codec": "JPEG"}),
+    ("a.gif", build_gif(320, 200), {"resolution": "320x200", "width": 320, "height": 200, "codec": "GIF"}),
+    ("a.bmp", build_bmp(100, 50), {"resolution": "100x50", "width": 100, "height": 50, "codec": "BMP"}),
+    ("b.bmp", build_bmp(100, 50, top_down=True), {"resolution": "100x50", "width": 100, "height": 50, "codec": "BMP"}),
+    ("c.bmp", build_bmp(64, 32, core_header=True), {"resolution": "64x32", "width": 64, "height": 32, "codec": "BMP"}),
+    ("a.tif", build_tiff(1024, 768), {"resolution": "1024x768", "width": 1024, "height": 768, "codec": "TIFF"}),
+    ("b.tif", build_tiff(70000, 5, big_endian=True, long_values=True),
+     {"resolution": "70000x5", "width": 70000, "height": 5, "codec": "TIFF"}),
+    ("c.tif", build_tiff(300, 200, ifd_offset=4096),
+     {"resolution": "300x200", "width": 300, "height": 200, "codec": "TIFF"}),
+    ("a.webp", build_webp(400, 300), {"resolution": "400x300", "width": 400, "height": 300, "codec": "WebP"}),
+    ("b.webp", build_webp(400, 300, chunk=b"VP8L"),
+     {"resolution": "400x300", "width": 400, "height": 300, "codec": "WebP"}),
+    ("c.webp", build_webp(400, 300, chunk=b"VP8 "),
+     {"resolution": "400x300", "width": 400, "height": 300, "codec": "WebP"}),
+])
+def test_extract_image_dimensions(tmp_path, name, data, expected):
+    """
+    Test dimensions and format are read from each supported header layout.
+    """
+    path = tmp_path / name
+    path.write_bytes(data)
+    assert ImageMetadataExtractor().extract(str(path)) == expected
+
+
+def test_jpeg_skips_large_segments_without_reading_them(tmp_path, mocker):
+    """
+    Test the JPEG walker jumps over an EXIF payload instead of reading it.
+    """
+    path = tmp_path / "exif.jpg"
+    path.write_bytes(build_jpeg(1920, 1080, exif_size=60_000))
+    read_spy = mocker.spy(PositionalReader, "read")
+
+    assert ImageMetadataExtractor().extract(str(path))["resolution"] == "1920x1080"
+    assert sum(call.args[2] for call in read_spy.call_args_list) < 2048
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"not an image at all",
+    build_png()[:20],
+    build_jpeg()[:30],
+    b"\xff\xd8\xff\xda\x00\x02",
+    b"II*\x00" + b"\xff\xff\xff\x7f",
+])
+def test_extract_unparseable_returns_empty(tmp_path, data):
+    """
+    Test truncated, corrupt or non-image files yield no metadata instead of raising.
+    """
+    path = tmp_path / "broken.img"
+    path.write_bytes(data)
+    assert ImageMetadataExtractor().extract(str(path)) == {}
+
+
+def test_extract_missing_file_returns_empty(tmp_path):
+    """
+    Test a file that disappeared before extraction yields no metadata.
+    """
+    assert ImageMetadataExtractor().extract(str(tmp_path / "gone.png")) == {}
+
+
+def test_composite_dispatches_images(tmp_path):
+    """
+    Test the composite extractor routes image files to the image extractor.
+    """
+    path = tmp_path / "a.png"
+    path.write_bytes(build_png(10, 20))
+    assert CompositeMetadataExtractor().extract(str(path), "image") == {
+        "resolution": "10x20", "width": 10, "height": 20, "codec": "PNG"
+    }
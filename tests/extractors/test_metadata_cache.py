@@ -0,0 +1,126 @@
+"""
+Unit tests for the MetadataCache sidecar store and its use by the extractors.
+"""
+
+import os
+
+from app.media_scan.extractors.composite_metadata import CompositeMetadataExtractor
+from app.media_scan.extractors.ffprobe import FFprobePool
+from app.media_scan.extractors.metadata_cache import MetadataCache
+from app.media_scan.utils.stat_snapshot import StatFingerprint
+from tests.fixtures.header_fixtures import build_mp4
+
+
+def fingerprint(index, mtime_ns=1):
+    return StatFingerprint(size=100, mtime_ns=mtime_ns, inode=index, device=1)
+
+
+def test_get_put_and_counters(tmp_path):
+    """
+    Test misses, hits, namespaces and that a changed fingerprint misses.
+    """
+    with MetadataCache(str(tmp_path / "cache.db")) as cache:
+        assert cache.get(fingerprint(1)) is None
+        cache.put(fingerprint(1), {"duration": 1.5, "codec": "H.264"})
+        cache.put(fingerprint(1), {"sha256": "abc"}, namespace="hash")
+
+        assert cache.get(fingerprint(1)) == {"duration": 1.5, "codec": "H.264"}
+        assert cache.get(fingerprint(1), namespace="hash") == {"sha256": "abc"}
+        assert cache.get(fingerprint(1, mtime_ns=2)) is None
+        assert cache.stats() == {"hits": 2, "misses": 2, "hit_rate": 0.5, "evictions": 0, "entries": 2}
+
+
+def test_persists_across_instances(tmp_path):
+    """
+    Test results survive closing and reopening the cache file, including empty results.
+    """
+    path = str(tmp_path / "nested" / "cache.db")
+    with MetadataCache(path) as cache:
+        cache.put(fingerprint(1), {"resolution": "640x480"})
+        cache.put(fingerprint(2), {})
+
+    with MetadataCache(path) as cache:
+        assert len(cache) == 2
+        assert cache.get(fingerprint(1)) == {"resolution": "640x480"}
+        assert cache.get(fingerprint(2)) == {}
+
+
+def test_put_overwrites_existing_entry(tmp_path):
+    """
+    Test storing a result for a cached fingerprint replaces it rather than adding an entry.
+    """
+    with MetadataCache(str(tmp_path / "cache.db")) as cache:
+        cache.put(fingerprint(1), {"codec": "old"})
+        cache.put(fingerprint(1), {"codec": "new"})
+        assert len(cache) == 1
+        assert cache.get(fingerprint(1)) == {"codec": "new"}
+
+
+def test_evicts_least_recently_accessed(tmp_path):
+    """
+    Test the cache stays within max_entries and a recent hit protects an entry from eviction.
+    """
+    with MetadataCache(str(tmp_path / "cache.db"), max_entries=3) as cache:
+        for index in range(3):
+            cache.put(fingerprint(index), {"index": index})
+        cache.get(fingerprint(0))  # 1 is now the least recently used
+        cache.put(fingerprint(3), {"index": 3})
+
+        assert len(cache) == 3
+        assert cache.get(fingerprint(1)) is None
+        assert [cache.get(fingerprint(index)) for index in (0, 2, 3)] == [{"index": 0}, {"index": 2}, {"index": 3}]
+        assert cache.stats()["evictions"] == 1
+
+
+def test_composite_extractor_consults_cache_before_reading(tmp_path, mocker):
+    """
+    Test a cached file is answered without running its extractor, and a modified file is re-extracted.
+    """
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(build_mp4())
+    cache = MetadataCache(":memory:")
+    extractor = CompositeMetadataExtractor(cache=cache)
+    video_spy = mocker.spy(extractor.extractors["video"], "extract")
+
+    first = extractor.extract(str(path), "video")
+    second = extractor.extract(str(path), "video", os.stat(path))
+    assert first == second
+    assert video_spy.call_count == 1
+
+    os.utime(path, ns=(0, 1_000_000_000))
+    extractor.extract(str(path), "video")
+    assert video_spy.call_count == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_cached_results_gain_width_and_height(tmp_path):
+    """
+    Test results cached with only a resolution string come back with integer dimensions.
+    """
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(build_mp4())
+    cache = MetadataCache(":memory:")
+    cache.put(os.stat(path), {"duration": 12.5, "resolution": "640x360"})
+
+    metadata = CompositeMetadataExtractor(cache=cache).extract(str(path), "video")
+
+    assert metadata == {"duration": 12.5, "resolution": "640x360", "width": 640, "height": 360}
+
+
+def test_ffprobe_pool_consults_cache(tmp_path, mocker):
+    """
+    Test a file probed once is served from the cache on the next run.
+    """
+    path = tmp_path / "old.avi"
+    path.write_bytes(b"x" * 10)
+    cache = MetadataCache(":memory:")
+    extractor = mocker.Mock()
+    extractor.probe.return_value = {"duration": 3.0}
+
+    for _ in range(2):
+        pool = FFprobePool(extractor, max_workers=1, cache=cache)
+        pool.submit(str(path))
+        assert list(pool.drain()) == [(str(path), {"duration": 3.0})]
+        pool.shutdown()
+
+    extractor.probe.assert_called_once()
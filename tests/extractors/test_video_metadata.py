@@ -0,0 +1,87 @@
+"""
+Unit tests for the VideoMetadataExtractor MP4/MOV and Matroska header parsers.
+
+The corpus is built from synthetic headers (see tests/fixtures/header_fixtures.py).
+"""
+
+import pytest
+
+from app.media_scan.extractors.composite_metadata import CompositeMetadataExtractor
+from app.media_scan.extractors.video_metadata import VideoMetadataExtractor, parse_video_header
+from tests.fixtures.header_fixtures import build_mkv, build_mp4
+
+
+@pytest.mark.parametrize("kwargs, expected", [
+    ({}, {"duration": 12.5, "resolution": "1920x1080", "width": 1920, "height": 1080, "codec": "H.264"}),
+    ({"moov_at_end": True},
+     {"duration": 12.5, "resolution": "1920x1080", "width": 1920, "height": 1080, "codec": "H.264"}),
+    ({"mvhd_version": 1, "timescale": 90000, "duration": 900000},
+     {"duration": 10.0, "resolution": "1920x1080", "width": 1920, "height": 1080, "codec": "H.264"}),
+    ({"video_format": b"hvc1", "width": 3840, "height": 2160},
+     {"duration": 12.5, "resolution": "3840x2160", "width": 3840, "height": 2160, "codec": "H.265"}),
+    ({"video_format": None}, {"duration": 12.5, "codec": "AAC"}),
+    ({"video_format": b"xyz1"},
+     {"duration": 12.5, "resolution": "1920x1080", "width": 1920, "height": 1080, "codec": "xyz1"}),
+])
+def test_parse_mp4(kwargs, expected):
+    """
+    Test MP4 parsing for moov before/after mdat, 64-bit mvhd, other codecs and audio-only files.
+    """
+    data = build_mp4(**kwargs)
+    metadata = parse_video_header(data)
+    bit_rate = metadata.pop("bit_rate")
+    assert metadata == expected
+    assert bit_rate == int(len(data) * 8 / expected["duration"])
+
+
+@pytest.mark.parametrize("kwargs, expected", [
+    ({}, {"duration": 12.5, "resolution": "1280x720", "width": 1280, "height": 720, "codec": "H.264"}),
+    ({"tracks_after_cluster": True},
+     {"duration": 12.5, "resolution": "1280x720", "width": 1280, "height": 720, "codec": "H.264"}),
+    ({"unknown_segment_size": True},
+     {"duration": 12.5, "resolution": "1280x720", "width": 1280, "height": 720, "codec": "H.264"}),
+    ({"float_size": 4, "timecode_scale": 1_000_000_000, "duration_ticks": 90.0},
+     {"duration": 90.0, "resolution": "1280x720", "width": 1280, "height": 720, "codec": "H.264"}),
+    ({"video_codec": b"V_VP9", "width": 640, "height": 360},
+     {"duration": 12.5, "resolution": "640x360", "width": 640, "height": 360, "codec": "VP9"}),
+    ({"video_codec": None}, {"duration": 12.5, "codec": "Opus"}),
+])
+def test_parse_matroska(kwargs, expected):
+    """
+    Test Matroska parsing, including Tracks reached through the SeekHead and unknown-size Segments.
+    """
+    metadata = parse_video_header(build_mkv(**kwargs))
+    metadata.pop("bit_rate")
+    assert metadata == expected
+
+
+def test_extract_from_file(tmp_path):
+    """
+    Test extraction through the file-based API and the composite extractor.
+    """
+    clip = tmp_path / "clip.mkv"
+    clip.write_bytes(build_mkv())
+
+    metadata = CompositeMetadataExtractor().extract(str(clip), "video")
+
+    assert metadata["resolution"] == "1280x720"
+    assert metadata["codec"] == "H.264"
+    assert metadata["duration"] == pytest.approx(12.5)
+
+
+@pytest.mark.parametrize("data", [b"", b"plain text", build_mp4()[:60], build_mkv()[:30]])
+def test_extract_unrecognised_or_truncated(tmp_path, data):
+    """
+    Test that empty, unknown and truncated files yield no metadata instead of raising.
+    """
+    clip = tmp_path / "broken.mp4"
+    clip.write_bytes(data)
+    metadata = VideoMetadataExtractor().extract(str(clip))
+    assert "resolution" not in metadata
+
+
+def test_extract_missing_file(tmp_path):
+    """
+    Test that a file that vanished yields no metadata.
+    """
+    assert VideoMetadataExtractor().extract(str(tmp_path / "gone.mp4")) == {}
@@ -73,3 +73,29 @@ def test_db_session(test_db_engine, test_db_tables):
     session = Session()
     yield session
     session.close()
+
+
+@pytest.fixture()
+def seeded_db_session(test_db_session):
+    """
+    Fixture for a database session with the standard media types seeded.
+
+    The tables are shared across the whole test session, so every media and
+    media type row is removed again once the test function finishes.
+
+    Yields:
+        sqlalchemy.orm.Session: A database session with 'video', 'audio' and
+        'image' media types registered.
+    """
+    from app.media_scan.models.media import Media
+    from app.media_scan.models.media_type import MediaType
+
+    for name in ("video", "audio", "image"):
+        if not test_db_session.query(MediaType).filter_by(name=name).first():
+            test_db_session.add(MediaType(name=name))
+    test_db_session.commit()
+    yield test_db_session
+    test_db_session.rollback()
+    test_db_session.query(Media).delete()
+    test_db_session.query(MediaType).delete()
+    test_db_session.commit()
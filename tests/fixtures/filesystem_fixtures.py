@@ -0,0 +1,41 @@
+"""
+Filesystem fakes for walker and scanner tests.
+"""
+
+import os
+
+
+def failing_stat_scandir(failing_paths):
+    """
+    Return an ``os.scandir`` replacement whose entries fail to stat for the given paths.
+    """
+    real_scandir = os.scandir
+    failing_paths = set(failing_paths)
+
+    class Entry:
+        def __init__(self, entry):
+            self._entry = entry
+            self.name, self.path = entry.name, entry.path
+
+        def is_dir(self, follow_symlinks=True):
+            return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+        def is_file(self):
+            return self._entry.is_file()
+
+        def stat(self):
+            if self.path in failing_paths:
+                raise PermissionError(13, "Permission denied", self.path)
+            return self._entry.stat()
+
+    class Scandir:
+        def __init__(self, path):
+            self._entries = real_scandir(path)
+
+        def __enter__(self):
+            return (Entry(entry) for entry in self._entries)
+
+        def __exit__(self, *exc_info):
+            self._entries.close()
+
+    return Scandir
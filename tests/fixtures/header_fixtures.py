@@ -0,0 +1,252 @@
+"""
+Builders for synthetic media container headers.
+
+The extractor tests write these to temporary files instead of shipping real
+media samples; each builder produces the smallest structure the parser needs.
+"""
+
+import struct
+
+
+def mp4_box(box_type: bytes, payload: bytes = b"", large: bool = False) -> bytes:
+    """
+    Build an ISO BMFF box, optionally with a 64-bit size.
+    """
+    if large:
+        return struct.pack(">I4sQ", 1, box_type, len(payload) + 16) + payload
+    return struct.pack(">I4s", len(payload) + 8, box_type) + payload
+
+
+def mp4_full_box(box_type: bytes, version: int, payload: bytes) -> bytes:
+    return mp4_box(box_type, struct.pack(">B3x", version) + payload)
+
+
+def mp4_mvhd(timescale: int, duration: int, version: int = 0) -> bytes:
+    if version == 1:
+        body = struct.pack(">QQIQ", 0, 0, timescale, duration)
+    else:
+        body = struct.pack(">IIII", 0, 0, timescale, duration)
+    return mp4_full_box(b"mvhd", version, body + b"\x00" * 80)
+
+
+def mp4_tkhd(width: int, height: int) -> bytes:
+    # creation, modification, track id, reserved, duration, reserved(8), layer/group/volume/reserved, matrix
+    body = struct.pack(">IIIII8x8x36x", 0, 0, 1, 0, 0) + struct.pack(">II", width << 16, height << 16)
+    return mp4_full_box(b"tkhd", 0, body)
+
+
+def mp4_trak(handler: bytes, sample_format: bytes, width: int = 0, height: int = 0) -> bytes:
+    hdlr = mp4_full_box(b"hdlr", 0, struct.pack(">I4s12x", 0, handler) + b"\x00")
+    sample_entry = struct.pack(">I4s6xH16xHH", 86, sample_format, 1, width, height) + b"\x00" * 50
+    stsd = mp4_full_box(b"stsd", 0, struct.pack(">I", 1) + sample_entry)
+    stbl = mp4_box(b"stbl", stsd + mp4_box(b"stts", b"\x00" * 8))
+    minf = mp4_box(b"minf", mp4_box(b"vmhd", b"\x00" * 12) + stbl)
+    mdia = mp4_box(b"mdia", mp4_full_box(b"mdhd", 0, b"\x00" * 20) + hdlr + minf)
+    return mp4_box(b"trak", mp4_tkhd(width, height) + mdia)
+
+
+def build_mp4(timescale=1000, duration=12_500, width=1920, height=1080, video_format=b"avc1",
+              audio_format=b"mp4a", moov_at_end=False, mdat_size=4096, mvhd_version=0) -> bytes:
+    """
+    Build a minimal MP4 with an ftyp, an mdat and a moov holding a video and an audio track.
+    """
+    ftyp = mp4_box(b"ftyp", b"isom\x00\x00\x02\x00isomavc1")
+    tracks = b""
+    if video_format:
+        tracks += mp4_trak(b"vide", video_format, width, height)
+    if audio_format:
+        tracks += mp4_trak(b"soun", audio_format)
+    moov = mp4_box(b"moov", mp4_mvhd(timescale, duration, mvhd_version) + tracks)
+    mdat = mp4_box(b"mdat", b"\x00" * mdat_size, large=True)
+    return ftyp + (mdat + moov if moov_at_end else moov + mdat)
+
+
+def ebml_id(element_id: int) -> bytes:
+    length = (element_id.bit_length() + 7) // 8
+    return element_id.to_bytes(length, "big")
+
+
+def ebml_size(size: int) -> bytes:
+    for length in range(1, 9):
+        if size < (1 << (7 * length)) - 1:
+            # The length marker bit sits just above the 7 * length value bits
+            return (size | (1 << (7 * length))).to_bytes(length, "big")
+    raise ValueError("EBML size too large")
+
+
+def ebml(element_id: int, payload: bytes = b"") -> bytes:
+    return ebml_id(element_id) + ebml_size(len(payload)) + payload
+
+
+def ebml_uint(element_id: int, value: int) -> bytes:
+    return ebml(element_id, value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big"))
+
+
+def build_mkv(duration_ticks=12_500.0, timecode_scale=1_000_000, width=1280, height=720,
+              video_codec=b"V_MPEG4/ISO/AVC", audio_codec=b"A_OPUS", tracks_after_cluster=False,
+              unknown_segment_size=False, float_size=8) -> bytes:
+    """
+    Build a minimal Matroska file with EBML header, Segment Info, Tracks and one Cluster.
+    """
+    header = ebml(0x1A45DFA3, ebml(0x4282, b"matroska"))
+    duration = struct.pack(">d" if float_size == 8 else ">f", duration_ticks)
+    info = ebml(0x1549A966, ebml_uint(0x2AD7B1, timecode_scale) + ebml(0x4489, duration))
+    entries = b""
+    if video_codec:
+        video = ebml(0xE0, ebml_uint(0xB0, width) + ebml_uint(0xBA, height))
+        entries += ebml(0xAE, ebml_uint(0xD7, 1) + ebml_uint(0x83, 1) + ebml(0x86, video_codec) + video)
+    if audio_codec:
+        entries += ebml(0xAE, ebml_uint(0xD7, 2) + ebml_uint(0x83, 2) + ebml(0x86, audio_codec))
+    tracks = ebml(0x1654AE6B, entries)
+    cluster = ebml(0x1F43B675, ebml_uint(0xE7, 0) + b"\xa3\x84\x81\x00\x00\x80")
+
+    if tracks_after_cluster:
+        # SeekHead positions are relative to the start of the Segment data
+        def seek_head(tracks_position):
+            seek = ebml(0x4DBB, ebml(0x53AB, ebml_id(0x1654AE6B))
+                        + ebml(0x53AC, tracks_position.to_bytes(4, "big")))
+            return ebml(0x114D9B74, seek)
+        placeholder = seek_head(0)
+        tracks_position = len(placeholder) + len(info) + len(cluster)
+        body = seek_head(tracks_position) + info + cluster + tracks
+    else:
+        body = info + tracks + cluster
+
+    size = b"\x01\xff\xff\xff\xff\xff\xff\xff" if unknown_segment_size else ebml_size(len(body))
+    return header + ebml_id(0x18538067) + size + body
+
+
+def build_png(width=640, height=480) -> bytes:
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + b"\x00" * 4
+
+
+def build_jpeg(width=800, height=600, sof_marker=0xC0, exif_size=0) -> bytes:
+    """
+    JPEG with an optional APP1 (EXIF) segment of exif_size bytes before the frame header.
+    """
+    segments = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    if exif_size:
+        segments += b"\xff\xe1" + struct.pack(">H", exif_size + 2) + b"\x00" * exif_size
+    segments += b"\xff\xdb" + struct.pack(">H", 67) + b"\x00" * 65
+    sof = struct.pack(">BHHB", 8, height, width, 3) + b"\x01\x22\x00" * 3
+    segments += bytes([0xFF, sof_marker]) + struct.pack(">H", len(sof) + 2) + sof
+    return b"\xff\xd8" + segments + b"\xff\xda" + struct.pack(">H", 2) + b"\x00" * 64 + b"\xff\xd9"
+
+
+def build_gif(width=320, height=200) -> bytes:
+    return b"GIF89a" + struct.pack("<HHBBB", width, height, 0, 0, 0) + b";"
+
+
+def build_bmp(width=100, height=50, core_header=False, top_down=False) -> bytes:
+    if core_header:
+        dib = struct.pack("<IHHHH", 12, width, height, 1, 24)
+    else:
+        dib = struct.pack("<IiiHH", 40, width, -height if top_down else height, 1, 24) + b"\x00" * 24
+    return b"BM" + struct.pack("<IHHI", 14 + len(dib), 0, 0, 14 + len(dib)) + dib
+
+
+def build_tiff(width=1024, height=768, big_endian=False, long_values=False, ifd_offset=8) -> bytes:
+    order = ">" if big_endian else "<"
+    magic = b"MM\x00*" if big_endian else b"II*\x00"
+    entries = [struct.pack(order + "HHII", 254, 4, 1, 0)]  # NewSubfileType, ignored by the parser
+    for tag, value in ((256, width), (257, height)):
+        if long_values:
+            entries.append(struct.pack(order + "HHII", tag, 4, 1, value))
+        else:
+            entries.append(struct.pack(order + "HHIHH", tag, 3, 1, value, 0))
+    ifd = struct.pack(order + "H", len(entries)) + b"".join(entries) + struct.pack(order + "I", 0)
+    padding = b"\x00" * (ifd_offset - 8)
+    return magic + struct.pack(order + "I", ifd_offset) + padding + ifd
+
+
+def build_webp(width=400, height=300, chunk=b"VP8X") -> bytes:
+    if chunk == b"VP8X":
+        payload = b"\x00" * 4 + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little")
+    elif chunk == b"VP8L":
+        payload = b"\x2f" + struct.pack("<I", (width - 1) | ((height - 1) << 14))
+    else:
+        payload = b"\x00" * 3 + b"\x9d\x01\x2a" + struct.pack("<HH", width, height)
+    body = b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def build_wav(sample_rate=44100, channels=2, bits=16, seconds=2.0, data_size=None, codec_tag=1) -> bytes:
+    """
+    data_size overrides the declared data chunk size (e.g. 0xFFFFFFFF for streamed files).
+    """
+    block_align = channels * bits // 8
+    samples = b"\x00" * int(sample_rate * seconds) * block_align
+    fmt = struct.pack("<HHIIHH", codec_tag, channels, sample_rate, sample_rate * block_align, block_align, bits)
+    chunks = b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    chunks += b"LIST" + struct.pack("<I", 5) + b"INFO\x00\x00"  # odd-sized chunk with pad byte
+    chunks += b"data" + struct.pack("<I", len(samples) if data_size is None else data_size) + samples
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks
+
+
+def build_flac(sample_rate=44100, total_samples=441000, padding=4096) -> bytes:
+    info = (sample_rate << 44) | (1 << 41) | (15 << 36) | total_samples
+    streaminfo = struct.pack(">HH", 4096, 4096) + b"\x00" * 6 + info.to_bytes(8, "big") + b"\x00" * 16
+    return b"fLaC" + b"\x80" + len(streaminfo).to_bytes(3, "big") + streaminfo + b"\x00" * padding
+
+
+def id3v2_tag(size: int) -> bytes:
+    synchsafe = bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b"ID3\x04\x00\x00" + synchsafe + b"\x00" * size
+
+
+def build_mp3(frames=100, vbr_header=None, mono=False, id3_size=0, id3v1=False) -> bytes:
+    """
+    MPEG-1 Layer III, 128 kbit/s, 44.1 kHz frames (417 bytes each).
+
+    vbr_header: None (CBR), "Xing" or "VBRI"; the header frame declares `frames` audio frames.
+    """
+    frame_header = b"\xff\xfb\x90" + (b"\xc0" if mono else b"\x00")
+    frame = frame_header + b"\x00" * 413
+    data = b""
+    if vbr_header == "Xing":
+        side_info = b"\x00" * (17 if mono else 32)
+        body = side_info + b"Xing" + struct.pack(">III", 3, frames, frames * 417)
+        data += frame_header + body + b"\x00" * (413 - len(body))
+    elif vbr_header == "VBRI":
+        body = b"\x00" * 32 + b"VBRI" + struct.pack(">HHHII", 1, 0, 75, frames * 417, frames)
+        data += frame_header + body + b"\x00" * (413 - len(body))
+    data += frame * frames
+    prefix = id3v2_tag(id3_size) if id3_size else b""
+    suffix = b"TAG" + b"\x00" * 125 if id3v1 else b""
+    return prefix + data + suffix
+
+
+def ogg_page(payload: bytes, granule: int, serial=0x1234, sequence=0, header_type=0) -> bytes:
+    segments = [255] * (len(payload) // 255) + [len(payload) % 255]
+    return (b"OggS\x00" + bytes([header_type]) + struct.pack("<qIII", granule, serial, sequence, 0)
+            + bytes([len(segments)]) + bytes(segments) + payload)
+
+
+def build_ogg(codec="vorbis", sample_rate=44100, final_granule=441000, pre_skip=312,
+              padding_pages=10, serial=0x1234, trailing_stream=False) -> bytes:
+    """
+    trailing_stream appends a page from another logical stream (serial + 1) after the last page.
+    """
+    if codec == "vorbis":
+        identification = b"\x01vorbis" + struct.pack("<IBIiiiB", 0, 2, sample_rate, 0, 128000, 0, 0xB8) + b"\x01"
+    else:
+        identification = b"OpusHead" + struct.pack("<BBHIhB", 1, 2, pre_skip, sample_rate, 0, 0)
+    data = ogg_page(identification, 0, serial, 0, header_type=2)
+    for sequence in range(1, padding_pages + 1):
+        data += ogg_page(b"\x00" * 4000, final_granule * sequence // (padding_pages + 1), serial, sequence)
+    data += ogg_page(b"\x00" * 100, final_granule, serial, padding_pages + 1, header_type=4)
+    if trailing_stream:
+        data += ogg_page(b"\x00" * 100, 2 ** 40, serial + 1, 0, header_type=4)
+    return data
+
+
+def build_adts(frames=430, frame_length=372, sample_rate_index=4) -> bytes:
+    """
+    AAC-LC ADTS stream of equal-length frames (1024 samples each).
+    """
+    header = bytes([
+        0xFF, 0xF1, 0x40 | (sample_rate_index << 2), 0x80 | ((frame_length >> 11) & 3),
+        (frame_length >> 3) & 0xFF, ((frame_length & 7) << 5) | 0x1F, 0xFC,
+    ])
+    return (header + b"\x00" * (frame_length - 7)) * frames
@@ -0,0 +1,33 @@
+"""
+Synthetic video files for the perceptual fingerprint tests, written with OpenCV.
+"""
+
+import cv2
+import numpy as np
+
+
+def synthetic_frames(seed: int, count: int = 40, size=(160, 120)):
+    """
+    Frames of a coarse random block pattern that drifts over time; each seed is a different "video".
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    pattern = rng.integers(0, 256, size=(6, 8), dtype=np.uint8)
+    frames = []
+    for index in range(count):
+        blocks = np.roll(pattern, shift=index // 10, axis=1)
+        gray = cv2.resize(blocks, (width, height), interpolation=cv2.INTER_NEAREST)
+        frames.append(cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR))
+    return frames
+
+
+def write_video(path, frames, size=None, fourcc="MJPG", fps=10):
+    """
+    Encode frames to `path`, optionally resized to `size` (width, height).
+    """
+    size = size or (frames[0].shape[1], frames[0].shape[0])
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), fps, size)
+    for frame in frames:
+        writer.write(cv2.resize(frame, size, interpolation=cv2.INTER_AREA))
+    writer.release()
+    return str(path)
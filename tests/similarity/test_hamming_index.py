@@ -0,0 +1,62 @@
+"""
+Unit tests for MultiIndexHashIndex, checked against brute-force Hamming search.
+"""
+
+import numpy as np
+import pytest
+
+from app.media_scan.similarity.hamming_index import MultiIndexHashIndex
+
+
+def flip_bits(signature, bits, rng):
+    flipped = signature.copy()
+    for bit in rng.choice(signature.size * 64, size=bits, replace=False):
+        flipped[bit // 64] ^= np.uint64(1) << np.uint64(bit % 64)
+    return flipped
+
+
+def brute_force_pairs(signatures, max_distance):
+    codes = [int.from_bytes(signature.astype("<u8").tobytes(), "little") for signature in signatures]
+    return sorted(
+        (a, b, (codes[a] ^ codes[b]).bit_count())
+        for a in range(len(codes)) for b in range(a + 1, len(codes))
+        if (codes[a] ^ codes[b]).bit_count() <= max_distance
+    )
+
+
+@pytest.mark.parametrize("words, max_distance", [(1, 3), (1, 10), (4, 16), (4, 40)])
+def test_pairs_within_matches_brute_force(words, max_distance):
+    """
+    Test the index finds exactly the pairs brute force finds, for search radii of zero and above.
+    """
+    rng = np.random.default_rng(7)
+    base = rng.integers(0, 2 ** 63, size=(150, words), dtype=np.uint64)
+    near = np.array([flip_bits(base[i], int(rng.integers(0, max_distance + 3)), rng) for i in range(50)])
+    signatures = np.concatenate([base, near])
+    index = MultiIndexHashIndex(words=words)
+    index.add_many(signatures)
+
+    assert index.pairs_within(max_distance) == brute_force_pairs(signatures, max_distance)
+
+
+def test_query_sorted_by_distance():
+    """
+    Test query returns matches within the distance, closest first.
+    """
+    rng = np.random.default_rng(1)
+    signature = rng.integers(0, 2 ** 63, size=2, dtype=np.uint64)
+    index = MultiIndexHashIndex(words=2)
+    index.add_many([flip_bits(signature, 5, rng), signature, flip_bits(signature, 60, rng)])
+
+    assert index.query(signature, 10) == [(1, 0), (0, 5)]
+    assert len(index) == 3
+
+
+def test_rejects_mismatched_width():
+    """
+    Test substring widths that do not divide the code, and signatures of the wrong width, are rejected.
+    """
+    with pytest.raises(ValueError):
+        MultiIndexHashIndex(words=1, substring_bits=24)
+    with pytest.raises(ValueError):
+        MultiIndexHashIndex(words=2).add(np.zeros(3, dtype=np.uint64))
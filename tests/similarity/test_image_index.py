@@ -0,0 +1,107 @@
+"""
+Unit tests for batched NumPy image hashes and ImageHashIndex, checked against brute force.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from app.media_scan.similarity.image_hash import batch_dhash, batch_phash, load_grayscale, popcount
+from app.media_scan.similarity.image_index import ImageHashIndex
+from app.media_scan.similarity.perceptual_hash import dhash, phash
+from tests.fixtures.video_fixtures import synthetic_frames
+
+
+def random_hashes(count, seed=0):
+    return np.random.default_rng(seed).integers(0, 2 ** 64, size=count, dtype=np.uint64, endpoint=False)
+
+
+def flip(value, bits, rng):
+    for bit in rng.choice(64, size=bits, replace=False):
+        value ^= np.uint64(1) << np.uint64(bit)
+    return value
+
+
+def test_batch_hashes_match_single_image_hashes():
+    """
+    Test the vectorized hashes agree with the per-image OpenCV implementations.
+    """
+    images = [synthetic_frames(seed=seed, count=1, size=(320, 240))[0][:, :, 0] for seed in range(5)]
+
+    assert [int(value) for value in batch_dhash(images)] == [dhash(image) for image in images]
+    for value, image in zip(batch_phash(images), images):
+        assert bin(int(value) ^ phash(image)).count("1") <= 2  # float rounding near the median
+
+
+def test_popcount():
+    """
+    Test bit counts per uint64 element.
+    """
+    values = np.array([0, 1, 2 ** 64 - 1, 0xF0F0], dtype=np.uint64)
+    assert popcount(values).tolist() == [0, 1, 64, 8]
+
+
+def test_load_grayscale_reduces_large_images(tmp_path):
+    """
+    Test that a known large resolution decodes at reduced scale, and unknown ones at full size.
+    """
+    path = str(tmp_path / "big.jpg")
+    cv2.imwrite(path, synthetic_frames(seed=1, count=1, size=(1024, 768))[0])
+
+    assert load_grayscale(path).shape == (768, 1024)
+    assert load_grayscale(path, resolution="1024x768").shape == (96, 128)
+    assert load_grayscale(path, resolution="Unknown").shape == (768, 1024)
+    assert load_grayscale(str(tmp_path / "missing.jpg")) is None
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1 << 20])
+def test_top_k_matches_brute_force(chunk_size):
+    """
+    Test top-k results (self excluded, ties by ID) for chunked and single-pass scans.
+    """
+    hashes = random_hashes(500)
+    ids = np.arange(1000, 1500)
+    index = ImageHashIndex(ids, hashes, chunk_size=chunk_size)
+
+    distances = popcount(hashes ^ hashes[42]).astype(int)
+    expected = sorted((int(distance), int(media_id)) for media_id, distance in zip(ids, distances) if media_id != 1042)[:5]
+    assert index.top_k(1042, k=5) == [(media_id, distance) for distance, media_id in expected]
+
+
+def test_top_k_unknown_id():
+    """
+    Test looking up an image without a hash raises KeyError.
+    """
+    with pytest.raises(KeyError):
+        ImageHashIndex([1, 2], random_hashes(2)).top_k(3)
+
+
+@pytest.mark.parametrize("max_distance", [0, 3, 6, 9])
+def test_pairs_within_matches_brute_force(max_distance):
+    """
+    Test the vectorized multi-index join finds exactly the brute-force pairs.
+    """
+    rng = np.random.default_rng(5)
+    base = random_hashes(300, seed=3)
+    near = np.array([flip(base[i], int(rng.integers(0, 11)), rng) for i in range(100)], dtype=np.uint64)
+    hashes = np.concatenate([base, near, base[:5]])
+    index = ImageHashIndex(np.arange(len(hashes)), hashes, chunk_size=64)
+
+    left, right = index.pairs_within(max_distance)
+
+    distances = popcount(hashes[:, None] ^ hashes[None, :])
+    expected = {(a, b) for a, b in zip(*np.nonzero(distances <= max_distance)) if a < b}
+    assert set(zip(left.tolist(), right.tolist())) == expected
+    assert len(left) == len(expected)
+
+
+def test_clusters_are_connected_components():
+    """
+    Test chained near-duplicates form one cluster and singletons are left out.
+    """
+    a = np.uint64(0)
+    hashes = np.array([a, a ^ np.uint64(0b111), a ^ np.uint64(0b111111), np.uint64(2 ** 64 - 1),
+                       np.uint64(2 ** 64 - 2), np.uint64(0xFFFF0000FFFF0000)], dtype=np.uint64)
+    clusters = ImageHashIndex([10, 11, 12, 13, 14, 15], hashes).clusters(max_distance=3)
+
+    assert [cluster.tolist() for cluster in clusters] == [[10, 11, 12], [13, 14]]
@@ -0,0 +1,160 @@
+"""
+Unit tests for metadata feature vectors and the BallTree-backed MetadataIndex.
+"""
+
+import numpy as np
+
+from app.media_scan.similarity import metadata_index
+from app.media_scan.similarity.metadata_index import MetadataIndex, feature_vector, parse_resolution
+
+
+def row(media_id, duration=120.0, resolution="1920x1080", codec="H.264", bit_rate=5_000_000,
+        file_size=75_000_000, file_mtime_ns=1):
+    return (media_id, file_size, file_mtime_ns, duration, resolution, codec, bit_rate)
+
+
+ROWS = [
+    row(1),
+    row(2, file_mtime_ns=2),                                           # byte-identical copy
+    row(3, codec="H.265", bit_rate=2_500_000, file_size=37_500_000),   # re-encode
+    row(4, resolution="1280x720", bit_rate=2_000_000, file_size=30_000_000),
+    row(5, duration=3600.0, file_size=2_250_000_000),
+]
+
+
+def test_parse_resolution():
+    """
+    Test 'WxH' strings split into integers and unknown values map to zero.
+    """
+    assert parse_resolution("1920x1080") == (1920, 1080)
+    assert parse_resolution("Unknown") == (0, 0)
+    assert parse_resolution(None) == (0, 0)
+
+
+def test_feature_vector_codec_one_hot():
+    """
+    Test known codecs get their own slot and unknown codecs share the last one.
+    """
+    h264 = feature_vector(10.0, "640x480", 1000, 1000, "H.264")
+    unknown = feature_vector(10.0, "640x480", 1000, 1000, "Unknown")
+    other = feature_vector(10.0, "640x480", 1000, 1000, "Something new")
+
+    assert not np.array_equal(h264, unknown)
+    assert np.array_equal(unknown, other)
+    assert unknown[-1] > 0
+
+
+def test_similar_ranks_closest_metadata_first():
+    """
+    Test nearest neighbours match brute-force distances and exclude the queried row.
+    """
+    index = MetadataIndex().updated(ROWS)
+    similar = index.similar(1, k=4)
+
+    vectors = {r[0]: feature_vector(r[3], r[4], r[6], r[1], r[5]) for r in ROWS}
+    expected = sorted((np.linalg.norm(vectors[1] - vectors[i]), i) for i in vectors if i != 1)
+    assert [media_id for media_id, _ in similar] == [i for _, i in expected]
+    assert np.allclose([distance for _, distance in similar], [d for d, _ in expected])
+    assert similar[0] == (2, 0.0)
+
+
+def test_duplicate_groups_link_copies_and_reencodes():
+    """
+    Test the default-sized radius groups copies and re-encodes but not resized or unrelated videos.
+    """
+    index = MetadataIndex().updated(ROWS)
+
+    assert index.duplicate_groups(radius=0.5) == [[1, 2, 3]]
+    assert index.duplicate_groups(radius=0.01) == [[1, 2]]
+    assert MetadataIndex().duplicate_groups(radius=0.5) == []
+
+
+def test_duplicate_groups_do_not_chain_a_dense_spread():
+    """
+    Test that rows each within the radius of the next only, never all of each other, stay in small groups.
+    """
+    # Consecutive durations are 0.3 apart in feature space, every second one 0.6
+    durations = np.expm1(np.log1p(60.0) + np.arange(200) * 0.3 / metadata_index.FEATURE_WEIGHTS["duration"])
+    index = MetadataIndex().updated([row(media_id, duration=duration) for media_id, duration in enumerate(durations)])
+    vectors = {media_id: index.vectors[position] for position, media_id in enumerate(index.ids.tolist())}
+
+    groups = index.duplicate_groups(radius=0.5)
+
+    assert len(groups) == 100
+    for group in groups:
+        assert all(np.linalg.norm(vectors[a] - vectors[b]) <= 0.5 for a in group for b in group)
+
+
+def test_duplicate_groups_cap_group_size():
+    """
+    Test that identical rows form groups of at most max_group_size.
+    """
+    index = MetadataIndex().updated([row(media_id) for media_id in range(40)])
+
+    assert [len(group) for group in index.duplicate_groups(radius=0.5, max_group_size=16)] == [16, 16, 8]
+
+
+def test_duplicate_groups_find_duplicates_among_many_equal_durations():
+    """
+    Test that duplicates are grouped when more rows than the scan window share their duration.
+
+    Asserts:
+        - An exact copy far apart in input order is grouped with its original.
+        - A near duplicate sorted past the window is still found through the tree.
+    """
+    # 400 unrelated files of one length, each file size 1.5x the previous one
+    rows = [row(media_id, resolution="640x480", file_size=10_000 * 1.5 ** media_id) for media_id in range(400)]
+    rows += [row(400, resolution="640x480", file_size=10_000),   # copy of row 0
+             row(401, resolution="640x481", file_size=10_000)]   # one line taller than row 0
+    index = MetadataIndex().updated(rows)
+
+    assert index.duplicate_groups(radius=0.001) == [[0, 400]]
+    assert index.duplicate_groups(radius=0.01) == [[0, 400, 401]]
+
+
+def test_updated_revectorizes_only_new_and_changed_rows(mocker):
+    """
+    Test unchanged rows reuse their vectors and an unchanged catalog returns the same index.
+    """
+    index = MetadataIndex().updated(ROWS)
+    spy = mocker.spy(metadata_index, "feature_vector")
+
+    assert index.updated(ROWS) is index
+    spy.assert_not_called()
+
+    changed = ROWS[1:4] + [row(5, duration=1800.0, file_mtime_ns=9), row(6)]
+    refreshed = index.updated(changed)
+
+    assert spy.call_count == 2
+    assert refreshed is not index and refreshed.ids.tolist() == [2, 3, 4, 5, 6]
+    assert refreshed.similar(2, k=1) == [(6, 0.0)]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """
+    Test a saved index loads with its tree and answers the same queries.
+    """
+    path = tmp_path / "index" / "metadata_index.pkl"
+    index = MetadataIndex().updated(ROWS)
+    index.save(str(path))
+
+    loaded = MetadataIndex.load(str(path))
+    assert loaded.ids.tolist() == index.ids.tolist()
+    assert loaded.keys == index.keys
+    assert loaded.similar(1, k=3) == index.similar(1, k=3)
+    assert loaded.updated(ROWS) is loaded
+
+
+def test_load_rejects_missing_corrupt_and_stale_files(tmp_path, mocker):
+    """
+    Test unusable files are ignored so the caller rebuilds.
+    """
+    path = tmp_path / "metadata_index.pkl"
+    assert MetadataIndex.load(str(path)) is None
+
+    path.write_bytes(b"not a pickle")
+    assert MetadataIndex.load(str(path)) is None
+
+    MetadataIndex().updated(ROWS).save(str(path))
+    mocker.patch.dict(metadata_index.FEATURE_WEIGHTS, {"duration": 1.0})
+    assert MetadataIndex.load(str(path)) is None
@@ -0,0 +1,65 @@
+"""
+Unit tests for frame perceptual hashes and video signatures.
+"""
+
+import numpy as np
+import pytest
+
+from app.media_scan.similarity.perceptual_hash import dhash, phash
+from app.media_scan.similarity.video_fingerprint import (
+    signature_from_bytes, signature_to_bytes, video_signature
+)
+from tests.fixtures.video_fixtures import synthetic_frames, write_video
+
+
+def hamming(a, b):
+    return sum(bin(int(x) ^ int(y)).count("1") for x, y in zip(a, b))
+
+
+@pytest.mark.parametrize("hash_function", [dhash, phash])
+def test_frame_hash_is_robust_to_resizing(hash_function):
+    """
+    Test a resized image hashes within a few bits, an unrelated image far away.
+    """
+    image = synthetic_frames(seed=1, count=1, size=(640, 480))[0][:, :, 0]
+    resized = np.ascontiguousarray(image[::2, ::2])
+    other = synthetic_frames(seed=2, count=1, size=(640, 480))[0][:, :, 0]
+
+    assert bin(hash_function(image) ^ hash_function(resized)).count("1") <= 4
+    assert bin(hash_function(image) ^ hash_function(other)).count("1") >= 12
+
+
+@pytest.mark.parametrize("method", ["dhash", "phash"])
+def test_video_signature_matches_reencoded_copies(tmp_path, method):
+    """
+    Test resized and re-encoded copies get near signatures and a different video does not.
+    """
+    frames = synthetic_frames(seed=3)
+    original = video_signature(write_video(tmp_path / "a.avi", frames), method=method)
+    resized = video_signature(write_video(tmp_path / "b.avi", frames, size=(320, 240)), method=method)
+    reencoded = video_signature(write_video(tmp_path / "c.mp4", frames, fourcc="mp4v"), method=method)
+    other = video_signature(write_video(tmp_path / "d.avi", synthetic_frames(seed=4)), method=method)
+
+    assert original.shape == (4,) and original.dtype == np.uint64
+    assert hamming(original, resized) <= 16
+    assert hamming(original, reencoded) <= 16
+    assert hamming(original, other) > 40
+
+
+def test_video_signature_undecodable(tmp_path):
+    """
+    Test a file OpenCV cannot decode yields no signature.
+    """
+    path = tmp_path / "broken.mp4"
+    path.write_bytes(b"not a video")
+    assert video_signature(str(path)) is None
+
+
+def test_signature_bytes_round_trip():
+    """
+    Test signatures serialize to fixed-width words and back.
+    """
+    signature = np.array([1, 2 ** 64 - 1, 0, 12345], dtype=np.uint64)
+    data = signature_to_bytes(signature)
+    assert len(data) == 32
+    assert np.array_equal(signature_from_bytes(data), signature)
@@ -0,0 +1,126 @@
+"""
+Unit tests for the ContentSniffingValidationStrategy class.
+
+Files are written with synthetic container headers so each signature can be
+checked without real media samples.
+"""
+
+import os
+
+import pytest
+from app.media_scan.strategies.content_validation import ContentSniffingValidationStrategy
+from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
+from utils.directory_scanner import DirectoryScanner
+
+SIGNATURES = [
+    (b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00", "video"),
+    (b"\x00\x00\x00\x14ftypqt  \x00\x00\x00\x00", "video"),
+    (b"\x00\x00\x00\x08wide\x00\x00\x00\x00mdat", "video"),
+    (b"\x00\x00\x00\x1cftypM4A \x00\x00\x00\x00", "audio"),
+    (b"\x00\x00\x00\x1cftypheic\x00\x00\x00\x00", "image"),
+    (b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01", "video"),
+    (b"RIFF\x24\x00\x00\x00AVI LIST", "video"),
+    (b"RIFF\x24\x00\x00\x00WAVEfmt ", "audio"),
+    (b"RIFF\x24\x00\x00\x00WEBPVP8 ", "image"),
+    (b"\x30\x26\xb2\x75\x8e\x66\xcf\x11\xa6\xd9\x00\xaa", "video"),
+    (b"ID3\x04\x00\x00\x00\x00\x00\x00", "audio"),
+    (b"\xff\xfb\x90\x64\x00\x00\x00\x00", "audio"),
+    (b"\xff\xf1\x50\x80\x00\x1f\xfc", "audio"),
+    (b"fLaC\x00\x00\x00\x22", "audio"),
+    (b"OggS\x00\x02" + b"\x00" * 22 + b"\x01vorbis", "audio"),
+    (b"OggS\x00\x02" + b"\x00" * 22 + b"\x80theora", "video"),
+    (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR", "image"),
+    (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image"),
+    (b"GIF89a\x01\x00\x01\x00", "image"),
+    (b"II*\x00\x08\x00\x00\x00", "image"),
+    (b"MM\x00*\x00\x00\x00\x08", "image"),
+    (b"BM\x3a\x00\x00\x00\x00\x00\x00\x00\x36\x00\x00\x00\x28\x00\x00\x00", "image"),
+    (b"BM is just text here", "unknown"),
+    (b"plain text file", "unknown"),
+    (b"PK\x03\x04\x14\x00", "unknown"),
+]
+
+
+@pytest.mark.parametrize("header, expected", SIGNATURES)
+def test_identify_signature(header, expected):
+    """
+    Test that each container signature maps to the expected media type.
+    """
+    assert ContentSniffingValidationStrategy.identify_signature(header) == expected
+
+
+def test_sniff_reads_file_header(tmp_path):
+    """
+    Test that sniff and validate classify real files, including extensionless ones.
+    """
+    strategy = ContentSniffingValidationStrategy()
+    camera_dump = tmp_path / "MVI_0001"
+    camera_dump.write_bytes(b"\x00\x00\x00\x18ftypisom" + b"\x00" * 100)
+    empty = tmp_path / "empty"
+    empty.write_bytes(b"")
+
+    assert strategy.sniff(str(camera_dump)) == "video"
+    assert strategy.validate(str(camera_dump)) is True
+    assert strategy.sniff(str(empty)) == "unknown"
+    assert strategy.sniff(str(tmp_path / "missing")) == "unknown"
+
+
+def test_sniff_caches_by_inode_and_mtime(tmp_path, mocker):
+    """
+    Test that an unchanged file is read once, and a modified file is read again.
+    """
+    strategy = ContentSniffingValidationStrategy()
+    file = tmp_path / "clip.bin"
+    file.write_bytes(b"fLaC" + b"\x00" * 60)
+    read_header = mocker.spy(strategy, "_read_header")
+
+    assert strategy.sniff(str(file)) == "audio"
+    assert strategy.sniff(str(file)) == "audio"
+    assert read_header.call_count == 1
+
+    file.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 56)
+    os.utime(file, ns=(0, 123456789))
+    assert strategy.sniff(str(file)) == "image"
+    assert read_header.call_count == 2
+
+
+def test_cache_is_bounded(tmp_path):
+    """
+    Test that the least recently used results are evicted beyond cache_size.
+    """
+    strategy = ContentSniffingValidationStrategy(cache_size=2)
+    for index in range(4):
+        file = tmp_path / f"f{index}"
+        file.write_bytes(b"ID3" + b"\x00" * 10)
+        strategy.sniff(str(file))
+    assert len(strategy._cache) == 2
+
+
+def test_should_sniff():
+    """
+    Test that only names with no extension or a non-document extension are sniffed.
+    """
+    strategy = ContentSniffingValidationStrategy()
+    assert strategy.should_sniff("DSC00042") is True
+    assert strategy.should_sniff("holiday.2019.mp4") is True
+    assert strategy.should_sniff("recording.dat") is True
+    assert strategy.should_sniff("notes.TXT") is False
+    assert strategy.should_sniff("archive.zip") is False
+
+
+def test_directory_scanner_sniffs_only_ambiguous_files(tmp_path, mocker):
+    """
+    Test that DirectoryScanner falls back to content sniffing only for files the
+    extension check cannot classify.
+    """
+    (tmp_path / "movie.mp4").write_bytes(b"not really an mp4")
+    (tmp_path / "DSC0001").write_bytes(b"\xff\xd8\xff\xe0" + b"\x00" * 20)
+    (tmp_path / "notes.txt").write_bytes(b"\xff\xd8\xff\xe0")
+    strategy = ContentSniffingValidationStrategy()
+    sniff = mocker.spy(strategy, "sniff")
+
+    scanner = DirectoryScanner(CompositeValidationStrategy(), content_strategy=strategy)
+    results = {os.path.basename(path): media_type for path, media_type in scanner.scan(str(tmp_path))}
+
+    assert results == {"movie.mp4": "video", "DSC0001": "image", "notes.txt": "unknown"}
+    assert sniff.call_count == 1
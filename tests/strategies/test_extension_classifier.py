@@ -0,0 +1,133 @@
+"""
+Unit tests for the ExtensionClassifier and the compiled CompositeValidationStrategy path.
+
+The classifier must give exactly the same answer as calling the audio, video
+and image strategies one after another, so most tests compare it against
+that sequential reference on tricky and randomly generated names.
+"""
+
+import random
+
+import pytest
+from app.media_scan.strategies.audio_validation import AudioValidationStrategy
+from app.media_scan.strategies.video_validation import VideoValidationStrategy
+from app.media_scan.strategies.image_validation import ImageValidationStrategy
+from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
+from app.media_scan.strategies.extension_classifier import ExtensionClassifier
+
+
+def sequential_reference(file_name):
+    """
+    Classify a name the original way: each strategy in turn, then 'unknown'.
+    """
+    for media_type, strategy in (
+        ("audio", AudioValidationStrategy()),
+        ("video", VideoValidationStrategy()),
+        ("image", ImageValidationStrategy()),
+    ):
+        if strategy.validate(file_name):
+            return media_type
+    return "unknown"
+
+
+TRICKY_NAMES = [
+    "", ".", "..", "...", "mp3", ".mp3", " .mp3", "a .mp3", "song.mp3", "song.MP3", "clip.Mp4",
+    "photo.jpeg", "photo.JPEG", "archive.tar.gz", "movie.mp4.mp4", "audio..mp3", "dir/song.mp3",
+    "dir\\song.mp3", "song.mp3/", "song.", "song.txt", "noextension", "\t.wav", "x.tiff", "x.tif",
+    "weird name with spaces.mkv", "ünïcödé.flac", "song.mp3 ", " song.mp3", "a.b", "İ.png",
+]
+
+
+@pytest.mark.parametrize("file_name", TRICKY_NAMES)
+def test_classify_matches_sequential_strategies_on_edge_cases(file_name):
+    """
+    Test that the compiled classifier agrees with the sequential strategies on edge cases.
+    """
+    composite = CompositeValidationStrategy()
+    assert composite.validate(file_name) == sequential_reference(file_name)
+
+
+def test_classify_matches_sequential_strategies_on_random_names():
+    """
+    Test agreement on a large corpus of randomly generated names.
+    """
+    rng = random.Random(1234)
+    alphabet = "ab .\\/_-XYZ"
+    extensions = ["mp3", "MP4", "jpg", "Png", "txt", "wav", "", "mkv", "tIFf", "doc"]
+    composite = CompositeValidationStrategy()
+
+    for _ in range(20000):
+        stem = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 6)))
+        file_name = f"{stem}.{rng.choice(extensions)}" if rng.random() < 0.8 else stem
+        assert composite.validate(file_name) == sequential_reference(file_name), file_name
+
+
+def test_first_strategy_wins_for_shared_extensions():
+    """
+    Test that an extension claimed by two types resolves to the first, like the sequential loop.
+    """
+    classifier = ExtensionClassifier({"audio": {".ogg"}, "video": {".ogg", ".mp4"}})
+    assert classifier.classify("clip.ogg") == "audio"
+    assert classifier.classify("clip.mp4") == "video"
+
+
+def test_composite_skips_compilation_for_mocked_strategies(mock_composite_strategy, mock_default_strategy):
+    """
+    Test that replacing the strategies with ones that expose no extension set falls back to the loop.
+    """
+    assert mock_composite_strategy.validate("unknown_file.xyz") == "unknown"
+    mock_default_strategy.validate.assert_called_once_with("unknown_file.xyz")
+
+
+def test_composite_does_not_call_default_strategy_when_compiled(mocker):
+    """
+    Test that the compiled path resolves unknown names without invoking the default strategy.
+    """
+    composite = CompositeValidationStrategy()
+    default_validate = mocker.patch.object(composite.strategies["default"], "validate")
+
+    assert composite.validate("notes.txt") == "unknown"
+    default_validate.assert_not_called()
+
+
+def test_composite_recompiles_when_strategies_change():
+    """
+    Test that strategies cannot be changed in place and add/remove_strategy keep the classifier current.
+    """
+    class SubtitleValidationStrategy(AudioValidationStrategy):
+        AUDIO_EXTENSIONS = {".srt"}
+
+    composite = CompositeValidationStrategy()
+    with pytest.raises(TypeError):
+        composite.strategies["subtitle"] = SubtitleValidationStrategy()
+
+    composite.add_strategy("subtitle", SubtitleValidationStrategy())
+    assert composite.validate_many(["talk.srt", "song.mp3"]) == ["subtitle", "audio"]
+    composite.remove_strategy("audio")
+    assert composite.validate_many(["talk.srt", "song.mp3"]) == ["subtitle", "unknown"]
+    with pytest.raises(ValueError):
+        composite.remove_strategy("default")
+
+
+def test_validate_many_matches_validate():
+    """
+    Test that the batch API returns the same media types, in order, as validating one name at a time.
+    """
+    composite = CompositeValidationStrategy()
+    assert composite.validate_many(TRICKY_NAMES) == [composite.validate(name) for name in TRICKY_NAMES]
+
+
+def test_validate_many_with_mocked_strategies(mock_composite_strategy):
+    """
+    Test that the batch API falls back to per-name validation when strategies are not compiled.
+    """
+    names = ["test_song.mp3", "test_movie.mp4", "test_image.jpg", "unknown_file.xyz"]
+    assert mock_composite_strategy.validate_many(names) == ["audio", "video", "image", "unknown"]
+
+
+def test_media_validation_strategy_validate_many():
+    """
+    Test the default per-strategy batch implementation returns one boolean per name.
+    """
+    names = ["song.mp3", "movie.mp4", ".mp3", "track.WAV"]
+    assert AudioValidationStrategy().validate_many(names) == [True, False, False, True]
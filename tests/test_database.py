@@ -0,0 +1,123 @@
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+
+from app.media_scan.config.settings import config
+from app.media_scan.dal import database
+from app.media_scan.dal.database import Base, MeteredQueuePool, create_engines, sqlite_pragmas
+from app.media_scan.models.media_type import MediaType  # noqa: F401 (registers the table)
+
+
+@pytest.fixture
+def tuned_engines(tmp_path):
+    write_engine, read_engine = create_engines(f"sqlite:///{tmp_path / 'catalog.db'}", sqlite_tuned=True)
+    Base.metadata.create_all(write_engine)
+    yield write_engine, read_engine
+    write_engine.dispose()
+    read_engine.dispose()
+
+
+def test_untuned_and_in_memory_databases_use_one_engine(tmp_path):
+    """
+    Without the profile, and for in-memory SQLite, reads and writes share the stock engine.
+    """
+    write_engine, read_engine = create_engines(f"sqlite:///{tmp_path / 'catalog.db'}", sqlite_tuned=False)
+    assert write_engine is read_engine
+    write_engine, read_engine = create_engines("sqlite:///:memory:", sqlite_tuned=True)
+    assert write_engine is read_engine
+
+
+def test_tuned_connections_apply_the_profile(tuned_engines):
+    write_engine, read_engine = tuned_engines
+    pragmas = sqlite_pragmas()
+    with write_engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA cache_size")).scalar() == pragmas["cache_size"]
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == pragmas["busy_timeout"]
+        assert connection.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+    with read_engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA query_only")).scalar() == 1
+
+
+def test_readers_cannot_write(tuned_engines):
+    _, read_engine = tuned_engines
+    with read_engine.connect() as connection:
+        with pytest.raises(OperationalError, match="readonly"):
+            connection.execute(text("INSERT INTO media_type (name) VALUES ('video')"))
+
+
+def test_readers_see_committed_rows_while_the_writer_holds_a_transaction(tuned_engines):
+    write_engine, read_engine = tuned_engines
+    with write_engine.begin() as connection:
+        connection.execute(text("INSERT INTO media_type (name) VALUES ('video')"))
+    with write_engine.connect() as writer:
+        writer.execute(text("INSERT INTO media_type (name) VALUES ('audio')"))
+        # The uncommitted insert holds the write lock; WAL still lets readers through
+        with read_engine.connect() as reader:
+            assert reader.execute(text("SELECT name FROM media_type")).scalars().all() == ["video"]
+        writer.rollback()
+
+
+def test_writer_is_a_single_connection(tuned_engines):
+    write_engine, read_engine = tuned_engines
+    assert read_engine.pool.size() == config.SQLITE_READ_POOL_SIZE
+    write_engine.pool._timeout = 0.1
+    with write_engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            write_engine.connect()
+
+
+def test_file_databases_get_configured_pools(tmp_path):
+    engine, _ = create_engines(f"sqlite:///{tmp_path / 'catalog.db'}", sqlite_tuned=False)
+    assert isinstance(engine.pool, MeteredQueuePool)
+    assert engine.pool.size() == config.DB_POOL_SIZE
+    assert engine.pool._recycle == config.DB_POOL_RECYCLE
+    assert engine.pool._pre_ping is config.DB_POOL_PRE_PING
+    engine.dispose()
+
+
+def test_pool_metrics_count_checkouts_and_waits(tuned_engines, monkeypatch):
+    write_engine, read_engine = tuned_engines
+    monkeypatch.setattr(database, "_engines", (write_engine, read_engine))
+
+    with write_engine.connect(), read_engine.connect(), read_engine.connect():
+        write, read = database.pool_metrics(), database.pool_metrics(read_only=True)
+    assert (write["in_use"], read["in_use"]) == (1, 2)
+    assert read["max_in_use"] == 2 and read["checkouts"] == 2
+    assert write["wait_max"] >= write["wait_mean"] > 0
+    assert database.pool_metrics(read_only=True)["in_use"] == 0
+
+
+def test_sessions_and_engine_names_resolve_lazily(tuned_engines, monkeypatch):
+    write_engine, read_engine = tuned_engines
+    monkeypatch.setattr(database, "_engines", None)
+    monkeypatch.setattr(database, "create_engines", lambda: (write_engine, read_engine))
+
+    assert database.SessionLocal().get_bind() is write_engine
+    assert database.ReadSessionLocal().get_bind() is read_engine
+    assert (database.engine, database.read_engine) == (write_engine, read_engine)
+    assert database.SessionLocal(bind=read_engine).get_bind() is read_engine
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_child_gets_fresh_pools(tuned_engines):
+    write_engine, _ = tuned_engines
+    with write_engine.connect() as connection:
+        parent_pool = write_engine.pool
+        pid = os.fork()
+        if pid == 0:
+            # The parent's checked-out connection is left alone; the child opens its own
+            healthy = False
+            try:
+                with write_engine.connect() as child_connection:
+                    child_connection.execute(text("SELECT 1"))
+                    healthy = write_engine.pool is not parent_pool and write_engine.pool.checkedout() == 1
+            finally:
+                os._exit(0 if healthy else 1)
+        _, status = os.waitpid(pid, 0)
+        connection.execute(text("SELECT 1"))
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -1,6 +1,9 @@
+import os
 import pytest
 from unittest.mock import Mock
 from utils.directory_scanner import DirectoryScanner
+from app.media_scan.utils.parallel_walker import ParallelDirectoryWalker
+from app.media_scan.utils.stat_snapshot import StatFingerprint, StatSnapshot
 
 from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
 from app.media_scan.strategies.audio_validation import AudioValidationStrategy
@@ -158,4 +161,99 @@ def test_scan_valid_media_files(mock_composite_strategy, mock_audio_strategy, mo
     results = sorted(results, key=lambda x: x[0])
 
     # Assert equality after sorting
-    assert results == expected_results
\ No newline at end of file
+    assert results == expected_results
+
+def test_scan_incremental_yields_only_new_and_changed_files(tmp_path):
+    """
+    Test that scan_incremental skips files whose fingerprint is unchanged and
+    reports cataloged files that disappeared.
+    """
+    unchanged = tmp_path / "unchanged.mp4"
+    changed = tmp_path / "changed.mp3"
+    added = tmp_path / "added.jpg"
+    for file in (unchanged, changed, added):
+        file.write_bytes(b"data")
+
+    snapshot = StatSnapshot({
+        str(unchanged): StatFingerprint.from_stat(os.stat(unchanged)),
+        str(changed): StatFingerprint(999, 0, 0, 0),
+        str(tmp_path / "deleted.mp4"): StatFingerprint(1, 1, 1, 1),
+    })
+    scanner = DirectoryScanner(CompositeValidationStrategy())
+
+    results = sorted((path, media_type) for path, media_type, _ in scanner.scan_incremental(str(tmp_path), snapshot))
+
+    assert results == [(str(added), "image"), (str(changed), "audio")]
+    assert list(snapshot.removed_paths()) == [str(tmp_path / "deleted.mp4")]
+
+
+def test_scan_incremental_missing_directory_raises(tmp_path):
+    """
+    Test that scan_incremental refuses a missing directory instead of reporting everything as removed.
+    """
+    scanner = DirectoryScanner(CompositeValidationStrategy())
+    with pytest.raises(FileNotFoundError):
+        list(scanner.scan_incremental(str(tmp_path / "missing"), StatSnapshot({})))
+
+
+def test_stat_snapshot_mark_seen_under():
+    """
+    Test that files under an unreadable directory are not reported as removed.
+    """
+    snapshot = StatSnapshot({
+        "/media/locked/a.mp4": StatFingerprint(1, 1, 1, 1),
+        "/media/locked-not/b.mp4": StatFingerprint(1, 1, 1, 1),
+    })
+    snapshot.mark_seen_under("/media/locked")
+    assert list(snapshot.removed_paths()) == ["/media/locked-not/b.mp4"]
+
+
+def test_stat_snapshot_keeps_entries_that_could_not_be_stated():
+    """
+    Test that entries whose stat failed, and anything under them, are not reported as removed.
+    """
+    snapshot = StatSnapshot({
+        "/media/a.mp4": StatFingerprint(1, 1, 1, 1),
+        "/media/sub/b.mp4": StatFingerprint(1, 1, 1, 1),
+        "/media/c.mp4": StatFingerprint(1, 1, 1, 1),
+    })
+    snapshot.mark_stat_failed("/media/a.mp4")
+    snapshot.mark_stat_failed("/media/sub")
+    assert list(snapshot.removed_paths()) == ["/media/c.mp4"]
+    assert snapshot.stat_failed_paths() == ["/media/a.mp4", "/media/sub"]
+
+
+def test_scan_entries_yields_stat_results(tmp_path):
+    """
+    Test that scan_entries yields the walker's stat result alongside each path and media type.
+    """
+    (tmp_path / "nested").mkdir()
+    video_file = tmp_path / "nested" / "clip.mkv"
+    video_file.write_bytes(b"x" * 7)
+    scanner = DirectoryScanner(CompositeValidationStrategy(),
+                               walker=ParallelDirectoryWalker(max_workers=2, ordering="deterministic"))
+
+    results = list(scanner.scan_entries(str(tmp_path)))
+
+    assert [(path, media_type, stat.st_size) for path, media_type, stat in results] == [
+        (str(video_file), "video", 7)
+    ]
+
+
+def test_scan_classifies_once_per_directory(tmp_path, mocker):
+    """
+    Test that scan_entries classifies each directory listing with one validate_many call.
+    """
+    (tmp_path / "sub").mkdir()
+    for name in ("a.mp4", "b.mp3", "c.txt"):
+        (tmp_path / name).write_text("x")
+    (tmp_path / "sub" / "d.png").write_text("x")
+    strategy = CompositeValidationStrategy()
+    validate_many = mocker.spy(strategy, "validate_many")
+    validate = mocker.spy(strategy, "validate")
+
+    results = list(DirectoryScanner(strategy).scan(str(tmp_path)))
+
+    assert validate_many.call_count == 2
+    validate.assert_not_called()
+    assert sorted(media_type for _, media_type in results) == ["audio", "image", "unknown", "video"]
@@ -0,0 +1,170 @@
+import os
+
+import pytest
+
+from app.media_scan.extractors.metadata_cache import MetadataCache
+from app.media_scan.models.media import Media
+from app.media_scan.services.duplicate_finder import DuplicateFinder
+from app.media_scan.services.media_scanner import MediaScanner
+from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
+from app.media_scan.utils.file_hashing import full_hash, partial_hash
+
+CHUNK = 1024
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def catalog(session, tmp_path):
+    MediaScanner(CompositeValidationStrategy(), session=session).execute_and_save_to_db(str(tmp_path))
+
+
+def create_duplicate_tree(tmp_path):
+    """
+    Large files: two identical copies, one differing only between the sampled chunks
+    (same partial hash), one differing in the head, and one with a unique size.
+    Small files (hashed whole): two identical copies and one different.
+    """
+    large = bytes(range(256)) * 40  # 10 KiB, ten chunks
+    middle_change = bytearray(large)
+    middle_change[CHUNK + 10] ^= 0xFF
+    head_change = bytearray(large)
+    head_change[0] ^= 0xFF
+    write(tmp_path / "a.mp4", large)
+    write(tmp_path / "a_copy.mp4", large)
+    write(tmp_path / "a_near.mp4", bytes(middle_change))
+    write(tmp_path / "a_head.mp4", bytes(head_change))
+    write(tmp_path / "other.mp4", large + b"x")
+    write(tmp_path / "s.jpg", b"small" * 100)
+    write(tmp_path / "s_copy.jpg", b"small" * 100)
+    write(tmp_path / "s_diff.jpg", b"SMALL" * 100)
+
+
+def test_partial_hash_samples_head_middle_tail(tmp_path):
+    """
+    Test that only three chunks are read from a large file and small files are hashed whole.
+    """
+    large = write(tmp_path / "large.bin", os.urandom(10 * CHUNK))
+    small = write(tmp_path / "small.bin", os.urandom(3 * CHUNK))
+
+    digest, bytes_read, whole = partial_hash(large, 10 * CHUNK, CHUNK)
+    assert (bytes_read, whole) == (3 * CHUNK, False)
+    assert digest != full_hash(large)[0]
+    digest, bytes_read, whole = partial_hash(small, 3 * CHUNK, CHUNK)
+    assert (digest, bytes_read, whole) == (full_hash(small)[0], 3 * CHUNK, True)
+
+
+def test_find_duplicates_stages(seeded_db_session, tmp_path):
+    """
+    Test that only size collisions are hashed, only partial collisions are fully hashed,
+    and only true copies are reported.
+    """
+    create_duplicate_tree(tmp_path)
+    catalog(seeded_db_session, tmp_path)
+
+    report = DuplicateFinder(seeded_db_session, chunk_size=CHUNK).find_duplicates()
+
+    groups = sorted(sorted(os.path.basename(path) for path in group) for group in report.groups)
+    assert groups == [["a.mp4", "a_copy.mp4"], ["s.jpg", "s_copy.jpg"]]
+    assert report.partial_hashed == 7  # everything except other.mp4
+    assert report.full_hashed == 3  # a, a_copy and a_near share a partial hash
+    assert report.bytes_read == 4 * 3 * CHUNK + 3 * 500 + 3 * 10 * CHUNK
+    assert report.catalog_bytes == 5 * 10 * CHUNK + 1 + 3 * 500
+    assert 0 < report.read_fraction < 1
+    other = seeded_db_session.query(Media).filter_by(file_path=str(tmp_path / "other.mp4")).one()
+    assert (other.partial_hash, other.content_hash) == (None, None)
+
+
+def test_find_duplicates_is_incremental(seeded_db_session, tmp_path):
+    """
+    Test that a second run reads nothing, and a new copy only costs its own reads.
+    """
+    create_duplicate_tree(tmp_path)
+    catalog(seeded_db_session, tmp_path)
+    finder = DuplicateFinder(seeded_db_session, chunk_size=CHUNK)
+    finder.find_duplicates()
+
+    assert finder.find_duplicates().bytes_read == 0
+
+    write(tmp_path / "s_third.jpg", b"small" * 100)
+    catalog(seeded_db_session, tmp_path)
+    report = finder.find_duplicates()
+    assert report.bytes_read == 500
+    assert sorted(len(group) for group in report.groups) == [2, 3]
+
+
+def test_find_duplicates_skips_files_changed_since_scan(seeded_db_session, tmp_path):
+    """
+    Test that a file modified after scanning is not hashed against its stale row.
+    """
+    create_duplicate_tree(tmp_path)
+    catalog(seeded_db_session, tmp_path)
+    write(tmp_path / "s_copy.jpg", b"SMALL" * 100)
+
+    report = DuplicateFinder(seeded_db_session, chunk_size=CHUNK).find_duplicates()
+
+    assert str(tmp_path / "s_copy.jpg") in report.skipped
+    assert not any("s.jpg" in path for group in report.groups for path in group)
+
+
+def test_find_duplicates_uses_hash_cache_after_rebuild(seeded_db_session, tmp_path):
+    """
+    Test that with a metadata cache, a rebuilt catalog finds the same duplicates without reading files.
+    """
+    create_duplicate_tree(tmp_path)
+    catalog(seeded_db_session, tmp_path)
+    cache = MetadataCache(":memory:")
+    first = DuplicateFinder(seeded_db_session, chunk_size=CHUNK, cache=cache).find_duplicates()
+
+    seeded_db_session.query(Media).delete()
+    seeded_db_session.commit()
+    catalog(seeded_db_session, tmp_path)
+    second = DuplicateFinder(seeded_db_session, chunk_size=CHUNK, cache=cache).find_duplicates()
+
+    assert second.bytes_read == 0
+    assert sorted(map(sorted, second.groups)) == sorted(map(sorted, first.groups))
+
+
+def test_find_duplicates_stores_hashes_before_a_failure(seeded_db_session, tmp_path, mocker):
+    """
+    Test that hashes are committed every batch, so a stage that fails part-way keeps its finished files.
+    """
+    create_duplicate_tree(tmp_path)
+    catalog(seeded_db_session, tmp_path)
+    finder = DuplicateFinder(seeded_db_session, chunk_size=CHUNK, max_workers=1, batch_size=2)
+    hash_partial = finder._partial_hash
+    calls = []
+
+    def failing_partial_hash(row):
+        calls.append(row["file_path"])
+        if len(calls) == 6:
+            raise RuntimeError("interrupted")
+        return hash_partial(row)
+
+    mocker.patch.object(finder, "_partial_hash", side_effect=failing_partial_hash)
+    with pytest.raises(RuntimeError):
+        finder.find_duplicates()
+
+    seeded_db_session.expire_all()
+    assert seeded_db_session.query(Media).filter(Media.partial_hash.is_not(None)).count() == 4
+
+
+def test_find_duplicates_rehashes_after_chunk_size_change(seeded_db_session, tmp_path):
+    """
+    Test that partial hashes record their chunk size, and ones from another chunk size are recomputed.
+    """
+    create_duplicate_tree(tmp_path)
+    catalog(seeded_db_session, tmp_path)
+    DuplicateFinder(seeded_db_session, chunk_size=CHUNK).find_duplicates()
+    original = seeded_db_session.query(Media).filter_by(file_path=str(tmp_path / "a.mp4")).one()
+    assert original.partial_hash.startswith(f"{CHUNK}:")
+
+    write(tmp_path / "a_third.mp4", (tmp_path / "a.mp4").read_bytes())
+    catalog(seeded_db_session, tmp_path)
+    report = DuplicateFinder(seeded_db_session, chunk_size=2 * CHUNK).find_duplicates()
+
+    assert report.partial_hashed == 8
+    groups = sorted(sorted(os.path.basename(path) for path in group) for group in report.groups)
+    assert groups == [["a.mp4", "a_copy.mp4", "a_third.mp4"], ["s.jpg", "s_copy.jpg"]]
@@ -0,0 +1,60 @@
+import cv2
+
+from app.media_scan.models.media import Media
+from app.media_scan.services.image_similarity import ImageSimilarityService
+from app.media_scan.services.media_scanner import MediaScanner
+from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
+from tests.fixtures.video_fixtures import synthetic_frames
+
+
+def create_image_tree(tmp_path):
+    """
+    An original photo, a resized PNG copy, a recompressed JPEG copy, an unrelated photo and a broken file.
+    """
+    image = synthetic_frames(seed=20, count=1, size=(640, 480))[0]
+    cv2.imwrite(str(tmp_path / "photo.jpg"), image)
+    cv2.imwrite(str(tmp_path / "photo_small.png"), cv2.resize(image, (160, 120), interpolation=cv2.INTER_AREA))
+    cv2.imwrite(str(tmp_path / "photo_low.jpg"), image, [cv2.IMWRITE_JPEG_QUALITY, 30])
+    cv2.imwrite(str(tmp_path / "other.jpg"), synthetic_frames(seed=21, count=1, size=(640, 480))[0])
+    (tmp_path / "broken.gif").write_bytes(b"GIF89a")
+
+
+def ids_by_name(session):
+    return {media.file_path.rsplit("/", 1)[-1]: media.id for media in session.query(Media)}
+
+
+def test_similar_images_and_clusters(seeded_db_session, tmp_path):
+    """
+    Test that copies rank closest to the original and form one cluster without the unrelated image.
+    """
+    create_image_tree(tmp_path)
+    MediaScanner(CompositeValidationStrategy(), session=seeded_db_session).execute_and_save_to_db(str(tmp_path))
+    service = ImageSimilarityService(seeded_db_session, batch_size=2)
+
+    assert service.hash_images() == 5
+    ids = ids_by_name(seeded_db_session)
+    similar = service.similar_images(ids["photo.jpg"], k=3)
+
+    assert {media_id for media_id, _ in similar[:2]} == {ids["photo_small.png"], ids["photo_low.jpg"]}
+    assert all(distance <= 6 for _, distance in similar[:2])
+    assert similar[2] == (ids["other.jpg"], similar[2][1]) and similar[2][1] > 12
+    clusters = service.clusters(max_distance=6)
+    assert [sorted(cluster.tolist()) for cluster in clusters] == [
+        sorted([ids["photo.jpg"], ids["photo_small.png"], ids["photo_low.jpg"]])
+    ]
+    broken = seeded_db_session.query(Media).filter_by(id=ids["broken.gif"]).one()
+    assert broken.image_hash == b""
+
+
+def test_hash_images_is_incremental(seeded_db_session, tmp_path, mocker):
+    """
+    Test that already hashed (or undecodable) images are not decoded again.
+    """
+    create_image_tree(tmp_path)
+    MediaScanner(CompositeValidationStrategy(), session=seeded_db_session).execute_and_save_to_db(str(tmp_path))
+    service = ImageSimilarityService(seeded_db_session)
+    service.hash_images()
+
+    load = mocker.patch("app.media_scan.services.image_similarity.load_grayscale")
+    assert service.hash_images() == 0
+    load.assert_not_called()
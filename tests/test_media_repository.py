@@ -0,0 +1,400 @@
+from datetime import datetime
+
+import pytest
+
+from app.media_scan.models.media import Media, MetadataStatus
+from app.media_scan.models.media_type import MediaType
+from app.media_scan.repositories.media_repository import MediaRepository, UpsertPolicy, _CopyStream
+from app.media_scan.utils.stat_snapshot import StatFingerprint
+from app.media_scan.exceptions.media_exceptions import MediaTypeNotFoundError
+
+
+def make_record(session, file_path, media_type="video", file_size=1024, file_mtime_ns=None,
+                file_inode=None, file_device=None):
+    """
+    Build a media row dictionary the way MediaScanner does.
+    """
+    return {
+        "file_path": file_path,
+        "file_size": file_size,
+        "media_type_id": MediaType.get_id_by_name(session, media_type),
+        "duration": 0.0,
+        "resolution": "Unknown",
+        "codec": "Unknown",
+        "bit_rate": 0,
+        "date_created": None,
+        "file_mtime_ns": file_mtime_ns,
+        "file_inode": file_inode,
+        "file_device": file_device,
+    }
+
+
+def test_add_media_bulk_inserts_all_records(seeded_db_session):
+    """
+    Test that add_media_bulk writes every record across several batches.
+
+    Asserts:
+        - All paths are reported as inserted and none as duplicates.
+        - The rows exist in the database.
+    """
+    repository = MediaRepository(seeded_db_session)
+    records = [make_record(seeded_db_session, f"/media/clip_{i}.mp4") for i in range(25)]
+
+    result = repository.add_media_bulk(records, batch_size=10)
+
+    assert result.inserted == [record["file_path"] for record in records]
+    assert result.duplicates == []
+    assert seeded_db_session.query(Media).count() == 25
+
+
+def test_add_media_bulk_reports_existing_duplicates(seeded_db_session):
+    """
+    Test that paths already in the database are reported rather than raising.
+    """
+    repository = MediaRepository(seeded_db_session)
+    repository.add_media(make_record(seeded_db_session, "/media/existing.mp4"))
+
+    records = [
+        make_record(seeded_db_session, "/media/existing.mp4"),
+        make_record(seeded_db_session, "/media/new.mp4"),
+    ]
+    result = repository.add_media_bulk(records)
+
+    assert result.inserted == ["/media/new.mp4"]
+    assert result.duplicates == ["/media/existing.mp4"]
+    assert seeded_db_session.query(Media).count() == 2
+
+
+def test_add_media_bulk_reports_duplicates_within_input(seeded_db_session):
+    """
+    Test that a path repeated within the same input is inserted once.
+    """
+    repository = MediaRepository(seeded_db_session)
+    records = [
+        make_record(seeded_db_session, "/media/song.mp3", media_type="audio"),
+        make_record(seeded_db_session, "/media/song.mp3", media_type="audio"),
+    ]
+
+    result = repository.add_media_bulk(records)
+
+    assert result.inserted == ["/media/song.mp3"]
+    assert result.duplicates == ["/media/song.mp3"]
+
+
+def test_add_media_bulk_falls_back_to_row_inserts_on_conflict(seeded_db_session, mocker):
+    """
+    Test that a conflict missed by the duplicate lookup is resolved row by row.
+
+    The portable (non ON CONFLICT) path is forced and its lookup is patched to
+    report no existing rows, so the batch INSERT hits the UNIQUE constraint and
+    the repository must retry each row in its own savepoint.
+    """
+    repository = MediaRepository(seeded_db_session)
+    repository.add_media(make_record(seeded_db_session, "/media/raced.mp4"))
+    mocker.patch.object(repository, "_dialect_insert", return_value=None)
+    mocker.patch.object(repository, "_existing_paths", return_value=set())
+
+    records = [
+        make_record(seeded_db_session, "/media/raced.mp4"),
+        make_record(seeded_db_session, "/media/fresh.mp4"),
+    ]
+    result = repository.add_media_bulk(records)
+
+    assert result.inserted == ["/media/fresh.mp4"]
+    assert result.duplicates == ["/media/raced.mp4"]
+    assert seeded_db_session.query(Media).count() == 2
+
+
+def test_add_media_bulk_rejects_invalid_batch_size(seeded_db_session):
+    """
+    Test that a non-positive batch size is rejected.
+    """
+    repository = MediaRepository(seeded_db_session)
+    with pytest.raises(ValueError):
+        repository.add_media_bulk([], batch_size=-1)
+
+
+@pytest.fixture(params=["native", "generic"])
+def upsert_repository(request, seeded_db_session, mocker):
+    """
+    Provide a MediaRepository exercising either the ON CONFLICT path or the portable fallback.
+    """
+    repository = MediaRepository(seeded_db_session)
+    if request.param == "generic":
+        mocker.patch.object(repository, "_dialect_insert", return_value=None)
+    return repository
+
+
+def seed_for_upsert(session, repository):
+    """
+    Catalog two files so an upsert sees one unchanged and one modified path.
+    """
+    repository.add_media_bulk([
+        make_record(session, "/media/same.mp4", file_size=100, file_mtime_ns=1),
+        make_record(session, "/media/edited.mp4", file_size=100, file_mtime_ns=1),
+    ])
+    return [
+        make_record(session, "/media/same.mp4", file_size=100, file_mtime_ns=1),
+        dict(make_record(session, "/media/edited.mp4", file_size=200, file_mtime_ns=2), codec="H.264"),
+        make_record(session, "/media/added.mp4", file_size=300, file_mtime_ns=3),
+    ]
+
+
+def test_upsert_media_bulk_skip(seeded_db_session, upsert_repository):
+    """
+    Test that the skip policy only inserts new paths and leaves existing rows untouched.
+    """
+    records = seed_for_upsert(seeded_db_session, upsert_repository)
+
+    result = upsert_repository.upsert_media_bulk(records, policy="skip")
+
+    assert (result.inserted, result.updated, result.unchanged) == (1, 0, 2)
+    edited = seeded_db_session.query(Media).filter_by(file_path="/media/edited.mp4").one()
+    assert edited.file_size == 100
+
+
+def test_upsert_media_bulk_refresh(seeded_db_session, upsert_repository):
+    """
+    Test that the refresh policy overwrites metadata for every existing path.
+    """
+    records = seed_for_upsert(seeded_db_session, upsert_repository)
+
+    result = upsert_repository.upsert_media_bulk(records, policy=UpsertPolicy.REFRESH)
+
+    assert (result.inserted, result.updated, result.unchanged) == (1, 2, 0)
+    seeded_db_session.expire_all()
+    edited = seeded_db_session.query(Media).filter_by(file_path="/media/edited.mp4").one()
+    assert (edited.file_size, edited.file_mtime_ns, edited.codec) == (200, 2, "H.264")
+
+
+def test_upsert_media_bulk_refresh_keeps_derived_columns(seeded_db_session, upsert_repository):
+    """
+    Test that refresh keeps hashes and extracted metadata of unchanged files.
+
+    Asserts:
+        - An unchanged file keeps its hashes, thumbnail, codec and DONE status against a pending record.
+        - A changed file has its hashes reset and takes the new record's status.
+    """
+    records = seed_for_upsert(seeded_db_session, upsert_repository)
+    derived = {"partial_hash": "p", "content_hash": "c", "image_hash": b"i", "thumbnail_path": "/thumbs/c.jpg"}
+    upsert_repository.update_media_metadata_bulk([
+        {"file_path": path, "codec": "HEVC", "metadata_status": MetadataStatus.DONE.value, **derived}
+        for path in ("/media/same.mp4", "/media/edited.mp4")
+    ])
+    pending = {"metadata_status": MetadataStatus.PENDING.value, "metadata_attempts": 0,
+               "partial_hash": None, "content_hash": None, "image_hash": None, "thumbnail_path": None}
+
+    result = upsert_repository.upsert_media_bulk([record | pending for record in records], policy="refresh")
+
+    assert (result.inserted, result.updated, result.unchanged) == (1, 2, 0)
+    seeded_db_session.expire_all()
+    same = seeded_db_session.query(Media).filter_by(file_path="/media/same.mp4").one()
+    assert (same.partial_hash, same.content_hash, same.image_hash, same.thumbnail_path) == tuple(derived.values())
+    assert (same.codec, same.metadata_status) == ("HEVC", MetadataStatus.DONE.value)
+    edited = seeded_db_session.query(Media).filter_by(file_path="/media/edited.mp4").one()
+    assert (edited.file_size, edited.content_hash, edited.thumbnail_path) == (200, None, None)
+    assert (edited.codec, edited.metadata_status) == ("H.264", MetadataStatus.PENDING.value)
+
+
+def test_upsert_media_bulk_refresh_if_changed(seeded_db_session, upsert_repository):
+    """
+    Test that refresh_if_changed only rewrites rows whose size or mtime differ.
+    """
+    records = seed_for_upsert(seeded_db_session, upsert_repository)
+
+    result = upsert_repository.upsert_media_bulk(records, policy="refresh_if_changed", batch_size=2)
+
+    assert (result.inserted, result.updated, result.unchanged) == (1, 1, 1)
+    seeded_db_session.expire_all()
+    edited = seeded_db_session.query(Media).filter_by(file_path="/media/edited.mp4").one()
+    assert (edited.file_size, edited.file_mtime_ns) == (200, 2)
+    assert seeded_db_session.query(Media).count() == 3
+
+
+def test_upsert_media_bulk_rejects_unknown_policy(seeded_db_session):
+    """
+    Test that an unknown policy name is rejected.
+    """
+    with pytest.raises(ValueError):
+        MediaRepository(seeded_db_session).upsert_media_bulk([], policy="overwrite")
+
+
+def load_record(file_path, media_type="video", file_size=1024):
+    """
+    Build a media row the way a bulk load receives it: the type by name instead of ID.
+    """
+    return {"file_path": file_path, "file_size": file_size, "media_type": media_type, "duration": 0.0}
+
+
+def test_load_media_bulk_resolves_types_by_name(seeded_db_session):
+    """
+    Test that the fallback path resolves type names and keeps the first occurrence of a path.
+    """
+    repository = MediaRepository(seeded_db_session)
+    repository.add_media_bulk([make_record(seeded_db_session, "/media/old.mp4", file_size=1)])
+
+    result = repository.load_media_bulk(load_record(path, media_type, size) for path, media_type, size in [
+        ("/media/old.mp4", "video", 2),
+        ("/media/song.mp3", "audio", 3),
+        ("/media/photo.jpg", "image", 4),
+        ("/media/song.mp3", "audio", 5),
+    ])
+
+    assert (result.inserted, result.updated, result.unchanged) == (2, 0, 2)
+    rows = {media.file_path: (media.media_type.name, media.file_size) for media in seeded_db_session.query(Media)}
+    assert rows == {"/media/old.mp4": ("video", 1), "/media/song.mp3": ("audio", 3),
+                    "/media/photo.jpg": ("image", 4)}
+
+
+def test_load_media_bulk_refresh_and_unknown_type(seeded_db_session):
+    """
+    Test the refresh policy of a bulk load, and that an unknown type name is rejected.
+    """
+    repository = MediaRepository(seeded_db_session)
+    repository.load_media_bulk([load_record("/media/clip.mp4", file_size=1)])
+
+    result = repository.load_media_bulk([load_record("/media/clip.mp4", file_size=2)], policy="refresh")
+
+    assert (result.inserted, result.updated, result.unchanged) == (0, 1, 0)
+    seeded_db_session.expire_all()
+    assert seeded_db_session.query(Media).one().file_size == 2
+    assert repository.load_media_bulk([]).inserted == 0
+    with pytest.raises(MediaTypeNotFoundError):
+        repository.load_media_bulk([load_record("/media/model.obj", media_type="3d")])
+
+
+def test_copy_stream_encodes_rows_in_copy_text_format():
+    """
+    Test that COPY lines escape separators, encode NULLs, bytea and timestamps, and stream in chunks.
+    """
+    records = iter([
+        {"file_path": "/media/tab\there\nnew\\line", "file_size": 5, "video_signature": b"\x01\xff",
+         "date_created": datetime(2024, 1, 2, 3, 4, 5)},
+        {"file_path": "/media/plain.mp4"},
+    ])
+    stream = _CopyStream(records, ["file_path", "file_size", "video_signature", "date_created"])
+
+    data = b"".join(iter(lambda: stream.read(16), b""))
+
+    assert data.decode().splitlines() == [
+        "/media/tab\\there\\nnew\\\\line\t5\t\\\\x01ff\t2024-01-02 03:04:05",
+        "/media/plain.mp4\t\\N\t\\N\t\\N",
+    ]
+    assert stream.rows == 2
+
+
+def test_get_fingerprints_limited_to_directory(seeded_db_session):
+    """
+    Test that get_fingerprints returns stat fingerprints only for files under the directory.
+    """
+    repository = MediaRepository(seeded_db_session)
+    inside = make_record(seeded_db_session, "/media/a/clip.mp4", file_size=5, file_mtime_ns=6,
+                         file_inode=7, file_device=8)
+    sibling = make_record(seeded_db_session, "/media/ab/clip.mp4")
+    repository.add_media_bulk([inside, sibling])
+
+    fingerprints = repository.get_fingerprints("/media/a")
+
+    assert fingerprints == {"/media/a/clip.mp4": StatFingerprint(5, 6, 7, 8)}
+
+
+def test_delete_media_by_paths(seeded_db_session):
+    """
+    Test that delete_media_by_paths removes only the given paths.
+    """
+    repository = MediaRepository(seeded_db_session)
+    repository.add_media_bulk([make_record(seeded_db_session, f"/media/{i}.mp4") for i in range(5)])
+
+    deleted = repository.delete_media_by_paths(["/media/1.mp4", "/media/3.mp4", "/media/9.mp4"], batch_size=2)
+
+    assert deleted == 2
+    assert seeded_db_session.query(Media).count() == 3
+
+
+def test_update_media_metadata_bulk(seeded_db_session):
+    """
+    Test that rows are updated by file path with per-row column sets, ignoring unknown paths.
+    """
+    repository = MediaRepository(seeded_db_session)
+    repository.add_media_bulk([make_record(seeded_db_session, f"/media/{i}.avi") for i in range(3)])
+
+    updated = repository.update_media_metadata_bulk([
+        {"file_path": "/media/0.avi", "duration": 10.0, "codec": "MPEG-4", "resolution": "640x480"},
+        {"file_path": "/media/1.avi", "duration": 20.0},
+        {"file_path": "/media/9.avi", "duration": 30.0},
+    ], batch_size=2)
+
+    assert updated == 2
+    rows = {media.file_path: media for media in seeded_db_session.query(Media).all()}
+    assert (rows["/media/0.avi"].duration, rows["/media/0.avi"].codec) == (10.0, "MPEG-4")
+    assert (rows["/media/1.avi"].duration, rows["/media/1.avi"].codec) == (20.0, "Unknown")
+    assert rows["/media/2.avi"].duration == 0.0
+
+
+@pytest.fixture
+def paged_repository(seeded_db_session):
+    """
+    A repository over 25 video rows interleaved with 5 audio rows.
+    """
+    repository = MediaRepository(seeded_db_session)
+    repository.add_media_bulk([
+        make_record(seeded_db_session, f"/media/{i:02d}", media_type="audio" if i % 6 == 5 else "video",
+                    file_size=i)
+        for i in range(30)
+    ])
+    return repository
+
+
+def test_get_media_page_keyset_pagination(paged_repository):
+    """
+    Test pages follow the id cursor, stay within the type and end with a None cursor.
+    """
+    pages, after_id = [], None
+    while True:
+        page = paged_repository.get_media_page("video", after_id=after_id, limit=10)
+        pages.append(page.items)
+        after_id = page.next_after_id
+        if after_id is None:
+            break
+
+    assert [len(items) for items in pages] == [10, 10, 5]
+    ids = [media.id for items in pages for media in items]
+    assert ids == sorted(ids) and len(set(ids)) == 25
+    assert all(isinstance(media, Media) and media.file_size % 6 != 5 for items in pages for media in items)
+
+
+def test_get_media_page_projects_columns(paged_repository):
+    """
+    Test projected pages return lightweight tuples starting with id.
+    """
+    page = paged_repository.get_media_page(limit=4, columns=["file_path", "file_size"])
+
+    assert [tuple(row) for row in page.items] == [
+        (row.id, f"/media/{i:02d}", i) for i, row in enumerate(page.items)
+    ]
+    assert not any(isinstance(row, Media) for row in page.items)
+    assert page.next_after_id == page.items[-1].id
+
+
+def test_iter_media_streams_with_yield_per(paged_repository, mocker):
+    """
+    Test the generator yields every row in id order, resumes after a cursor and fetches with yield_per.
+    """
+    execute = mocker.spy(paged_repository.session, "execute")
+
+    rows = list(paged_repository.iter_media("video", columns=["file_size"], batch_size=7))
+
+    assert [row.file_size for row in rows] == [i for i in range(30) if i % 6 != 5]
+    assert execute.call_args_list[-1].args[0].get_execution_options()["yield_per"] == 7
+    resumed = list(paged_repository.iter_media(after_id=rows[-3].id))
+    assert [media.file_size for media in resumed] == [27, 28, 29]  # all types, 29 is audio
+
+
+def test_paged_queries_reject_unknown_type_and_columns(paged_repository):
+    """
+    Test unknown media types and column names raise before querying.
+    """
+    with pytest.raises(MediaTypeNotFoundError):
+        paged_repository.get_media_page("hologram")
+    with pytest.raises(ValueError):
+        list(paged_repository.iter_media(columns=["no_such_column"]))
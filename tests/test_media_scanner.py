@@ -0,0 +1,251 @@
+from sqlalchemy.orm import sessionmaker
+
+from app.media_scan.extractors.composite_metadata import CompositeMetadataExtractor
+from app.media_scan.extractors.ffprobe import FFprobeError, FFprobePool
+from app.media_scan.models.media import Media
+from app.media_scan.services.media_scanner import MediaScanner
+from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
+from tests.fixtures.filesystem_fixtures import failing_stat_scandir
+from tests.fixtures.header_fixtures import build_mp4
+
+
+def create_media_tree(tmp_path):
+    """
+    Create a small directory tree with media and non-media files.
+    """
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "movie.mp4").write_bytes(b"x" * 10)
+    (tmp_path / "song.mp3").write_bytes(b"x" * 20)
+    (tmp_path / "sub" / "picture.jpg").write_bytes(b"x" * 30)
+    (tmp_path / "notes.txt").write_text("not media")
+
+
+def test_execute_and_save_to_db_bulk(seeded_db_session, tmp_path):
+    """
+    Test that the default bulk mode stores every media file and skips unknown files.
+    """
+    create_media_tree(tmp_path)
+    scanner = MediaScanner(CompositeValidationStrategy(), session=seeded_db_session, batch_size=2)
+
+    scanner.execute_and_save_to_db(str(tmp_path))
+
+    rows = {media.file_path: media.file_size for media in seeded_db_session.query(Media)}
+    assert rows == {
+        str(tmp_path / "movie.mp4"): 10,
+        str(tmp_path / "song.mp3"): 20,
+        str(tmp_path / "sub" / "picture.jpg"): 30,
+    }
+
+
+def test_execute_and_save_to_db_rescan_skips_duplicates(seeded_db_session, tmp_path):
+    """
+    Test that scanning the same directory twice does not create duplicate rows.
+    """
+    create_media_tree(tmp_path)
+    scanner = MediaScanner(CompositeValidationStrategy(), session=seeded_db_session)
+
+    scanner.execute_and_save_to_db(str(tmp_path))
+    scanner.execute_and_save_to_db(str(tmp_path))
+
+    assert seeded_db_session.query(Media).count() == 3
+
+
+def test_execute_and_save_to_db_flushes_on_interval(seeded_db_session, tmp_path, mocker):
+    """
+    Test that a zero flush interval writes each row as soon as it is scanned.
+    """
+    create_media_tree(tmp_path)
+    scanner = MediaScanner(CompositeValidationStrategy(), session=seeded_db_session,
+                           batch_size=1000, flush_interval=0)
+    spy = mocker.spy(scanner.media_repository, "add_media_bulk")
+
+    scanner.execute_and_save_to_db(str(tmp_path))
+
+    assert spy.call_count >= 3
+    assert seeded_db_session.query(Media).count() == 3
+
+
+def test_execute_and_save_to_db_without_bulk(seeded_db_session, tmp_path, mocker):
+    """
+    Test that bulk=False keeps the original one-commit-per-file behaviour.
+    """
+    create_media_tree(tmp_path)
+    scanner = MediaScanner(CompositeValidationStrategy(), session=seeded_db_session)
+    spy = mocker.spy(scanner.media_repository, "add_media")
+
+    scanner.execute_and_save_to_db(str(tmp_path), bulk=False)
+
+    assert spy.call_count == 3
+    assert seeded_db_session.query(Media).count() == 3
+
+
+def test_execute_and_save_to_db_upsert_refreshes_changed_files(seeded_db_session, tmp_path):
+    """
+    Test that a rescan with refresh_if_changed picks up a file whose size changed.
+    """
+    create_media_tree(tmp_path)
+    scanner = MediaScanner(CompositeValidationStrategy(), session=seeded_db_session,
+                           upsert_policy="refresh_if_changed")
+    scanner.execute_and_save_to_db(str(tmp_path))
+
+    (tmp_path / "movie.mp4").write_bytes(b"x" * 99)
+    scanner.execute_and_save_to_db(str(tmp_path))
+
+    seeded_db_session.expire_all()
+    movie = seeded_db_session.query(Media).filter_by(file_path=str(tmp_path / "movie.mp4")).one()
+    assert movie.file_size == 99
+    assert seeded_db_session.query(Media).count() == 3
+
+
+def test_execute_and_save_to_db_bulk_load(seeded_db_session, tmp_path, mocker):
+    """
+    Test that bulk-load mode hands every row to one load_media_bulk call, with types by name.
+    """
+    create_media_tree(tmp_path)
+    scanner = MediaScanner(CompositeValidationStrategy(), session=seeded_db_session)
+    spy = mocker.spy(scanner.media_repository, "load_media_bulk")
+
+    scanner.execute_and_save_to_db(str(tmp_path), bulk_load=True)
+    scanner.execute_and_save_to_db(str(tmp_path), bulk_load=True)
+
+    assert spy.call_count == 2
+    assert spy.spy_return.unchanged == 3
+    types = {media.file_path: media.media_type.name for media in seeded_db_session.query(Media)}
+    assert types == {
+        str(tmp_path / "movie.mp4"): "video",
+        str(tmp_path / "song.mp3"): "audio",
+        str(tmp_path / "sub" / "picture.jpg"): "image",
+    }
+
+
+def test_execute_and_save_to_db_incremental(seeded_db_session, tmp_path, mocker):
+    """
+    Test that an incremental rescan only sends changed files to the database and
+    prunes files that were deleted from disk.
+    """
+    create_media_tree(tmp_path)
+    scanner = MediaScanner(CompositeValidationStrategy(), session=seeded_db_session)
+    scanner.execute_and_save_to_db(str(tmp_path), incremental=True)
+    assert seeded_db_session.query(Media).count() == 3
+
+    (tmp_path / "song.mp3").write_bytes(b"x" * 42)
+    (tmp_path / "sub" / "picture.jpg").unlink()
+    sent = []
+    upsert_media_bulk = scanner.media_repository.upsert_media_bulk
+
+    def record_upsert(records, **kwargs):
+        # The scanner reuses its pending list, so copy the paths before it is cleared
+        sent.extend(record["file_path"] for record in records)
+        return upsert_media_bulk(records, **kwargs)
+
+    mocker.patch.object(scanner.media_repository, "upsert_media_bulk", side_effect=record_upsert)
+
+    scanner.execute_and_save_to_db(str(tmp_path), incremental=True, prune_missing=True)
+
+    assert sent == [str(tmp_path / "song.mp3")]
+    assert scanner.removed_paths == [str(tmp_path / "sub" / "picture.jpg")]
+    seeded_db_session.expire_all()
+    rows = {media.file_path: media.file_size for media in seeded_db_session.query(Media)}
+    assert rows == {str(tmp_path / "movie.mp4"): 10, str(tmp_path / "song.mp3"): 42}
+
+
+def test_execute_and_save_to_db_incremental_reads_fingerprints_on_read_session(
+        seeded_db_session, test_db_engine, tmp_path, mocker):
+    """
+    Test that a separate read session serves the fingerprints and its transaction is ended afterwards.
+    """
+    create_media_tree(tmp_path)
+    read_session = sessionmaker(bind=test_db_engine)()
+    scanner = MediaScanner(CompositeValidationStrategy(), session=seeded_db_session, read_session=read_session)
+    scanner.execute_and_save_to_db(str(tmp_path), incremental=True)
+    read_spy = mocker.spy(scanner.read_repository, "get_fingerprints")
+    write_spy = mocker.spy(scanner.media_repository, "get_fingerprints")
+
+    scanner.execute_and_save_to_db(str(tmp_path), incremental=True)
+
+    assert read_spy.call_count == 1 and write_spy.call_count == 0
+    assert len(read_spy.spy_return) == 3
+    assert not read_session.in_transaction()
+    read_session.close()
+
+
+def test_execute_and_save_to_db_incremental_keeps_files_that_cannot_be_stated(seeded_db_session, tmp_path, mocker):
+    """
+    Test that a file whose stat fails during an incremental rescan is not pruned as removed.
+    """
+    create_media_tree(tmp_path)
+    scanner = MediaScanner(CompositeValidationStrategy(), session=seeded_db_session)
+    scanner.execute_and_save_to_db(str(tmp_path), incremental=True)
+    song = str(tmp_path / "song.mp3")
+    mocker.patch("app.media_scan.utils.parallel_walker.os.scandir", side_effect=failing_stat_scandir([song]))
+
+    scanner.execute_and_save_to_db(str(tmp_path), incremental=True, prune_missing=True)
+
+    assert scanner.removed_paths == []
+    assert seeded_db_session.query(Media).count() == 3
+
+
+def test_execute_and_save_to_db_with_metadata_extractor(seeded_db_session, tmp_path):
+    """
+    Test that a metadata extractor replaces the placeholder columns for parsable files.
+    """
+    (tmp_path / "clip.mp4").write_bytes(build_mp4())
+    (tmp_path / "song.mp3").write_bytes(b"x" * 20)
+    scanner = MediaScanner(CompositeValidationStrategy(), session=seeded_db_session,
+                           metadata_extractor=CompositeMetadataExtractor())
+
+    scanner.execute_and_save_to_db(str(tmp_path))
+
+    clip = seeded_db_session.query(Media).filter_by(file_path=str(tmp_path / "clip.mp4")).one()
+    assert (clip.duration, clip.resolution, clip.codec) == (12.5, "1920x1080", "H.264")
+    assert (clip.width, clip.height) == (1920, 1080)
+    assert clip.bit_rate > 0
+    song = seeded_db_session.query(Media).filter_by(file_path=str(tmp_path / "song.mp3")).one()
+    assert (song.resolution, song.codec) == ("Unknown", "Unknown")
+    assert (song.width, song.height) == (None, None)
+
+
+def test_execute_and_save_to_db_with_ffprobe_fallback(seeded_db_session, tmp_path, mocker):
+    """
+    Test that only files the header parsers could not read are probed, and results update their rows.
+    """
+    (tmp_path / "clip.mp4").write_bytes(build_mp4())
+    (tmp_path / "old.avi").write_bytes(b"x" * 20)
+    (tmp_path / "photo.jpg").write_bytes(b"x" * 20)
+    extractor = mocker.Mock()
+    extractor.probe.return_value = {"duration": 95.2, "codec": "MPEG-4", "resolution": "640x480"}
+    pool = FFprobePool(extractor, max_workers=2)
+    scanner = MediaScanner(CompositeValidationStrategy(), session=seeded_db_session,
+                           metadata_extractor=CompositeMetadataExtractor(), ffprobe_pool=pool)
+
+    scanner.execute_and_save_to_db(str(tmp_path))
+
+    extractor.probe.assert_called_once_with(str(tmp_path / "old.avi"))
+    old = seeded_db_session.query(Media).filter_by(file_path=str(tmp_path / "old.avi")).one()
+    assert (old.duration, old.codec, old.resolution) == (95.2, "MPEG-4", "640x480")
+    assert pool.stats()["probed"] == 1
+    assert old.metadata_status == "done"
+
+
+def test_ffprobe_fallback_keeps_failed_probes_pending(seeded_db_session, tmp_path, mocker):
+    """
+    Test that a row handed to ffprobe is only marked done by the probe's result, and a failed probe
+    is recorded as an attempt so the enricher retries it.
+    """
+    (tmp_path / "old.avi").write_bytes(b"x" * 20)
+    (tmp_path / "broken.avi").write_bytes(b"x" * 30)
+    def probe(file_path):
+        if file_path.endswith("broken.avi"):
+            raise FFprobeError("ffprobe timed out")
+        return {"duration": 95.2, "codec": "MPEG-4"}
+
+    extractor = mocker.Mock()
+    extractor.probe.side_effect = probe
+    scanner = MediaScanner(CompositeValidationStrategy(), session=seeded_db_session,
+                           ffprobe_pool=FFprobePool(extractor, max_workers=2))
+
+    scanner.execute_and_save_to_db(str(tmp_path))
+
+    rows = {media.file_path.rsplit("/", 1)[-1]: (media.metadata_status, media.metadata_attempts)
+            for media in seeded_db_session.query(Media)}
+    assert rows == {"old.avi": ("done", 0), "broken.avi": ("pending", 1)}
@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta, timezone
+
+from app.media_scan.extractors.composite_metadata import CompositeMetadataExtractor
+from app.media_scan.models.media import Media, MetadataStatus
+from app.media_scan.repositories.media_repository import MediaRepository
+from app.media_scan.services.media_scanner import MediaScanner
+from app.media_scan.services.metadata_enricher import MetadataEnricher
+from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
+from tests.fixtures.header_fixtures import build_mp4, build_png
+
+
+def register_files(session, tmp_path, count=0):
+    """
+    Write an MP4, a PNG and `count` extra MP4s, and register them with a deferred-metadata scan.
+    """
+    (tmp_path / "clip.mp4").write_bytes(build_mp4())
+    (tmp_path / "photo.png").write_bytes(build_png(640, 480))
+    for index in range(count):
+        (tmp_path / f"extra{index}.mp4").write_bytes(build_mp4())
+    scanner = MediaScanner(CompositeValidationStrategy(), session=session,
+                           metadata_extractor=CompositeMetadataExtractor(), defer_metadata=True)
+    scanner.execute_and_save_to_db(str(tmp_path))
+
+
+def statuses(session):
+    session.expire_all()
+    return {media.file_path.rsplit("/", 1)[-1]: media.metadata_status for media in session.query(Media)}
+
+
+def test_deferred_scan_registers_pending_rows_without_reading_files(seeded_db_session, tmp_path, mocker):
+    """
+    Test that a deferred scan inserts placeholder rows and never calls the extractor.
+    """
+    extract = mocker.patch.object(CompositeMetadataExtractor, "extract")
+    register_files(seeded_db_session, tmp_path)
+
+    extract.assert_not_called()
+    assert statuses(seeded_db_session) == {"clip.mp4": "pending", "photo.png": "pending"}
+
+
+def test_inline_scan_marks_rows_done(seeded_db_session, tmp_path):
+    """
+    Test that extracting during the scan leaves nothing for the enricher.
+    """
+    (tmp_path / "clip.mp4").write_bytes(build_mp4())
+    MediaScanner(CompositeValidationStrategy(), session=seeded_db_session,
+                 metadata_extractor=CompositeMetadataExtractor()).execute_and_save_to_db(str(tmp_path))
+
+    assert statuses(seeded_db_session) == {"clip.mp4": "done"}
+    assert MediaRepository(seeded_db_session).claim_pending_metadata(10, 60) == []
+
+
+def test_enricher_fills_metadata_in_batches(seeded_db_session, tmp_path):
+    """
+    Test that the enricher extracts metadata for every pending row and marks it done.
+    """
+    register_files(seeded_db_session, tmp_path, count=3)
+    enricher = MetadataEnricher(CompositeMetadataExtractor(), session=seeded_db_session, batch_size=2)
+
+    result = enricher.run()
+
+    assert (result.done, result.retried, result.failed) == (5, 0, 0)
+    assert set(statuses(seeded_db_session).values()) == {"done"}
+    clip = seeded_db_session.query(Media).filter_by(file_path=str(tmp_path / "clip.mp4")).one()
+    assert (clip.duration, clip.resolution, clip.codec) == (12.5, "1920x1080", "H.264")
+    assert (clip.metadata_attempts, clip.metadata_leased_until) == (1, None)
+    photo = seeded_db_session.query(Media).filter_by(file_path=str(tmp_path / "photo.png")).one()
+    assert (photo.resolution, photo.codec) == ("640x480", "PNG")
+
+
+def test_claims_are_disjoint_until_lease_expires(seeded_db_session, tmp_path):
+    """
+    Test that leased rows are not claimed twice, and are reclaimed once the lease expires (crash recovery).
+    """
+    register_files(seeded_db_session, tmp_path, count=2)
+    repository = MediaRepository(seeded_db_session)
+
+    first = repository.claim_pending_metadata(2, lease_seconds=300)
+    second = repository.claim_pending_metadata(10, lease_seconds=300)
+    assert len(first) == 2 and len(second) == 2
+    assert not {row.id for row in first} & {row.id for row in second}
+    assert repository.claim_pending_metadata(10, lease_seconds=300) == []
+
+    # The worker holding `first` died: its lease runs out and the rows are claimable again
+    seeded_db_session.query(Media).filter(Media.id.in_([row.id for row in first])).update(
+        {Media.metadata_leased_until: datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=1)}, synchronize_session=False
+    )
+    seeded_db_session.commit()
+    reclaimed = repository.claim_pending_metadata(10, lease_seconds=300)
+    assert [row.id for row in reclaimed] == [row.id for row in first]
+    assert {row.metadata_attempts for row in reclaimed} == {2}
+
+
+def test_enricher_resumes_after_interrupted_run(seeded_db_session, tmp_path):
+    """
+    Test that a run stopped part-way through leaves the remaining rows pending for the next run.
+    """
+    register_files(seeded_db_session, tmp_path, count=3)
+    enricher = MetadataEnricher(CompositeMetadataExtractor(), session=seeded_db_session, batch_size=2)
+
+    assert enricher.run(max_batches=1).done == 2
+    assert list(statuses(seeded_db_session).values()).count("pending") == 3
+    assert enricher.run().done == 3
+    assert set(statuses(seeded_db_session).values()) == {"done"}
+
+
+def test_enricher_retries_then_marks_failed(seeded_db_session, tmp_path):
+    """
+    Test that a file that cannot be read is retried until max_attempts, then marked failed.
+    """
+    register_files(seeded_db_session, tmp_path)
+    (tmp_path / "clip.mp4").unlink()
+    enricher = MetadataEnricher(CompositeMetadataExtractor(), session=seeded_db_session,
+                                lease_seconds=0, max_attempts=2)
+
+    first = enricher.run(max_batches=1)
+    assert (first.done, first.retried, first.failed) == (1, 1, 0)
+    assert statuses(seeded_db_session)["clip.mp4"] == MetadataStatus.PENDING.value
+
+    second = enricher.run()
+    assert (second.done, second.retried, second.failed) == (0, 0, 1)
+    assert statuses(seeded_db_session) == {"clip.mp4": "failed", "photo.png": "done"}
+
+
+def test_enricher_discards_results_after_losing_the_lease(seeded_db_session, tmp_path, mocker):
+    """
+    Test that a worker whose lease expired and was taken over does not overwrite the new claim.
+    """
+    register_files(seeded_db_session, tmp_path)
+    extractor = CompositeMetadataExtractor()
+    enricher = MetadataEnricher(extractor, session=seeded_db_session)
+    repository = MediaRepository(seeded_db_session)
+    extract = extractor.extract
+    takeovers = []
+
+    def slow_extract(file_path, media_type, stat):
+        if not takeovers:
+            # The lease runs out mid-batch and another worker claims the rows
+            seeded_db_session.query(Media).update({Media.metadata_leased_until: datetime(2000, 1, 1)})
+            seeded_db_session.commit()
+            takeovers.extend(repository.claim_pending_metadata(10, lease_seconds=300))
+        return extract(file_path, media_type, stat)
+
+    mocker.patch.object(extractor, "extract", side_effect=slow_extract)
+    result = enricher.enrich_batch()
+
+    assert (result.done, result.lost) == (0, 2) and len(takeovers) == 2
+    assert set(statuses(seeded_db_session).values()) == {"pending"}
+    seeded_db_session.expire_all()
+    assert {media.metadata_attempts for media in seeded_db_session.query(Media)} == {2}
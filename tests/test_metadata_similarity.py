@@ -0,0 +1,76 @@
+from app.media_scan.models.media import Media
+from app.media_scan.models.media_type import MediaType
+from app.media_scan.repositories.media_repository import MediaRepository
+from app.media_scan.services.metadata_similarity import MetadataSimilarityService
+from app.media_scan.similarity import metadata_index
+
+
+def add_media(session, name, media_type="video", duration=120.0, resolution="1920x1080", codec="H.264",
+              bit_rate=5_000_000, file_size=75_000_000):
+    MediaRepository(session).add_media_bulk([{
+        "file_path": f"/videos/{name}",
+        "file_size": file_size,
+        "media_type_id": MediaType.get_id_by_name(session, media_type),
+        "duration": duration,
+        "resolution": resolution,
+        "codec": codec,
+        "bit_rate": bit_rate,
+        "date_created": None,
+        "file_mtime_ns": 1,
+    }])
+    return session.query(Media).filter_by(file_path=f"/videos/{name}").one().id
+
+
+def test_similar_videos_and_duplicate_groups(seeded_db_session):
+    """
+    Test only enriched videos are indexed and copies form a candidate group.
+    """
+    original = add_media(seeded_db_session, "movie.mp4")
+    copy = add_media(seeded_db_session, "movie (1).mp4")
+    other = add_media(seeded_db_session, "clip.mp4", duration=30.0, file_size=10_000_000)
+    pending = add_media(seeded_db_session, "new.mp4", duration=0.0)
+    add_media(seeded_db_session, "song.mp3", media_type="audio", resolution="Unknown", codec="MP3")
+    service = MetadataSimilarityService(seeded_db_session, index_path=False)
+
+    similar = service.similar_videos(original, k=5)
+    assert [media_id for media_id, _ in similar] == [copy, other]
+    assert similar[0][1] == 0.0 and similar[1][1] > 1.0
+    assert service.duplicate_groups() == [[original, copy]]
+    assert pending not in service.index.ids
+
+
+def test_background_refresh_swaps_index(seeded_db_session):
+    """
+    Test queries keep the old index until a background rebuild finishes, then see the new rows.
+    """
+    original = add_media(seeded_db_session, "movie.mp4")
+    service = MetadataSimilarityService(seeded_db_session, index_path=False)
+    before = service.index
+    copy = add_media(seeded_db_session, "movie (1).mp4")
+
+    assert service.index is before
+    thread = service.refresh(background=True)
+    service.wait()
+
+    assert not thread.is_alive()
+    assert service.index is not before
+    assert service.similar_videos(original, k=1) == [(copy, 0.0)]
+
+
+def test_index_persists_across_restarts(seeded_db_session, tmp_path, mocker):
+    """
+    Test a new service loads the saved index instead of rebuilding, and refreshes only changes.
+    """
+    path = str(tmp_path / "metadata_index.pkl")
+    original = add_media(seeded_db_session, "movie.mp4")
+    copy = add_media(seeded_db_session, "movie (1).mp4")
+    MetadataSimilarityService(seeded_db_session, index_path=path).refresh()
+
+    features = mocker.spy(MediaRepository, "get_similarity_features")
+    vectorize = mocker.spy(metadata_index, "feature_vector")
+    restarted = MetadataSimilarityService(seeded_db_session, index_path=path)
+
+    assert restarted.duplicate_groups() == [[original, copy]]
+    features.assert_not_called()
+    restarted.refresh()
+    vectorize.assert_not_called()
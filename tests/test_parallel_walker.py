@@ -0,0 +1,116 @@
+import os
+import pytest
+
+from app.media_scan.utils.parallel_walker import ParallelDirectoryWalker
+from tests.fixtures.filesystem_fixtures import failing_stat_scandir
+
+
+def create_tree(tmp_path):
+    """
+    Create a nested directory tree and return the expected {path: size} of its files.
+    """
+    expected = {}
+    for dir_index in range(3):
+        for sub_index in range(3):
+            directory = tmp_path / f"dir_{dir_index}" / f"sub_{sub_index}"
+            directory.mkdir(parents=True)
+            for file_index in range(2):
+                file = directory / f"file_{file_index}.mp4"
+                file.write_bytes(b"x" * (dir_index * 10 + sub_index * 3 + file_index))
+                expected[str(file)] = file.stat().st_size
+    root_file = tmp_path / "root.mp3"
+    root_file.write_bytes(b"abc")
+    expected[str(root_file)] = 3
+    return expected
+
+
+def flatten(results):
+    """
+    Convert walker output into a list of (full path, size) tuples.
+    """
+    return [
+        (os.path.join(dir_path, name), stat.st_size)
+        for dir_path, files in results
+        for name, stat in files
+    ]
+
+
+@pytest.mark.parametrize("ordering", ["deterministic", "as_completed"])
+@pytest.mark.parametrize("max_pending", [1, None])
+def test_walk_finds_every_file_with_stat(tmp_path, ordering, max_pending):
+    """
+    Test that both orderings yield every file exactly once with its stat result.
+    """
+    expected = create_tree(tmp_path)
+    walker = ParallelDirectoryWalker(max_workers=4, ordering=ordering, max_pending=max_pending)
+
+    found = flatten(walker.walk(str(tmp_path)))
+
+    assert len(found) == len(expected)
+    assert dict(found) == expected
+
+
+def test_walk_deterministic_matches_sorted_depth_first_order(tmp_path):
+    """
+    Test that deterministic ordering is a sorted depth-first pre-order, identical across runs.
+    """
+    create_tree(tmp_path)
+    walker = ParallelDirectoryWalker(max_workers=8, ordering="deterministic")
+
+    first = [dir_path for dir_path, _ in walker.walk(str(tmp_path))]
+    second = [dir_path for dir_path, _ in walker.walk(str(tmp_path))]
+
+    expected = []
+    for root, dirs, _ in os.walk(str(tmp_path)):
+        dirs.sort()
+        expected.append(root)
+    assert first == second == expected
+
+
+def test_walk_reports_unlistable_directories(tmp_path, mocker):
+    """
+    Test that a directory that cannot be listed is passed to on_error and skipped.
+    """
+    create_tree(tmp_path)
+    broken = str(tmp_path / "dir_1")
+    real_scandir = os.scandir
+
+    def failing_scandir(path):
+        if path == broken:
+            raise PermissionError(13, "Permission denied", path)
+        return real_scandir(path)
+
+    mocker.patch("app.media_scan.utils.parallel_walker.os.scandir", side_effect=failing_scandir)
+    errors = []
+    walker = ParallelDirectoryWalker(max_workers=2, ordering="deterministic")
+
+    found = flatten(walker.walk(str(tmp_path), on_error=errors.append))
+
+    assert [error.filename for error in errors] == [broken]
+    assert not any(path.startswith(broken + os.sep) for path, _ in found)
+
+
+def test_walk_reports_entries_that_cannot_be_stated(tmp_path, mocker):
+    """
+    Test that a file whose stat fails is passed to on_stat_error and left out of the listing.
+    """
+    create_tree(tmp_path)
+    broken = str(tmp_path / "root.mp3")
+    mocker.patch("app.media_scan.utils.parallel_walker.os.scandir", side_effect=failing_stat_scandir([broken]))
+    errors = []
+    walker = ParallelDirectoryWalker(max_workers=2)
+
+    found = flatten(walker.walk(str(tmp_path), on_stat_error=lambda path, error: errors.append(path)))
+
+    assert errors == [broken]
+    assert broken not in dict(found) and len(found) == 18
+
+
+def test_walker_rejects_invalid_settings():
+    """
+    Test that an unknown ordering or non-positive worker count is rejected.
+    """
+    with pytest.raises(ValueError):
+        ParallelDirectoryWalker(ordering="random")
+    with pytest.raises(ValueError):
+        ParallelDirectoryWalker(max_workers=-2)
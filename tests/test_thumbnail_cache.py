@@ -0,0 +1,149 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from app.media_scan.models.media import Media
+from app.media_scan.services.media_scanner import MediaScanner
+from app.media_scan.services.thumbnail_cache import ThumbnailCache
+from app.media_scan.services.thumbnail_generator import ThumbnailGenerator
+from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
+from app.media_scan.thumbnails import render
+from tests.fixtures.video_fixtures import synthetic_frames, write_video
+
+TIERS = {"icon": 32, "medium": 128, "preview": 256}
+
+
+def catalog(session, tmp_path, images=6):
+    """
+    Scan a directory of photos and one video; return Media IDs in path order.
+    """
+    media = tmp_path / "media"
+    media.mkdir()
+    for index in range(images):
+        cv2.imwrite(str(media / f"photo_{index}.jpg"), synthetic_frames(seed=30 + index, count=1, size=(640, 480))[0])
+    write_video(media / "zclip.avi", synthetic_frames(seed=40))
+    (media / "zsong.mp3").write_bytes(b"ID3" + b"\x00" * 64)
+    MediaScanner(CompositeValidationStrategy(), session=session).execute_and_save_to_db(str(media))
+    return [media.id for media in session.query(Media).order_by(Media.file_path)]
+
+
+def test_levels_memory_disk_and_source(seeded_db_session, tmp_path, mocker):
+    """
+    Test a cold miss decodes once for every tier, other tiers then hit disk and repeats hit memory.
+    """
+    ids = catalog(seeded_db_session, tmp_path)
+    cache = ThumbnailCache(seeded_db_session, directory=str(tmp_path / "thumbs"), tiers=TIERS, prefetch_workers=1)
+    load = mocker.spy(render, "load_image")
+
+    icon = cache.get(ids[0], "icon", wait=True)
+    preview = cache.get(ids[0], "preview")
+    assert cache.get(ids[0], "icon") is icon
+
+    assert load.call_count == 1
+    assert cv2.imdecode(np.frombuffer(preview, np.uint8), cv2.IMREAD_COLOR).shape == (192, 256, 3)
+    stats = cache.stats()
+    assert (stats["renders"], stats["disk_hits"], stats["memory"]["hits"]) == (1, 1, 1)
+    assert cache.get(ids[-2], "icon", wait=True)[:2] == b"\xff\xd8"   # video
+    assert cache.get(ids[-1], "icon") is None              # audio has no thumbnail
+    cache.close()
+
+
+def test_reads_generated_tiers_from_disk(seeded_db_session, tmp_path, mocker):
+    """
+    Test thumbnails written by the generator are served without decoding the sources.
+    """
+    ids = catalog(seeded_db_session, tmp_path, images=2)
+    directory = str(tmp_path / "thumbs")
+    ThumbnailGenerator(seeded_db_session, directory=directory, tiers=TIERS, max_workers=1).generate()
+    cache = ThumbnailCache(seeded_db_session, directory=directory, tiers=TIERS)
+    load = mocker.spy(render, "load_image")
+
+    assert set(cache.get_many(ids, "medium")) == set(ids[:3])
+    load.assert_not_called()
+    assert cache.stats()["disk_hits"] == 3
+    cache.close()
+
+
+def test_window_prefetches_neighbours(seeded_db_session, tmp_path):
+    """
+    Test the pages around the visible window are loaded in the background and later served from memory.
+    """
+    ids = catalog(seeded_db_session, tmp_path)
+    cache = ThumbnailCache(seeded_db_session, directory=str(tmp_path / "thumbs"), tiers=TIERS, prefetch_workers=2)
+
+    visible = cache.window(ids[:6], start=2, count=2, tier="icon")
+    cache.wait_for_prefetch()
+
+    # Nothing is on disk yet: the visible items are rendered in the background too, ahead of the neighbours
+    assert visible == {}
+    assert cache.stats()["prefetched"] == 6
+    assert all((media_id, "icon") in cache.memory for media_id in ids[:6])
+    assert list(cache.window(ids[:6], start=4, count=2, tier="icon")) == ids[4:6]
+    assert cache.stats()["memory"]["hits"] == 2
+    cache.close()
+
+
+def test_memory_limit_evicts(seeded_db_session, tmp_path):
+    """
+    Test the memory tier stays within its byte budget and evicted entries fall back to disk.
+    """
+    ids = catalog(seeded_db_session, tmp_path)
+    cache = ThumbnailCache(seeded_db_session, directory=str(tmp_path / "thumbs"), tiers=TIERS, memory_limit=4_000)
+
+    for media_id in ids[:6]:
+        cache.get(media_id, "preview", wait=True)
+    stats = cache.stats()["memory"]
+    assert stats["bytes"] <= 4_000 and stats["evictions"] > 0
+
+    assert cache.get(ids[0], "preview") is not None
+    assert cache.stats()["disk_hits"] == 1
+    assert os.path.isdir(tmp_path / "thumbs" / "icon")
+    cache.close()
+
+
+def test_concurrent_gets_render_once(seeded_db_session, tmp_path, mocker):
+    """
+    Test threads missing on the same thumbnail share one render instead of decoding the source each.
+    """
+    ids = catalog(seeded_db_session, tmp_path, images=1)
+    cache = ThumbnailCache(seeded_db_session, directory=str(tmp_path / "thumbs"), tiers=TIERS)
+    cache._resolve(ids)
+    load = mocker.spy(render, "load_image")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        thumbnails = list(executor.map(lambda _: cache.get(ids[0], "icon", wait=True), range(16)))
+
+    assert load.call_count == 1
+    assert all(thumbnail is thumbnails[0] for thumbnail in thumbnails)
+    assert cache.stats()["render_failures"] == 0
+    cache.close()
+
+
+def test_get_renders_in_the_background(seeded_db_session, tmp_path, mocker):
+    """
+    Test a miss with no tier file returns None at once and hashes and decodes the source on a
+    prefetch thread, reporting the thumbnail through on_loaded.
+    """
+    ids = catalog(seeded_db_session, tmp_path, images=1)
+    loaded = []
+    cache = ThumbnailCache(seeded_db_session, directory=str(tmp_path / "thumbs"), tiers=TIERS,
+                           on_loaded=lambda media_id, tier, data: loaded.append((media_id, tier, data)))
+    threads = []
+    hash_file = render.full_hash
+
+    def recording_hash(file_path):
+        threads.append(threading.current_thread())
+        return hash_file(file_path)
+
+    mocker.patch.object(render, "full_hash", side_effect=recording_hash)
+
+    assert cache.get(ids[0], "icon") is None
+    cache.wait_for_prefetch()
+
+    assert threads and threading.main_thread() not in threads
+    assert [(media_id, tier) for media_id, tier, _ in loaded] == [(ids[0], "icon")]
+    assert cache.get(ids[0], "icon") is loaded[0][2]
+    cache.close()
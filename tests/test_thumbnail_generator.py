@@ -0,0 +1,101 @@
+import os
+import shutil
+
+import cv2
+
+from app.media_scan.models.media import Media
+from app.media_scan.repositories.media_repository import MediaRepository
+from app.media_scan.services.media_scanner import MediaScanner
+from app.media_scan.services.thumbnail_generator import ThumbnailGenerator, ThumbnailReport
+from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
+from app.media_scan.thumbnails.packed_store import PackedThumbnailStore
+from tests.fixtures.video_fixtures import synthetic_frames, write_video
+
+
+def create_media_tree(tmp_path):
+    """
+    A video and a byte-identical copy, a large photo, and an image that cannot be decoded.
+    """
+    media = tmp_path / "media"
+    media.mkdir()
+    write_video(media / "clip.avi", synthetic_frames(seed=5))
+    shutil.copy(media / "clip.avi", media / "clip copy.avi")
+    cv2.imwrite(str(media / "photo.jpg"), synthetic_frames(seed=6, count=1, size=(1024, 768))[0])
+    (media / "broken.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+    return media
+
+
+def scan(session, directory):
+    MediaScanner(CompositeValidationStrategy(), session=session).execute_and_save_to_db(str(directory))
+
+
+def thumbnails_by_name(session):
+    session.expire_all()
+    return {os.path.basename(media.file_path): media.thumbnail_path for media in session.query(Media)}
+
+
+def test_generate_content_addressed_thumbnails(seeded_db_session, tmp_path):
+    """
+    Test duplicates share one thumbnail set, every tier is written and undecodable files get an empty path.
+    """
+    scan(seeded_db_session, create_media_tree(tmp_path))
+    output = tmp_path / "thumbnails"
+    generator = ThumbnailGenerator(seeded_db_session, directory=str(output), tiers={"icon": 32, "medium": 128},
+                                   primary_tier="medium", max_workers=2)
+
+    report = generator.generate()
+
+    thumbnails = thumbnails_by_name(seeded_db_session)
+    assert report.generated == 2 and report.failed == 1 and report.generated + report.reused == 3
+    assert thumbnails["clip.avi"] == thumbnails["clip copy.avi"]
+    assert thumbnails["broken.png"] == ""
+    assert cv2.imread(thumbnails["photo.jpg"]).shape == (96, 128, 3)
+    assert cv2.imread(thumbnails["clip.avi"]).shape == (96, 128, 3)
+    photo = seeded_db_session.query(Media).filter(Media.file_path.like("%photo.jpg")).one()
+    assert thumbnails["photo.jpg"] == str(output / "medium" / photo.content_hash[:2] / f"{photo.content_hash}.jpg")
+    assert cv2.imread(str(output / "icon" / photo.content_hash[:2] / f"{photo.content_hash}.jpg")).shape == (24, 32, 3)
+
+
+def test_generate_skips_existing_thumbnails(seeded_db_session, tmp_path, mocker):
+    """
+    Test linked rows are not processed again and new copies reuse the existing thumbnail without decoding.
+    """
+    media = create_media_tree(tmp_path)
+    scan(seeded_db_session, media)
+    generator = ThumbnailGenerator(seeded_db_session, directory=str(tmp_path / "thumbnails"), max_workers=1)
+    generator.generate()
+
+    assert generator.generate() == ThumbnailReport()
+
+    shutil.copy(media / "photo.jpg", media / "photo copy.jpg")
+    scan(seeded_db_session, media)
+    report = generator.generate()
+
+    thumbnails = thumbnails_by_name(seeded_db_session)
+    assert report == ThumbnailReport(reused=1)
+    assert thumbnails["photo copy.jpg"] == thumbnails["photo.jpg"]
+
+
+def test_pack_into_store(seeded_db_session, tmp_path):
+    """
+    Test packing stores each distinct thumbnail once, follows catalog changes and keeps the loose files.
+    """
+    media = create_media_tree(tmp_path)
+    scan(seeded_db_session, media)
+    generator = ThumbnailGenerator(seeded_db_session, directory=str(tmp_path / "thumbnails"), max_workers=1)
+    generator.generate()
+    thumbnails = thumbnails_by_name(seeded_db_session)
+    ids = {os.path.basename(media.file_path): media.id for media in seeded_db_session.query(Media)}
+
+    with PackedThumbnailStore(str(tmp_path / "store")) as store:
+        assert generator.pack(store, tier="medium") == 3
+        assert store.stats()["blobs"] == 2
+        with open(thumbnails["photo.jpg"], "rb") as file:
+            assert store.get(ids["photo.jpg"]) == file.read()
+
+        assert generator.pack(store) == 0
+        MediaRepository(seeded_db_session).delete_media_by_paths([str(media / "clip copy.avi")])
+        assert generator.pack(store) == 0
+        assert set(store.entries()) == {ids["clip.avi"], ids["photo.jpg"]}
+        assert os.path.exists(thumbnails["photo.jpg"])
+        assert store.get(ids["clip.avi"])[:2] == b"\xff\xd8"
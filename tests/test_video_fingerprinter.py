@@ -0,0 +1,71 @@
+import pytest
+
+from app.media_scan.models.media import Media
+from app.media_scan.services.media_scanner import MediaScanner
+from app.media_scan.services.video_fingerprinter import VideoFingerprinter
+from app.media_scan.strategies.composite_validation import CompositeValidationStrategy
+from tests.fixtures.video_fixtures import synthetic_frames, write_video
+
+
+def catalog(session, tmp_path):
+    MediaScanner(CompositeValidationStrategy(), session=session).execute_and_save_to_db(str(tmp_path))
+
+
+def test_find_near_duplicate_videos(seeded_db_session, tmp_path):
+    """
+    Test that a resized and a re-encoded copy are paired with the original, and an unrelated video is not.
+    """
+    frames = synthetic_frames(seed=10)
+    write_video(tmp_path / "original.avi", frames)
+    write_video(tmp_path / "small.avi", frames, size=(80, 60))
+    write_video(tmp_path / "reencoded.mp4", frames, fourcc="mp4v")
+    write_video(tmp_path / "other.avi", synthetic_frames(seed=11))
+    (tmp_path / "broken.mkv").write_bytes(b"not a video")
+    catalog(seeded_db_session, tmp_path)
+    fingerprinter = VideoFingerprinter(seeded_db_session, max_workers=2)
+
+    assert fingerprinter.fingerprint_videos() == 5
+    pairs = fingerprinter.find_near_duplicates(max_distance=16)
+
+    names = {tuple(sorted(path.rsplit("/", 1)[-1] for path in pair[:2])) for pair in pairs}
+    assert names == {("original.avi", "small.avi"), ("original.avi", "reencoded.mp4"), ("reencoded.mp4", "small.avi")}
+    broken = seeded_db_session.query(Media).filter_by(file_path=str(tmp_path / "broken.mkv")).one()
+    assert broken.video_signature == b""
+
+
+def test_fingerprint_videos_is_incremental(seeded_db_session, tmp_path, mocker):
+    """
+    Test that videos already fingerprinted (or undecodable) are not decoded again.
+    """
+    write_video(tmp_path / "a.avi", synthetic_frames(seed=12))
+    (tmp_path / "broken.mkv").write_bytes(b"not a video")
+    catalog(seeded_db_session, tmp_path)
+    fingerprinter = VideoFingerprinter(seeded_db_session)
+    fingerprinter.fingerprint_videos()
+
+    signature = mocker.patch("app.media_scan.services.video_fingerprinter.video_signature")
+    assert fingerprinter.fingerprint_videos() == 0
+    signature.assert_not_called()
+
+
+def test_fingerprint_videos_stores_batches_as_they_finish(seeded_db_session, tmp_path, mocker):
+    """
+    Test signatures are committed every batch, so videos finished before a failure keep theirs.
+    """
+    for index in range(5):
+        write_video(tmp_path / f"clip_{index}.avi", synthetic_frames(seed=20 + index, count=8))
+    catalog(seeded_db_session, tmp_path)
+    fingerprinter = VideoFingerprinter(seeded_db_session, max_workers=1, batch_size=2)
+    store = mocker.spy(fingerprinter.media_repository, "update_media_metadata_bulk")
+
+    assert fingerprinter.fingerprint_videos() == 5
+    assert [len(call.args[0]) for call in store.call_args_list] == [2, 2, 1]
+
+    seeded_db_session.query(Media).update({"video_signature": None})
+    seeded_db_session.commit()
+    signature = mocker.patch("app.media_scan.services.video_fingerprinter.video_signature",
+                             side_effect=[None, None, None, OSError("disk gone"), None])
+    with pytest.raises(OSError):
+        fingerprinter.fingerprint_videos()
+    assert signature.call_count == 5
+    assert seeded_db_session.query(Media).filter(Media.video_signature == b"").count() == 2
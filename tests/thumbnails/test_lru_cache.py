@@ -0,0 +1,35 @@
+"""
+Unit tests for the byte-bounded ByteLRUCache.
+"""
+
+from app.media_scan.thumbnails.lru_cache import ByteLRUCache
+
+
+def test_evicts_least_recently_used_by_bytes():
+    """
+    Test the byte budget is enforced and recently read entries survive eviction.
+    """
+    cache = ByteLRUCache(max_bytes=100)
+    cache.put("a", b"a" * 40)
+    cache.put("b", b"b" * 40)
+    assert cache.get("a") == b"a" * 40
+
+    cache.put("c", b"c" * 40)
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.get("b") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "evictions": 1, "evicted_bytes": 40,
+                             "entries": 2, "bytes": 80, "max_bytes": 100}
+
+
+def test_replace_and_oversized_values():
+    """
+    Test replacing a key re-accounts its size and values over the budget are not cached.
+    """
+    cache = ByteLRUCache(max_bytes=100)
+    cache.put("a", b"a" * 90)
+    cache.put("a", b"a" * 10)
+    assert cache.stats()["bytes"] == 10
+
+    assert not cache.put("huge", b"x" * 101)
+    assert "huge" not in cache and len(cache) == 1
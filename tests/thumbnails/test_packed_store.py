@@ -0,0 +1,85 @@
+"""
+Unit tests for PackedThumbnailStore: segments, shared blobs, bulk reads and compaction.
+"""
+
+import os
+
+import pytest
+
+from app.media_scan.thumbnails.packed_store import PackedThumbnailStore
+
+
+def blob(index, size=100):
+    return bytes([index % 256]) * size
+
+
+def test_put_get_and_shared_blobs(tmp_path):
+    """
+    Test round trips, duplicate content stored once and missing IDs left out.
+    """
+    with PackedThumbnailStore(str(tmp_path)) as store:
+        store.put(1, "a", blob(1))
+        store.put_many([(2, "b", blob(2)), (3, "a", None)])
+
+        assert store.get(1) == blob(1)
+        assert store.get_many([3, 2, 99]) == {2: blob(2), 3: blob(1)}
+        assert store.get(99) is None
+        assert store.entries() == {1: "a", 2: "b", 3: "a"}
+        assert store.stats() == {"entries": 3, "blobs": 2, "segments": 1, "live_bytes": 200,
+                                 "segment_bytes": 200, "dead_bytes": 0}
+        with pytest.raises(KeyError):
+            store.put(4, "missing", None)
+        assert store.get(4) is None
+
+
+def test_segments_roll_over_and_persist(tmp_path):
+    """
+    Test new segments start when one is full and a reopened store reads and appends correctly.
+    """
+    with PackedThumbnailStore(str(tmp_path), segment_size=250) as store:
+        store.put_many([(index, f"k{index}", blob(index)) for index in range(5)])
+        assert store.get(0) == blob(0)  # maps the active segment before it grows
+        store.put(5, "k5", blob(5))
+        assert store.get_many(range(6)) == {index: blob(index) for index in range(6)}
+        assert store.stats()["segments"] == 3
+
+    with PackedThumbnailStore(str(tmp_path), segment_size=250) as store:
+        store.put(6, "k6", blob(6))
+        assert store.get_many(range(7)) == {index: blob(index) for index in range(7)}
+        assert store.stats()["segments"] == 4
+
+
+def test_get_many_reads_in_offset_order(tmp_path, mocker):
+    """
+    Test bulk reads are sorted by segment and offset whatever order the IDs come in.
+    """
+    with PackedThumbnailStore(str(tmp_path), segment_size=250) as store:
+        store.put_many([(index, f"k{index}", blob(index)) for index in range(6)])
+        view = mocker.spy(store, "_view")
+
+        store.get_many([5, 0, 3, 1, 4, 2])
+
+        assert [call.args[1] for call in view.call_args_list] == [100, 200, 100, 200, 100, 200]
+        assert [call.args[0] for call in view.call_args_list] == [1, 1, 2, 2, 3, 3]
+
+
+def test_compact_reclaims_dead_segments(tmp_path):
+    """
+    Test compaction drops unreferenced blobs, rewrites mostly dead segments and keeps live data.
+    """
+    with PackedThumbnailStore(str(tmp_path), segment_size=300) as store:
+        store.put_many([(index, f"k{index}", blob(index)) for index in range(9)])
+        store.put(9, "k0", None)
+        store.delete([0, 1, 2, 3, 5])
+
+        assert store.stats()["dead_bytes"] == 400
+        reclaimed = store.compact(max_dead_fraction=0.5)
+
+        assert reclaimed == 400
+        assert store.stats()["dead_bytes"] == 0
+        assert store.get_many(range(10)) == {index: blob(index) for index in (4, 6, 7, 8)} | {9: blob(0)}
+        assert not os.path.exists(os.path.join(str(tmp_path), "segment_00002.dat"))
+
+    with PackedThumbnailStore(str(tmp_path)) as store:
+        assert store.get_many([4, 9]) == {4: blob(4), 9: blob(0)}
+        assert store.compact() == 0
@@ -0,0 +1,97 @@
+"""
+Unit tests for thumbnail frame selection, scaling and content-addressed writes.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+from app.media_scan.thumbnails.render import (
+    content_addressed_path, encode_jpeg, fit_within, load_image, parse_tiers, render_tiers, representative_frame,
+    write_atomically,
+)
+from tests.fixtures.video_fixtures import synthetic_frames, write_video
+
+
+def test_fit_within_keeps_aspect_ratio():
+    """
+    Test large images shrink to the longest side and small ones are left alone.
+    """
+    image = np.zeros((600, 800, 3), dtype=np.uint8)
+
+    assert fit_within(image, 200).shape == (150, 200, 3)
+    assert fit_within(image, 1000) is image
+
+
+def test_representative_frame_skips_flat_frames(tmp_path):
+    """
+    Test the most detailed sampled frame is chosen over black intro and outro frames.
+    """
+    black = [np.zeros((120, 160, 3), dtype=np.uint8)] * 20
+    path = write_video(tmp_path / "intro.avi", black + synthetic_frames(seed=3, count=20) + black)
+
+    frame = representative_frame(path)
+
+    assert frame is not None and frame.std() > 20
+    assert representative_frame(str(tmp_path / "missing.avi")) is None
+
+
+def test_load_image_decodes_reduced(tmp_path):
+    """
+    Test a large JPEG is decoded at reduced scale but never below the thumbnail size.
+    """
+    path = str(tmp_path / "large.jpg")
+    cv2.imwrite(path, synthetic_frames(seed=4, count=1, size=(1600, 1200))[0])
+
+    assert load_image(path, 320, resolution="1600x1200").shape[:2] == (300, 400)
+    assert load_image(path, 320).shape[:2] == (1200, 1600)
+
+
+def test_content_addressed_write(tmp_path):
+    """
+    Test thumbnails fan out by hash prefix, the first writer wins and no temporary files are left.
+    """
+    path = content_addressed_path(str(tmp_path), "abcdef", "icon")
+    assert write_atomically(path, encode_jpeg(np.full((8, 8, 3), 128, dtype=np.uint8)))
+    assert not write_atomically(path, b"second writer")
+
+    assert path == os.path.join(str(tmp_path), "icon", "ab", "abcdef.jpg")
+    assert cv2.imread(path).shape == (8, 8, 3)
+    assert os.listdir(os.path.dirname(path)) == ["abcdef.jpg"]
+
+
+def test_parse_tiers():
+    """
+    Test tier specs keep their order and malformed entries are rejected.
+    """
+    assert parse_tiers("icon:96, medium:320,preview:800") == {"icon": 96, "medium": 320, "preview": 800}
+    with pytest.raises(ValueError):
+        parse_tiers("icon:96,medium")
+
+
+def test_render_tiers_from_one_image():
+    """
+    Test every tier is encoded at its own size from a single decoded image.
+    """
+    image = synthetic_frames(seed=7, count=1, size=(1000, 500))[0]
+
+    encoded = render_tiers(image, {"icon": 50, "preview": 400, "medium": 200})
+
+    sizes = {name: cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR).shape[:2]
+             for name, data in encoded.items()}
+    assert sizes == {"icon": (25, 50), "medium": (100, 200), "preview": (200, 400)}
+
+
+def test_concurrent_writes_to_one_path(tmp_path):
+    """
+    Test threads writing the same thumbnail all succeed, exactly one wins and no temporary files are left.
+    """
+    path = content_addressed_path(str(tmp_path), "abcdef", "icon")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        written = list(executor.map(lambda number: write_atomically(path, b"writer %d" % number), range(64)))
+
+    assert written.count(True) == 1
+    assert os.listdir(os.path.dirname(path)) == ["abcdef.jpg"]